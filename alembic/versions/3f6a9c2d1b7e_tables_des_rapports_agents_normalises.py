@@ -0,0 +1,79 @@
+"""Tables des rapports d'agents normalisés (agent_reports, agent_report_databases)
+
+Revision ID: 3f6a9c2d1b7e
+Revises: 189d154d9780
+Create Date: 2026-10-19 09:12:04.218311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a9c2d1b7e'
+down_revision: Union[str, None] = '189d154d9780'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'agent_reports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('agent_id', sa.String(), nullable=False),
+        sa.Column('operation_log_file_name', sa.String(), nullable=False),
+        sa.Column('operation_start_time', sa.DateTime(), nullable=True),
+        sa.Column('operation_end_time', sa.DateTime(), nullable=True),
+        sa.Column('overall_status', sa.String(), nullable=True),
+        sa.Column('database_count', sa.Integer(), nullable=False),
+        sa.Column('ingested_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('agent_id', 'operation_log_file_name', name='_unique_agent_report'),
+    )
+    op.create_index(op.f('ix_agent_reports_id'), 'agent_reports', ['id'], unique=False)
+    op.create_index(op.f('ix_agent_reports_agent_id'), 'agent_reports', ['agent_id'], unique=False)
+    op.create_index(op.f('ix_agent_reports_operation_end_time'), 'agent_reports', ['operation_end_time'], unique=False)
+
+    op.create_table(
+        'agent_report_databases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('report_id', sa.Integer(), nullable=False),
+        sa.Column('database_name', sa.String(), nullable=False),
+        sa.Column('staged_file_name', sa.String(), nullable=True),
+        sa.Column('logs_summary', sa.Text(), nullable=True),
+        sa.Column('backup_status', sa.Boolean(), nullable=True),
+        sa.Column('backup_start_time', sa.DateTime(), nullable=True),
+        sa.Column('backup_end_time', sa.DateTime(), nullable=True),
+        sa.Column('backup_sha256', sa.String(length=64), nullable=True),
+        sa.Column('backup_size', sa.BigInteger(), nullable=True),
+        sa.Column('compress_status', sa.Boolean(), nullable=True),
+        sa.Column('compress_start_time', sa.DateTime(), nullable=True),
+        sa.Column('compress_end_time', sa.DateTime(), nullable=True),
+        sa.Column('compress_sha256', sa.String(length=64), nullable=True),
+        sa.Column('compress_size', sa.BigInteger(), nullable=True),
+        sa.Column('transfer_status', sa.Boolean(), nullable=True),
+        sa.Column('transfer_start_time', sa.DateTime(), nullable=True),
+        sa.Column('transfer_end_time', sa.DateTime(), nullable=True),
+        sa.Column('transfer_error_message', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['report_id'], ['agent_reports.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('report_id', 'database_name', name='_unique_report_database'),
+    )
+    op.create_index(op.f('ix_agent_report_databases_id'), 'agent_report_databases', ['id'], unique=False)
+    op.create_index(op.f('ix_agent_report_databases_report_id'), 'agent_report_databases', ['report_id'], unique=False)
+    op.create_index(op.f('ix_agent_report_databases_database_name'), 'agent_report_databases', ['database_name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_agent_report_databases_database_name'), table_name='agent_report_databases')
+    op.drop_index(op.f('ix_agent_report_databases_report_id'), table_name='agent_report_databases')
+    op.drop_index(op.f('ix_agent_report_databases_id'), table_name='agent_report_databases')
+    op.drop_table('agent_report_databases')
+    op.drop_index(op.f('ix_agent_reports_operation_end_time'), table_name='agent_reports')
+    op.drop_index(op.f('ix_agent_reports_agent_id'), table_name='agent_reports')
+    op.drop_index(op.f('ix_agent_reports_id'), table_name='agent_reports')
+    op.drop_table('agent_reports')
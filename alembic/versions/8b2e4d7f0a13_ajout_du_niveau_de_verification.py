@@ -0,0 +1,29 @@
+"""Ajout du champ verification_tier à la table backup_entries
+
+Revision ID: 8b2e4d7f0a13
+Revises: 3f6a9c2d1b7e
+Create Date: 2026-10-19 09:14:37.904126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d7f0a13'
+down_revision: Union[str, None] = '3f6a9c2d1b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('backup_entries', sa.Column('verification_tier', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('backup_entries') as batch_op:
+        batch_op.drop_column('verification_tier')
@@ -0,0 +1,28 @@
+"""Index (expected_job_id, timestamp) sur backup_entries pour la détection groupée des MISSING
+
+Revision ID: a4e7c1d9b352
+Revises: f2c9d4e6a118
+Create Date: 2026-10-19 14:02:17.318540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e7c1d9b352'
+down_revision: Union[str, None] = 'f2c9d4e6a118'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_backup_entries_job_timestamp', 'backup_entries', ['expected_job_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_backup_entries_job_timestamp', table_name='backup_entries')
@@ -0,0 +1,32 @@
+"""Empreinte courte (content_fingerprint) indexée sur backup_entries
+
+Revision ID: b7d3e9f1c264
+Revises: a4e7c1d9b352
+Create Date: 2026-10-19 16:41:05.207913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e9f1c264'
+down_revision: Union[str, None] = 'a4e7c1d9b352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('backup_entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_fingerprint', sa.String(length=64), nullable=True, comment="Empreinte courte du fichier (<algorithme>:<hex>), calculée avec le SHA-256"))
+        batch_op.create_index('ix_backup_entries_content_fingerprint', ['content_fingerprint'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('backup_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_backup_entries_content_fingerprint')
+        batch_op.drop_column('content_fingerprint')
@@ -0,0 +1,54 @@
+"""Table scan_runs (registre des passages du scanner)
+
+Revision ID: c41d7e9a5f20
+Revises: 8b2e4d7f0a13
+Create Date: 2026-10-19 10:02:51.377540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e9a5f20'
+down_revision: Union[str, None] = '8b2e4d7f0a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'scan_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scanner', sa.String(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=False),
+        sa.Column('duration_seconds', sa.Float(), nullable=False),
+        sa.Column('succeeded', sa.Boolean(), nullable=False),
+        sa.Column('phase_durations', sa.JSON(), nullable=True),
+        sa.Column('status_counts', sa.JSON(), nullable=True),
+        sa.Column('report_outcomes', sa.JSON(), nullable=True),
+        sa.Column('agents_processed', sa.Integer(), nullable=False),
+        sa.Column('reports_processed', sa.Integer(), nullable=False),
+        sa.Column('entries_created', sa.Integer(), nullable=False),
+        sa.Column('files_hashed', sa.Integer(), nullable=False),
+        sa.Column('bytes_hashed', sa.BigInteger(), nullable=False),
+        sa.Column('bytes_promoted', sa.BigInteger(), nullable=False),
+        sa.Column('report_cache_hits', sa.Integer(), nullable=False),
+        sa.Column('report_cache_lookups', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_scan_runs_id'), 'scan_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_scan_runs_started_at'), 'scan_runs', ['started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_scan_runs_started_at'), table_name='scan_runs')
+    op.drop_index(op.f('ix_scan_runs_id'), table_name='scan_runs')
+    op.drop_table('scan_runs')
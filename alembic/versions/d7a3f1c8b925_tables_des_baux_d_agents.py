@@ -0,0 +1,50 @@
+"""Tables scanner_nodes et agent_leases (partage des agents entre instances du scanner)
+
+Revision ID: d7a3f1c8b925
+Revises: c41d7e9a5f20
+Create Date: 2026-10-19 11:20:07.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3f1c8b925'
+down_revision: Union[str, None] = 'c41d7e9a5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'scanner_nodes',
+        sa.Column('node_id', sa.String(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('node_id'),
+    )
+    op.create_index(op.f('ix_scanner_nodes_expires_at'), 'scanner_nodes', ['expires_at'], unique=False)
+    op.create_table(
+        'agent_leases',
+        sa.Column('agent_id', sa.String(), nullable=False),
+        sa.Column('node_id', sa.String(), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('agent_id'),
+    )
+    op.create_index(op.f('ix_agent_leases_node_id'), 'agent_leases', ['node_id'], unique=False)
+    op.create_index(op.f('ix_agent_leases_expires_at'), 'agent_leases', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_agent_leases_expires_at'), table_name='agent_leases')
+    op.drop_index(op.f('ix_agent_leases_node_id'), table_name='agent_leases')
+    op.drop_table('agent_leases')
+    op.drop_index(op.f('ix_scanner_nodes_expires_at'), table_name='scanner_nodes')
+    op.drop_table('scanner_nodes')
@@ -0,0 +1,31 @@
+"""Heure attendue (facultative) des jobs : expected_hour_utc, expected_minute_utc
+
+Revision ID: f2c9d4e6a118
+Revises: e5b8c2a7d341
+Create Date: 2026-10-19 13:10:52.661904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9d4e6a118'
+down_revision: Union[str, None] = 'e5b8c2a7d341'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('expected_backup_jobs', sa.Column('expected_hour_utc', sa.Integer(), nullable=True))
+    op.add_column('expected_backup_jobs', sa.Column('expected_minute_utc', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('expected_backup_jobs') as batch_op:
+        batch_op.drop_column('expected_minute_utc')
+        batch_op.drop_column('expected_hour_utc')
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import expected_backup_jobs, backup_entries
+from app.api.endpoints import expected_backup_jobs, backup_entries, agent_reports, scan_runs
 
 api_router = APIRouter()
 
@@ -15,4 +15,18 @@ api_router.include_router(
     backup_entries.router,
     prefix="/entries",
     tags=["Backup Entries"]
-) 
\ No newline at end of file
+)
+
+# Intégration des endpoints pour les rapports d'agents ingérés
+api_router.include_router(
+    agent_reports.router,
+    prefix="/reports",
+    tags=["Agent Reports"]
+)
+
+# Intégration des endpoints du registre des passages du scanner
+api_router.include_router(
+    scan_runs.router,
+    prefix="/scans",
+    tags=["Scan Runs"]
+)
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+# Importation des schémas des rapports ingérés
+from app.schemas.agent_report import AgentReport, AgentReportDatabase
+from app.crud import agent_report as crud_report
+from app.core.database import get_db
+
+router = APIRouter(
+    prefix="",
+    tags=["Agent Reports"],
+    responses={404: {"description": "Non trouvé"}},
+)
+
+@router.get("/", response_model=List[AgentReport])
+def read_agent_reports(
+    agent_id: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, gt=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Retourne les rapports STATUS.json ingérés, du plus récent au plus ancien.
+    - `agent_id` restreint la liste à un agent.
+    """
+    return crud_report.get_agent_reports(db=db, agent_id=agent_id, skip=skip, limit=limit)
+
+@router.get("/by_database/{database_name}", response_model=List[AgentReportDatabase])
+def read_report_databases(
+    database_name: str = Path(..., title="Nom de la base de données"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, gt=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Retourne l'historique normalisé (BACKUP/COMPRESS/TRANSFER) d'une base de données.
+    """
+    return crud_report.get_report_databases_by_name(db=db, database_name=database_name, skip=skip, limit=limit)
+
+@router.get("/{report_id}", response_model=AgentReport)
+def read_agent_report(
+    report_id: int = Path(..., title="ID du rapport", gt=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Récupère un rapport ingéré par son identifiant.
+    """
+    report = crud_report.get_agent_report(db=db, report_id=report_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rapport non trouvé")
+    return report
@@ -43,6 +43,18 @@ def read_backup_entries_by_job(
     entries = crud_entry.get_backup_entries_by_job_id(db=db, job_id=job_id, skip=skip, limit=limit)
     return entries
 
+@router.get("/by_fingerprint/{fingerprint}", response_model=List[BackupEntry])
+def read_backup_entries_by_fingerprint(
+    fingerprint: str = Path(..., title="Empreinte courte (<algorithme>:<hex>)", min_length=1, max_length=64),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, gt=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Récupère les BackupEntry de contenu identique (même content_fingerprint), tous jobs confondus.
+    """
+    return crud_entry.get_backup_entries_by_fingerprint(db=db, fingerprint=fingerprint, skip=skip, limit=limit)
+
 @router.get("/{entry_id}", response_model=BackupEntry)
 def read_backup_entry(
     entry_id: int = Path(..., title="ID de l'entrée", gt=0),
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+
+router = APIRouter(
+    prefix="",
+    tags=["Metrics"],
+)
+
+@router.get("", response_class=PlainTextResponse)
+def read_metrics():
+    """
+    Expose les métriques internes du scanner et de l'API au format texte Prometheus
+    (durées des phases, octets hachés, latences des commits et des notifications...).
+    """
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+# Importation des schémas du registre des passages du scanner
+from app.schemas.scan_run import ScanRun, ScanTrendPoint
+from app.crud import scan_run as crud_scan_run
+from app.core.database import get_db
+
+router = APIRouter(
+    prefix="",
+    tags=["Scan Runs"],
+    responses={404: {"description": "Non trouvé"}},
+)
+
+@router.get("/", response_model=List[ScanRun])
+def read_scan_runs(
+    scanner: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, gt=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Retourne les passages du scanner, du plus récent au plus ancien.
+    - `scanner` restreint la liste à un scanner (mvp, backup_scanner).
+    """
+    return crud_scan_run.get_scan_runs(db=db, scanner=scanner, skip=skip, limit=limit)
+
+@router.get("/trends", response_model=List[ScanTrendPoint])
+def read_scan_trends(
+    days: int = Query(30, gt=0, le=366),
+    scanner: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Retourne les agrégats quotidiens des passages (durées, octets hachés, erreurs)
+    sur les `days` derniers jours.
+    """
+    return crud_scan_run.get_scan_trends(db=db, days=days, scanner=scanner)
+
+@router.get("/{scan_run_id}", response_model=ScanRun)
+def read_scan_run(
+    scan_run_id: int = Path(..., title="ID du passage", gt=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Récupère un passage du scanner par son identifiant.
+    """
+    scan_run = crud_scan_run.get_scan_run(db=db, scan_run_id=scan_run_id)
+    if scan_run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Passage non trouvé")
+    return scan_run
@@ -0,0 +1,312 @@
+# app/cli.py
+# Commandes d'exploitation du scanner, sans passer par l'API ni attendre le prochain passage planifié.
+#
+#   scan : passage ponctuel de scanner_MVP.process_all_agents, éventuellement restreint à certains agents
+#          (identifiants, entreprises des jobs attendus, motifs glob sur les dossiers). Avec une liste
+#          d'agents explicite, seuls leurs dossiers sont lus : la racine n'est pas parcourue.
+#          Le passage est enregistré dans scan_runs comme un passage planifié et ses statistiques sont
+#          émises en JSON (--json, "-" pour la sortie standard).
+#   replay : rejeu des rapports archivés (app/services/report_replay.py) pour reconstruire l'historique
+#            BackupEntry et l'état des jobs, avec les mêmes critères de sélection des agents.
+#   analytics : tendances de tailles et de durées de l'historique des rapports et anomalies
+#               (app/services/backup_analytics.py, NumPy requis).
+#   export : export incrémental de backup_entries en Parquet / Arrow IPC partitionné par entreprise et par mois
+#            (app/services/history_export.py, pyarrow requis).
+#
+# Usage :
+#     python -m app.cli scan --agent SIRPACAM_BAFOUSSAM_ORANGE
+#     python -m app.cli scan --company SIRPACAM --pattern "*_DOUALA_*" --workers 4 --json -
+#     python -m app.cli scan --agent SIRPACAM_BAFOUSSAM_ORANGE --no-archive --json stats.json
+#     python -m app.cli replay --company SIRPACAM --since 2025-06-01 --until 2025-06-30 --workers 4 --json -
+#     python -m app.cli replay --agent SIRPACAM_BAFOUSSAM_ORANGE --replace
+#     python -m app.cli analytics --days 30 --anomalies-only --json -
+#     python -m app.cli export --output /srv/exports/backup_history
+#     python -m app.cli export --format arrow --full --json -
+
+import argparse
+import contextlib
+import fnmatch
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import configure_logging
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CliError(Exception):
+    """Exception personnalisée pour les erreurs des commandes d'exploitation."""
+    pass
+
+
+def select_agents(db_session: Session, agent_ids: Sequence[str] = (), companies: Sequence[str] = (),
+                  patterns: Sequence[str] = (), root_folder: Optional[str] = None) -> Optional[List[str]]:
+    """
+    Dossiers d'agents à scanner, dans l'ordre des critères et sans doublon.
+    Retourne None sans aucun critère (passage complet).
+
+    - agent_ids : noms de dossiers d'agents, pris tels quels ;
+    - companies : agents responsables d'un job attendu actif de ces entreprises ;
+    - patterns  : motifs glob comparés aux dossiers de la racine (seul critère qui la liste).
+    """
+    if not (agent_ids or companies or patterns):
+        return None
+    selected = list(agent_ids)
+    if companies:
+        from app.models.models import ExpectedBackupJob
+        rows = (
+            db_session.query(ExpectedBackupJob.agent_id_responsible)
+            .filter(ExpectedBackupJob.is_active.is_(True), ExpectedBackupJob.company_name.in_(list(companies)))
+            .distinct()
+            .order_by(ExpectedBackupJob.agent_id_responsible)
+            .all()
+        )
+        selected.extend(agent_id for (agent_id,) in rows)
+    if patterns:
+        root_folder = root_folder or settings.BACKUP_STORAGE_ROOT
+        try:
+            folders = sorted(os.listdir(root_folder))
+        except OSError as e:
+            raise CliError(f"Racine des agents illisible : {root_folder} ({e})")
+        selected.extend(name for name in folders if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns))
+    return list(dict.fromkeys(selected))
+
+
+def run_scan(db_session: Session, agents: Optional[List[str]] = None, archive: bool = True,
+             workers: Optional[int] = None) -> dict:
+    """
+    Passage ponctuel du scanner sur `agents` (None = tous), enregistré dans scan_runs.
+    Une erreur du passage est consignée dans ses statistiques (succeeded=False), comme pour un passage planifié.
+
+    Returns:
+        dict: colonnes de scan_runs du passage, agents demandés et dossiers introuvables.
+
+    Raises:
+        CliError: Si le passage ne peut pas être enregistré.
+    """
+    from app.schemas.scan_run import ScanRun as ScanRunSchema
+    from app.services.scan_ledger import ScanLedgerError, ScanRunRecorder
+    from app.services.scanner_MVP import process_all_agents
+    from app.services.verification_pool import shutdown_verification_pool, start_verification_pool
+
+    root_folder = settings.BACKUP_STORAGE_ROOT
+    missing = [name for name in agents or [] if not os.path.isdir(os.path.join(root_folder, name))]
+    recorder = ScanRunRecorder(scanner="mvp", agents=agents)
+    start_verification_pool(workers)
+    try:
+        process_all_agents(db_session, agents=agents, archive=archive)
+    except Exception as e:
+        db_session.rollback()
+        recorder.record_error(e)
+        logger.error(f"Erreur pendant le passage ponctuel du scanner : {e}", exc_info=True)
+    finally:
+        shutdown_verification_pool()
+    try:
+        scan_run = recorder.finish(db_session)
+    except ScanLedgerError as e:
+        raise CliError(str(e))
+    stats = ScanRunSchema.model_validate(scan_run, from_attributes=True).model_dump(mode="json")
+    stats.update({"agents_requested": agents, "agents_missing": missing, "archive": archive})
+    return stats
+
+
+def _write_stats(stats: dict, json_path: Optional[str], stdout) -> None:
+    output = json.dumps(stats, indent=2, ensure_ascii=False)
+    if json_path == "-":
+        print(output, file=stdout)
+    elif json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+def _parse_datetime(value: str) -> datetime:
+    """Date ISO 8601 d'une option (--since/--until), UTC si aucun fuseau n'est indiqué."""
+    from app.utils.datetime_utils import DateTimeUtilityError, parse_iso_datetime
+    try:
+        return parse_iso_datetime(value)
+    except DateTimeUtilityError:
+        raise argparse.ArgumentTypeError(f"date ISO 8601 invalide : {value}")
+
+
+def _scan_command(args, stdout) -> int:
+    from app.core.database import Base, SessionLocal, get_engine
+
+    Base.metadata.create_all(bind=get_engine())
+    db_session = SessionLocal()
+    try:
+        agents = select_agents(db_session, args.agent, args.company, args.pattern)
+        if agents is not None and not agents:
+            raise CliError("Aucun agent ne correspond aux critères.")
+        stats = run_scan(db_session, agents, archive=not args.no_archive, workers=args.workers)
+    finally:
+        db_session.close()
+
+    _write_stats(stats, args.json_path, stdout)
+    logger.info(f"Passage ponctuel terminé : {stats['agents_processed']} agent(s), "
+                f"{stats['reports_processed']} rapport(s), {stats['error_count']} erreur(s), "
+                f"{stats['duration_seconds']:.2f}s.")
+    if stats["agents_missing"]:
+        logger.warning(f"Dossiers d'agents introuvables : {', '.join(stats['agents_missing'])}")
+    return 0 if stats["succeeded"] else 1
+
+
+def _replay_command(args, stdout) -> int:
+    from app.core.database import Base, SessionLocal, get_engine
+    from app.services.report_replay import ReportReplayError, replay_archived_reports
+
+    Base.metadata.create_all(bind=get_engine())
+    db_session = SessionLocal()
+    try:
+        agents = select_agents(db_session, args.agent, args.company, args.pattern)
+        if agents is not None and not agents:
+            raise CliError("Aucun agent ne correspond aux critères.")
+        try:
+            stats = replay_archived_reports(db_session, agents=agents, since=args.since, until=args.until,
+                                            replace=args.replace, verify_latest=not args.no_verify,
+                                            workers=args.workers)
+        except ReportReplayError as e:
+            raise CliError(str(e))
+    finally:
+        db_session.close()
+
+    stats.update({"agents_requested": agents, "since": args.since and args.since.isoformat(),
+                  "until": args.until and args.until.isoformat(), "replace": args.replace})
+    _write_stats(stats, args.json_path, stdout)
+    logger.info(f"Rejeu terminé : {stats.get('agents_replayed', 0)} agent(s), "
+                f"{stats.get('reports_replayed', 0)} rapport(s), {stats.get('entries_written', 0)} entrée(s) écrite(s), "
+                f"{stats.get('entries_kept', 0)} conservée(s).")
+    return 0
+
+
+def _analytics_command(args, stdout) -> int:
+    from datetime import timedelta, timezone
+    from app.core.database import Base, SessionLocal, get_engine
+    from app.services.backup_analytics import BackupAnalyticsError, analyze_fleet
+
+    days = settings.ANALYTICS_LOOKBACK_DAYS if args.days is None else args.days
+    Base.metadata.create_all(bind=get_engine())
+    db_session = SessionLocal()
+    try:
+        analytics = analyze_fleet(db_session, since=datetime.now(timezone.utc) - timedelta(days=days),
+                                  window=args.window)
+    except BackupAnalyticsError as e:
+        raise CliError(str(e))
+    finally:
+        db_session.close()
+
+    stats = {"days": days, "rows": analytics.rows, "anomalies": analytics.anomalies}
+    if not args.anomalies_only:
+        stats["series"] = analytics.series
+    _write_stats(stats, args.json_path, stdout)
+    logger.info(f"Analyse terminée : {analytics.rows} rapport(s), {len(analytics.series)} base(s), "
+                f"{len(analytics.anomalies)} anomalie(s).")
+    return 0
+
+
+def _export_command(args, stdout) -> int:
+    from app.core.database import Base, SessionLocal, get_engine
+    from app.services.history_export import HistoryExportError, export_backup_history
+
+    Base.metadata.create_all(bind=get_engine())
+    db_session = SessionLocal()
+    try:
+        stats = export_backup_history(db_session, args.output, args.format, args.batch_size, full=args.full)
+    except HistoryExportError as e:
+        raise CliError(str(e))
+    finally:
+        db_session.close()
+
+    _write_stats(stats, args.json_path, stdout)
+    return 0
+
+
+def _add_agent_selection(parser: argparse.ArgumentParser, action: str) -> None:
+    parser.add_argument("--agent", action="append", default=[], metavar="ID",
+                        help=f"Dossier d'agent à {action} (répétable)")
+    parser.add_argument("--company", action="append", default=[], metavar="NOM",
+                        help="Agents des jobs attendus actifs de cette entreprise (répétable)")
+    parser.add_argument("--pattern", action="append", default=[], metavar="GLOB",
+                        help="Motif glob sur les dossiers d'agents, ex. 'SIRPACAM_*' (répétable)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Commandes d'exploitation du scanner.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="Passage ponctuel du scanner, éventuellement ciblé")
+    _add_agent_selection(scan, "scanner")
+    scan.add_argument("--no-archive", action="store_true",
+                      help="Laisse les rapports traités dans log/ (pas de déplacement vers _archive)")
+    scan.add_argument("--workers", type=int, default=None,
+                      help="Processus de vérification (défaut : SCANNER_WORKER_PROCESSES, 0 = un par CPU, "
+                           "1 = en ligne)")
+    scan.add_argument("--json", dest="json_path", metavar="FICHIER",
+                      help="Écrit les statistiques du passage en JSON ('-' : sortie standard)")
+    scan.set_defaults(handler=_scan_command)
+
+    replay = commands.add_parser("replay", help="Rejeu des rapports archivés (reconstruction de l'historique)")
+    _add_agent_selection(replay, "rejouer")
+    replay.add_argument("--since", type=_parse_datetime, default=None, metavar="DATE",
+                        help="Premier rapport rejoué (ISO 8601, UTC par défaut)")
+    replay.add_argument("--until", type=_parse_datetime, default=None, metavar="DATE",
+                        help="Dernier rapport rejoué (ISO 8601, UTC par défaut)")
+    replay.add_argument("--replace", action="store_true",
+                        help="Recalcule les entrées déjà présentes pour les rapports rejoués")
+    replay.add_argument("--no-verify", action="store_true",
+                        help="Ne vérifie aucun fichier déposé : condensats rapportés par les agents uniquement")
+    replay.add_argument("--workers", type=int, default=None,
+                        help="Processus de rejeu (défaut : SCANNER_WORKER_PROCESSES, 0 = un par CPU, 1 = en ligne)")
+    replay.add_argument("--json", dest="json_path", metavar="FICHIER",
+                        help="Écrit les statistiques du rejeu en JSON ('-' : sortie standard)")
+    replay.set_defaults(handler=_replay_command)
+
+    analytics = commands.add_parser("analytics", help="Tendances de tailles et de durées, anomalies de l'historique")
+    analytics.add_argument("--days", type=int, default=None,
+                           help="Période analysée en jours (défaut : ANALYTICS_LOOKBACK_DAYS)")
+    analytics.add_argument("--window", type=int, default=None,
+                           help="Rapports précédents comparés à chaque rapport (défaut : ANALYTICS_WINDOW)")
+    analytics.add_argument("--anomalies-only", action="store_true", help="N'émet pas les statistiques par base")
+    analytics.add_argument("--json", dest="json_path", metavar="FICHIER",
+                           help="Écrit le résultat de l'analyse en JSON ('-' : sortie standard)")
+    analytics.set_defaults(handler=_analytics_command)
+
+    export = commands.add_parser("export", help="Export Parquet / Arrow de l'historique backup_entries")
+    export.add_argument("--output", default=None, metavar="DOSSIER",
+                        help="Dossier de l'export (défaut : HISTORY_EXPORT_PATH)")
+    export.add_argument("--format", choices=("parquet", "arrow"), default=None,
+                        help="Format des fichiers (défaut : HISTORY_EXPORT_FORMAT)")
+    export.add_argument("--batch-size", type=int, default=None,
+                        help="Lignes lues par lot (défaut : HISTORY_EXPORT_BATCH_SIZE)")
+    export.add_argument("--full", action="store_true",
+                        help="Remplace l'export précédent par un export complet (sinon : entrées nouvelles seulement)")
+    export.add_argument("--json", dest="json_path", metavar="FICHIER",
+                        help="Écrit les statistiques de l'export en JSON ('-' : sortie standard)")
+    export.set_defaults(handler=_export_command)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    stdout = sys.stdout
+    # JSON sur la sortie standard : les traces (print du scanner, journaux, SQL) passent sur la sortie
+    # d'erreur, y compris les gestionnaires créés pendant la commande
+    redirect = contextlib.redirect_stdout(sys.stderr) if getattr(args, "json_path", None) == "-" \
+        else contextlib.nullcontext()
+    with redirect:
+        configure_logging()
+        try:
+            return args.handler(args, stdout)
+        except CliError as e:
+            logger.error(str(e))
+            return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,33 +2,77 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from config.settings import settings
 
-import os
-
-print(f"Chemin absolu de la base principale : {os.path.abspath(settings.DATABASE_URL)}")
-
-# Moteur pour la base principale
+# Moteur pour la base principale : créé au premier usage (lifespan de l'API, première session),
+# pas à l'import, pour que les workers et les scripts démarrent sans ouvrir la base.
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    echo=True,
-    connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
-)
+_engine = None
 
-# Moteur pour la base de test
+# Moteur pour la base de test : uniquement sur demande (tests/conftest.py), jamais en production
 TEST_DATABASE_URL = "sqlite:///./data/db/test_sql_app.db"  # ✅ Base séparée pour les tests
-test_engine = create_engine(
-    TEST_DATABASE_URL,
-    echo=False,  # Moins de logs pour les tests
-    connect_args={"check_same_thread": False} if "sqlite" in TEST_DATABASE_URL else {}
-)
+_test_engine = None
+_test_session_factory = None
+
+
+def _create_engine(url: str, echo: bool):
+    return create_engine(
+        url,
+        echo=echo,
+        connect_args={"check_same_thread": False} if "sqlite" in url else {}
+    )
+
+
+def get_engine():
+    """Retourne le moteur de la base principale, créé au premier appel."""
+    global _engine
+    if _engine is None:
+        _engine = _create_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+    return _engine
+
+
+def get_test_engine():
+    """Retourne le moteur de la base de test, créé au premier appel."""
+    global _test_engine
+    if _test_engine is None:
+        _test_engine = _create_engine(TEST_DATABASE_URL, echo=False)  # Moins de logs pour les tests
+    return _test_engine
 
-# Sessions pour base principale et tests
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+
+class _LazySessionMaker(sessionmaker):
+    """sessionmaker qui se lie au moteur principal à la première session ouverte."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+def _get_test_session_factory():
+    global _test_session_factory
+    if _test_session_factory is None:
+        _test_session_factory = sessionmaker(autocommit=False, autoflush=False, bind=get_test_engine())
+    return _test_session_factory
+
+
+# Sessions pour la base principale
+SessionLocal = _LazySessionMaker(autocommit=False, autoflush=False)
 
 # Déclaration des modèles
 Base = declarative_base()
 
+
+def __getattr__(name):
+    """
+    Accès paresseux aux anciens noms du module (`engine`, `test_engine`, `TestSessionLocal`) :
+    `from app.core.database import engine` reste valable et crée le moteur à ce moment-là.
+    """
+    if name == "engine":
+        return get_engine()
+    if name == "test_engine":
+        return get_test_engine()
+    if name == "TestSessionLocal":
+        return _get_test_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Fonction pour obtenir une session de la base principale
 def get_db():
     db = SessionLocal()
@@ -41,7 +85,7 @@ def get_db():
 
 # Fonction pour obtenir une session de la base de test
 def get_test_db():
-    db = TestSessionLocal()
+    db = _get_test_session_factory()()
     if db.bind.dialect.name == "sqlite":
         db.execute("PRAGMA foreign_keys=ON")
     try:
@@ -0,0 +1,226 @@
+# app/core/leader.py
+# Ce module élit un seul processus "leader" pour exécuter le planificateur du scanner quand l'API
+# tourne avec plusieurs workers (uvicorn --workers, gunicorn) : les autres restent dédiés à l'API.
+# Deux verrous sont disponibles :
+#   - FileLeaderLock : verrou fcntl exclusif sur un fichier, libéré par le noyau à la mort du
+#     processus (workers d'un même hôte, bascule immédiate) ;
+#   - DatabaseLeaderLock : ligne de la table scheduler_locks avec expiration, renouvelée par le
+#     leader (plusieurs hôtes, bascule après SCHEDULER_LEADER_TTL_SECONDS).
+# LeaderElector retente périodiquement l'acquisition et renouvelle le verrou du leader.
+
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app.models.models import SchedulerLock
+from config.settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows : seul le verrou en base est disponible
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElectionError(Exception):
+    """Exception personnalisée pour les erreurs d'élection du leader du planificateur."""
+    pass
+
+
+def default_holder_id() -> str:
+    """Identifiant du processus candidat : '<hôte>:<pid>'."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class FileLeaderLock:
+    """Verrou exclusif non bloquant (fcntl.flock) sur un fichier local."""
+
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise LeaderElectionError("Le verrou par fichier nécessite fcntl (indisponible sur cette plateforme).")
+        self.path = path
+        self._file = None
+
+    def try_acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Informatif : le détenteur actuel, pour le diagnostic
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(default_holder_id())
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def renew(self) -> bool:
+        # Un verrou fcntl ne se perd pas tant que le descripteur reste ouvert
+        return self._file is not None
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class DatabaseLeaderLock:
+    """
+    Verrou nommé dans la table scheduler_locks, pris et renouvelé par des UPDATE conditionnels.
+    Un verrou non renouvelé expire après `ttl_seconds` et peut être repris par un autre processus.
+    """
+
+    def __init__(self, name: str = "scheduler", holder: Optional[str] = None, ttl_seconds: Optional[int] = None,
+                 session_factory: Optional[Callable] = None):
+        self.name = name
+        self.holder = holder or default_holder_id()
+        self.ttl = timedelta(seconds=ttl_seconds or settings.SCHEDULER_LEADER_TTL_SECONDS)
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.core.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def try_acquire(self, now: Optional[datetime] = None) -> bool:
+        now = now or _utcnow()
+        session = self._session()
+        try:
+            taken = session.execute(
+                update(SchedulerLock)
+                .where(SchedulerLock.name == self.name,
+                       (SchedulerLock.holder == self.holder) | (SchedulerLock.expires_at < now))
+                .values(holder=self.holder, acquired_at=now, expires_at=now + self.ttl)
+            ).rowcount
+            if taken:
+                session.commit()
+                return True
+            if session.get(SchedulerLock, self.name) is not None:
+                session.rollback()
+                return False
+            session.add(SchedulerLock(name=self.name, holder=self.holder, acquired_at=now, expires_at=now + self.ttl))
+            session.commit()
+            return True
+        except IntegrityError:
+            session.rollback()
+            return False
+        finally:
+            session.close()
+
+    def renew(self, now: Optional[datetime] = None) -> bool:
+        now = now or _utcnow()
+        session = self._session()
+        try:
+            renewed = session.execute(
+                update(SchedulerLock)
+                .where(SchedulerLock.name == self.name, SchedulerLock.holder == self.holder,
+                       SchedulerLock.expires_at >= now)
+                .values(expires_at=now + self.ttl)
+            ).rowcount
+            session.commit()
+            return bool(renewed)
+        finally:
+            session.close()
+
+    def release(self) -> None:
+        session = self._session()
+        try:
+            session.query(SchedulerLock).filter(
+                SchedulerLock.name == self.name, SchedulerLock.holder == self.holder
+            ).delete()
+            session.commit()
+        finally:
+            session.close()
+
+
+def build_leader_lock(backend: Optional[str] = None):
+    """
+    Construit le verrou selon settings.SCHEDULER_LEADER_ELECTION ("file", "db").
+    Retourne None pour "none" (pas d'élection).
+
+    Raises:
+        LeaderElectionError: Si le backend est inconnu.
+    """
+    backend = (backend or settings.SCHEDULER_LEADER_ELECTION).lower()
+    if backend == "none":
+        return None
+    if backend == "file":
+        return FileLeaderLock(settings.SCHEDULER_LEADER_LOCK_FILE)
+    if backend == "db":
+        return DatabaseLeaderLock()
+    raise LeaderElectionError(f"SCHEDULER_LEADER_ELECTION inconnu : '{backend}' (attendu : none, file, db).")
+
+
+class LeaderElector(threading.Thread):
+    """
+    Boucle d'élection : tente d'acquérir le verrou tant que le processus n'est pas leader,
+    le renouvelle ensuite, et appelle on_elected / on_demoted aux changements d'état.
+    """
+
+    def __init__(self, lock, on_elected: Callable[[], None], on_demoted: Callable[[], None],
+                 interval_seconds: Optional[float] = None):
+        super().__init__(name="scheduler-leader-elector", daemon=True)
+        self.lock = lock
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.interval = interval_seconds or settings.SCHEDULER_LEADER_RETRY_SECONDS
+        self.is_leader = False
+        self._stop_event = threading.Event()
+
+    def check(self) -> bool:
+        """Un tour d'élection ; retourne True si le processus est leader à l'issue du tour."""
+        try:
+            if not self.is_leader:
+                if self.lock.try_acquire():
+                    self.is_leader = True
+                    logger.info(f"Processus {default_holder_id()} élu leader du planificateur.")
+                    self.on_elected()
+            elif not self.lock.renew():
+                self.is_leader = False
+                logger.warning(f"Processus {default_holder_id()} : verrou du leader perdu, planificateur suspendu.")
+                self.on_demoted()
+        except Exception as e:
+            # Base ou fichier inaccessible : l'élection est retentée au tour suivant
+            logger.error(f"Erreur pendant l'élection du leader du planificateur : {e}")
+        return self.is_leader
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self.check()
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        """Arrête la boucle et rend le verrou (les autres processus peuvent être élus aussitôt)."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=self.interval + 5)
+        if self.is_leader:
+            self.is_leader = False
+            self.on_demoted()
+        try:
+            self.lock.release()
+        except Exception as e:
+            logger.error(f"Impossible de rendre le verrou du leader du planificateur : {e}")
@@ -0,0 +1,26 @@
+# app/core/logging_config.py
+# Configuration de la journalisation des processus de l'application (API et worker scanner) :
+# config/logging.yaml si présent, sinon une configuration minimale sur la sortie standard.
+
+import logging
+import os
+
+LOGGING_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config", "logging.yaml")
+
+
+def configure_logging():
+    """
+    Applique config/logging.yaml (ou une configuration minimale à défaut).
+    Appelée au démarrage du processus (lifespan de l'API, worker), pas à l'import.
+    """
+    if os.path.exists(LOGGING_CONFIG_PATH):
+        import logging.config
+        import yaml
+        try:
+            with open(LOGGING_CONFIG_PATH, "r") as f:
+                logging_config = yaml.safe_load(f)
+            logging.config.dictConfig(logging_config)
+        except Exception as e:
+            raise RuntimeError(f"{LOGGING_CONFIG_PATH} is invalid: {e}")
+    else:
+        logging.basicConfig(level=logging.INFO, format='[%(asctime)s] - [%(name)s] - %(levelname)s - %(message)s')
@@ -0,0 +1,277 @@
+# app/core/metrics.py
+# Ce module fournit des métriques en mémoire (compteurs, jauges, histogrammes) au format texte
+# de Prometheus, exposées par l'endpoint /metrics. Les métriques sont propres au processus :
+# une mise à jour coûte un verrou et quelques additions, sans dépendance externe.
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bornes par défaut des histogrammes de durée (secondes).
+DEFAULT_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base commune : nom, description, noms d'étiquettes et verrou."""
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Étiquettes attendues pour {self.name} : {self.labelnames}, reçues : {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Compteur monotone."""
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Un compteur ne peut pas décroître.")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0)
+
+    def values(self) -> Dict[LabelValues, float]:
+        """Copie des valeurs courantes, indexées par valeurs d'étiquettes (pour calculer des écarts)."""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Valeur instantanée pouvant monter ou descendre."""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Histogramme cumulatif (buckets, somme et nombre d'observations)."""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Par jeu d'étiquettes : [compteurs par bucket (non cumulés), somme, nombre]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Mesure la durée du bloc (time.perf_counter) et l'enregistre, même en cas d'exception."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._label_values(labels))
+        return series[2] if series else 0
+
+    def sum(self, **labels: str) -> float:
+        series = self._series.get(self._label_values(labels))
+        return series[1] if series else 0.0
+
+    def totals(self) -> Dict[LabelValues, Tuple[float, int]]:
+        """Copie (somme, nombre d'observations) par valeurs d'étiquettes (pour calculer des écarts)."""
+        with self._lock:
+            return {key: (total, count) for key, (_, total, count) in self._series.items()}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._series.items())
+        lines = self.header()
+        bucket_labelnames = self.labelnames + ("le",)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_labelnames, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ensemble des métriques du processus, rendu au format d'exposition texte Prometheus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrique déjà enregistrée : {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets or DEFAULT_DURATION_BUCKETS))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registre par défaut du processus.
+registry = MetricsRegistry()
+
+# --- Scanner ---
+SCAN_DURATION = registry.histogram(
+    "backup_scan_duration_seconds", "Durée d'un passage complet du scanner.", ["scanner"])
+SCAN_PHASE_DURATION = registry.histogram(
+    "backup_scan_phase_duration_seconds", "Durée de chaque phase du scanner.", ["scanner", "phase"])
+AGENTS_PROCESSED = registry.counter(
+    "backup_scan_agents_processed_total", "Dossiers d'agents parcourus par le scanner.", ["scanner"])
+REPORTS_PROCESSED = registry.counter(
+    "backup_scan_reports_processed_total", "Rapports STATUS.json traités, par issue.", ["scanner", "outcome"])
+REPORT_INGESTIONS = registry.counter(
+    "backup_report_ingestions_total", "Recherches de rapports à ingérer, par résultat (new, existing).", ["result"])
+LAST_SCAN_COMPLETED = registry.gauge(
+    "backup_scan_last_completed_timestamp_seconds", "Horodatage Unix de la fin du dernier passage.", ["scanner"])
+AGENTS_OWNED = registry.gauge(
+    "backup_scan_agents_owned", "Agents attribués à l'instance du scanner (mode sharding).", ["node"])
+
+# --- Hachage et promotion ---
+BYTES_HASHED = registry.counter(
+    "backup_hashed_bytes_total", "Octets lus pour le calcul des SHA-256.")
+HASH_DURATION = registry.histogram(
+    "backup_hash_duration_seconds", "Durée du calcul d'un SHA-256 de fichier.")
+HASH_THROUGHPUT = registry.gauge(
+    "backup_hash_throughput_bytes_per_second", "Débit du dernier hachage de fichier.")
+PROMOTION_BYTES = registry.counter(
+    "backup_promotion_bytes_total", "Octets copiés vers le stockage validé.")
+PROMOTION_DURATION = registry.histogram(
+    "backup_promotion_duration_seconds", "Durée de la copie d'une sauvegarde vers le stockage validé.")
+
+# --- Budget d'E/S du scanner ---
+IO_THROTTLE_RATE = registry.gauge(
+    "backup_io_throttle_rate_bytes_per_second", "Débit d'E/S en vigueur pour le scanner (0 = illimité).")
+IO_THROTTLE_TOKENS = registry.gauge(
+    "backup_io_throttle_tokens_bytes", "Jetons disponibles dans le seau (négatif : dette en cours d'attente).")
+IO_THROTTLE_WAITING = registry.gauge(
+    "backup_io_throttle_waiting_operations", "Opérations d'E/S en attente de jetons.")
+IO_THROTTLE_BYTES = registry.counter(
+    "backup_io_throttle_bytes_total", "Octets prélevés sur le budget d'E/S, par opération.", ["operation"])
+IO_THROTTLE_WAIT_SECONDS = registry.counter(
+    "backup_io_throttle_wait_seconds_total", "Temps passé à attendre des jetons, par opération.", ["operation"])
+
+# --- Base de données, notifications, planificateur ---
+DB_COMMIT_DURATION = registry.histogram(
+    "backup_db_commit_duration_seconds", "Durée des commits du scanner.", ["scanner"])
+NOTIFICATION_DURATION = registry.histogram(
+    "backup_notification_duration_seconds", "Durée d'envoi des notifications, par issue.", ["outcome"])
+SCHEDULER_LAG = registry.histogram(
+    "backup_scheduler_lag_seconds", "Retard entre l'heure planifiée d'un job et sa soumission.", ["job_id"])
+SCAN_NEXT_INTERVAL = registry.gauge(
+    "backup_scan_next_interval_seconds", "Intervalle choisi avant le prochain passage (cadence adaptative).")
+
+# --- Analyse de l'historique ---
+ANALYTICS_DURATION = registry.histogram(
+    "backup_analytics_duration_seconds", "Durée de l'analyse de l'historique, par phase (load, compute).", ["phase"])
+BACKUP_ANOMALIES = registry.gauge(
+    "backup_anomalies", "Bases dont le dernier rapport est signalé par l'analyse, par type d'anomalie.", ["kind"])
+
+
+# Type de contenu du format d'exposition texte Prometheus
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_metrics() -> str:
+    """Retourne toutes les métriques du registre par défaut au format texte Prometheus."""
+    return registry.render()
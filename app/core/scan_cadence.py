@@ -0,0 +1,180 @@
+# app/core/scan_cadence.py
+# Ce module choisit l'intervalle avant le prochain passage du scanner (cadence adaptative).
+# Au lieu d'un passage fixe toutes les SCANNER_INTERVAL_MINUTES, jour et nuit :
+#   - l'intervalle descend à SCANNER_CADENCE_MIN_SECONDS dès qu'un passage traite des rapports ;
+#   - il est ensuite multiplié par SCANNER_CADENCE_BACKOFF_FACTOR à chaque passage sans rapport,
+#     jusqu'à SCANNER_INTERVAL_MINUTES tant qu'une fenêtre de collecte est ouverte (heure attendue
+#     d'un job actif ± fenêtre, ou créneau où des rapports sont arrivés plusieurs jours sur les
+#     SCANNER_CADENCE_LEARNING_DAYS derniers), jusqu'à SCANNER_CADENCE_MAX_SECONDS sinon, sans
+#     dépasser l'ouverture de la prochaine fenêtre ;
+#   - le budget plafonne le nombre de passages par heure (passages espacés régulièrement une fois
+#     le plafond atteint) et la part du temps passée à scanner.
+# Les créneaux sont relus en base au plus toutes les SLOT_REFRESH_SECONDS secondes.
+
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Deque, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.metrics import SCAN_NEXT_INTERVAL
+from app.models.models import ExpectedBackupJob, ScanRun
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+# Durée de validité des créneaux chargés depuis la base
+SLOT_REFRESH_SECONDS = 600
+# Granularité (minutes) des créneaux d'arrivée appris, et nombre de jours distincts requis
+LEARNING_BUCKET_MINUTES = 15
+LEARNING_MIN_DAYS = 2
+
+
+class ScanCadenceError(Exception):
+    """Exception personnalisée pour les erreurs de la cadence adaptative du scanner."""
+    pass
+
+
+def minute_of_day(moment: datetime) -> float:
+    moment = moment.astimezone(timezone.utc) if moment.tzinfo else moment
+    return moment.hour * 60 + moment.minute + moment.second / 60
+
+
+def expected_slots(session) -> List[int]:
+    """Heures attendues distinctes des jobs actifs, en minutes depuis minuit UTC."""
+    rows = session.query(ExpectedBackupJob.expected_hour_utc, ExpectedBackupJob.expected_minute_utc).filter(
+        ExpectedBackupJob.is_active == True,
+        ExpectedBackupJob.expected_hour_utc.isnot(None),
+    ).distinct().all()
+    return sorted({hour * 60 + (minute or 0) for hour, minute in rows})
+
+
+def learned_arrival_slots(session, now: datetime, days: int) -> List[int]:
+    """
+    Créneaux (milieu d'une tranche de LEARNING_BUCKET_MINUTES minutes) où des passages ont traité
+    des rapports au moins LEARNING_MIN_DAYS jours distincts sur les `days` derniers jours.
+    """
+    since = (now - timedelta(days=days)).astimezone(timezone.utc).replace(tzinfo=None)
+    days_by_bucket = {}
+    for (started_at,) in session.query(ScanRun.started_at).filter(
+        ScanRun.started_at >= since, ScanRun.reports_processed > 0
+    ):
+        bucket = int(minute_of_day(started_at)) // LEARNING_BUCKET_MINUTES
+        days_by_bucket.setdefault(bucket, set()).add(started_at.date())
+    return sorted(
+        bucket * LEARNING_BUCKET_MINUTES + LEARNING_BUCKET_MINUTES // 2
+        for bucket, seen in days_by_bucket.items() if len(seen) >= LEARNING_MIN_DAYS
+    )
+
+
+class AdaptiveScanCadence:
+    """Calcule l'intervalle avant le prochain passage à partir de l'activité et des fenêtres de collecte."""
+
+    def __init__(self, min_seconds: Optional[float] = None, max_seconds: Optional[float] = None,
+                 window_interval_seconds: Optional[float] = None, backoff_factor: Optional[float] = None, max_scans_per_hour: Optional[int] = None,
+                 max_busy_ratio: Optional[float] = None, window_minutes: Optional[int] = None,
+                 learning_days: Optional[int] = None, session_factory: Optional[Callable] = None):
+        self.min_seconds = min_seconds or settings.SCANNER_CADENCE_MIN_SECONDS
+        self.max_seconds = max(max_seconds or settings.SCANNER_CADENCE_MAX_SECONDS, self.min_seconds)
+        # Intervalle maximal pendant une fenêtre de collecte : l'intervalle fixe historique
+        self.window_interval_seconds = min(max(
+            window_interval_seconds or settings.SCANNER_INTERVAL_MINUTES * 60, self.min_seconds), self.max_seconds)
+        self.backoff_factor = backoff_factor or settings.SCANNER_CADENCE_BACKOFF_FACTOR
+        self.max_scans_per_hour = max_scans_per_hour or settings.SCANNER_CADENCE_MAX_SCANS_PER_HOUR
+        self.max_busy_ratio = max_busy_ratio or settings.SCANNER_CADENCE_MAX_BUSY_RATIO
+        self.window_minutes = window_minutes if window_minutes is not None \
+            else settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES
+        self.learning_days = learning_days or settings.SCANNER_CADENCE_LEARNING_DAYS
+        self._session_factory = session_factory
+        # Créneaux (minutes depuis minuit UTC) autour desquels une fenêtre de collecte est ouverte
+        self.slots: List[int] = []
+        self._slots_loaded_at: Optional[datetime] = None
+        self._recent_runs: Deque[datetime] = deque()
+        self.idle_passes = 0
+
+    # --- Créneaux ---
+
+    def set_slots(self, slots, now: Optional[datetime] = None) -> None:
+        self.slots = sorted(set(slots))
+        self._slots_loaded_at = now
+
+    def refresh_slots(self, now: datetime) -> None:
+        """
+        Relit les créneaux (heures attendues + arrivées apprises) s'ils ont plus de SLOT_REFRESH_SECONDS.
+
+        Raises:
+            ScanCadenceError: Si la base est inaccessible.
+        """
+        if self._slots_loaded_at is not None and \
+                (now - self._slots_loaded_at).total_seconds() < SLOT_REFRESH_SECONDS:
+            return
+        if self._session_factory is None:
+            from app.core.database import SessionLocal
+            self._session_factory = SessionLocal
+        session = self._session_factory()
+        try:
+            slots = expected_slots(session) + learned_arrival_slots(session, now, self.learning_days)
+        except SQLAlchemyError as e:
+            raise ScanCadenceError(f"Impossible de charger les créneaux de collecte : {e}")
+        finally:
+            session.close()
+        self.set_slots(slots, now)
+        logger.debug(f"Cadence du scanner : {len(self.slots)} créneau(x) de collecte.")
+
+    def in_window(self, now: datetime) -> bool:
+        """True si une fenêtre de collecte (créneau ± fenêtre) est ouverte à `now`."""
+        current = minute_of_day(now)
+        for slot in self.slots:
+            distance = (current - slot) % MINUTES_PER_DAY
+            if distance <= self.window_minutes or distance >= MINUTES_PER_DAY - self.window_minutes:
+                return True
+        return False
+
+    def seconds_until_window(self, now: datetime) -> Optional[float]:
+        """Secondes avant l'ouverture de la prochaine fenêtre de collecte (None sans créneau)."""
+        if not self.slots:
+            return None
+        if self.in_window(now):
+            return 0.0
+        current = minute_of_day(now)
+        return min((slot - self.window_minutes - current) % MINUTES_PER_DAY for slot in self.slots) * 60
+
+    # --- Intervalle ---
+
+    def next_interval(self, now: datetime, reports_processed: int = 0, duration_seconds: float = 0.0) -> float:
+        """
+        Enregistre le passage terminé à `now` et retourne l'intervalle (secondes) avant le suivant.
+        """
+        self._recent_runs.append(now)
+        while self._recent_runs and self._recent_runs[0] <= now - timedelta(hours=1):
+            self._recent_runs.popleft()
+
+        if reports_processed > 0:
+            self.idle_passes = 0
+            interval = self.min_seconds
+        else:
+            self.idle_passes += 1
+            backoff = self.min_seconds * self.backoff_factor ** self.idle_passes
+            if self.in_window(now):
+                interval = min(backoff, self.window_interval_seconds)
+            else:
+                interval = min(backoff, self.max_seconds)
+                # Pas de sommeil au-delà de l'ouverture de la prochaine fenêtre
+                until_window = self.seconds_until_window(now)
+                if until_window is not None:
+                    interval = min(interval, max(until_window, self.window_interval_seconds))
+
+        # Budget : part du temps passée à scanner, puis nombre de passages par heure
+        if 0 < self.max_busy_ratio < 1 and duration_seconds > 0:
+            interval = max(interval, duration_seconds * (1 - self.max_busy_ratio) / self.max_busy_ratio)
+        if len(self._recent_runs) >= self.max_scans_per_hour:
+            interval = max(interval, 3600 / self.max_scans_per_hour)
+
+        SCAN_NEXT_INTERVAL.set(interval)
+        return interval
+
+
+# Cadence du processus, utilisée par le planificateur.
+scan_cadence = AdaptiveScanCadence()
@@ -1,7 +1,16 @@
 # app/core/scheduler.py
 import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from apscheduler.events import EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.background import BackgroundScheduler
-from app.services.scanner_MVP import run_new_scanner  # Import du nouveau scanner
+from app.core.leader import LeaderElector, build_leader_lock
+from app.core.metrics import SCHEDULER_LAG
+from app.core.scan_cadence import ScanCadenceError, scan_cadence
+from app.services.agent_sharding import AgentShardingError, get_shard_coordinator
+from app.models.models import ScanRun
+from app.services.scan_ledger import ScanRunRecorder, ScanLedgerError
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -9,50 +18,227 @@ logger = logging.getLogger(__name__)
 # Initialise le planificateur en arrière-plan
 scheduler = BackgroundScheduler()
 
+SCANNER_JOB_ID = 'backup_scanner_main_job'
+
+# Élection du processus qui exécute les scans (None si désactivée ou planificateur non démarré)
+leader_elector: Optional[LeaderElector] = None
+
+def record_scheduler_lag(event):
+    """
+    Écouteur APScheduler : mesure le retard entre l'heure planifiée d'un job et sa soumission
+    à l'exécuteur (métrique backup_scheduler_lag_seconds).
+    """
+    if not event.scheduled_run_times:
+        return
+    lag = (datetime.now(timezone.utc) - max(event.scheduled_run_times)).total_seconds()
+    SCHEDULER_LAG.observe(max(lag, 0.0), job_id=event.job_id)
+
+scheduler.add_listener(record_scheduler_lag, EVENT_JOB_SUBMITTED)
+
 def run_new_scanner_job():
     """
     Fonction wrapper exécutée par APScheduler.
     Elle déclenche l'exécution du scanner sans passer d'arguments.
     """
+    if leader_elector is not None and not leader_elector.is_leader:
+        logger.info("Processus non leader : passage du scanner ignoré.")
+        return
+    recorder = ScanRunRecorder(scanner="mvp")
     try:
         logger.info("Début de l'exécution planifiée du scanner de sauvegardes.")
+        # Import au premier passage : le scanner (notifier, sys.path) n'est pas chargé au démarrage de l'API
+        from app.services.scanner_MVP import run_new_scanner
         # Appelle la fonction principale du scanner sans passer de session DB (elle s'en charge en interne)
         run_new_scanner()
         logger.info("Exécution planifiée du scanner de sauvegardes terminée avec succès.")
     except Exception as e:
         # Capture toutes les exceptions et les logue pour éviter que le job ne crashe le scheduler
+        recorder.record_error(e)
         logger.error(f"Erreur lors de l'exécution du job du scanner de sauvegardes : {e}", exc_info=True)
     finally:
+        scan_run = record_scan_run(recorder)
+        if settings.SCANNER_ANALYTICS_ENABLED:
+            # Tailles et durées de l'historique comparées aux rapports précédents (NumPy requis)
+            from app.services.backup_analytics import run_post_scan_analytics
+            run_post_scan_analytics()
+        if settings.SCANNER_ADAPTIVE_CADENCE_ENABLED:
+            plan_next_scan(scan_run)
         logger.debug("Job du scanner terminé.")
 
-def start_scheduler():
+def record_scan_run(recorder: ScanRunRecorder) -> Optional[ScanRun]:
     """
-    Démarre le planificateur et ajoute le job du scanner.
+    Écrit la ligne scan_runs du passage terminé et la retourne. Une erreur d'écriture est loguée
+    sans interrompre le planificateur (retourne None).
     """
+    from app.core.database import SessionLocal
+    db_session = SessionLocal()
+    try:
+        return recorder.finish(db_session)
+    except ScanLedgerError as e:
+        logger.error(str(e))
+        return None
+    finally:
+        db_session.close()
+
+def plan_next_scan(scan_run: Optional[ScanRun]):
+    """
+    Cadence adaptative : avance ou recule le prochain passage selon l'activité du passage terminé
+    et les fenêtres de collecte (voir app/core/scan_cadence.py).
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        scan_cadence.refresh_slots(now)
+    except ScanCadenceError as e:
+        # Les créneaux précédents restent utilisés
+        logger.error(str(e))
+    interval = scan_cadence.next_interval(
+        now,
+        reports_processed=scan_run.reports_processed if scan_run is not None else 0,
+        duration_seconds=scan_run.duration_seconds if scan_run is not None else 0.0,
+    )
     if not scheduler.running:
+        return
+    # modify_job prend le verrou des jobstores, que shutdown() garde en attendant la fin de ce job :
+    # replanifier depuis un thread séparé évite l'interblocage à l'arrêt.
+    threading.Thread(target=_reschedule_scanner, args=(now + timedelta(seconds=interval), interval),
+                     name="scan-cadence", daemon=True).start()
+
+def _reschedule_scanner(next_run_time: datetime, interval: float):
+    try:
+        scheduler.modify_job(SCANNER_JOB_ID, next_run_time=next_run_time)
+    except Exception as e:
+        # Planificateur arrêté ou job retiré pendant le passage
+        logger.warning(f"Impossible de replanifier le scanner : {e}")
+        return
+    logger.info(f"Prochain passage du scanner dans {interval:.0f} secondes.")
+
+def run_shard_heartbeat_job():
+    """
+    Battement de cœur de l'instance en mode sharding : la maintient vivante et prolonge ses baux
+    entre deux passages (et pendant un passage long).
+    """
+    from app.core.database import SessionLocal
+    db_session = SessionLocal()
+    try:
+        get_shard_coordinator().heartbeat(db_session)
+    except AgentShardingError as e:
+        logger.error(str(e))
+    finally:
+        db_session.close()
+
+def release_shard_leases():
+    """Rend les baux de l'instance à l'arrêt, pour que les autres instances reprennent ses agents sans attendre."""
+    from app.core.database import SessionLocal
+    db_session = SessionLocal()
+    try:
+        get_shard_coordinator().release_all(db_session)
+    except AgentShardingError as e:
+        logger.error(str(e))
+    finally:
+        db_session.close()
+
+def schedule_jobs():
+    """
+    Ajoute au planificateur le job du scanner (et le battement de cœur du mode sharding).
+    """
+    if settings.SCANNER_ADAPTIVE_CADENCE_ENABLED:
+        # Cadence adaptative : premier passage immédiat, puis chaque passage fixe l'heure du suivant
+        # (plan_next_scan) ; l'intervalle maximal ne sert que de filet de sécurité.
+        scheduler.add_job(
+            run_new_scanner_job,
+            'interval',
+            seconds=settings.SCANNER_CADENCE_MAX_SECONDS,
+            id=SCANNER_JOB_ID,
+            next_run_time=datetime.now(timezone.utc),
+            replace_existing=True,
+            misfire_grace_time=90,
+            max_instances=1,
+            coalesce=True,
+        )
+        logger.info(f"Job '{SCANNER_JOB_ID}' ajouté au planificateur. Cadence adaptative : "
+                    f"{settings.SCANNER_CADENCE_MIN_SECONDS} à {settings.SCANNER_CADENCE_MAX_SECONDS} secondes.")
+    else:
         # Ajoute le job pour exécuter run_new_scanner_job à un intervalle défini
         scheduler.add_job(
             run_new_scanner_job,
             'interval',
             minutes=settings.SCANNER_INTERVAL_MINUTES,
-            id='backup_scanner_main_job',
+            id=SCANNER_JOB_ID,
             replace_existing=True,
             misfire_grace_time=90,  # Facultatif, permet au job de s'exécuter jusqu'à 60 secondes après l'heure prévue
             max_instances=1,
             coalesce=True,
         )
-        logger.info(f"Job 'backup_scanner_main_job' ajouté au planificateur. Intervalle : {settings.SCANNER_INTERVAL_MINUTES} minutes.")
-        scheduler.start()
-        logger.info("Planificateur APScheduler démarré.")
-    else:
+        logger.info(f"Job '{SCANNER_JOB_ID}' ajouté au planificateur. Intervalle : {settings.SCANNER_INTERVAL_MINUTES} minutes.")
+    if settings.SCANNER_SHARDING_ENABLED:
+        scheduler.add_job(
+            run_shard_heartbeat_job,
+            'interval',
+            seconds=settings.SCANNER_HEARTBEAT_INTERVAL_SECONDS,
+            id='scanner_shard_heartbeat_job',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+        logger.info(f"Mode sharding actif pour l'instance '{get_shard_coordinator().node_id}'. "
+                    f"Battement de cœur toutes les {settings.SCANNER_HEARTBEAT_INTERVAL_SECONDS} secondes.")
+
+def activate_scheduler():
+    """
+    Exécute les scans dans ce processus : démarre le planificateur, ou le reprend s'il a été suspendu.
+    Appelé directement sans élection, ou quand ce processus est élu leader.
+    """
+    if scheduler.running:
+        scheduler.resume()
+        logger.info("Planificateur APScheduler repris.")
+        return
+    schedule_jobs()
+    scheduler.start()
+    logger.info("Planificateur APScheduler démarré.")
+
+def suspend_scheduler():
+    """Suspend les scans de ce processus (verrou du leader perdu)."""
+    if scheduler.running:
+        scheduler.pause()
+        logger.info("Planificateur APScheduler suspendu.")
+
+def start_scheduler():
+    """
+    Démarre le planificateur et ajoute le job du scanner.
+
+    Avec l'élection du leader (settings.SCHEDULER_LEADER_ELECTION), un seul processus parmi les
+    workers exécute les scans ; les autres restent dédiés à l'API et prennent le relais si le leader
+    s'arrête.
+    """
+    global leader_elector
+    if scheduler.running or leader_elector is not None:
         logger.info("Le planificateur est déjà en cours d'exécution.")
+        return
+    lock = build_leader_lock()
+    if lock is None:
+        activate_scheduler()
+        return
+    leader_elector = LeaderElector(lock, on_elected=activate_scheduler, on_demoted=suspend_scheduler)
+    # Premier tour immédiat : le premier worker démarré devient leader sans attendre l'intervalle
+    leader_elector.check()
+    leader_elector.start()
+    if not leader_elector.is_leader:
+        logger.info(f"Un autre processus exécute le planificateur : ce worker reste dédié à l'API "
+                    f"(nouvelle tentative toutes les {leader_elector.interval} secondes).")
 
 def shutdown_scheduler():
     """
     Arrête proprement le planificateur.
     """
+    global leader_elector
     if scheduler.running:
         scheduler.shutdown()
         logger.info("Planificateur APScheduler arrêté.")
+        if settings.SCANNER_SHARDING_ENABLED:
+            release_shard_leases()
     else:
         logger.info("Le planificateur n'était pas en cours d'exécution.")
+    # Le verrou n'est rendu qu'après la fin du passage en cours (shutdown attend les jobs)
+    if leader_elector is not None:
+        leader_elector.stop()
+        leader_elector = None
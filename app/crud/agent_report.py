@@ -0,0 +1,33 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.models.models import AgentReport, AgentReportDatabase
+
+def get_agent_report(db: Session, report_id: int) -> Optional[AgentReport]:
+    """
+    Récupère un rapport ingéré par son ID.
+    """
+    return db.query(AgentReport).filter(AgentReport.id == report_id).first()
+
+def get_agent_reports(db: Session, agent_id: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[AgentReport]:
+    """
+    Récupère une liste paginée de rapports ingérés, du plus récent au plus ancien,
+    éventuellement filtrée par agent.
+    """
+    query = db.query(AgentReport)
+    if agent_id:
+        query = query.filter(AgentReport.agent_id == agent_id)
+    return query.order_by(AgentReport.operation_end_time.desc()).offset(skip).limit(limit).all()
+
+def get_report_databases_by_name(db: Session, database_name: str, skip: int = 0, limit: int = 100) -> List[AgentReportDatabase]:
+    """
+    Récupère l'historique normalisé des processus d'une base de données, du plus récent au plus ancien.
+    """
+    return (
+        db.query(AgentReportDatabase)
+        .join(AgentReport)
+        .filter(AgentReportDatabase.database_name == database_name)
+        .order_by(AgentReport.operation_end_time.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
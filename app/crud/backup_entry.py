@@ -38,6 +38,20 @@ def get_backup_entries_by_job_id(db: Session, job_id: int, skip: int = 0, limit:
         .all()
     )
 
+def get_backup_entries_by_fingerprint(db: Session, fingerprint: str, skip: int = 0, limit: int = 100) -> List[BackupEntry]:
+    """
+    Récupère les entrées de sauvegarde dont le fichier a la même empreinte courte (contenu identique),
+    via l'index ix_backup_entries_content_fingerprint.
+    """
+    return (
+        db.query(BackupEntry)
+        .filter(BackupEntry.content_fingerprint == fingerprint)
+        .order_by(BackupEntry.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
 def get_expected_backup_job_for_entry(db: Session, job_id: int) -> Optional[ExpectedBackupJob]:
     """
     Vérifie l'existence d'un ExpectedBackupJob pour l'ID donné.
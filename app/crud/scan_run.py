@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.models import ScanRun
+
+def get_scan_run(db: Session, scan_run_id: int) -> Optional[ScanRun]:
+    """Récupère un passage par son identifiant."""
+    return db.query(ScanRun).filter(ScanRun.id == scan_run_id).first()
+
+
+def get_scan_runs(db: Session, scanner: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[ScanRun]:
+    """Récupère les passages, du plus récent au plus ancien."""
+    query = db.query(ScanRun)
+    if scanner:
+        query = query.filter(ScanRun.scanner == scanner)
+    return query.order_by(ScanRun.started_at.desc()).offset(skip).limit(limit).all()
+
+
+def get_scan_trends(db: Session, days: int = 30, scanner: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Agrégats quotidiens des passages sur les derniers jours, en une requête groupée
+    (appuyée sur l'index de started_at) : nombre de passages, durées moyenne et maximale,
+    octets hachés, rapports traités et passages en erreur.
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).replace(tzinfo=None)
+    day = func.date(ScanRun.started_at)
+    query = (
+        db.query(
+            day.label("day"),
+            func.count(ScanRun.id).label("runs"),
+            func.avg(ScanRun.duration_seconds).label("avg_duration_seconds"),
+            func.max(ScanRun.duration_seconds).label("max_duration_seconds"),
+            func.sum(ScanRun.bytes_hashed).label("bytes_hashed"),
+            func.sum(ScanRun.reports_processed).label("reports_processed"),
+            func.sum(ScanRun.error_count).label("errors"),
+        )
+        .filter(ScanRun.started_at >= since)
+    )
+    if scanner:
+        query = query.filter(ScanRun.scanner == scanner)
+    rows = query.group_by(day).order_by(day).all()
+    return [
+        {
+            "day": str(row.day),
+            "runs": row.runs,
+            "avg_duration_seconds": float(row.avg_duration_seconds or 0.0),
+            "max_duration_seconds": float(row.max_duration_seconds or 0.0),
+            "bytes_hashed": int(row.bytes_hashed or 0),
+            "reports_processed": int(row.reports_processed or 0),
+            "errors": int(row.errors or 0),
+        }
+        for row in rows
+    ]
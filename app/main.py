@@ -1,33 +1,48 @@
-import logging.config
-import os
-import yaml
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import Base, engine
+from app.core.database import Base, get_engine
 from app.core.config import settings
-from app.core.scheduler import start_scheduler, shutdown_scheduler
-from app.api.endpoints import expected_backup_jobs, backup_entries
+from app.core.logging_config import configure_logging
+from config.settings import settings as app_settings
+from app.api.endpoints import expected_backup_jobs, backup_entries, agent_reports, scan_runs, metrics
 
-# --- Configuration du Logging ---
-LOGGING_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "logging.yaml")
+logger = logging.getLogger(__name__)
 
-if os.path.exists(LOGGING_CONFIG_PATH):
-    try:
-        with open(LOGGING_CONFIG_PATH, "r") as f:
-            logging_config = yaml.safe_load(f)
-        logging.config.dictConfig(logging_config)
-    except Exception as e:
-        raise RuntimeError(f"{LOGGING_CONFIG_PATH} is invalid: {e}")
-else:
-    import logging
-    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] - [%(name)s] - %(levelname)s - %(message)s')
 
-logger = logging.getLogger(__name__)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Démarrage et arrêt de l'application : journalisation, création des tables puis planificateur.
+    Le moteur de base de données et le planificateur (donc le scanner) ne sont chargés qu'ici,
+    si bien qu'un simple `import app.main` reste léger. Avec RUN_SCANNER_IN_API=False, aucun
+    planificateur n'est démarré : les scans tournent dans le worker dédié (app/scanner_worker.py).
+    """
+    configure_logging()
+    logger.info("Démarrage de l'application FastAPI...")
+    # Création des tables de la base de données
+    Base.metadata.create_all(bind=get_engine())
+    scanner_scheduler = None
+    if app_settings.RUN_SCANNER_IN_API:
+        from app.core import scheduler as scanner_scheduler
+        scanner_scheduler.start_scheduler()  # Démarre le scheduler qui lancera automatiquement le nouveau scanner
+    else:
+        logger.info("Scanner exécuté par le worker dédié : aucun planificateur dans l'API.")
+    logger.info("Application prête.")
+    try:
+        yield
+    finally:
+        logger.info("Arrêt de l'application FastAPI...")
+        if scanner_scheduler is not None:
+            scanner_scheduler.shutdown_scheduler()  # Arrête le scheduler proprement
+        logger.info("Application arrêtée.")
 
 # --- Initialisation de l'Application FastAPI ---
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Configuration CORS
@@ -39,21 +54,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Création des tables de la base de données
-Base.metadata.create_all(bind=engine)
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Démarrage de l'application FastAPI...")
-    start_scheduler()  # Démarre le scheduler qui lancera automatiquement le nouveau scanner
-    logger.info("Application prête.")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Arrêt de l'application FastAPI...")
-    shutdown_scheduler()  # Arrête le scheduler proprement
-    logger.info("Application arrêtée.")
-
 @app.get("/")
 async def root():
     return {"message": "API de Surveillance des Sauvegardes est en ligne"}
@@ -69,3 +69,19 @@ app.include_router(
     prefix=f"{settings.API_V1_STR}/backup-entries",
     tags=["Backup Entries"]
 )
+app.include_router(
+    agent_reports.router,
+    prefix=f"{settings.API_V1_STR}/agent-reports",
+    tags=["Agent Reports"]
+)
+app.include_router(
+    scan_runs.router,
+    prefix=f"{settings.API_V1_STR}/scans",
+    tags=["Scan Runs"]
+)
+# Métriques au format Prometheus, hors préfixe d'API (convention des collecteurs)
+app.include_router(
+    metrics.router,
+    prefix="/metrics",
+    tags=["Metrics"]
+)
@@ -1,2 +1,2 @@
 # app/models/__init__.py
-from .models import ExpectedBackupJob, BackupEntry
+from .models import ExpectedBackupJob, BackupEntry, AgentReport, AgentReportDatabase, ScanRun, ScannerNode, AgentLease, SchedulerLock
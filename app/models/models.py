@@ -3,7 +3,7 @@
 
 from datetime import datetime
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, Text, ForeignKey, BigInteger, Boolean, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, Text, ForeignKey, BigInteger, Boolean, UniqueConstraint, Float, JSON, Index
 from sqlalchemy.orm import relationship
 
 # Importe la classe de base déclarative.
@@ -33,6 +33,7 @@ class BackupEntryStatus(str, enum.Enum):
     MISSING = "MISSING"
     HASH_MISMATCH = "HASH_MISMATCH"
     TRANSFER_INTEGRITY_FAILED = "TRANSFER_INTEGRITY_FAILED"
+    UNCHANGED = "UNCHANGED"  # Écrit par scanner_MVP quand le hash est identique au dernier succès
     UNKNOWN = "UNKNOWN"
 
 
@@ -46,8 +47,10 @@ class ExpectedBackupJob(Base):
     city = Column(String, nullable=False, index=True, comment="Ville de l'agence")
     neighborhood = Column(String, nullable=False, index=True, comment="Quartier ou zone spécifique de l'agence") # NOUVEAU CHAMP
     database_name = Column(String, nullable=False, index=True, comment="Nom de la base de données")
-    #expected_hour_utc = Column(Integer, nullable=False, comment="Heure attendue de fin de sauvegarde (UTC)")
-    #expected_minute_utc = Column(Integer, nullable=False, comment="Minute attendue de fin de sauvegarde (UTC)")
+    # Heure attendue de fin de sauvegarde : facultative, elle fixe l'échéance (heure + fenêtre de collecte)
+    # au-delà de laquelle un job sans rapport est marqué MISSING (voir app/services/deadline_scheduler.py)
+    expected_hour_utc = Column(Integer, nullable=True, comment="Heure attendue de fin de sauvegarde (UTC)")
+    expected_minute_utc = Column(Integer, nullable=True, comment="Minute attendue de fin de sauvegarde (UTC)")
     
     __table_args__ = (
         UniqueConstraint('year', 'company_name', 'city', 'neighborhood', 'database_name', # AJUSTÉ: Ajout de 'neighborhood'
@@ -150,10 +153,192 @@ class BackupEntry(Base):
     # Vérification de Hachage pour HASH_MISMATCH
     previous_successful_hash_global = Column(String(64), nullable=True, comment="Hachage de la dernière sauvegarde globale réussie pour cette BD")
     hash_comparison_result = Column(Boolean, nullable=True, comment="Résultat de la comparaison des hachages (True si différent, False si identique)")
+    verification_tier = Column(String, nullable=True, comment="Niveau de vérification ayant décidé du résultat (stat, sample, sha256)")
+    content_fingerprint = Column(String(64), nullable=True, comment="Empreinte courte du fichier (<algorithme>:<hex>), calculée avec le SHA-256")
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Dernière entrée de chaque job sur une période : requête groupée de app/services/missing_evaluator.py
+    __table_args__ = (
+        Index('ix_backup_entries_job_timestamp', 'expected_job_id', 'timestamp'),
+        # Recherche des sauvegardes de contenu identique (doublons entre jobs ou entre jours)
+        Index('ix_backup_entries_content_fingerprint', 'content_fingerprint'),
+    )
+
     def __repr__(self):
         return (f"<BackupEntry(job_id={self.expected_job_id}, status='{self.status.value}', "
                 f"timestamp='{self.timestamp}', agent_status={self.agent_transfer_process_status}, "
                 f"server_hash_ok={self.hash_comparison_result})>")
+
+
+# --- TABLE 3: AgentReport ---
+class AgentReport(Base):
+    """
+    Rapport STATUS.json d'un agent, ingéré une seule fois sous forme normalisée.
+    Les détails par base de données sont stockés dans AgentReportDatabase.
+    """
+    __tablename__ = "agent_reports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    agent_id = Column(String, nullable=False, index=True, comment="ID de l'agent ayant produit le rapport")
+    operation_log_file_name = Column(String, nullable=False, comment="Nom du fichier STATUS.json d'origine")
+    operation_start_time = Column(DateTime, nullable=True, comment="Début de l'opération rapporté par l'agent (UTC)")
+    operation_end_time = Column(DateTime, nullable=True, index=True, comment="Fin de l'opération rapportée par l'agent (UTC)")
+    overall_status = Column(String, nullable=True, comment="Statut global rapporté par l'agent")
+    database_count = Column(Integer, nullable=False, default=0, comment="Nombre de bases de données décrites dans le rapport")
+    ingested_at = Column(DateTime, default=datetime.utcnow, nullable=False, comment="Date d'ingestion par le serveur")
+
+    __table_args__ = (
+        UniqueConstraint('agent_id', 'operation_log_file_name', name='_unique_agent_report'),
+    )
+
+    databases = relationship("AgentReportDatabase"
+                             , back_populates="report"
+                             , lazy="selectin"
+                             , cascade="all, delete-orphan"
+                             , passive_deletes=True,
+    )
+
+    def __repr__(self):
+        return (f"<AgentReport(agent='{self.agent_id}', file='{self.operation_log_file_name}', "
+                f"end='{self.operation_end_time}', databases={self.database_count})>")
+
+
+# --- TABLE 4: AgentReportDatabase ---
+class AgentReportDatabase(Base):
+    """
+    Détail normalisé des processus BACKUP/COMPRESS/TRANSFER d'une base de données
+    pour un rapport d'agent donné.
+    """
+    __tablename__ = "agent_report_databases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, ForeignKey("agent_reports.id", ondelete="CASCADE"), nullable=False, index=True)
+    report = relationship("AgentReport", back_populates="databases")
+
+    database_name = Column(String, nullable=False, index=True, comment="Nom de la base de données")
+    staged_file_name = Column(String, nullable=True, comment="Nom du fichier déposé (sans le chemin côté agent)")
+    logs_summary = Column(Text, nullable=True)
+
+    backup_status = Column(Boolean, nullable=True)
+    backup_start_time = Column(DateTime, nullable=True)
+    backup_end_time = Column(DateTime, nullable=True)
+    backup_sha256 = Column(String(64), nullable=True)
+    backup_size = Column(BigInteger, nullable=True)
+
+    compress_status = Column(Boolean, nullable=True)
+    compress_start_time = Column(DateTime, nullable=True)
+    compress_end_time = Column(DateTime, nullable=True)
+    compress_sha256 = Column(String(64), nullable=True)
+    compress_size = Column(BigInteger, nullable=True)
+
+    transfer_status = Column(Boolean, nullable=True)
+    transfer_start_time = Column(DateTime, nullable=True)
+    transfer_end_time = Column(DateTime, nullable=True)
+    transfer_error_message = Column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('report_id', 'database_name', name='_unique_report_database'),
+    )
+
+    @property
+    def all_processes_succeeded(self) -> bool:
+        """True si l'agent a rapporté le succès des trois processus."""
+        return bool(self.backup_status and self.compress_status and self.transfer_status)
+
+    def __repr__(self):
+        return (f"<AgentReportDatabase(report_id={self.report_id}, db='{self.database_name}', "
+                f"file='{self.staged_file_name}', compress_size={self.compress_size})>")
+
+
+# --- TABLE 5: ScanRun ---
+class ScanRun(Base):
+    """
+    Registre des passages du scanner : une ligne écrite à la fin de chaque exécution planifiée,
+    avec les durées par phase, les volumes traités et les erreurs.
+    """
+    __tablename__ = "scan_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scanner = Column(String, nullable=False, default="mvp", comment="Scanner exécuté (mvp, backup_scanner)")
+    started_at = Column(DateTime, nullable=False, index=True, comment="Début du passage (UTC)")
+    finished_at = Column(DateTime, nullable=False, comment="Fin du passage (UTC)")
+    duration_seconds = Column(Float, nullable=False, comment="Durée totale du passage")
+    succeeded = Column(Boolean, nullable=False, default=True, comment="False si le passage s'est interrompu sur une erreur")
+
+    phase_durations = Column(JSON, nullable=True, comment="Durée cumulée par phase, en secondes")
+    status_counts = Column(JSON, nullable=True, comment="Nombre de BackupEntry créées par statut")
+    report_outcomes = Column(JSON, nullable=True, comment="Nombre de rapports par issue (processed, invalid, deferred...)")
+
+    agents_processed = Column(Integer, nullable=False, default=0)
+    reports_processed = Column(Integer, nullable=False, default=0)
+    entries_created = Column(Integer, nullable=False, default=0)
+    files_hashed = Column(Integer, nullable=False, default=0)
+    bytes_hashed = Column(BigInteger, nullable=False, default=0)
+    bytes_promoted = Column(BigInteger, nullable=False, default=0)
+    report_cache_hits = Column(Integer, nullable=False, default=0, comment="Rapports déjà ingérés retrouvés en base")
+    report_cache_lookups = Column(Integer, nullable=False, default=0)
+
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=True, comment="Messages des erreurs rencontrées (tronqués)")
+
+    @property
+    def report_cache_hit_rate(self):
+        """Part des rapports déjà ingérés parmi les rapports recherchés (None si aucune recherche)."""
+        if not self.report_cache_lookups:
+            return None
+        return self.report_cache_hits / self.report_cache_lookups
+
+    def __repr__(self):
+        return (f"<ScanRun(id={self.id}, scanner='{self.scanner}', started='{self.started_at}', "
+                f"duration={self.duration_seconds}, errors={self.error_count})>")
+
+
+# --- TABLE 6: ScannerNode ---
+class ScannerNode(Base):
+    """
+    Instance du scanner participant au partage des agents (mode sharding).
+    Une instance est vivante tant que son battement de cœur n'a pas expiré.
+    """
+    __tablename__ = "scanner_nodes"
+
+    node_id = Column(String, primary_key=True, comment="Identifiant de l'instance (hôte:pid par défaut)")
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow, comment="Premier battement de cœur (UTC)")
+    heartbeat_at = Column(DateTime, nullable=False, comment="Dernier battement de cœur (UTC)")
+    expires_at = Column(DateTime, nullable=False, index=True, comment="Instance considérée morte après cette date (UTC)")
+
+    def __repr__(self):
+        return f"<ScannerNode(node_id='{self.node_id}', expires_at='{self.expires_at}')>"
+
+
+# --- TABLE 7: AgentLease ---
+class AgentLease(Base):
+    """
+    Bail d'un dossier d'agent : seule l'instance qui détient un bail non expiré traite l'agent.
+    """
+    __tablename__ = "agent_leases"
+
+    agent_id = Column(String, primary_key=True, comment="Nom du dossier de l'agent")
+    node_id = Column(String, nullable=False, index=True, comment="Instance détentrice du bail")
+    acquired_at = Column(DateTime, nullable=False, comment="Prise du bail par l'instance actuelle (UTC)")
+    expires_at = Column(DateTime, nullable=False, index=True, comment="Fin du bail s'il n'est pas renouvelé (UTC)")
+
+    def __repr__(self):
+        return f"<AgentLease(agent_id='{self.agent_id}', node_id='{self.node_id}', expires_at='{self.expires_at}')>"
+
+
+# --- TABLE 8: SchedulerLock ---
+class SchedulerLock(Base):
+    """
+    Verrou nommé avec expiration, détenu par le processus élu pour exécuter le planificateur
+    (élection d'un leader parmi les workers de l'API, backend "db").
+    """
+    __tablename__ = "scheduler_locks"
+
+    name = Column(String, primary_key=True, comment="Nom du verrou (ex: scheduler)")
+    holder = Column(String, nullable=False, comment="Processus détenteur (hôte:pid)")
+    acquired_at = Column(DateTime, nullable=False, comment="Prise du verrou par le détenteur actuel (UTC)")
+    expires_at = Column(DateTime, nullable=False, comment="Fin du verrou s'il n'est pas renouvelé (UTC)")
+
+    def __repr__(self):
+        return f"<SchedulerLock(name='{self.name}', holder='{self.holder}', expires_at='{self.expires_at}')>"
@@ -0,0 +1,114 @@
+# app/scanner_worker.py
+# Worker dédié au scanner : exécute le planificateur APScheduler et le scanner hors du processus de l'API,
+# avec son propre pool de processus pour la vérification des fichiers déposés
+# (app/services/verification_pool.py). Le hachage des sauvegardes ne dispute plus le GIL aux requêtes.
+#
+# Usage :
+#     python -m app.scanner_worker
+#     python -m app.scanner_worker --processes 4 --metrics-port 9108 --nice 10
+#
+# L'API est alors lancée avec RUN_SCANNER_IN_API=false (service scanner-worker du docker-compose.yml).
+# L'élection du leader (SCHEDULER_LEADER_ELECTION) et le sharding s'appliquent comme dans l'API :
+# plusieurs workers peuvent tourner, un seul planifie (ou chacun traite sa part des agents).
+
+import argparse
+import logging
+import os
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from app.core.database import Base, get_engine
+from app.core.logging_config import configure_logging
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Expose les métriques du worker (scans, hachage, budget d'E/S) au format texte Prometheus."""
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def start_metrics_server(port: int) -> Optional[ThreadingHTTPServer]:
+    """Démarre le serveur /metrics du worker dans un thread (None si port = 0)."""
+    if port <= 0:
+        return None
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="scanner-metrics", daemon=True).start()
+    logger.info(f"Métriques du worker exposées sur le port {port} (/metrics).")
+    return server
+
+
+def run_worker(processes: Optional[int] = None, metrics_port: Optional[int] = None, nice: Optional[int] = None,
+               stop_event: Optional[threading.Event] = None) -> None:
+    """
+    Démarre le pool de vérification et le planificateur, puis attend `stop_event`
+    (SIGTERM/SIGINT via main) avant de tout arrêter proprement.
+    """
+    from app.core.scheduler import shutdown_scheduler, start_scheduler
+    from app.services.verification_pool import shutdown_verification_pool, start_verification_pool
+
+    stop_event = stop_event or threading.Event()
+    logger.info("Démarrage du worker scanner...")
+    nice = settings.SCANNER_WORKER_NICE if nice is None else nice
+    if nice > 0:
+        # Avant le pool : ses processus héritent de la priorité
+        os.nice(nice)
+    # Création des tables de la base de données (comme au démarrage de l'API)
+    Base.metadata.create_all(bind=get_engine())
+    metrics_server = start_metrics_server(settings.SCANNER_WORKER_METRICS_PORT if metrics_port is None else metrics_port)
+    start_verification_pool(processes)
+    try:
+        start_scheduler()
+        logger.info("Worker scanner prêt.")
+        stop_event.wait()
+    finally:
+        logger.info("Arrêt du worker scanner...")
+        # Le planificateur attend la fin du passage en cours, qui peut encore utiliser le pool
+        shutdown_scheduler()
+        shutdown_verification_pool()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        logger.info("Worker scanner arrêté.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker du scanner de sauvegardes (planificateur hors de l'API).")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Processus du pool de vérification (défaut : SCANNER_WORKER_PROCESSES, 0 = un par CPU)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Port du serveur /metrics (défaut : SCANNER_WORKER_METRICS_PORT, 0 = désactivé)")
+    parser.add_argument("--nice", type=int, default=None,
+                        help="Baisse de priorité CPU du worker et de son pool (défaut : SCANNER_WORKER_NICE)")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    stop_event = threading.Event()
+
+    def _stop(signum, frame):
+        logger.info(f"Signal {signal.Signals(signum).name} reçu.")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    run_worker(args.processes, args.metrics_port, args.nice, stop_event)
+
+
+if __name__ == "__main__":
+    main()
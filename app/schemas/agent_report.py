@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+# Schéma d'une ligne normalisée décrivant les processus d'une base de données dans un rapport
+class AgentReportDatabase(BaseModel):
+    id: int
+    report_id: int
+    database_name: str
+    staged_file_name: Optional[str] = None
+    logs_summary: Optional[str] = None
+
+    backup_status: Optional[bool] = None
+    backup_start_time: Optional[datetime] = None
+    backup_end_time: Optional[datetime] = None
+    backup_sha256: Optional[str] = None
+    backup_size: Optional[int] = None
+
+    compress_status: Optional[bool] = None
+    compress_start_time: Optional[datetime] = None
+    compress_end_time: Optional[datetime] = None
+    compress_sha256: Optional[str] = None
+    compress_size: Optional[int] = None
+
+    transfer_status: Optional[bool] = None
+    transfer_start_time: Optional[datetime] = None
+    transfer_end_time: Optional[datetime] = None
+    transfer_error_message: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+# Schéma d'un rapport STATUS.json ingéré, avec le détail de ses bases de données
+class AgentReport(BaseModel):
+    id: int
+    agent_id: str
+    operation_log_file_name: str
+    operation_start_time: Optional[datetime] = None
+    operation_end_time: Optional[datetime] = None
+    overall_status: Optional[str] = None
+    database_count: int
+    ingested_at: datetime
+    databases: List[AgentReportDatabase] = []
+
+    class Config:
+        orm_mode = True
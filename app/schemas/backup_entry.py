@@ -9,6 +9,7 @@ class BackupEntryStatusEnum(str, enum.Enum):
     SUCCESS = "SUCCESS"        # Sauvegarde validée avec succès
     MISSING = "MISSING"        # Sauvegarde introuvable
     HASH_MISMATCH = "HASH_MISMATCH"  # Erreur de validation de hachage
+    TRANSFER_INTEGRITY_FAILED = "TRANSFER_INTEGRITY_FAILED"  # Fichier déposé incohérent avec le rapport
     FAILED = "FAILED"
     UNCHANGED = "UNCHANGED"
 
@@ -37,6 +38,10 @@ class BackupEntryBase(BaseModel):
     # Résultat de la comparaison des hachages (True si différent, False si identique)
     hash_comparison_result: Optional[bool] = None
     expected_hash: Optional[str] = None
+    # Niveau de vérification ayant décidé du résultat (stat, sample ou sha256)
+    verification_tier: Optional[str] = None
+    # Empreinte courte du fichier (<algorithme>:<hex>), calculée pendant la même lecture que le SHA-256
+    content_fingerprint: Optional[str] = None
 
 # Schéma utilisé lors de la création d'une BackupEntry via l'API
 class BackupEntryCreate(BackupEntryBase):
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import enum
 
 # Enumération pour le statut d'un ExpectedBackupJob
@@ -24,6 +24,9 @@ class ExpectedBackupJobBase(BaseModel):
     neighborhood: str  
     # Nom de la base de données concernée par la sauvegarde
     database_name: str
+    # Heure et minute UTC attendues de fin de sauvegarde (facultatives : sans elles, pas d'échéance MISSING)
+    expected_hour_utc: Optional[int] = Field(None, ge=0, le=23)
+    expected_minute_utc: Optional[int] = Field(None, ge=0, le=59)
     # Identifiant de l'agent responsable de ce job
     agent_id_responsible: str
     # Chemin template pour le dépôt des fichiers de base de données envoyé par l'agent
@@ -54,6 +57,8 @@ class ExpectedBackupJobUpdate(BaseModel):
     city: Optional[str] = None
     neighborhood: Optional[str] = None  
     database_name: Optional[str] = None
+    expected_hour_utc: Optional[int] = Field(None, ge=0, le=23)
+    expected_minute_utc: Optional[int] = Field(None, ge=0, le=59)
     agent_id_responsible: Optional[str] = None
     agent_deposit_path_template: Optional[str] = None
     agent_log_deposit_path_template: Optional[str] = None
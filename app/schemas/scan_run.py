@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+# Schéma d'un passage du scanner enregistré dans scan_runs
+class ScanRun(BaseModel):
+    id: int
+    scanner: str
+    started_at: datetime
+    finished_at: datetime
+    duration_seconds: float
+    succeeded: bool
+
+    phase_durations: Optional[Dict[str, float]] = None
+    status_counts: Optional[Dict[str, int]] = None
+    report_outcomes: Optional[Dict[str, int]] = None
+
+    agents_processed: int
+    reports_processed: int
+    entries_created: int
+    files_hashed: int
+    bytes_hashed: int
+    bytes_promoted: int
+    report_cache_hits: int
+    report_cache_lookups: int
+    report_cache_hit_rate: Optional[float] = None
+
+    error_count: int
+    errors: Optional[List[str]] = None
+
+    class Config:
+        orm_mode = True
+
+# Agrégats quotidiens des passages (tendances)
+class ScanTrendPoint(BaseModel):
+    day: str
+    runs: int
+    avg_duration_seconds: float
+    max_duration_seconds: float
+    bytes_hashed: int
+    reports_processed: int
+    errors: int
@@ -0,0 +1,229 @@
+# app/services/agent_sharding.py
+# Ce service répartit les dossiers d'agents entre plusieurs instances du scanner.
+# Chaque instance s'annonce dans la table scanner_nodes (battement de cœur avec expiration) ;
+# les agents sont attribués aux instances vivantes par hachage cohérent, et une instance ne traite
+# un agent que si elle détient son bail (table agent_leases). Les baux sont pris et renouvelés par
+# des UPDATE conditionnels (compare-and-set), ce qui fonctionne sur SQLite comme sur PostgreSQL.
+# Quand une instance meurt, ses baux et son battement de cœur expirent et les autres instances
+# reprennent ses agents ; quand une instance arrive, les détenteurs rendent les agents qui lui
+# reviennent. Les horloges des instances doivent être synchronisées (NTP).
+
+import bisect
+import hashlib
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.metrics import AGENTS_OWNED
+from app.models.models import AgentLease, ScannerNode
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AgentShardingError(Exception):
+    """Exception personnalisée pour les erreurs de coordination entre instances du scanner."""
+    pass
+
+
+def default_node_id() -> str:
+    """Identifiant par défaut d'une instance : '<hôte>:<pid>'."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _utcnow() -> datetime:
+    # Les dates sont stockées en UTC naïf, comme dans le reste du modèle
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Anneau de hachage cohérent : chaque instance y occupe `replicas` points virtuels.
+    L'ajout ou le retrait d'une instance ne déplace qu'environ 1/N des agents.
+    """
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 64):
+        self.nodes = sorted(set(nodes))
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        for node in self.nodes:
+            for replica in range(replicas):
+                point = _hash(f"{node}#{replica}")
+                self._owners[point] = node
+                bisect.insort(self._points, point)
+
+    def owner(self, key: str) -> Optional[str]:
+        """Instance responsable de `key` (None si l'anneau est vide)."""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+
+class AgentShardCoordinator:
+    """
+    Coordination d'une instance du scanner avec les autres instances.
+
+    Usage (à chaque passage) :
+        owned = coordinator.claim_agents(db, agent_folders)
+        for agent in owned:
+            if coordinator.renew(db, agent):
+                ...traiter l'agent...
+    """
+
+    def __init__(self, node_id: Optional[str] = None, lease_ttl_seconds: Optional[int] = None,
+                 replicas: Optional[int] = None):
+        self.node_id = node_id or settings.SCANNER_NODE_ID or default_node_id()
+        self.lease_ttl = timedelta(seconds=lease_ttl_seconds or settings.SCANNER_LEASE_TTL_SECONDS)
+        self.replicas = replicas or settings.SCANNER_HASH_RING_REPLICAS
+
+    # --- Instances ---
+
+    def heartbeat(self, db: Session, now: Optional[datetime] = None) -> None:
+        """
+        Annonce l'instance comme vivante et prolonge tous ses baux.
+
+        Raises:
+            AgentShardingError: Si l'écriture en base échoue.
+        """
+        now = now or _utcnow()
+        expires_at = now + self.lease_ttl
+        try:
+            node = db.get(ScannerNode, self.node_id)
+            if node is None:
+                db.add(ScannerNode(node_id=self.node_id, started_at=now, heartbeat_at=now, expires_at=expires_at))
+            else:
+                node.heartbeat_at = now
+                node.expires_at = expires_at
+            db.execute(
+                update(AgentLease)
+                .where(AgentLease.node_id == self.node_id, AgentLease.expires_at >= now)
+                .values(expires_at=expires_at)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise AgentShardingError(f"Battement de cœur impossible pour l'instance '{self.node_id}' : {e}")
+
+    def live_nodes(self, db: Session, now: Optional[datetime] = None) -> List[str]:
+        """Instances dont le battement de cœur n'a pas expiré."""
+        now = now or _utcnow()
+        rows = db.query(ScannerNode.node_id).filter(ScannerNode.expires_at >= now).all()
+        return sorted(node_id for (node_id,) in rows)
+
+    def ring(self, db: Session, now: Optional[datetime] = None) -> HashRing:
+        return HashRing(self.live_nodes(db, now), self.replicas)
+
+    # --- Baux ---
+
+    def _acquire(self, db: Session, agent_id: str, now: datetime) -> bool:
+        expires_at = now + self.lease_ttl
+        # Renouvellement d'un bail détenu, puis reprise d'un bail expiré (UPDATE conditionnels atomiques)
+        renewed = db.execute(
+            update(AgentLease)
+            .where(AgentLease.agent_id == agent_id, AgentLease.node_id == self.node_id)
+            .values(expires_at=expires_at)
+        ).rowcount
+        if not renewed:
+            renewed = db.execute(
+                update(AgentLease)
+                .where(AgentLease.agent_id == agent_id, AgentLease.expires_at < now)
+                .values(node_id=self.node_id, acquired_at=now, expires_at=expires_at)
+            ).rowcount
+        if renewed:
+            db.commit()
+            return True
+        if db.get(AgentLease, agent_id) is not None:
+            db.rollback()
+            return False  # Bail valide détenu par une autre instance
+        try:
+            db.add(AgentLease(agent_id=agent_id, node_id=self.node_id, acquired_at=now, expires_at=expires_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            # Une autre instance a créé le bail entre-temps
+            db.rollback()
+            return False
+
+    def claim_agents(self, db: Session, agent_ids: Iterable[str], now: Optional[datetime] = None) -> List[str]:
+        """
+        Retourne les agents que cette instance doit traiter pendant ce passage.
+
+        Envoie un battement de cœur, rend les baux des agents attribués à une autre instance
+        par l'anneau, puis prend ou renouvelle le bail des agents qui lui reviennent.
+
+        Raises:
+            AgentShardingError: Si la coordination échoue.
+        """
+        now = now or _utcnow()
+        self.heartbeat(db, now)
+        ring = self.ring(db, now)
+        owned = []
+        try:
+            for agent_id in sorted(set(agent_ids)):
+                if ring.owner(agent_id) != self.node_id:
+                    # Agent attribué à une autre instance : rendre le bail s'il est encore détenu
+                    db.execute(
+                        delete(AgentLease)
+                        .where(AgentLease.agent_id == agent_id, AgentLease.node_id == self.node_id)
+                    )
+                    db.commit()
+                    continue
+                if self._acquire(db, agent_id, now):
+                    owned.append(agent_id)
+        except Exception as e:
+            db.rollback()
+            raise AgentShardingError(f"Répartition des agents impossible pour l'instance '{self.node_id}' : {e}")
+        AGENTS_OWNED.set(len(owned), node=self.node_id)
+        logger.info(f"Instance '{self.node_id}' : {len(owned)} agent(s) attribué(s) "
+                    f"sur {len(ring.nodes)} instance(s) vivante(s).")
+        return owned
+
+    def renew(self, db: Session, agent_id: str, now: Optional[datetime] = None) -> bool:
+        """
+        Prolonge le bail d'un agent juste avant son traitement.
+        Retourne False si le bail a été perdu (expiré puis repris par une autre instance).
+        """
+        now = now or _utcnow()
+        renewed = db.execute(
+            update(AgentLease)
+            .where(AgentLease.agent_id == agent_id, AgentLease.node_id == self.node_id,
+                   AgentLease.expires_at >= now)
+            .values(expires_at=now + self.lease_ttl)
+        ).rowcount
+        db.commit()
+        return bool(renewed)
+
+    def release_all(self, db: Session) -> int:
+        """Rend tous les baux de l'instance et la retire des instances vivantes (arrêt propre)."""
+        try:
+            released = db.execute(delete(AgentLease).where(AgentLease.node_id == self.node_id)).rowcount
+            db.execute(delete(ScannerNode).where(ScannerNode.node_id == self.node_id))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise AgentShardingError(f"Libération des baux impossible pour l'instance '{self.node_id}' : {e}")
+        AGENTS_OWNED.set(0, node=self.node_id)
+        logger.info(f"Instance '{self.node_id}' : {released} bail(s) libéré(s).")
+        return released
+
+
+_coordinator: Optional[AgentShardCoordinator] = None
+
+
+def get_shard_coordinator() -> AgentShardCoordinator:
+    """Coordinateur de l'instance courante (créé au premier appel, même identifiant ensuite)."""
+    global _coordinator
+    if _coordinator is None:
+        _coordinator = AgentShardCoordinator()
+    return _coordinator
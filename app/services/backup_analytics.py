@@ -0,0 +1,316 @@
+# app/services/backup_analytics.py
+# Analyse vectorisée (NumPy) de l'historique des rapports d'agents, pour toute la flotte en une fois :
+# tailles avant/après compression, durées des phases BACKUP/COMPRESS/TRANSFER (agent_report_databases).
+#
+#   - L'historique est chargé en une requête triée par (agent, base, fin d'opération), lue par lots,
+#     puis converti en colonnes NumPy ; chaque série (agent, base) correspond à un job attendu.
+#   - Chaque rapport est comparé aux `window` rapports précédents de sa série (sommes cumulées par série :
+#     aucune boucle Python par ligne) : moyenne et écart-type glissants de la taille compressée et de la
+#     durée totale, z-scores et rapport à la moyenne.
+#   - Par série, sur la dernière fenêtre : percentiles des durées de chaque phase et taux de compression.
+#   - Sont signalés : chute de taille (ex. fichier réduit de 90 %), taille ou durée au z-score anormal.
+#
+# NumPy est une dépendance optionnelle : sans elle, l'analyse lève BackupAnalyticsError et l'analyse
+# après passage (SCANNER_ANALYTICS_ENABLED) est ignorée avec un avertissement.
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import DateTime, String, cast, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.metrics import ANALYTICS_DURATION, BACKUP_ANOMALIES
+from app.models.models import AgentReport, AgentReportDatabase
+from config.settings import settings
+
+try:  # Dépendance optionnelle : calculs vectorisés de l'analyse
+    import numpy as np
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    np = None
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("backup", "compress", "transfer", "total")
+ANOMALY_SIZE_DROP = "size_drop"
+ANOMALY_SIZE_ZSCORE = "size_zscore"
+ANOMALY_DURATION_ZSCORE = "duration_zscore"
+ANOMALY_KINDS = (ANOMALY_SIZE_DROP, ANOMALY_SIZE_ZSCORE, ANOMALY_DURATION_ZSCORE)
+# Rapports précédents nécessaires avant de juger un rapport
+MIN_HISTORY = 3
+# Lignes lues par lot sur le curseur de la requête d'historique
+LOAD_BATCH_SIZE = 50000
+
+_HISTORY_COLUMNS = (
+    AgentReport.agent_id, AgentReportDatabase.database_name, AgentReport.operation_end_time,
+    AgentReport.operation_log_file_name, AgentReportDatabase.backup_size, AgentReportDatabase.compress_size,
+    AgentReportDatabase.backup_start_time, AgentReportDatabase.backup_end_time,
+    AgentReportDatabase.compress_start_time, AgentReportDatabase.compress_end_time,
+    AgentReportDatabase.transfer_start_time, AgentReportDatabase.transfer_end_time,
+)
+
+
+class BackupAnalyticsError(Exception):
+    """Exception personnalisée pour les erreurs de l'analyse de l'historique."""
+    pass
+
+
+class FleetAnalytics(NamedTuple):
+    """Résultat de l'analyse de la flotte."""
+    rows: int
+    series: List[dict]      # une ligne par (agent, base) : statistiques de la dernière fenêtre et du dernier rapport
+    anomalies: List[dict]   # rapports signalés, sur toute la période analysée
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise BackupAnalyticsError("NumPy n'est pas installé : l'analyse de l'historique est indisponible.")
+
+
+def load_report_history(db_session: Session, since: Optional[datetime] = None) -> Dict[str, "np.ndarray"]:
+    """
+    Historique des rapports en colonnes NumPy, trié par (agent, base, fin d'opération).
+    Les rapports sans fin d'opération sont ignorés ; tailles et dates absentes valent NaN / NaT.
+    """
+    _require_numpy()
+    # Dates lues en texte ISO et converties par NumPy en un appel par colonne : la conversion en objets
+    # datetime ligne par ligne coûtait plus que la requête elle-même (bench_backup_analytics.py)
+    stmt = (
+        select(*(cast(column, String) if isinstance(column.type, DateTime) else column
+                 for column in _HISTORY_COLUMNS))
+        .join(AgentReport, AgentReportDatabase.report_id == AgentReport.id)
+        .where(AgentReport.operation_end_time.isnot(None))
+        .order_by(AgentReport.agent_id, AgentReportDatabase.database_name, AgentReport.operation_end_time)
+    )
+    if since is not None:
+        # Colonnes DateTime sans fuseau, en UTC
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        stmt = stmt.where(AgentReport.operation_end_time >= since)
+
+    columns = [[] for _ in _HISTORY_COLUMNS]
+    try:
+        result = db_session.execute(stmt.execution_options(yield_per=LOAD_BATCH_SIZE))
+        for partition in result.partitions():
+            for column, values in zip(columns, zip(*partition)):
+                column.extend(values)
+    except SQLAlchemyError as e:
+        raise BackupAnalyticsError(f"Lecture de l'historique des rapports impossible : {e}")
+
+    agent_ids, database_names, end_times, file_names, backup_sizes, compress_sizes, *phase_times = columns
+    history = {
+        "agent_id": np.array(agent_ids, dtype=object),
+        "database_name": np.array(database_names, dtype=object),
+        "operation_end_time": np.array(end_times, dtype="datetime64[us]"),
+        "operation_log_file_name": np.array(file_names, dtype=object),
+        "backup_size": np.array(backup_sizes, dtype=float),
+        "compress_size": np.array(compress_sizes, dtype=float),
+    }
+    for (phase, bound), values in zip([(p, b) for p in PHASES[:3] for b in ("start", "end")], phase_times):
+        history[f"{phase}_{bound}_time"] = np.array(values, dtype="datetime64[us]")
+    return history
+
+
+def _seconds(start: "np.ndarray", end: "np.ndarray") -> "np.ndarray":
+    """Durées en secondes (NaN si une borne manque)."""
+    return (end - start) / np.timedelta64(1, "s")
+
+
+def rolling_baseline(values: "np.ndarray", group: "np.ndarray", starts: "np.ndarray", window: int):
+    """
+    Moyenne, écart-type et effectif des valeurs connues parmi les `window` lignes précédentes de la même
+    série (`group` : indice de série de chaque ligne, `starts` : première ligne de chaque série), valeur
+    courante exclue. Les sommes cumulées portent sur les valeurs centrées par série (précision des tailles
+    de plusieurs Gio).
+    """
+    valid = ~np.isnan(values)
+    counts_by_group = np.add.reduceat(valid.astype(np.int64), starts)
+    sums_by_group = np.add.reduceat(np.where(valid, values, 0.0), starts)
+    group_mean = np.divide(sums_by_group, counts_by_group, out=np.zeros(len(starts)), where=counts_by_group > 0)
+    centered = np.where(valid, values - group_mean[group], 0.0)
+
+    cum_count = np.r_[0, np.cumsum(valid)]
+    cum_sum = np.r_[0.0, np.cumsum(centered)]
+    cum_sq = np.r_[0.0, np.cumsum(centered * centered)]
+    index = np.arange(len(values))
+    low = np.maximum(index - window, starts[group])
+    count = cum_count[index] - cum_count[low]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (cum_sum[index] - cum_sum[low]) / count
+        variance = np.maximum((cum_sq[index] - cum_sq[low]) / count - mean * mean, 0.0)
+    return mean + group_mean[group], np.sqrt(variance), count
+
+
+def group_percentiles(values: "np.ndarray", group: "np.ndarray", groups: int, quantiles: Sequence[float]):
+    """Percentiles (interpolation linéaire, comme np.percentile) des valeurs connues de chaque groupe."""
+    valid = ~np.isnan(values)
+    sorted_values, sorted_group = values[valid], group[valid]
+    order = np.lexsort((sorted_values, sorted_group))
+    sorted_values = sorted_values[order]
+    counts = np.bincount(sorted_group, minlength=groups)
+    offsets = np.r_[0, np.cumsum(counts)[:-1]]
+    results = []
+    for quantile in quantiles:
+        position = offsets + (counts - 1) * quantile
+        low = np.clip(np.floor(position).astype(np.int64), 0, max(len(sorted_values) - 1, 0))
+        high = np.clip(np.ceil(position).astype(np.int64), 0, max(len(sorted_values) - 1, 0))
+        if len(sorted_values):
+            value = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - np.floor(position))
+        else:
+            value = np.zeros(groups)
+        results.append(np.where(counts > 0, value, np.nan))
+    return results
+
+
+def _number(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) or np.isinf(value) else value
+
+
+def _timestamp(value) -> Optional[str]:
+    return None if np.isnat(value) else value.astype(datetime).isoformat()
+
+
+def compute_fleet_analytics(history: Dict[str, "np.ndarray"], window: Optional[int] = None,
+                            size_drop_ratio: Optional[float] = None,
+                            zscore_threshold: Optional[float] = None) -> FleetAnalytics:
+    """
+    Statistiques glissantes et anomalies de toutes les séries d'un historique (load_report_history).
+    """
+    _require_numpy()
+    window = window or settings.ANALYTICS_WINDOW
+    size_drop_ratio = settings.ANALYTICS_SIZE_DROP_RATIO if size_drop_ratio is None else size_drop_ratio
+    zscore_threshold = settings.ANALYTICS_ZSCORE_THRESHOLD if zscore_threshold is None else zscore_threshold
+
+    rows = len(history["agent_id"])
+    if rows == 0:
+        return FleetAnalytics(0, [], [])
+    new_series = np.r_[True, (history["agent_id"][1:] != history["agent_id"][:-1])
+                       | (history["database_name"][1:] != history["database_name"][:-1])]
+    group = np.cumsum(new_series) - 1
+    starts = np.flatnonzero(new_series)
+    ends = np.r_[starts[1:], rows]
+    groups = len(starts)
+
+    durations = {phase: _seconds(history[f"{phase}_start_time"], history[f"{phase}_end_time"])
+                 for phase in PHASES[:3]}
+    total_end = history["transfer_end_time"].copy()
+    for fallback in ("compress_end_time", "backup_end_time"):
+        total_end = np.where(np.isnat(total_end), history[fallback], total_end)
+    durations["total"] = _seconds(history["backup_start_time"], total_end)
+    sizes = history["compress_size"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        compression_ratio = np.where(history["backup_size"] > 0, sizes / history["backup_size"], np.nan)
+
+    size_mean, size_std, size_count = rolling_baseline(sizes, group, starts, window)
+    duration_mean, duration_std, duration_count = rolling_baseline(durations["total"], group, starts, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        size_ratio = np.where(size_count >= MIN_HISTORY, sizes / size_mean, np.nan)
+        size_z = np.where((size_count >= MIN_HISTORY) & (size_std > 0), (sizes - size_mean) / size_std, np.nan)
+        duration_z = np.where((duration_count >= MIN_HISTORY) & (duration_std > 0),
+                              (durations["total"] - duration_mean) / duration_std, np.nan)
+    flags = {
+        ANOMALY_SIZE_DROP: size_ratio <= 1 - size_drop_ratio,
+        ANOMALY_SIZE_ZSCORE: np.abs(size_z) >= zscore_threshold,
+        ANOMALY_DURATION_ZSCORE: duration_z >= zscore_threshold,
+    }
+    measures = {
+        ANOMALY_SIZE_DROP: (sizes, size_mean, size_ratio),
+        ANOMALY_SIZE_ZSCORE: (sizes, size_mean, size_z),
+        ANOMALY_DURATION_ZSCORE: (durations["total"], duration_mean, duration_z),
+    }
+
+    anomalies = []
+    for kind in ANOMALY_KINDS:
+        value, baseline, score = measures[kind]
+        for index in np.flatnonzero(flags[kind]):
+            anomalies.append({
+                "kind": kind,
+                "agent_id": history["agent_id"][index],
+                "database_name": history["database_name"][index],
+                "operation_end_time": _timestamp(history["operation_end_time"][index]),
+                "operation_log_file_name": history["operation_log_file_name"][index],
+                "value": _number(value[index]),
+                "baseline": _number(baseline[index]),
+                "score": _number(score[index]),
+            })
+    anomalies.sort(key=lambda anomaly: (anomaly["operation_end_time"] or "", anomaly["agent_id"], anomaly["kind"]))
+
+    # Percentiles de la dernière fenêtre de chaque série
+    in_window = np.arange(rows) >= ends[group] - window
+    window_group = group[in_window]
+    percentiles = {phase: group_percentiles(durations[phase][in_window], window_group, groups, (0.5, 0.95))
+                   for phase in PHASES}
+    (compression_median,) = group_percentiles(compression_ratio[in_window], window_group, groups, (0.5,))
+
+    series = []
+    for series_index, last in enumerate(ends - 1):
+        summary = {
+            "agent_id": history["agent_id"][last],
+            "database_name": history["database_name"][last],
+            "reports": int(ends[series_index] - starts[series_index]),
+            "last_report_at": _timestamp(history["operation_end_time"][last]),
+            "last_compress_size": _number(sizes[last]),
+            "size_baseline": _number(size_mean[last]),
+            "size_ratio": _number(size_ratio[last]),
+            "size_zscore": _number(size_z[last]),
+            "compression_ratio": _number(compression_ratio[last]),
+            "compression_ratio_median": _number(compression_median[series_index]),
+            "last_duration_seconds": _number(durations["total"][last]),
+            "duration_zscore": _number(duration_z[last]),
+        }
+        for phase in PHASES:
+            p50, p95 = percentiles[phase]
+            summary[f"{phase}_duration_p50"] = _number(p50[series_index])
+            summary[f"{phase}_duration_p95"] = _number(p95[series_index])
+        summary["anomalies"] = [kind for kind in ANOMALY_KINDS if flags[kind][last]]
+        series.append(summary)
+    return FleetAnalytics(rows, series, anomalies)
+
+
+def analyze_fleet(db_session: Session, since: Optional[datetime] = None, window: Optional[int] = None,
+                  size_drop_ratio: Optional[float] = None, zscore_threshold: Optional[float] = None) -> FleetAnalytics:
+    """
+    Charge l'historique depuis `since` (défaut : ANALYTICS_LOOKBACK_DAYS derniers jours) et l'analyse.
+
+    Raises:
+        BackupAnalyticsError: Si NumPy est absent ou si l'historique est illisible.
+    """
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(days=settings.ANALYTICS_LOOKBACK_DAYS)
+    with ANALYTICS_DURATION.time(phase="load"):
+        history = load_report_history(db_session, since)
+    with ANALYTICS_DURATION.time(phase="compute"):
+        return compute_fleet_analytics(history, window, size_drop_ratio, zscore_threshold)
+
+
+def run_post_scan_analytics() -> Optional[FleetAnalytics]:
+    """
+    Analyse exécutée après un passage planifié (SCANNER_ANALYTICS_ENABLED) : met à jour la métrique
+    backup_anomalies et journalise les bases dont le dernier rapport est signalé.
+    Une erreur est journalisée sans interrompre le planificateur (retourne None).
+    """
+    from app.core.database import SessionLocal
+    db_session = SessionLocal()
+    try:
+        analytics = analyze_fleet(db_session)
+    except BackupAnalyticsError as e:
+        logger.warning(f"Analyse de l'historique ignorée : {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Erreur lors de l'analyse de l'historique : {e}", exc_info=True)
+        return None
+    finally:
+        db_session.close()
+
+    for kind in ANOMALY_KINDS:
+        flagged = [summary for summary in analytics.series if kind in summary["anomalies"]]
+        BACKUP_ANOMALIES.set(len(flagged), kind=kind)
+        for summary in flagged:
+            logger.warning(f"Anomalie {kind} sur {summary['agent_id']} / {summary['database_name']} "
+                           f"(rapport du {summary['last_report_at']}) : taille {summary['last_compress_size']}, "
+                           f"moyenne {summary['size_baseline']}, durée {summary['last_duration_seconds']}s.")
+    logger.info(f"Analyse de l'historique : {analytics.rows} rapport(s), {len(analytics.series)} base(s), "
+                f"{len(analytics.anomalies)} anomalie(s) sur la période.")
+    return analytics
@@ -6,6 +6,7 @@ from datetime import datetime
 
 from app.models.models import ExpectedBackupJob
 import app.utils.file_operations as file_ops
+from app.core.metrics import PROMOTION_BYTES, PROMOTION_DURATION
 from app.utils.path_utils import get_expected_final_path
 from config.settings import settings
 
@@ -37,7 +38,9 @@ def promote_backup(staged_file_path: str, job: ExpectedBackupJob, base_validated
         file_ops.ensure_directory_exists(destination_dir)
         logger.debug(f"promote_backup: Répertoire de destination assuré : '{destination_dir}'")
 
-        file_ops.copy_file(staged_file_path, destination_file_path)
+        with PROMOTION_DURATION.time():
+            file_ops.copy_file(staged_file_path, destination_file_path)
+        PROMOTION_BYTES.inc(os.path.getsize(destination_file_path))
         logger.info(f"Sauvegarde pour '{job.database_name}' copiée avec succès de '{staged_file_path}' vers '{destination_file_path}'.")
 
         return destination_file_path
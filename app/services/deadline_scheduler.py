@@ -0,0 +1,224 @@
+# app/services/deadline_scheduler.py
+# Ce service planifie la détection des sauvegardes manquantes par échéance.
+# L'échéance d'un cycle est l'heure attendue du job (expected_hour_utc:expected_minute_utc)
+# plus la fenêtre de collecte (SCANNER_REPORT_COLLECTION_WINDOW_MINUTES). Les prochaines échéances
+# de tous les jobs sont conservées dans un tas (heapq) : à chaque passage, seuls les jobs dont
+# l'échéance est atteinte sont évalués, en O(k log n) pour k jobs échus, au lieu de parcourir
+# tous les jobs actifs.
+# Le tas est reconstruit quand la planification des jobs change : création, suppression ou
+# modification de l'heure attendue / de l'activation d'un job, dans ce processus (événements
+# SQLAlchemy) ou dans un autre (empreinte agrégée calculée par une seule requête à chaque passage).
+# Les mises à jour de statut faites par le scanner ne déclenchent pas de reconstruction.
+
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, event, func, inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.models import ExpectedBackupJob
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineSchedulerError(Exception):
+    """Exception personnalisée pour les erreurs de planification des échéances."""
+    pass
+
+
+def cycle_deadline(expected_datetime: datetime, window_minutes: int) -> datetime:
+    """Échéance d'un cycle : heure attendue + fenêtre de collecte."""
+    return expected_datetime + timedelta(minutes=window_minutes)
+
+
+def next_deadline(expected_hour_utc: int, expected_minute_utc: int, window_minutes: int,
+                  after: datetime) -> datetime:
+    """
+    Première échéance strictement postérieure à `after` pour un job quotidien.
+
+    Args:
+        after (datetime): Instant de référence (UTC conscient).
+
+    Returns:
+        datetime: L'échéance (UTC conscient).
+    """
+    after = after.astimezone(timezone.utc)
+    expected = after.replace(hour=expected_hour_utc, minute=expected_minute_utc, second=0, microsecond=0)
+    # La fenêtre peut déplacer l'échéance au jour suivant : partir de la veille couvre tous les cas
+    deadline = cycle_deadline(expected - timedelta(days=1), window_minutes)
+    while deadline <= after:
+        deadline += timedelta(days=1)
+    return deadline
+
+
+def has_deadline(job: ExpectedBackupJob) -> bool:
+    return job.expected_hour_utc is not None and job.expected_minute_utc is not None
+
+
+# Attributs d'un job qui déterminent ses échéances.
+SCHEDULE_ATTRIBUTES = ("expected_hour_utc", "expected_minute_utc", "is_active")
+
+
+def schedule_fingerprint(session: Session) -> Tuple:
+    """
+    Empreinte de la planification de tous les jobs, en une requête agrégée :
+    nombre de jobs, plus grand id, jobs actifs et somme pondérée par id des créneaux des jobs actifs.
+    """
+    slot = func.coalesce(ExpectedBackupJob.expected_hour_utc, 99) * 100 \
+        + func.coalesce(ExpectedBackupJob.expected_minute_utc, 99)
+    active = ExpectedBackupJob.is_active == True
+    return tuple(session.query(
+        func.count(ExpectedBackupJob.id),
+        func.max(ExpectedBackupJob.id),
+        func.sum(case((active, 1), else_=0)),
+        func.sum(case((active, ExpectedBackupJob.id * slot), else_=0)),
+    ).one())
+
+
+class DeadlineScheduler:
+    """
+    Tas des prochaines échéances des jobs actifs.
+
+    Chaque élément est (échéance, id du job, version) ; une replanification incrémente la version
+    du job, ce qui invalide paresseusement ses anciens éléments (ignorés au dépilement).
+    """
+
+    def __init__(self, window_minutes: Optional[int] = None):
+        self.window_minutes = window_minutes if window_minutes is not None \
+            else settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES
+        self._heap: List[Tuple[datetime, int, int]] = []
+        self._versions: Dict[int, int] = {}
+        self._times: Dict[int, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._fingerprint = None
+        # Dernier instant jusqu'auquel les échéances ont été dépilées
+        self.last_tick: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    # --- Construction ---
+
+    def _push(self, job_id: int, hour: int, minute: int, after: datetime) -> None:
+        version = self._versions.get(job_id, 0) + 1
+        self._versions[job_id] = version
+        self._times[job_id] = (hour, minute)
+        heapq.heappush(self._heap, (next_deadline(hour, minute, self.window_minutes, after), job_id, version))
+
+    def schedule(self, job: ExpectedBackupJob, after: datetime) -> None:
+        """(Re)planifie un job ; un job inactif ou sans heure attendue est retiré."""
+        with self._lock:
+            if not job.is_active or not has_deadline(job):
+                self._remove(job.id)
+                return
+            self._push(job.id, job.expected_hour_utc, job.expected_minute_utc, after)
+
+    def _remove(self, job_id: int) -> None:
+        if self._times.pop(job_id, None) is not None:
+            self._versions[job_id] = self._versions.get(job_id, 0) + 1
+
+    def unschedule(self, job_id: int) -> None:
+        with self._lock:
+            self._remove(job_id)
+
+    def rebuild(self, jobs: Iterable[ExpectedBackupJob], now: datetime) -> None:
+        """
+        Reconstruit le tas à partir des jobs. Les échéances passées depuis le dernier passage
+        (ou depuis 24 h au premier passage) sont conservées pour être évaluées au prochain dépilement.
+        """
+        after = self.last_tick or (now - timedelta(days=1))
+        with self._lock:
+            self._heap = []
+            self._times = {}
+            for job in jobs:
+                if job.is_active and has_deadline(job):
+                    self._push(job.id, job.expected_hour_utc, job.expected_minute_utc, after)
+            self._dirty = False
+        logger.info(f"Échéancier des jobs reconstruit : {len(self._times)} job(s) avec échéance.")
+
+    def mark_dirty(self) -> None:
+        """Demande une reconstruction au prochain passage (jobs créés, modifiés ou supprimés)."""
+        self._dirty = True
+
+    def refresh(self, session: Session, now: datetime) -> bool:
+        """
+        Reconstruit le tas si les jobs ont changé depuis la dernière construction.
+        Retourne True si une reconstruction a eu lieu.
+
+        Raises:
+            DeadlineSchedulerError: Si les jobs ne peuvent pas être lus.
+        """
+        try:
+            fingerprint = schedule_fingerprint(session)
+            if not self._dirty and fingerprint == self._fingerprint:
+                return False
+            jobs = session.query(ExpectedBackupJob).filter(ExpectedBackupJob.is_active == True).all()
+            self.rebuild(jobs, now)
+        except (SQLAlchemyError, TypeError, ValueError) as e:
+            self._dirty = True
+            raise DeadlineSchedulerError(f"Impossible de construire l'échéancier des jobs : {e}") from e
+        self._fingerprint = fingerprint
+        return True
+
+    # --- Échéances ---
+
+    def next_due(self) -> Optional[datetime]:
+        """Prochaine échéance planifiée (None si aucune)."""
+        with self._lock:
+            while self._heap and self._heap[0][2] != self._versions.get(self._heap[0][1]):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[Tuple[int, datetime]]:
+        """
+        Dépile les échéances atteintes (<= now) et replanifie chaque job sur son échéance suivante.
+
+        Returns:
+            List[Tuple[int, datetime]]: (id du job, échéance atteinte), une fois par job.
+        """
+        due: Dict[int, datetime] = {}
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, job_id, version = heapq.heappop(self._heap)
+                if version != self._versions.get(job_id):
+                    continue  # Élément périmé (job replanifié ou retiré)
+                # Après une longue interruption, seule la dernière échéance manquée est évaluée
+                due[job_id] = max(deadline, due.get(job_id, deadline))
+                hour, minute = self._times[job_id]
+                self._push(job_id, hour, minute, now)
+            self.last_tick = now
+        return sorted(due.items(), key=lambda item: item[1])
+
+    def restore(self, previous_tick: Optional[datetime]) -> None:
+        """
+        Annule un dépilement dont l'évaluation a échoué : le dernier passage redevient `previous_tick`
+        et le tas est reconstruit au prochain passage, ce qui remet en file les échéances dépilées.
+        """
+        with self._lock:
+            self.last_tick = previous_tick
+            self._dirty = True
+
+
+# Échéancier du processus, partagé par les passages du scanner.
+deadline_scheduler = DeadlineScheduler()
+
+
+def _mark_jobs_changed(mapper, connection, target) -> None:
+    deadline_scheduler.mark_dirty()
+
+
+def _mark_schedule_changed(mapper, connection, target) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in SCHEDULE_ATTRIBUTES):
+        deadline_scheduler.mark_dirty()
+
+
+event.listen(ExpectedBackupJob, "after_insert", _mark_jobs_changed)
+event.listen(ExpectedBackupJob, "after_delete", _mark_jobs_changed)
+event.listen(ExpectedBackupJob, "after_update", _mark_schedule_changed)
@@ -0,0 +1,300 @@
+# app/services/history_export.py
+# Export colonnaire de l'historique backup_entries (Parquet ou Arrow IPC) pour l'analyse hors ligne :
+# l'équipe données lit les fichiers exportés au lieu de paginer l'API JSON sur la base de production.
+#
+#   - Partitionnement « Hive » par entreprise et par mois de l'entrée :
+#       <dossier>/company=<entreprise>/month=<AAAA-MM>/part-<export>.parquet
+#     lisible tel quel par pyarrow.dataset, pandas, DuckDB ou Spark.
+#   - Lecture en flux (curseur côté serveur, yield_per) triée par (entreprise, horodatage) : une seule
+#     partition est ouverte à la fois et la mémoire reste bornée à un lot de HISTORY_EXPORT_BATCH_SIZE lignes.
+#   - Export incrémental : _export_state.json retient le plus grand identifiant exporté ; l'export suivant
+#     n'ajoute que les entrées plus récentes, dans de nouveaux fichiers. Les entrées supprimées ou recalculées
+#     (rejeu avec --replace) ne sont pas retirées des fichiers déjà écrits : utiliser un export complet.
+#   - Les fichiers sont écrits sous un nom temporaire puis renommés, et l'état n'est mis à jour qu'ensuite :
+#     un export interrompu ne laisse pas de fichier partiel et sera rejoué. Un export complet n'efface les
+#     fichiers de l'export précédent qu'après avoir publié les siens et écrit l'état.
+#
+# pyarrow est une dépendance optionnelle : sans elle, l'export lève HistoryExportError.
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import List, Optional
+from urllib.parse import quote
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.models import BackupEntry, ExpectedBackupJob
+from config.settings import settings
+
+try:  # Dépendance optionnelle : écriture Parquet / Arrow IPC
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    pa = pc = pq = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMAT_ARROW = "arrow"
+EXPORT_FORMATS = (EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_ARROW)
+STATE_FILE_NAME = "_export_state.json"
+# Exports conservés dans l'historique de _export_state.json
+STATE_HISTORY_LENGTH = 50
+COMPRESSION = "zstd"
+
+# (colonne exportée, colonne SQL, type Arrow)
+_EXPORT_COLUMNS = (
+    ("entry_id", BackupEntry.id, "int64"),
+    ("expected_job_id", BackupEntry.expected_job_id, "int64"),
+    ("timestamp", BackupEntry.timestamp, "timestamp"),
+    ("status", BackupEntry.status, "string"),
+    ("message", BackupEntry.message, "string"),
+    ("expected_hash", BackupEntry.expected_hash, "string"),
+    ("operation_log_file_name", BackupEntry.operation_log_file_name, "string"),
+    ("agent_id", BackupEntry.agent_id, "string"),
+    ("agent_overall_status", BackupEntry.agent_overall_status, "string"),
+    ("server_calculated_staged_hash", BackupEntry.server_calculated_staged_hash, "string"),
+    ("server_calculated_staged_size", BackupEntry.server_calculated_staged_size, "int64"),
+    ("previous_successful_hash_global", BackupEntry.previous_successful_hash_global, "string"),
+    ("hash_comparison_result", BackupEntry.hash_comparison_result, "bool"),
+    ("verification_tier", BackupEntry.verification_tier, "string"),
+    ("content_fingerprint", BackupEntry.content_fingerprint, "string"),
+    ("created_at", BackupEntry.created_at, "timestamp"),
+    ("company_name", ExpectedBackupJob.company_name, "string"),
+    ("city", ExpectedBackupJob.city, "string"),
+    ("neighborhood", ExpectedBackupJob.neighborhood, "string"),
+    ("database_name", ExpectedBackupJob.database_name, "string"),
+    ("job_year", ExpectedBackupJob.year, "int32"),
+)
+
+
+class HistoryExportError(Exception):
+    """Exception personnalisée pour les erreurs de l'export de l'historique."""
+    pass
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise HistoryExportError("pyarrow n'est pas installé : l'export Parquet / Arrow est indisponible.")
+
+
+def export_schema() -> "pa.Schema":
+    """Schéma Arrow des fichiers exportés (horodatages UTC sans fuseau, à la microseconde)."""
+    _require_pyarrow()
+    types = {"int64": pa.int64(), "int32": pa.int32(), "string": pa.string(), "bool": pa.bool_(),
+             "timestamp": pa.timestamp("us")}
+    return pa.schema([(name, types[arrow_type]) for name, _, arrow_type in _EXPORT_COLUMNS])
+
+
+def partition_path(output_dir: str, company_name: str, month: str) -> str:
+    """Dossier d'une partition ; le nom de l'entreprise est échappé comme une valeur de partition Hive."""
+    return os.path.join(output_dir, f"company={quote(company_name or '', safe='')}", f"month={month}")
+
+
+def read_export_state(output_dir: str) -> dict:
+    """État du dernier export (dernier identifiant exporté, historique), vide si aucun export n'a eu lieu."""
+    state_path = os.path.join(output_dir, STATE_FILE_NAME)
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        raise HistoryExportError(f"État d'export illisible : {state_path} ({e})")
+
+
+def _write_export_state(output_dir: str, state: dict) -> None:
+    state_path = os.path.join(output_dir, STATE_FILE_NAME)
+    temporary_path = state_path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temporary_path, state_path)
+
+
+def _remove_previous_export(output_dir: str, keep: List[str]) -> None:
+    """
+    Export complet publié : supprime les fichiers part-* des exports précédents (hors `keep`)
+    et les dossiers de partition devenus vides.
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    for name in os.listdir(output_dir):
+        company_dir = os.path.join(output_dir, name)
+        if not (name.startswith("company=") and os.path.isdir(company_dir)):
+            continue
+        for folder, _, file_names in os.walk(company_dir, topdown=False):
+            for file_name in file_names:
+                path = os.path.join(folder, file_name)
+                if file_name.startswith("part-") and os.path.abspath(path) not in keep:
+                    os.remove(path)
+            if not os.listdir(folder):
+                os.rmdir(folder)
+
+
+class _PartitionWriter:
+    """
+    Écrit les lots d'une partition à la fois. Les lignes sont regroupées en groupes d'environ
+    `batch_size` lignes avant écriture (une partition peut s'étaler sur plusieurs lots lus).
+    """
+
+    def __init__(self, output_dir: str, fmt: str, run_id: str, schema: "pa.Schema", batch_size: int):
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.file_name = f"part-{run_id}.{fmt}"
+        self.schema = schema
+        self.batch_size = batch_size
+        self.key = None
+        self.writer = None
+        self.pending: List["pa.RecordBatch"] = []
+        self.pending_rows = 0
+        self.written: List[tuple] = []   # (chemin temporaire, chemin final)
+
+    def write(self, key: tuple, batch: "pa.RecordBatch") -> None:
+        if key != self.key:
+            self._close_partition()
+            self.key = key
+        self.pending.append(batch)
+        self.pending_rows += batch.num_rows
+        if self.pending_rows >= self.batch_size:
+            self._flush()
+
+    def _open(self) -> None:
+        folder = partition_path(self.output_dir, *self.key)
+        os.makedirs(folder, exist_ok=True)
+        final_path = os.path.join(folder, self.file_name)
+        temporary_path = os.path.join(folder, f".{self.file_name}.tmp")
+        if self.fmt == EXPORT_FORMAT_PARQUET:
+            self.writer = pq.ParquetWriter(temporary_path, self.schema, compression=COMPRESSION)
+        else:
+            self.writer = pa.ipc.new_file(temporary_path, self.schema,
+                                          options=pa.ipc.IpcWriteOptions(compression=COMPRESSION))
+        self.written.append((temporary_path, final_path))
+
+    def _flush(self) -> None:
+        if not self.pending:
+            return
+        if self.writer is None:
+            self._open()
+        table = pa.Table.from_batches(self.pending, schema=self.schema)
+        if self.fmt == EXPORT_FORMAT_PARQUET:
+            self.writer.write_table(table, row_group_size=self.batch_size)
+        else:
+            self.writer.write_table(table, max_chunksize=self.batch_size)
+        self.pending, self.pending_rows = [], 0
+
+    def _close_partition(self) -> None:
+        self._flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def commit(self) -> List[str]:
+        """Ferme la dernière partition et publie les fichiers écrits sous leur nom final."""
+        self._close_partition()
+        for temporary_path, final_path in self.written:
+            os.replace(temporary_path, final_path)
+        return [final_path for _, final_path in self.written]
+
+    def abort(self) -> None:
+        try:
+            if self.writer is not None:
+                self.writer.close()
+        finally:
+            for temporary_path, _ in self.written:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+
+
+def export_backup_history(db_session: Session, output_dir: Optional[str] = None, fmt: Optional[str] = None,
+                          batch_size: Optional[int] = None, full: bool = False) -> dict:
+    """
+    Exporte les entrées backup_entries postérieures au dernier export (toutes avec full=True, qui remplace
+    l'export précédent) vers `output_dir`, partitionnées par entreprise et par mois.
+
+    Returns:
+        dict: Lignes et fichiers écrits, partitions touchées, dernier identifiant exporté, octets, durée.
+
+    Raises:
+        HistoryExportError: Si pyarrow est absent, le format inconnu, l'état illisible ou la lecture impossible.
+    """
+    _require_pyarrow()
+    output_dir = output_dir or settings.HISTORY_EXPORT_PATH
+    fmt = fmt or settings.HISTORY_EXPORT_FORMAT
+    batch_size = batch_size or settings.HISTORY_EXPORT_BATCH_SIZE
+    if fmt not in EXPORT_FORMATS:
+        raise HistoryExportError(f"Format d'export inconnu : {fmt} (attendu : {', '.join(EXPORT_FORMATS)})")
+
+    started_at = datetime.now(timezone.utc)
+    os.makedirs(output_dir, exist_ok=True)
+    # Export complet : repart de zéro, l'export précédent reste en place jusqu'à la publication du nouveau
+    state = {} if full else read_export_state(output_dir)
+    if state.get("format", fmt) != fmt:
+        raise HistoryExportError(f"Le dossier contient un export {state['format']} : export complet requis "
+                                 f"pour passer au format {fmt}.")
+    last_entry_id = state.get("last_entry_id", 0)
+
+    schema = export_schema()
+    run_id = started_at.strftime("%Y%m%dT%H%M%S%fZ")
+    stmt = (
+        select(*(column for _, column, _ in _EXPORT_COLUMNS))
+        .join(ExpectedBackupJob, BackupEntry.expected_job_id == ExpectedBackupJob.id)
+        .where(BackupEntry.id > last_entry_id)
+        .order_by(ExpectedBackupJob.company_name, BackupEntry.timestamp, BackupEntry.id)
+    )
+    company_index = schema.get_field_index("company_name")
+    timestamp_index = schema.get_field_index("timestamp")
+    writer = _PartitionWriter(output_dir, fmt, run_id, schema, batch_size)
+    rows, max_entry_id, partitions = 0, last_entry_id, set()
+    try:
+        result = db_session.execute(stmt.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*partition), schema)], schema=schema)
+            months = pc.strftime(batch.column(timestamp_index), format="%Y-%m").to_pylist()
+            companies = batch.column(company_index).to_pylist()
+            # Lignes triées par (entreprise, horodatage) : chaque partition forme une suite contiguë
+            offset = 0
+            for key, run in groupby(zip(companies, months)):
+                length = sum(1 for _ in run)
+                writer.write(key, batch.slice(offset, length))
+                partitions.add(key)
+                offset += length
+            rows += batch.num_rows
+            max_entry_id = max(max_entry_id, pc.max(batch.column(0)).as_py())
+        files = writer.commit()
+    except SQLAlchemyError as e:
+        writer.abort()
+        raise HistoryExportError(f"Lecture de l'historique impossible : {e}")
+    except Exception:
+        writer.abort()
+        raise
+
+    stats = {
+        "run_id": run_id,
+        "format": fmt,
+        "full": full,
+        "rows": rows,
+        "files": len(files),
+        "partitions": len(partitions),
+        "bytes_written": sum(os.path.getsize(path) for path in files),
+        "previous_entry_id": last_entry_id,
+        "last_entry_id": max_entry_id,
+        "duration_seconds": (datetime.now(timezone.utc) - started_at).total_seconds(),
+    }
+    history = state.get("exports", []) + [{key: stats[key] for key in ("run_id", "rows", "files", "last_entry_id")}]
+    _write_export_state(output_dir, {
+        "format": fmt,
+        "last_entry_id": max_entry_id,
+        "last_export_at": started_at.isoformat(),
+        "exports": history[-STATE_HISTORY_LENGTH:],
+    })
+    if full:
+        _remove_previous_export(output_dir, files)
+    logger.info(f"Export de l'historique : {rows} entrée(s), {len(files)} fichier(s) {fmt} "
+                f"dans {output_dir} (dernier identifiant {max_entry_id}).")
+    return stats
@@ -0,0 +1,135 @@
+# app/services/integrity_checker.py
+# Ce service vérifie l'intégrité d'un fichier déposé par un agent en plusieurs niveaux,
+# du moins coûteux au plus coûteux :
+#   1. "stat"   : existence, type et taille du fichier comparée à COMPRESS.size (un seul appel système) ;
+#   2. "sample" : lecture de quelques blocs (signature du format compressé, fin de fichier non nulle) ;
+#   3. "sha256" : hachage complet du fichier, uniquement si les niveaux précédents sont passés
+#                 (l'empreinte courte content_fingerprint est calculée pendant la même lecture).
+# Chaque résultat indique le niveau qui a pris la décision : un transfert tronqué
+# est ainsi rejeté sans relire plusieurs Go.
+
+import os
+import logging
+from typing import NamedTuple, Optional
+
+from app.utils.crypto import calculate_file_sha256_and_fingerprint, CryptoUtilityError
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TIER_STAT = "stat"
+TIER_SAMPLE = "sample"
+TIER_SHA256 = "sha256"
+
+# Signatures (nombres magiques) des formats de compression déposés par les agents.
+COMPRESSED_MAGIC_NUMBERS = {
+    ".gz": b"\x1f\x8b",
+    ".zst": b"\x28\xb5\x2f\xfd",
+}
+
+
+class VerificationResult(NamedTuple):
+    """Résultat de la vérification d'un fichier déposé."""
+    ok: bool
+    tier: str                      # Niveau ayant pris la décision (stat, sample ou sha256)
+    message: str
+    size: Optional[int] = None     # Taille constatée sur le serveur
+    sha256: Optional[str] = None   # Hachage calculé (uniquement si le niveau sha256 a été atteint)
+    fingerprint: Optional[str] = None  # Empreinte courte calculée avec le hachage (<algorithme>:<hex>)
+
+
+def check_stat(file_path: str, expected_size: Optional[int]) -> VerificationResult:
+    """
+    Niveau 1 : vérifie l'existence du fichier et sa taille avec un seul os.stat.
+
+    Returns:
+        VerificationResult: ok=True si le fichier existe et que sa taille correspond
+        (ou si l'agent n'a pas rapporté de taille).
+    """
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError:
+        return VerificationResult(False, TIER_STAT, f"Fichier déposé introuvable : {file_path}")
+    except OSError as e:
+        return VerificationResult(False, TIER_STAT, f"Fichier déposé inaccessible : {file_path} ({e})")
+
+    size = stat_result.st_size
+    if not os.path.isfile(file_path):
+        return VerificationResult(False, TIER_STAT, f"Le chemin déposé n'est pas un fichier : {file_path}", size)
+    if size == 0:
+        return VerificationResult(False, TIER_STAT, f"Fichier déposé vide : {file_path}", size)
+    if expected_size is not None and size != expected_size:
+        return VerificationResult(
+            False, TIER_STAT,
+            f"Taille du fichier déposé ({size} octets) différente de la taille déclarée ({expected_size} octets) : "
+            f"transfert tronqué ou incomplet.",
+            size,
+        )
+    return VerificationResult(True, TIER_STAT, "Taille conforme.", size)
+
+
+def check_sample(file_path: str, size: int, block_size: Optional[int] = None) -> VerificationResult:
+    """
+    Niveau 2 : lit le premier et le dernier bloc du fichier.
+      - le premier bloc doit porter la signature du format annoncé par l'extension (.gz, .zst) ;
+      - le dernier bloc ne doit pas être entièrement nul (zone préallouée jamais écrite).
+    """
+    block_size = block_size or settings.SCANNER_SAMPLE_BLOCK_SIZE
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(min(block_size, size))
+            f.seek(max(size - block_size, 0))
+            tail = f.read(block_size)
+    except OSError as e:
+        return VerificationResult(False, TIER_SAMPLE, f"Lecture des blocs échantillons impossible : {e}", size)
+
+    extension = os.path.splitext(file_path)[1].lower()
+    magic = COMPRESSED_MAGIC_NUMBERS.get(extension)
+    if magic is not None and not head.startswith(magic):
+        return VerificationResult(False, TIER_SAMPLE, f"Signature {extension} absente en tête du fichier déposé.", size)
+    if tail and tail.count(0) == len(tail):
+        return VerificationResult(False, TIER_SAMPLE, "Fin du fichier déposé entièrement nulle (écriture incomplète).", size)
+    return VerificationResult(True, TIER_SAMPLE, "Blocs échantillons conformes.", size)
+
+
+def verify_staged_file(
+    file_path: str,
+    expected_size: Optional[int],
+    expected_hash: Optional[str],
+    sample_check: Optional[bool] = None,
+) -> VerificationResult:
+    """
+    Vérifie un fichier déposé en s'arrêtant au premier niveau qui échoue.
+
+    Args:
+        file_path (str): Chemin du fichier dans la zone de dépôt.
+        expected_size (Optional[int]): Taille déclarée par l'agent (COMPRESS.size).
+        expected_hash (Optional[str]): SHA-256 déclaré par l'agent.
+        sample_check (Optional[bool]): Active le niveau "sample" (défaut : SCANNER_SAMPLE_CHECK_ENABLED).
+
+    Returns:
+        VerificationResult: Le résultat et le niveau qui l'a déterminé.
+    """
+    result = check_stat(file_path, expected_size)
+    if not result.ok:
+        logger.info(f"Vérification '{file_path}' rejetée au niveau {result.tier} : {result.message}")
+        return result
+    size = result.size
+
+    if sample_check is None:
+        sample_check = settings.SCANNER_SAMPLE_CHECK_ENABLED
+    if sample_check:
+        result = check_sample(file_path, size)
+        if not result.ok:
+            logger.info(f"Vérification '{file_path}' rejetée au niveau {result.tier} : {result.message}")
+            return result
+
+    try:
+        computed_hash, fingerprint = calculate_file_sha256_and_fingerprint(file_path)
+    except CryptoUtilityError as e:
+        return VerificationResult(False, TIER_SHA256, f"Erreur lors du calcul du hash : {e}", size)
+
+    if computed_hash != expected_hash:
+        return VerificationResult(False, TIER_SHA256, "Hash calculé différent du hash déclaré dans le rapport.",
+                                  size, computed_hash, fingerprint)
+    return VerificationResult(True, TIER_SHA256, "Hash conforme au hash déclaré.", size, computed_hash, fingerprint)
@@ -0,0 +1,169 @@
+# app/services/missing_evaluator.py
+# Ce service détecte en une fois les jobs dont la sauvegarde est manquante (MISSING).
+# Au lieu d'une requête BackupEntry par job (N+1 sur toute la flotte), la dernière entrée
+# de chaque job candidat depuis le début de la fenêtre la plus ancienne est lue par une seule
+# requête groupée ; elle est ensuite comparée en mémoire à la fenêtre du cycle de chaque job,
+# combinée aux rapports pertinents collectés en phase 1, et les entrées MISSING sont créées
+# par des insertions groupées (un seul commit, fait par l'appelant).
+# Le résultat est identique à celui de BackupScanner._handle_missing_or_unknown_job appliqué
+# job par job (voir tests/test_missing_evaluator.py).
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import and_, func, insert
+from sqlalchemy.orm import Session
+
+from app.models.models import BackupEntry, BackupEntryStatus, ExpectedBackupJob, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Au-delà, le filtre sur les ids est remplacé par le seul filtre sur l'horodatage
+# (limite de paramètres des anciennes versions de SQLite).
+MAX_JOB_IDS_IN_FILTER = 900
+
+# Statuts d'une entrée qui montrent que le cycle du job est déjà traité
+HANDLED_STATUSES = (
+    BackupEntryStatus.SUCCESS, BackupEntryStatus.FAILED, BackupEntryStatus.MISSING,
+    BackupEntryStatus.HASH_MISMATCH, BackupEntryStatus.TRANSFER_INTEGRITY_FAILED,
+)
+
+
+class JobCycle(NamedTuple):
+    """Cycle courant d'un job : date, heure attendue et échéance (heure attendue + fenêtre)."""
+    target_date: date
+    expected_datetime: datetime
+    deadline: datetime
+
+    def entries_since(self, window_minutes: int) -> datetime:
+        """Début de la période où une entrée existante compte pour ce cycle."""
+        return self.expected_datetime - timedelta(minutes=window_minutes * 2)
+
+
+def current_cycle(job: ExpectedBackupJob, now_utc: datetime, window_minutes: int) -> Optional[JobCycle]:
+    """
+    Cycle le plus récent d'un job à `now_utc` (None si le job n'a pas d'heure attendue).
+    Le cycle est celui du jour si l'heure attendue est passée, sinon celui de la veille.
+    """
+    if job.expected_hour_utc is None or job.expected_minute_utc is None:
+        return None
+    target_date = now_utc.date()
+    if (now_utc.hour < job.expected_hour_utc or
+            (now_utc.hour == job.expected_hour_utc and now_utc.minute < job.expected_minute_utc)):
+        target_date = now_utc.date() - timedelta(days=1)
+    expected_datetime = datetime(
+        target_date.year, target_date.month, target_date.day,
+        job.expected_hour_utc, job.expected_minute_utc, 0, 0,
+        tzinfo=timezone.utc
+    )
+    return JobCycle(target_date, expected_datetime, expected_datetime + timedelta(minutes=window_minutes))
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Les horodatages des entrées sont stockés en UTC sans fuseau
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def latest_entries_since(session: Session, job_ids: Iterable[int],
+                         since: datetime) -> Dict[int, Tuple[datetime, str]]:
+    """
+    Dernière entrée (horodatage, statut) de chaque job depuis `since`, en une requête groupée.
+    À horodatage égal, l'entrée d'id le plus grand est retenue.
+    """
+    job_ids = set(job_ids)
+    if not job_ids:
+        return {}
+    since = _naive_utc(since)
+    latest = session.query(
+        BackupEntry.expected_job_id.label("job_id"),
+        func.max(BackupEntry.timestamp).label("latest_timestamp"),
+    ).filter(BackupEntry.timestamp >= since)
+    if len(job_ids) <= MAX_JOB_IDS_IN_FILTER:
+        latest = latest.filter(BackupEntry.expected_job_id.in_(job_ids))
+    latest = latest.group_by(BackupEntry.expected_job_id).subquery()
+
+    rows = session.query(
+        BackupEntry.expected_job_id, BackupEntry.timestamp, BackupEntry.status
+    ).join(latest, and_(
+        BackupEntry.expected_job_id == latest.c.job_id,
+        BackupEntry.timestamp == latest.c.latest_timestamp,
+    )).order_by(BackupEntry.id).all()
+
+    entries: Dict[int, Tuple[datetime, str]] = {}
+    for job_id, timestamp, status in rows:
+        if job_id in job_ids:
+            entries[job_id] = (_naive_utc(timestamp), status)
+    return entries
+
+
+def find_missing_jobs(session: Session, jobs: Iterable[ExpectedBackupJob], now_utc: datetime,
+                      window_minutes: int,
+                      reported_job_keys: Optional[Set[Tuple[str, str]]] = None
+                      ) -> List[Tuple[ExpectedBackupJob, JobCycle]]:
+    """
+    Jobs à marquer MISSING à `now_utc`, avec leur cycle : échéance dépassée, pas de rapport
+    pertinent (clés (agent, base) de `reported_job_keys`) et pas d'entrée traitée pour le cycle.
+    """
+    reported_job_keys = reported_job_keys or set()
+    candidates: List[Tuple[ExpectedBackupJob, JobCycle]] = []
+    for job in jobs:
+        if (job.agent_id_responsible, job.database_name) in reported_job_keys:
+            continue
+        cycle = current_cycle(job, now_utc, window_minutes)
+        if cycle is None or now_utc <= cycle.deadline:
+            continue
+        candidates.append((job, cycle))
+    if not candidates:
+        return []
+
+    since = min(cycle.entries_since(window_minutes) for _, cycle in candidates)
+    latest = latest_entries_since(session, (job.id for job, _ in candidates), since)
+
+    missing = []
+    for job, cycle in candidates:
+        entry = latest.get(job.id)
+        if entry is not None and entry[0] >= _naive_utc(cycle.entries_since(window_minutes)) \
+                and entry[1] in HANDLED_STATUSES:
+            continue
+        missing.append((job, cycle))
+    return missing
+
+
+def missing_message(job: ExpectedBackupJob, target_date: date) -> str:
+    return f"Sauvegarde manquante pour le cycle du {target_date} à {job.expected_hour_utc:02d}:{job.expected_minute_utc:02d} UTC"
+
+
+def build_missing_entry(job: ExpectedBackupJob, target_date: date, now_utc: datetime) -> BackupEntry:
+    """Entrée MISSING d'un job pour le cycle du `target_date`."""
+    return BackupEntry(
+        expected_job_id=job.id,
+        timestamp=now_utc,
+        status=BackupEntryStatus.MISSING,
+        message=missing_message(job, target_date)
+    )
+
+
+def create_missing_entries(session: Session, missing: List[Tuple[ExpectedBackupJob, JobCycle]],
+                           now_utc: datetime) -> int:
+    """
+    Insère en lot les entrées MISSING et met à jour le statut des jobs concernés
+    (deux instructions groupées). Le commit, unique pour tout le lot, est laissé à l'appelant ;
+    il expire les jobs chargés, qui sont relus avec leur nouveau statut.
+    """
+    if not missing:
+        return 0
+    session.execute(insert(BackupEntry), [
+        dict(expected_job_id=job.id, timestamp=now_utc, status=BackupEntryStatus.MISSING.value,
+             message=missing_message(job, cycle.target_date))
+        for job, cycle in missing
+    ])
+    # Mise à jour groupée par clé primaire (UPDATE ... WHERE id = ?, en executemany)
+    session.bulk_update_mappings(ExpectedBackupJob, [
+        dict(id=job.id, current_status=JobStatus.MISSING.value, last_checked_timestamp=now_utc)
+        for job, _ in missing
+    ])
+    logger.info(f"{len(missing)} job(s) marqué(s) MISSING.")
+    return len(missing)
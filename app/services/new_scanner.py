@@ -15,7 +15,6 @@ Ce scanner est censé être lancé à intervalle régulier via un scheduler ou u
 """
 
 import os
-import json
 import logging
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
@@ -25,6 +24,7 @@ from app.models.models import ExpectedBackupJob, BackupEntry
 # Importation des utilitaires
 from app.utils.file_operations import ensure_directory_exists, move_file, copy_file
 from app.utils.crypto import calculate_file_sha256
+from app.utils.json_decoder import load_report
 # Import de la configuration
 from config.settings import settings
 
@@ -73,8 +73,7 @@ class NewBackupScanner:
             json_file = sorted(json_files)[0]
             json_path = os.path.join(log_dir, json_file)
             try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    report_data = json.load(f)
+                report_data = load_report(json_path)
                 self.logger.info(f"Lecture du rapport {json_file} de l'agent {agent_id}")
             except Exception as e:
                 self.logger.error(f"Erreur de lecture du fichier {json_path} : {e}")
@@ -2,9 +2,11 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
+import time
 from typing import Optional
 
 from config.settings import settings
+from app.core.metrics import NOTIFICATION_DURATION
 from app.models.models import ExpectedBackupJob, BackupEntry, JobStatus, BackupEntryStatus
 
 logger = logging.getLogger(__name__)
@@ -43,6 +45,8 @@ def send_email_notification(
     msg.attach(MIMEText(body, 'plain'))
 
     server = None
+    outcome = "error"
+    start = time.perf_counter()
     try:
         # Établit une connexion SMTP sécurisée
         server = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT)
@@ -50,6 +54,7 @@ def send_email_notification(
         server.login(settings.EMAIL_USERNAME, settings.EMAIL_PASSWORD) # S'authentifie
         text = msg.as_string() # Convertit le message en chaîne
         server.sendmail(settings.EMAIL_SENDER, recipient_email, text) # Envoie l'e-mail
+        outcome = "sent"
         logger.info(f"E-mail de notification envoyé à '{recipient_email}' avec le sujet : '{subject}'")
     except smtplib.SMTPException as e:
         logger.error(f"Erreur SMTP lors de l'envoi de l'e-mail à '{recipient_email}': {e}", exc_info=True)
@@ -58,6 +63,7 @@ def send_email_notification(
         logger.critical(f"Erreur inattendue lors de l'envoi de l'e-mail à '{recipient_email}': {e}", exc_info=True)
         raise NotificationError(f"Échec inattendu de l'envoi de l'e-mail : {e}")
     finally:
+        NOTIFICATION_DURATION.observe(time.perf_counter() - start, outcome=outcome)
         if server:
             server.quit() # Ferme la connexion SMTP même en cas d'erreur
 
@@ -0,0 +1,158 @@
+# app/services/report_ingestion.py
+# Ce service convertit chaque rapport STATUS.json d'un agent en lignes normalisées
+# (AgentReport + AgentReportDatabase) une seule fois. L'évaluation des jobs et les
+# requêtes de l'API lisent ensuite des colonnes typées au lieu de reparcourir le JSON.
+
+import os
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.metrics import REPORT_INGESTIONS
+from app.models.models import AgentReport, AgentReportDatabase
+from app.utils.report_fields import (
+    coerce_bool,
+    coerce_int,
+    coerce_datetime,
+    coerce_optional_str,
+    get_reported_checksum,
+)
+
+logger = logging.getLogger(__name__)
+
+# Sections de processus décrites pour chaque base de données d'un rapport.
+PROCESS_SECTIONS = ("BACKUP", "COMPRESS", "TRANSFER")
+
+
+class ReportIngestionError(Exception):
+    """Exception personnalisée levée lorsqu'un rapport ne peut pas être ingéré."""
+    pass
+
+
+def normalize_database_entry(database_name: str, db_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convertit l'entrée brute d'une base de données en dictionnaire de colonnes typées
+    pour AgentReportDatabase.
+
+    Args:
+        database_name (str): Nom de la base tel que rapporté par l'agent.
+        db_data (dict): Section brute de la base (BACKUP/COMPRESS/TRANSFER, staged_file_name...).
+
+    Returns:
+        dict: Les valeurs prêtes à être passées au constructeur de AgentReportDatabase.
+    """
+    staged_file_name = coerce_optional_str(db_data.get("staged_file_name"))
+    row = {
+        "database_name": database_name,
+        # L'agent peut publier le chemin complet de son côté : seul le nom du fichier est utile au serveur.
+        "staged_file_name": os.path.basename(staged_file_name) if staged_file_name else None,
+        "logs_summary": coerce_optional_str(db_data.get("logs_summary")),
+    }
+
+    for section_name in PROCESS_SECTIONS:
+        section = db_data.get(section_name)
+        if not isinstance(section, dict):
+            section = {}
+        prefix = section_name.lower()
+        row[f"{prefix}_status"] = coerce_bool(section.get("status"))
+        row[f"{prefix}_start_time"] = coerce_datetime(section.get("start_time"))
+        row[f"{prefix}_end_time"] = coerce_datetime(section.get("end_time"))
+        if section_name == "TRANSFER":
+            row["transfer_error_message"] = coerce_optional_str(section.get("error_message"))
+        else:
+            row[f"{prefix}_sha256"] = get_reported_checksum(section)
+            row[f"{prefix}_size"] = coerce_int(section.get("size"))
+
+    return row
+
+
+def normalize_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convertit un rapport STATUS.json déjà décodé en structure normalisée.
+
+    Args:
+        report (dict): Le rapport brut de l'agent.
+
+    Returns:
+        dict: Les colonnes de AgentReport, avec une clé 'databases' listant les lignes par base.
+
+    Raises:
+        ReportIngestionError: Si le rapport n'est pas un dictionnaire ou n'a pas d'agent_id.
+    """
+    if not isinstance(report, dict):
+        raise ReportIngestionError("Le rapport doit être un dictionnaire.")
+
+    agent_id = report.get("agent_id")
+    if not isinstance(agent_id, str) or not agent_id:
+        raise ReportIngestionError("Le rapport ne contient pas d'agent_id valide.")
+
+    databases = report.get("databases")
+    if not isinstance(databases, dict):
+        databases = {}
+
+    return {
+        "agent_id": agent_id,
+        "operation_start_time": coerce_datetime(report.get("operation_start_time")),
+        "operation_end_time": coerce_datetime(report.get("operation_end_time")),
+        "overall_status": coerce_optional_str(report.get("overall_status")),
+        "databases": [
+            normalize_database_entry(db_name, db_data)
+            for db_name, db_data in databases.items()
+            if isinstance(db_data, dict)
+        ],
+    }
+
+
+def get_ingested_report(db_session: Session, agent_id: str, operation_log_file_name: str) -> Optional[AgentReport]:
+    """
+    Récupère un rapport déjà ingéré pour un agent et un nom de fichier donnés.
+    """
+    return (
+        db_session.query(AgentReport)
+        .filter_by(agent_id=agent_id, operation_log_file_name=operation_log_file_name)
+        .first()
+    )
+
+
+def ingest_report(db_session: Session, report: Dict[str, Any], operation_log_file_name: str) -> AgentReport:
+    """
+    Ingère un rapport décodé dans les tables normalisées, une seule fois par (agent_id, fichier).
+    Si le rapport a déjà été ingéré (ex: arrêt du scanner avant l'archivage), la ligne existante
+    est retournée sans nouvelle écriture.
+
+    Le commit est laissé à l'appelant pour que l'ingestion et l'évaluation des jobs
+    partagent la même transaction.
+
+    Args:
+        db_session (Session): La session SQLAlchemy.
+        report (dict): Le rapport brut décodé.
+        operation_log_file_name (str): Nom du fichier STATUS.json d'origine.
+
+    Returns:
+        AgentReport: Le rapport normalisé (avec ses lignes par base de données).
+
+    Raises:
+        ReportIngestionError: Si le rapport ne peut pas être normalisé.
+    """
+    normalized = normalize_report(report)
+
+    existing = get_ingested_report(db_session, normalized["agent_id"], operation_log_file_name)
+    if existing is not None:
+        REPORT_INGESTIONS.inc(result="existing")
+        logger.debug(f"Rapport déjà ingéré : {operation_log_file_name} (agent {normalized['agent_id']})")
+        return existing
+
+    db_rows = normalized.pop("databases")
+    agent_report = AgentReport(
+        **normalized,
+        operation_log_file_name=operation_log_file_name,
+        database_count=len(db_rows),
+    )
+    agent_report.databases = [AgentReportDatabase(**row) for row in db_rows]
+
+    db_session.add(agent_report)
+    db_session.flush()  # Attribue les identifiants sans valider la transaction
+    REPORT_INGESTIONS.inc(result="new")
+    logger.info(f"Rapport ingéré : {operation_log_file_name} ({len(db_rows)} base(s), agent {agent_report.agent_id})")
+    return agent_report
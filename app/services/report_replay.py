@@ -0,0 +1,417 @@
+# app/services/report_replay.py
+# Rejeu des rapports archivés (<agent>/log/_archive/) pour reconstruire l'historique BackupEntry et l'état
+# des jobs après une panne du scanner ou une correction de sa logique, sans attendre les passages planifiés.
+#
+#   - Les rapports archivés de chaque agent sont relus dans l'ordre chronologique (horodatage du nom
+#     YYYY-MM-DD_HH-MM-SS_<agent>.json ou YYYYMMDD_HHMMSS_<agent>.json, sinon date de modification du fichier).
+#   - Les décisions reprennent celles de scanner_MVP.process_expected_job (SUCCESS, UNCHANGED, FAILED, MISSING,
+#     chaînage par previous_successful_hash_global), sans promotion vers le stockage validé ni notification.
+#   - Pas de hachage quand le condensat est déjà connu : une entrée existante pour (job, rapport) est conservée
+#     (ou, avec replace, recalculée à partir de son hachage serveur). Seul le dernier rapport citant une base
+#     peut encore désigner le fichier déposé, qui est alors vérifié ; pour les rapports plus anciens, le fichier
+#     a été remplacé depuis et la décision repose sur le SHA-256 rapporté par l'agent (niveau "report").
+#   - Les agents sont rejoués en parallèle (pool de processus) ; un job n'appartient qu'à un agent, l'ordre
+#     de ses rapports est donc conservé. Les entrées sont écrites par insertions groupées et les jobs par
+#     mises à jour groupées, une transaction par agent.
+
+import logging
+import multiprocessing
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.core.metrics import BYTES_HASHED
+from app.models.models import BackupEntry, ExpectedBackupJob
+from app.services.integrity_checker import verify_staged_file
+from app.services.report_ingestion import ReportIngestionError, normalize_report
+from app.utils.is_valid_backup_report import is_valid_backup_report
+from app.utils.json_decoder import load_report
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FOLDER = "_archive"
+# Niveau de décision d'une entrée rejouée sur le seul SHA-256 rapporté par l'agent (fichier non re-haché)
+TIER_REPORT = "report"
+REPLAY_MESSAGE_SUFFIX = " (rejeu)"
+SUCCESS_STATUSES = ("SUCCESS", "UNCHANGED")
+# Taille des lots d'insertion des entrées rejouées
+INSERT_CHUNK_SIZE = 1000
+
+# Horodatage en tête du nom : YYYY-MM-DD_HH-MM-SS_ (agents) ou YYYYMMDD_HHMMSS_
+_REPORT_NAME_TIME = re.compile(r"^(\d{4})(-?)(\d{2})\2(\d{2})_(\d{2})(-?)(\d{2})\6(\d{2})_")
+
+
+class ReportReplayError(Exception):
+    """Exception personnalisée pour les erreurs du rejeu des rapports archivés."""
+    pass
+
+
+class ArchivedReport(NamedTuple):
+    """Rapport archivé d'un agent, daté pour l'ordre du rejeu."""
+    path: str
+    name: str
+    reported_at: datetime  # UTC, sans fuseau (comme les colonnes DateTime de la base)
+
+
+class AgentPlan(NamedTuple):
+    """Tout ce qu'il faut pour rejouer un agent hors de la session : transmis tel quel au pool."""
+    agent: str
+    databases_folder: str
+    reports: List[ArchivedReport]
+    jobs: List[dict]                        # id, database_name et état courant des jobs actifs de l'agent
+    existing: Dict[Tuple[int, str], dict]   # entrées déjà présentes par (job, fichier de rapport)
+    chain_start: Dict[int, Optional[str]]   # previous_successful_hash_global avant le premier rapport rejoué
+    replace: bool
+    verify_latest: bool
+
+
+class AgentReplay(NamedTuple):
+    """Résultat du rejeu d'un agent, écrit ensuite en une transaction."""
+    agent: str
+    entries: List[dict]
+    job_updates: List[dict]
+    replaced_entry_ids: List[int]
+    stats: Dict[str, int]
+
+
+def report_time_from_name(file_name: str) -> Optional[datetime]:
+    """
+    Horodatage UTC (sans fuseau) du préfixe YYYY-MM-DD_HH-MM-SS_ ou YYYYMMDD_HHMMSS_ d'un nom de rapport,
+    None s'il est absent.
+    """
+    match = _REPORT_NAME_TIME.match(file_name)
+    if match is None:
+        return None
+    year, _, month, day, hour, _, minute, second = match.groups()
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def list_archived_reports(root_folder: str, agents: Optional[Sequence[str]] = None,
+                          since: Optional[datetime] = None,
+                          until: Optional[datetime] = None) -> Dict[str, List[ArchivedReport]]:
+    """
+    Rapports archivés par agent, triés chronologiquement et restreints à [since, until].
+    Avec `agents`, seuls leurs dossiers sont lus ; sinon la racine est parcourue.
+    """
+    since, until = _naive_utc(since), _naive_utc(until)
+    if agents is None:
+        try:
+            agents = sorted(os.listdir(root_folder))
+        except OSError as e:
+            raise ReportReplayError(f"Racine des agents illisible : {root_folder} ({e})")
+
+    archived = {}
+    for agent in agents:
+        archive_folder = os.path.join(root_folder, agent, "log", ARCHIVE_FOLDER)
+        if not os.path.isdir(archive_folder):
+            continue
+        reports = []
+        with os.scandir(archive_folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(".json"):
+                    continue
+                reported_at = report_time_from_name(entry.name) \
+                    or datetime.fromtimestamp(entry.stat().st_mtime, timezone.utc).replace(tzinfo=None)
+                if (since and reported_at < since) or (until and reported_at > until):
+                    continue
+                reports.append(ArchivedReport(entry.path, entry.name, reported_at))
+        if reports:
+            archived[agent] = sorted(reports, key=lambda report: (report.reported_at, report.name))
+    return archived
+
+
+def _load_archived_report(path: str) -> Optional[dict]:
+    """Rapport archivé normalisé (report_ingestion.normalize_report), None s'il est illisible ou invalide."""
+    try:
+        report = load_report(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Rapport archivé illisible — ignoré : {path} ({e})")
+        return None
+    if not isinstance(report, dict) or not is_valid_backup_report(report):
+        logger.warning(f"Rapport archivé invalide — ignoré : {path}")
+        return None
+    try:
+        return normalize_report(report)
+    except ReportIngestionError as e:
+        logger.warning(f"Rapport archivé non normalisable — ignoré : {path} ({e})")
+        return None
+
+
+def _staged_file_path(databases_folder: str, row: dict) -> Optional[str]:
+    from app.services.scanner_MVP import STAGED_FILE_EXTENSIONS
+    from scripts.stagged_file_name_filter import extraire_nom_fichier
+
+    file_name = extraire_nom_fichier(row["staged_file_name"], STAGED_FILE_EXTENSIONS)
+    return os.path.join(databases_folder, file_name) if file_name else None
+
+
+def replay_agent(plan: AgentPlan) -> AgentReplay:
+    """
+    Rejoue les rapports archivés d'un agent, sans accès à la base (exécutable dans un processus du pool).
+
+    Les décisions de chaque job suivent l'ordre des rapports à partir de son condensat de référence
+    (chain_start). Un job n'est mis à jour que si le rejeu est plus récent que son dernier contrôle,
+    sauf avec replace (l'historique qui a produit son état est alors recalculé).
+    """
+    stats = defaultdict(int)
+    bytes_before = BYTES_HASHED.value()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    parsed = []
+    for report in plan.reports:
+        normalized = _load_archived_report(report.path)
+        if normalized is None:
+            stats["reports_invalid"] += 1
+        else:
+            parsed.append((report, normalized))
+    # Seul le dernier rapport citant une base peut encore désigner son fichier déposé
+    latest_report_by_database = {}
+    for index, (_, normalized) in enumerate(parsed):
+        for row in normalized["databases"]:
+            latest_report_by_database[row["database_name"]] = index
+
+    chain = dict(plan.chain_start)
+    states = {job["id"]: dict(job) for job in plan.jobs}
+    entries, replaced_entry_ids = [], []
+    for index, (report, normalized) in enumerate(parsed):
+        stats["reports_replayed"] += 1
+        rows = {row["database_name"]: row for row in normalized["databases"]}
+        reported_at = _naive_utc(normalized["operation_end_time"]) or report.reported_at
+
+        for job in plan.jobs:
+            existing = plan.existing.get((job["id"], report.name))
+            if existing is not None and not plan.replace:
+                # Entrée conservée : elle fait partie de la chaîne des condensats du job
+                stats["entries_kept"] += 1
+                if existing["previous_successful_hash_global"]:
+                    chain[job["id"]] = existing["previous_successful_hash_global"]
+                continue
+            if existing is not None:
+                replaced_entry_ids.append(existing["id"])
+
+            previous_hash = chain.get(job["id"])
+            computed_hash, staged_size, tier, fingerprint, last_success = None, None, None, None, None
+            row = rows.get(job["database_name"])
+            if row is None:
+                status, message, expected_hash = "MISSING", "Aucune entrée dans le rapport pour ce job.", "RAS"
+            else:
+                expected_hash = row["compress_sha256"]
+                if existing is not None and existing["server_calculated_staged_hash"]:
+                    # Condensat déjà calculé par le serveur lors du premier passage
+                    stats["digests_reused"] += 1
+                    computed_hash = existing["server_calculated_staged_hash"]
+                    staged_size = existing["server_calculated_staged_size"]
+                    tier, fingerprint = existing["verification_tier"], existing["content_fingerprint"]
+                    ok = computed_hash == expected_hash
+                    message = "Hash conforme au hash déclaré." if ok \
+                        else "Hash calculé différent du hash déclaré dans le rapport."
+                else:
+                    staged_path = _staged_file_path(plan.databases_folder, row)
+                    if (plan.verify_latest and staged_path and latest_report_by_database[job["database_name"]] == index
+                            and os.path.exists(staged_path)):
+                        stats["files_hashed"] += 1
+                        verification = verify_staged_file(staged_path, row["compress_size"], expected_hash)
+                        ok, message = verification.ok, verification.message
+                        computed_hash, staged_size = verification.sha256, verification.size
+                        tier, fingerprint = verification.tier, verification.fingerprint
+                    else:
+                        stats["digests_from_report"] += 1
+                        tier = TIER_REPORT
+                        ok = bool(expected_hash) and row["compress_status"] is not False \
+                            and row["transfer_status"] is not False
+                        message = "Hash rapporté par l'agent." if ok \
+                            else "Échec de compression ou de transfert rapporté par l'agent."
+
+                if not ok:
+                    status = "FAILED"
+                else:
+                    last_success = reported_at
+                    digest = computed_hash or expected_hash
+                    if previous_hash and digest == previous_hash:
+                        status, message = "UNCHANGED", "Backup identique à la dernière version validée."
+                    else:
+                        status = "SUCCESS"
+                        message = "Nouveau backup validé avec contenu mis à jour." if previous_hash \
+                            else "Premier succès validé."
+                        chain[job["id"]] = digest
+
+            entries.append({
+                "expected_job_id": job["id"],
+                "timestamp": reported_at,
+                "status": status,
+                "message": message + REPLAY_MESSAGE_SUFFIX,
+                "expected_hash": expected_hash,
+                "operation_log_file_name": report.name,
+                "agent_id": normalized["agent_id"],
+                "agent_overall_status": normalized["overall_status"],
+                "server_calculated_staged_hash": computed_hash or "",
+                "server_calculated_staged_size": staged_size,
+                "verification_tier": tier,
+                "content_fingerprint": fingerprint,
+                "previous_successful_hash_global": chain.get(job["id"]),
+                "hash_comparison_result": bool(computed_hash and expected_hash and computed_hash == expected_hash),
+                "created_at": now,
+            })
+            stats["entries_written"] += 1
+
+            state = states[job["id"]]
+            if plan.replace or state["last_checked_timestamp"] is None or reported_at > state["last_checked_timestamp"]:
+                state.update(current_status=status, last_checked_timestamp=reported_at,
+                             previous_successful_hash_global=chain.get(job["id"]), changed=True)
+                if last_success is not None:
+                    state["last_successful_backup_timestamp"] = last_success
+
+    job_updates = [
+        {key: state[key] for key in ("id", "current_status", "last_checked_timestamp",
+                                     "last_successful_backup_timestamp", "previous_successful_hash_global")}
+        for state in states.values() if state.get("changed")
+    ]
+    stats["jobs_updated"] = len(job_updates)
+    stats["bytes_hashed"] = int(BYTES_HASHED.value() - bytes_before)
+    return AgentReplay(plan.agent, entries, job_updates, replaced_entry_ids, dict(stats))
+
+
+def build_plans(db_session: Session, archived: Dict[str, List[ArchivedReport]], root_folder: str,
+                replace: bool = False, verify_latest: bool = True) -> List[AgentPlan]:
+    """
+    Prépare le rejeu de chaque agent en deux requêtes : jobs actifs des agents, puis entrées existantes
+    de ces jobs (entrées des rapports rejoués et condensat de référence avant le premier d'entre eux).
+    """
+    jobs_by_agent = defaultdict(list)
+    if archived:
+        jobs = (
+            db_session.query(ExpectedBackupJob)
+            .filter(ExpectedBackupJob.is_active.is_(True), ExpectedBackupJob.agent_id_responsible.in_(list(archived)))
+            .order_by(ExpectedBackupJob.id)
+            .all()
+        )
+        for job in jobs:
+            jobs_by_agent[job.agent_id_responsible].append({
+                "id": job.id,
+                "database_name": job.database_name,
+                "current_status": job.current_status,
+                "last_checked_timestamp": _naive_utc(job.last_checked_timestamp),
+                "last_successful_backup_timestamp": _naive_utc(job.last_successful_backup_timestamp),
+                "previous_successful_hash_global": job.previous_successful_hash_global,
+            })
+
+    job_agent = {job["id"]: agent for agent, jobs in jobs_by_agent.items() for job in jobs}
+    report_names = {agent: {report.name for report in reports} for agent, reports in archived.items()}
+    first_report_time = {agent: reports[0].reported_at for agent, reports in archived.items()}
+    existing = defaultdict(dict)
+    chain_start = defaultdict(dict)   # job -> (date du rapport, condensat)
+    columns = (BackupEntry.id, BackupEntry.expected_job_id, BackupEntry.operation_log_file_name,
+               BackupEntry.timestamp, BackupEntry.previous_successful_hash_global,
+               BackupEntry.server_calculated_staged_hash, BackupEntry.server_calculated_staged_size,
+               BackupEntry.verification_tier, BackupEntry.content_fingerprint)
+    job_ids = list(job_agent)
+    for start in range(0, len(job_ids), INSERT_CHUNK_SIZE):
+        rows = db_session.execute(
+            db_session.query(*columns)
+            .filter(BackupEntry.expected_job_id.in_(job_ids[start:start + INSERT_CHUNK_SIZE]))
+            .statement
+        ).mappings()
+        for row in rows:
+            agent = job_agent[row["expected_job_id"]]
+            name = row["operation_log_file_name"] or ""
+            if name in report_names[agent]:
+                existing[agent][(row["expected_job_id"], name)] = dict(row)
+                continue
+            # Entrées ordonnées par date du rapport d'origine (à défaut, date du passage)
+            entry_time = report_time_from_name(name) or _naive_utc(row["timestamp"])
+            current = chain_start[agent].get(row["expected_job_id"])
+            if entry_time < first_report_time[agent] and (current is None or entry_time >= current[0]):
+                chain_start[agent][row["expected_job_id"]] = (entry_time, row["previous_successful_hash_global"])
+
+    return [
+        AgentPlan(
+            agent=agent,
+            databases_folder=os.path.join(root_folder, agent, "databases"),
+            reports=reports,
+            jobs=jobs_by_agent.get(agent, []),
+            existing=existing.get(agent, {}),
+            chain_start={job_id: digest for job_id, (_, digest) in chain_start.get(agent, {}).items()},
+            replace=replace,
+            verify_latest=verify_latest,
+        )
+        for agent, reports in archived.items()
+    ]
+
+
+def write_agent_replay(db_session: Session, result: AgentReplay) -> None:
+    """Écrit le rejeu d'un agent en une transaction : suppressions (replace), insertions et mises à jour groupées."""
+    try:
+        for start in range(0, len(result.replaced_entry_ids), INSERT_CHUNK_SIZE):
+            db_session.execute(
+                delete(BackupEntry).where(BackupEntry.id.in_(result.replaced_entry_ids[start:start + INSERT_CHUNK_SIZE])))
+        for start in range(0, len(result.entries), INSERT_CHUNK_SIZE):
+            db_session.execute(insert(BackupEntry), result.entries[start:start + INSERT_CHUNK_SIZE])
+        if result.job_updates:
+            # Mise à jour groupée par clé primaire (UPDATE ... WHERE id = ?, en executemany)
+            db_session.bulk_update_mappings(ExpectedBackupJob, result.job_updates)
+        db_session.commit()
+    except Exception as e:
+        db_session.rollback()
+        raise ReportReplayError(f"Écriture du rejeu de l'agent {result.agent} impossible : {e}")
+
+
+def _replay_results(plans: List[AgentPlan], workers: int) -> Iterable[AgentReplay]:
+    if workers <= 1 or len(plans) <= 1:
+        for plan in plans:
+            yield replay_agent(plan)
+        return
+    # Processus lancés en « spawn » comme le pool de vérification (le parent peut avoir des threads)
+    with ProcessPoolExecutor(max_workers=min(workers, len(plans)),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        yield from executor.map(replay_agent, plans)
+
+
+def replay_archived_reports(db_session: Session, root_folder: Optional[str] = None,
+                            agents: Optional[Sequence[str]] = None, since: Optional[datetime] = None,
+                            until: Optional[datetime] = None, replace: bool = False, verify_latest: bool = True,
+                            workers: Optional[int] = None) -> dict:
+    """
+    Rejoue les rapports archivés de `agents` (None = tous) entre `since` et `until`.
+
+    Args:
+        replace (bool): Recalcule les entrées déjà présentes pour un rapport rejoué (sinon elles sont conservées).
+        verify_latest (bool): Vérifie le fichier déposé encore désigné par le dernier rapport d'une base.
+        workers (int): Processus de rejeu (défaut : SCANNER_WORKER_PROCESSES, 0 = un par CPU, 1 = en ligne).
+
+    Returns:
+        dict: Statistiques cumulées du rejeu (rapports, entrées écrites et conservées, condensats, jobs).
+
+    Raises:
+        ReportReplayError: Si la racine est illisible ou si l'écriture d'un agent échoue.
+    """
+    from app.services.verification_pool import resolve_worker_count
+
+    root_folder = root_folder or settings.BACKUP_STORAGE_ROOT
+    archived = list_archived_reports(root_folder, agents, since, until)
+    plans = build_plans(db_session, archived, root_folder, replace, verify_latest)
+    logger.info(f"Rejeu de {sum(len(plan.reports) for plan in plans)} rapport(s) archivé(s) "
+                f"pour {len(plans)} agent(s).")
+
+    stats = defaultdict(int)
+    for result in _replay_results(plans, resolve_worker_count(workers)):
+        write_agent_replay(db_session, result)
+        for key, value in result.stats.items():
+            stats[key] += value
+        stats["agents_replayed"] += 1
+    return dict(stats)
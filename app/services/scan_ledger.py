@@ -0,0 +1,160 @@
+# app/services/scan_ledger.py
+# Ce service enregistre chaque passage du scanner dans la table scan_runs.
+# Les volumes (octets hachés, rapports traités, durées des phases...) sont obtenus par différence
+# entre deux instantanés des métriques du processus (app.core.metrics), pris au début et à la fin
+# du passage : le scanner n'a pas à transporter de compteurs supplémentaires.
+# Les passages ne se chevauchent pas (max_instances=1 dans le planificateur).
+# Les entrées créées sont comptées pour les agents du passage : ceux demandés (scan ciblé) ou, en mode
+# sharding, ceux dont l'instance détient le bail ; sinon pour toute la flotte.
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.metrics import (
+    AGENTS_PROCESSED, BYTES_HASHED, HASH_DURATION, PROMOTION_BYTES, REPORT_INGESTIONS,
+    REPORTS_PROCESSED, SCAN_PHASE_DURATION,
+)
+from app.models.models import AgentLease, BackupEntry, ExpectedBackupJob, ScanRun
+from app.services.agent_sharding import get_shard_coordinator
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de messages d'erreur conservés par passage, et longueur maximale de chacun.
+MAX_RECORDED_ERRORS = 20
+MAX_ERROR_LENGTH = 500
+
+
+class ScanLedgerError(Exception):
+    """Exception personnalisée pour les erreurs d'écriture du registre des passages."""
+    pass
+
+
+def _metrics_snapshot() -> Dict[str, Any]:
+    return {
+        "agents": AGENTS_PROCESSED.values(),
+        "reports": REPORTS_PROCESSED.values(),
+        "phases": SCAN_PHASE_DURATION.totals(),
+        "bytes_hashed": BYTES_HASHED.value(),
+        "files_hashed": HASH_DURATION.count(),
+        "bytes_promoted": PROMOTION_BYTES.value(),
+        "ingestions": REPORT_INGESTIONS.values(),
+    }
+
+
+def _delta(after: Dict, before: Dict) -> Dict:
+    return {key: value - before.get(key, 0) for key, value in after.items() if value - before.get(key, 0)}
+
+
+class ScanRunRecorder:
+    """
+    Accompagne un passage du scanner : instantané des métriques au début,
+    collecte des erreurs, puis écriture d'une ligne ScanRun à la fin.
+    """
+
+    def __init__(self, scanner: str = "mvp", agents: Optional[Iterable[str]] = None,
+                 node_id: Optional[str] = None):
+        """
+        `agents` restreint le comptage des entrées créées à ces agents (scan ciblé). Sinon, en mode sharding
+        (settings.SCANNER_SHARDING_ENABLED ou `node_id` fourni), il est restreint aux agents dont l'instance
+        détient le bail à la fin du passage.
+        """
+        self.scanner = scanner
+        self.agents = list(agents) if agents is not None else None
+        if node_id is None and self.agents is None and settings.SCANNER_SHARDING_ENABLED:
+            node_id = get_shard_coordinator().node_id
+        self.node_id = node_id
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._before = _metrics_snapshot()
+        self.errors: List[str] = []
+
+    def record_error(self, error: Any) -> None:
+        """Ajoute une erreur rencontrée pendant le passage."""
+        self.errors.append(str(error)[:MAX_ERROR_LENGTH])
+
+    def _agent_scope(self, db_session: Session) -> Optional[List[str]]:
+        """Agents dont les entrées sont comptées, None pour toute la flotte."""
+        if self.agents is not None:
+            return self.agents
+        if self.node_id is not None:
+            return [agent_id for agent_id, in
+                    db_session.query(AgentLease.agent_id).filter(AgentLease.node_id == self.node_id)]
+        return None
+
+    def build(self, db_session: Session) -> ScanRun:
+        """Construit la ligne ScanRun du passage à partir des écarts de métriques."""
+        finished_at = datetime.now(timezone.utc)
+        duration_seconds = round(time.perf_counter() - self._start, 6)
+        after = _metrics_snapshot()
+        before = self._before
+        scanner = self.scanner
+
+        # Les métriques étiquetées sont indexées par tuple de valeurs : (scanner,) ou (scanner, phase/outcome)
+        phases = {
+            key[1]: round(total - before["phases"].get(key, (0.0, 0))[0], 6)
+            for key, (total, count) in after["phases"].items()
+            if key[0] == scanner and count != before["phases"].get(key, (0.0, 0))[1]
+        }
+        report_outcomes = {
+            key[1]: int(value) for key, value in _delta(after["reports"], before["reports"]).items() if key[0] == scanner
+        }
+        ingestions = _delta(after["ingestions"], before["ingestions"])
+        cache_hits = int(ingestions.get(("existing",), 0))
+
+        # Entrées créées pendant le passage pour ses agents, regroupées par statut (une requête groupée)
+        naive_start = self.started_at.replace(tzinfo=None)
+        query = db_session.query(BackupEntry.status, func.count(BackupEntry.id)) \
+            .filter(BackupEntry.created_at >= naive_start)
+        agents = self._agent_scope(db_session)
+        if agents is not None:
+            query = query.join(ExpectedBackupJob, BackupEntry.expected_job_id == ExpectedBackupJob.id) \
+                .filter(ExpectedBackupJob.agent_id_responsible.in_(agents))
+        status_counts = {
+            str(getattr(status, "value", status)): count
+            for status, count in query.group_by(BackupEntry.status).all()
+        }
+
+        return ScanRun(
+            scanner=scanner,
+            started_at=naive_start,
+            finished_at=finished_at.replace(tzinfo=None),
+            duration_seconds=duration_seconds,
+            succeeded=not self.errors,
+            phase_durations=phases,
+            status_counts=status_counts,
+            report_outcomes=report_outcomes,
+            agents_processed=int(_delta(after["agents"], before["agents"]).get((scanner,), 0)),
+            reports_processed=sum(report_outcomes.values()),
+            entries_created=sum(status_counts.values()),
+            files_hashed=after["files_hashed"] - before["files_hashed"],
+            bytes_hashed=int(after["bytes_hashed"] - before["bytes_hashed"]),
+            bytes_promoted=int(after["bytes_promoted"] - before["bytes_promoted"]),
+            report_cache_hits=cache_hits,
+            report_cache_lookups=cache_hits + int(ingestions.get(("new",), 0)),
+            error_count=len(self.errors),
+            errors=self.errors[:MAX_RECORDED_ERRORS] or None,
+        )
+
+    def finish(self, db_session: Session) -> ScanRun:
+        """
+        Écrit la ligne ScanRun du passage et la valide.
+
+        Raises:
+            ScanLedgerError: Si l'écriture échoue.
+        """
+        try:
+            scan_run = self.build(db_session)
+            db_session.add(scan_run)
+            db_session.commit()
+        except Exception as e:
+            db_session.rollback()
+            raise ScanLedgerError(f"Impossible d'enregistrer le passage du scanner : {e}")
+        logger.info(f"Passage du scanner enregistré (id={scan_run.id}, {scan_run.duration_seconds:.2f}s, "
+                    f"{scan_run.reports_processed} rapport(s), {scan_run.error_count} erreur(s)).")
+        return scan_run
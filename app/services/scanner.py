@@ -7,6 +7,7 @@ import json
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
 import re
+import time
 from typing import Tuple, Dict, Any, Optional, Set
 
 # Importe les modèles de base de données
@@ -19,12 +20,24 @@ from app.utils.file_operations import ensure_directory_exists, move_file, FileOp
 from app.utils.datetime_utils import parse_iso_datetime, get_utc_now, DateTimeUtilityError
 from app.utils.path_utils import get_expected_final_path
 from app.services.backup_manager import promote_backup, BackupManagerError
+from app.services.integrity_checker import TIER_STAT
+from app.services.deadline_scheduler import DeadlineSchedulerError, deadline_scheduler, has_deadline
+from app.services.missing_evaluator import (
+    HANDLED_STATUSES, build_missing_entry, create_missing_entries, current_cycle, find_missing_jobs,
+)
+from app.utils.profiling import ScanProfiler, CATEGORY_DB, CATEGORY_IO
+from app.core.metrics import (
+    AGENTS_PROCESSED, DB_COMMIT_DURATION, LAST_SCAN_COMPLETED, REPORTS_PROCESSED, SCAN_DURATION, SCAN_PHASE_DURATION,
+)
 
 # Importe la configuration de l'application
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Nom du scanner dans les étiquettes des métriques
+SCANNER_LABEL = "backup_scanner"
+
 class ScannerError(Exception):
     """Exception personnalisée pour les erreurs du scanner."""
     pass
@@ -37,11 +50,15 @@ class BackupScanner:
     3. Archivage des rapports traités
     """
     
-    def __init__(self, session: Session):
-        """Initialise le scanner avec une session de base de données."""
+    def __init__(self, session: Session, profiler: Optional[ScanProfiler] = None):
+        """
+        Initialise le scanner avec une session de base de données.
+        Le profileur (désactivé par défaut, voir SCANNER_PROFILING_*) chronomètre les phases, agents et jobs.
+        """
         self.session = session
         self.settings = settings
         self.logger = logger
+        self.profiler = profiler or ScanProfiler.from_settings()
         # Stockage des rapports pertinents par (agent_id, database_name)
         self.all_relevant_reports_map: Dict[Tuple[str, str], Dict[str, Any]] = {}
         # File d'attente pour l'archivage des STATUS.json
@@ -61,19 +78,32 @@ class BackupScanner:
         self.logger.info(f"🕓 Fenêtre de collecte = ±{self.settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES} minutes")
 
         
+        scan_start = time.perf_counter()
+        self.profiler.start()
+
         # Réinitialisation des structures pour cette exécution
         self.all_relevant_reports_map.clear()
         self.status_files_to_archive.clear()
         
         # Phase 1 : Collecte et validation des rapports
-        self._phase1_collect_and_validate_reports()
-        
-        # Phase 2 : Évaluation des jobs
-        self._phase2_evaluate_jobs()
-        
-        # Phase 3 : Archivage des rapports
-        self._phase3_archive_reports()
-        
+        try:
+            with SCAN_PHASE_DURATION.time(scanner=SCANNER_LABEL, phase="collect"), self.profiler.phase("collect"):
+                self._phase1_collect_and_validate_reports()
+
+            # Phase 2 : Évaluation des jobs
+            with SCAN_PHASE_DURATION.time(scanner=SCANNER_LABEL, phase="evaluate"), self.profiler.phase("evaluate"):
+                self._phase2_evaluate_jobs()
+
+            # Phase 3 : Archivage des rapports
+            with SCAN_PHASE_DURATION.time(scanner=SCANNER_LABEL, phase="archive"), self.profiler.phase("archive"):
+                self._phase3_archive_reports()
+        finally:
+            self.profiler.stop()
+            if self.profiler.enabled:
+                self.logger.info(self.profiler.format_report())
+
+        SCAN_DURATION.observe(time.perf_counter() - scan_start, scanner=SCANNER_LABEL)
+        LAST_SCAN_COMPLETED.set(time.time(), scanner=SCANNER_LABEL)
         self.logger.info("Scan des jobs de sauvegarde terminé.")
 
     def _phase1_collect_and_validate_reports(self) -> None:
@@ -100,21 +130,107 @@ class BackupScanner:
                 continue
                 
             # Traitement des rapports de cet agent
-            self._process_agent_reports(agent_folder_name, agent_folder_path)
+            AGENTS_PROCESSED.inc(scanner=SCANNER_LABEL)
+            with self.profiler.step("agent", agent_folder_name):
+                self._process_agent_reports(agent_folder_name, agent_folder_path)
 
     def _phase2_evaluate_jobs(self) -> None:
         """
-        Phase 2 : Évaluation de chaque job de sauvegarde attendu
-        en recherchant les rapports pertinents et en déterminant les statuts.
+        Phase 2 : Évaluation des jobs concernés par ce passage :
+        - les jobs des agents dont un rapport a été collecté en phase 1 ;
+        - les jobs dont l'échéance (heure attendue + fenêtre de collecte) est atteinte,
+          fournis par l'échéancier (app/services/deadline_scheduler.py).
+        Les autres jobs actifs ne sont pas parcourus. Les jobs avec un rapport pertinent sont traités
+        un par un ; la détection des MISSING des autres est faite en lot (app/services/missing_evaluator.py).
         """
         self.logger.info("Phase 2 : Évaluation des jobs de sauvegarde")
-        
-        all_active_jobs = self.session.query(ExpectedBackupJob).filter(
-            ExpectedBackupJob.is_active == True
-        ).all()
-        
-        for job in all_active_jobs:
-            self._evaluate_single_job(job)
+        now_utc = get_utc_now()
+        previous_tick = deadline_scheduler.last_tick
+
+        with self.profiler.category(CATEGORY_DB):
+            try:
+                deadline_scheduler.refresh(self.session, now_utc)
+                due_job_ids = {job_id for job_id, _ in deadline_scheduler.pop_due(now_utc)}
+            except DeadlineSchedulerError as e:
+                due_job_ids = None
+                self.logger.warning(f"{e} Évaluation de tous les jobs actifs, un par un.")
+                all_active_jobs = self.session.query(ExpectedBackupJob).filter(
+                    ExpectedBackupJob.is_active == True
+                ).all()
+
+        if due_job_ids is None:
+            # Mode dégradé sans échéancier : chemin job par job
+            for job in all_active_jobs:
+                with self.profiler.step("job", f"{job.agent_id_responsible}/{job.database_name}"):
+                    self._evaluate_single_job(job)
+            return
+
+        try:
+            self._evaluate_jobs(due_job_ids, now_utc)
+        except Exception:
+            # Les échéances dépilées n'ont pas été traitées (ex. base verrouillée) :
+            # elles sont remises en file pour être réévaluées au prochain passage.
+            deadline_scheduler.restore(previous_tick)
+            raise
+
+    def _evaluate_jobs(self, due_job_ids: Set[int], now_utc: datetime) -> None:
+        """Évalue les jobs ayant un rapport collecté et ceux dont l'échéance est atteinte."""
+        with self.profiler.category(CATEGORY_DB):
+            jobs_to_evaluate = self._load_jobs_to_evaluate(due_job_ids)
+
+        self.logger.info(f"{len(jobs_to_evaluate)} job(s) à évaluer "
+                         f"({len(due_job_ids)} échéance(s) atteinte(s), {len(self.all_relevant_reports_map)} rapport(s)).")
+        missing_candidates = []
+        for job in jobs_to_evaluate.values():
+            report_info = self.all_relevant_reports_map.get((job.agent_id_responsible, job.database_name))
+            if report_info and self._is_report_relevant_for_job_cycle(report_info['operation_timestamp'], job):
+                with self.profiler.step("job", f"{job.agent_id_responsible}/{job.database_name}"):
+                    self.logger.info(f"Traitement du rapport pour le job {job.database_name} (ID: {job.id})")
+                    self._process_job_with_report(job, report_info)
+            else:
+                missing_candidates.append(job)
+        self._handle_missing_jobs(missing_candidates, now_utc)
+
+    def _load_jobs_to_evaluate(self, due_job_ids: Set[int]) -> Dict[int, ExpectedBackupJob]:
+        """Jobs actifs ayant un rapport collecté ou dont l'échéance est atteinte, indexés par id."""
+        jobs_to_evaluate: Dict[int, ExpectedBackupJob] = {}
+        reporting_agents = {agent_id for agent_id, _ in self.all_relevant_reports_map}
+        if reporting_agents:
+            for job in self.session.query(ExpectedBackupJob).filter(
+                ExpectedBackupJob.is_active == True,
+                ExpectedBackupJob.agent_id_responsible.in_(reporting_agents)
+            ).all():
+                if (job.agent_id_responsible, job.database_name) in self.all_relevant_reports_map:
+                    jobs_to_evaluate[job.id] = job
+        if due_job_ids:
+            for job in self.session.query(ExpectedBackupJob).filter(
+                ExpectedBackupJob.is_active == True,
+                ExpectedBackupJob.id.in_(due_job_ids)
+            ).all():
+                jobs_to_evaluate.setdefault(job.id, job)
+        return jobs_to_evaluate
+
+    def _handle_missing_jobs(self, jobs, now_utc: datetime) -> None:
+        """
+        Détection en lot des jobs sans rapport pertinent dont la deadline est dépassée :
+        une requête groupée pour les entrées existantes, puis un seul commit pour toutes les entrées MISSING.
+        """
+        if not jobs:
+            return
+        with self.profiler.category(CATEGORY_DB):
+            missing = find_missing_jobs(
+                self.session, jobs, now_utc, self.settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES
+            )
+            if not missing:
+                return
+            # Les jobs sont expirés par le commit : les messages sont préparés avant
+            messages = [f"Job {job.database_name} marqué MISSING pour le cycle du {cycle.target_date}"
+                        for job, cycle in missing]
+            create_missing_entries(self.session, missing, now_utc)
+            with DB_COMMIT_DURATION.time(scanner=SCANNER_LABEL):
+                self.session.commit()
+        for message in messages:
+            self.logger.info(message)
 
     def _phase3_archive_reports(self) -> None:
         """
@@ -148,12 +264,16 @@ class BackupScanner:
             self.status_files_to_archive.add(status_file_path)
             
             try:
-                status_data = validate_status_file(status_file_path)
+                with self.profiler.category(CATEGORY_IO):
+                    status_data = validate_status_file(status_file_path)
                 self._process_valid_status_file(agent_folder_name, status_file_path, status_data)
+                REPORTS_PROCESSED.inc(scanner=SCANNER_LABEL, outcome="processed")
                 
             except (StatusFileValidationError, DateTimeUtilityError, json.JSONDecodeError) as e:
                 self.logger.warning(f"Fichier STATUS.json invalide '{status_file_path}': {e}")
+                REPORTS_PROCESSED.inc(scanner=SCANNER_LABEL, outcome="invalid")
             except Exception as e:
+                REPORTS_PROCESSED.inc(scanner=SCANNER_LABEL, outcome="error")
                 self.logger.error(f"Erreur lors du traitement de '{status_file_path}': {e}", exc_info=True)
 
     def _process_valid_status_file(self, agent_folder_name: str, status_file_path: str, status_data: Dict[str, Any]) -> None:
@@ -255,7 +375,8 @@ class BackupScanner:
             # Si la sauvegarde est valide, on la promeut
             if entry_status == BackupEntryStatus.SUCCESS:
                 try:
-                    final_path = promote_backup(staged_db_file_path, job)
+                    with self.profiler.category(CATEGORY_IO):
+                        final_path = promote_backup(staged_db_file_path, job)
                     self.logger.info(f"Sauvegarde promue avec succès vers : {final_path}")
                 except BackupManagerError as e:
                     self.logger.error(f"Échec de la promotion de la sauvegarde : {e}")
@@ -283,42 +404,31 @@ class BackupScanner:
     def _handle_missing_or_unknown_job(self, job: ExpectedBackupJob) -> None:
         """
         Gère les jobs sans rapport pertinent en vérifiant si la deadline est dépassée.
+        Un job sans heure attendue n'a pas d'échéance : il n'est jamais marqué MISSING ici.
         """
         now_utc = get_utc_now()
-        
-        # Détermination de la date du cycle le plus récent
-        target_date = now_utc.date()
-        if (now_utc.hour < job.expected_hour_utc or 
-            (now_utc.hour == job.expected_hour_utc and now_utc.minute < job.expected_minute_utc)):
-            target_date = now_utc.date() - timedelta(days=1)
-        
-        # Calcul de la deadline du cycle
-        expected_datetime = datetime(
-            target_date.year, target_date.month, target_date.day,
-            job.expected_hour_utc, job.expected_minute_utc, 0, 0, 
-            tzinfo=timezone.utc
-        )
-        deadline = expected_datetime + timedelta(
-            minutes=self.settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES
-        )
-        
+        window_minutes = self.settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES
+        cycle = current_cycle(job, now_utc, window_minutes)
+        if cycle is None:
+            return
+        target_date, expected_datetime, deadline = cycle
+
         if now_utc <= deadline:
             self.logger.debug(f"Job {job.database_name} : Deadline non atteinte ({deadline})")
             return
             
         # Vérification si le job n'a pas déjà été traité pour ce cycle
-        recent_entry = self.session.query(BackupEntry).filter(
-            BackupEntry.expected_job_id == job.id,
-            BackupEntry.timestamp >= expected_datetime - timedelta(
-                minutes=self.settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES * 2
-            )
-        ).order_by(BackupEntry.timestamp.desc()).first()
-        
-        if recent_entry and recent_entry.status in [
-            BackupEntryStatus.SUCCESS, BackupEntryStatus.FAILED,
-            BackupEntryStatus.HASH_MISMATCH, BackupEntryStatus.TRANSFER_INTEGRITY_FAILED
-        ]:
-            self.logger.debug(f"Job {job.database_name} : Entrée récente existante ({recent_entry.status.value})")
+        with self.profiler.category(CATEGORY_DB):
+            recent_entry = self.session.query(BackupEntry).filter(
+                BackupEntry.expected_job_id == job.id,
+                BackupEntry.timestamp >= expected_datetime - timedelta(
+                    minutes=self.settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES * 2
+                )
+            ).order_by(BackupEntry.timestamp.desc()).first()
+        
+        # Une entrée MISSING existante pour ce cycle suffit aussi : pas de doublon après un redémarrage
+        if recent_entry and recent_entry.status in HANDLED_STATUSES:
+            self.logger.debug(f"Job {job.database_name} : Entrée récente existante ({recent_entry.status})")
             return
             
         # Création de l'entrée MISSING
@@ -358,17 +468,24 @@ class BackupScanner:
             return (None, None, BackupEntryStatus.TRANSFER_INTEGRITY_FAILED,
                    f"Fichier stagé introuvable pour {job.database_name} : {staged_file_path}", None)
         
-        # Calcul des valeurs côté serveur
+        # Calcul des valeurs côté serveur : la taille (un seul stat) est comparée avant le hachage complet
         try:
-            server_hash = calculate_file_sha256(staged_file_path)
             server_size = os.path.getsize(staged_file_path)
-            
+
             # Conversion et validation de la taille agent
             try:
                 agent_size = int(agent_size) if agent_size is not None else -1
             except (ValueError, TypeError):
                 agent_size = -1
-                
+
+            if agent_size >= 0 and server_size != agent_size:
+                message = (f"Échec intégrité transfert pour {job.database_name} (vérification {TIER_STAT}). "
+                          f"Taille agent : {agent_size}, taille serveur : {server_size}")
+                return None, server_size, BackupEntryStatus.TRANSFER_INTEGRITY_FAILED, message, None
+
+            with self.profiler.category(CATEGORY_IO):
+                server_hash = calculate_file_sha256(staged_file_path)
+
         except (CryptoUtilityError, FileOperationError, OSError) as e:
             return (None, None, BackupEntryStatus.TRANSFER_INTEGRITY_FAILED,
                    f"Erreur de vérification fichier pour {job.database_name} : {e}", None)
@@ -460,24 +577,19 @@ class BackupScanner:
             job.last_successful_backup_timestamp = now_utc
             job.previous_successful_hash_global = server_hash
             
-        self.session.commit()
+        with DB_COMMIT_DURATION.time(scanner=SCANNER_LABEL), self.profiler.category(CATEGORY_DB):
+            self.session.commit()
         self.session.refresh(job)
         
         self.logger.info(f"Job {job.database_name} mis à jour : {job.current_status.value}")
 
     def _create_missing_entry(self, job: ExpectedBackupJob, target_date, now_utc: datetime) -> None:
         """Crée une entrée MISSING pour un job."""
-        new_entry = BackupEntry(
-            expected_job_id=job.id,
-            timestamp=now_utc,
-            status=BackupEntryStatus.MISSING,
-            message=f"Sauvegarde manquante pour le cycle du {target_date} à {job.expected_hour_utc:02d}:{job.expected_minute_utc:02d} UTC"
-        )
-        
-        self.session.add(new_entry)
+        self.session.add(build_missing_entry(job, target_date, now_utc))
         job.current_status = JobStatus.MISSING
         job.last_checked_timestamp = now_utc
-        self.session.commit()
+        with DB_COMMIT_DURATION.time(scanner=SCANNER_LABEL), self.profiler.category(CATEGORY_DB):
+            self.session.commit()
         
         self.logger.info(f"Job {job.database_name} marqué MISSING pour le cycle du {target_date}")
 
@@ -554,7 +666,9 @@ class BackupScanner:
             self.logger.error(f"Erreur archivage de {os.path.basename(status_file_path)} : {e}", exc_info=True)
 
     def _is_report_relevant_for_job_cycle(self, report_timestamp: datetime, job: ExpectedBackupJob) -> bool:
-        """Vérifie si un rapport est pertinent pour le cycle d'un job."""
+        """Vérifie si un rapport est pertinent pour le cycle d'un job (toujours vrai sans heure attendue)."""
+        if not has_deadline(job):
+            return True
         report_date = report_timestamp.date()
         
         expected_datetime = datetime(
@@ -1,5 +1,4 @@
 import os
-import json
 import sys
 
 from app.services.notifier import notify_backup_status_change, NotificationError
@@ -12,15 +11,28 @@ if project_root not in sys.path:
 
 from scripts.stagged_file_name_filter import extraire_nom_fichier
 
-import shutil
+import time
 from datetime import datetime, timezone
 
 # Importations de l'application
-from app.utils.crypto import calculate_file_sha256
+from app.utils.json_decoder import load_report
 from app.utils.is_valid_backup_report import is_valid_backup_report
 from app.models.models import ExpectedBackupJob, BackupEntry
+from app.services.report_ingestion import ingest_report, ReportIngestionError
+from app.services.integrity_checker import verify_staged_file
+from app.services.verification_pool import submit_verifications, wait_verification
+from app.utils.file_operations import copy_file, move_file
+from app.services.upload_tracker import upload_tracker
+from app.services.agent_sharding import AgentShardingError, get_shard_coordinator
+from app.core.metrics import (
+    AGENTS_PROCESSED, DB_COMMIT_DURATION, LAST_SCAN_COMPLETED, PROMOTION_BYTES, PROMOTION_DURATION,
+    REPORTS_PROCESSED, SCAN_DURATION, SCAN_PHASE_DURATION,
+)
 from config.settings import settings  # Pour BACKUP_STORAGE_ROOT et VALIDATED_BACKUPS_BASE_PATH
 
+# Nom du scanner dans les étiquettes des métriques
+SCANNER_LABEL = "mvp"
+
 # ------------------------------------------------------------------------------
 # Partie Notification
 # ------------------------------------------------------------------------------
@@ -35,9 +47,8 @@ def send_notification(job, message):
 # Fonctions de base pour charger et archiver les rapports JSON
 # ------------------------------------------------------------------------------
 def load_json_report(json_path):
-    """Charge et renvoie le contenu d'un fichier JSON."""
-    with open(json_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Charge et renvoie le contenu d'un fichier JSON (lecture unique, décodeur rapide si disponible)."""
+    return load_report(json_path)
 
 
 def archive_report(json_path):
@@ -49,34 +60,69 @@ def archive_report(json_path):
     archive_folder = os.path.join(os.path.dirname(json_path), "_archive")
     os.makedirs(archive_folder, exist_ok=True)
     archived_path = os.path.join(archive_folder, os.path.basename(json_path))
-    shutil.move(json_path, archived_path)
+    # Renommage sur le même volume ; la copie de repli éventuelle est soumise au budget d'E/S
+    move_file(json_path, archived_path)
 
     return archived_path
 
+
+def copy_to_validated_storage(job, backup_file_path, staged_file_name):
+    """
+    Copie le fichier validé vers VALIDATED_BACKUPS_BASE_PATH/<société>/<ville>/<année>/
+    et met à jour le chemin de stockage du job.
+    """
+    validated_path = os.path.join(settings.VALIDATED_BACKUPS_BASE_PATH, job.company_name, job.city, str(job.year))
+    job.file_storage_path_template = os.path.join(validated_path, staged_file_name)
+    os.makedirs(validated_path, exist_ok=True)
+    with PROMOTION_DURATION.time():
+        # Mode d'E/S SCANNER_IO_CACHE_MODE : la copie peut ne pas rester dans le cache de pages
+        copy_file(backup_file_path, os.path.join(validated_path, staged_file_name))
+    PROMOTION_BYTES.inc(os.path.getsize(backup_file_path))
+
 # ------------------------------------------------------------------------------
 # Traitement d'un ExpectedBackupJob individuel
 # ------------------------------------------------------------------------------
-def process_expected_job(job, databases_data, agent_databases_folder, agent_id, operation_log_file_name, agent_status, db_session):
+# Extensions retirées du nom de fichier rapporté par l'agent (staged_file_name)
+STAGED_FILE_EXTENSIONS = [".zst", ".gz", ".db.sql"]
+
+def staged_file_path(agent_databases_folder, db_record):
+    """Chemin du fichier déposé pour une ligne de rapport (AgentReportDatabase)."""
+    return os.path.join(agent_databases_folder, extraire_nom_fichier(db_record.staged_file_name, STAGED_FILE_EXTENSIONS))
+
+def process_expected_job(job, databases_data, agent_databases_folder, agent_id, operation_log_file_name, agent_status, db_session,
+                         verifications=None):
     now = datetime.now(timezone.utc)
     computed_hash = None
+    content_fingerprint = None
     staged_file_name = None
     backup_file_path = None
+    staged_size = None
+    verification_tier = None
     message = ""
 
     if job.database_name in databases_data:
-        data = databases_data[job.database_name]
-        staged_file_name = extraire_nom_fichier(data.get("staged_file_name"), [".zst", ".gz", ".db.sql"])
-        compress_section = data.get("COMPRESS", {})
-        expected_hash = compress_section.get("sha256_checksum") if compress_section.get("sha256_checksum") else compress_section.get("sha256")
-        backup_file_path = os.path.join(agent_databases_folder, staged_file_name)
+        # Ligne normalisée (AgentReportDatabase) issue de l'ingestion du rapport
+        db_record = databases_data[job.database_name]
+        backup_file_path = staged_file_path(agent_databases_folder, db_record)
+        staged_file_name = os.path.basename(backup_file_path)
+        expected_hash = db_record.compress_sha256
         print(f"*****BACKUP_FILE PATH :  {backup_file_path}")
         if os.path.exists(backup_file_path):
             try:
-                computed_hash = calculate_file_sha256(backup_file_path)
-                print(f"++++++computed_hash:{computed_hash}  -VS-  expected_hash:{expected_hash}+++++++++")
-                if computed_hash != expected_hash:
+                # Vérification par niveaux : taille (stat), blocs échantillons, puis hachage complet,
+                # déjà lancée dans le pool du worker scanner le cas échéant
+                future = (verifications or {}).get(backup_file_path)
+                verification = wait_verification(future) if future is not None else None
+                if verification is None:
+                    verification = verify_staged_file(backup_file_path, db_record.compress_size, expected_hash)
+                computed_hash = verification.sha256
+                content_fingerprint = verification.fingerprint
+                staged_size = verification.size
+                verification_tier = verification.tier
+                print(f"++++++[{verification_tier}] computed_hash:{computed_hash}  -VS-  expected_hash:{expected_hash}+++++++++")
+                if not verification.ok:
                     job.current_status = "FAILED"
-                    message = "Hash calculé différent du hash déclaré dans le rapport."
+                    message = verification.message
                 else:
                     job.last_successful_backup_timestamp=now
                     # Hash validé par l'agent — on entre en zone promotion
@@ -89,10 +135,7 @@ def process_expected_job(job, databases_data, agent_databases_folder, agent_id,
                             job.previous_successful_hash_global = computed_hash
                             message = "Nouveau backup validé avec contenu mis à jour."
                             try:
-                                validated_path = os.path.join(settings.VALIDATED_BACKUPS_BASE_PATH, job.company_name,job.city, str(job.year))
-                                job.file_storage_path_template = os.path.join(validated_path, staged_file_name)
-                                os.makedirs(validated_path, exist_ok=True)
-                                shutil.copy2(backup_file_path, os.path.join(validated_path, staged_file_name))
+                                copy_to_validated_storage(job, backup_file_path, staged_file_name)
                             except Exception as copy_err:
                                 job.current_status = "FAILED"
                                 message += f" / Copie échouée : {copy_err}"
@@ -101,10 +144,7 @@ def process_expected_job(job, databases_data, agent_databases_folder, agent_id,
                         job.previous_successful_hash_global = computed_hash
                         message = "Premier succès validé."
                         try:
-                            validated_path = os.path.join(settings.VALIDATED_BACKUPS_BASE_PATH, job.company_name,job.city, str(job.year))
-                            job.file_storage_path_template = os.path.join(validated_path, staged_file_name)
-                            os.makedirs(validated_path, exist_ok=True)
-                            shutil.copy2(backup_file_path, os.path.join(validated_path, staged_file_name))
+                            copy_to_validated_storage(job, backup_file_path, staged_file_name)
                         except Exception as copy_err:
                             job.current_status = "FAILED"
                             message += f" / Copie échouée : {copy_err}"
@@ -134,7 +174,9 @@ def process_expected_job(job, databases_data, agent_databases_folder, agent_id,
         agent_id=agent_id,
         agent_overall_status=agent_status,
         server_calculated_staged_hash=computed_hash or "",
-        server_calculated_staged_size=os.path.getsize(backup_file_path) if backup_file_path and os.path.exists(backup_file_path) else None,
+        server_calculated_staged_size=staged_size,
+        verification_tier=verification_tier,
+        content_fingerprint=content_fingerprint,
         
         previous_successful_hash_global=job.previous_successful_hash_global,
         hash_comparison_result= True if ((computed_hash == expected_hash) and (computed_hash and expected_hash)) else False,
@@ -159,77 +201,147 @@ def process_expected_job(job, databases_data, agent_databases_folder, agent_id,
 # ------------------------------------------------------------------------------
 # Traitement complet d'un rapport JSON pour un agent donné
 # ------------------------------------------------------------------------------
-def process_agent_report(agent_log_json_path, agent_databases_folder, db_session, agent_name):
+def process_agent_report(agent_log_json_path, agent_databases_folder, db_session, agent_name, archive=True):
     print(f"********DEBUT PROCESS AGENT REPORT**********")
     """
     Traite un rapport JSON d'un agent.
       - Charge le rapport depuis le dossier log.
-      - Récupère la section "databases".
+      - Ingère le rapport dans les tables normalisées (AgentReport / AgentReportDatabase).
       - Récupère les ExpectedBackupJob actifs (filtrage supplémentaire possible par critères).
       - Pour chaque job, appelle process_expected_job.
-      - Commit les modifications et archive le rapport traité.
+      - Commit les modifications et archive le rapport traité (archive=False : le rapport reste dans log/).
     """
     print(f"📄 Traitement du JSON************ : {agent_log_json_path}")
 
-    report = load_json_report(agent_log_json_path)
+    with SCAN_PHASE_DURATION.time(scanner=SCANNER_LABEL, phase="load"):
+        report = load_json_report(agent_log_json_path)
 
     if not isinstance(report, dict):
         print(f"⚠️ Rapport JSON vide ou corrompu : {agent_log_json_path}")
-        archive_report(agent_log_json_path)
+        REPORTS_PROCESSED.inc(scanner=SCANNER_LABEL, outcome="corrupted")
+        if archive:
+            archive_report(agent_log_json_path)
         return
 
-    if not is_valid_backup_report(report):
+    with SCAN_PHASE_DURATION.time(scanner=SCANNER_LABEL, phase="validate"):
+        report_is_valid = is_valid_backup_report(report)
+    if not report_is_valid:
         print(f"❌ Rapport invalide — ignoré : {agent_log_json_path}")
-        archive_report(agent_log_json_path)
+        REPORTS_PROCESSED.inc(scanner=SCANNER_LABEL, outcome="invalid")
+        if archive:
+            archive_report(agent_log_json_path)
+        return
+
+    # Fichiers encore en cours de dépôt : le rapport reste dans log/ et sera repris plus tard
+    pending_files = []
+    for db_data in report.get("databases", {}).values():
+        staged_file_name = extraire_nom_fichier(db_data.get("staged_file_name"), STAGED_FILE_EXTENSIONS)
+        if staged_file_name and upload_tracker.is_upload_in_progress(os.path.join(agent_databases_folder, staged_file_name)):
+            pending_files.append(staged_file_name)
+    if pending_files:
+        print(f"⏳ Dépôt en cours ({', '.join(pending_files)}) — rapport différé : {agent_log_json_path}")
+        REPORTS_PROCESSED.inc(scanner=SCANNER_LABEL, outcome="deferred")
+        return
+
+    operation_log_file_name = os.path.basename(agent_log_json_path)
+
+    # Ingestion unique du rapport : les jobs lisent ensuite les colonnes typées
+    try:
+        with SCAN_PHASE_DURATION.time(scanner=SCANNER_LABEL, phase="ingest"):
+            agent_report = ingest_report(db_session, report, operation_log_file_name)
+    except ReportIngestionError as e:
+        print(f"❌ Rapport non ingérable — ignoré : {agent_log_json_path} ({e})")
+        REPORTS_PROCESSED.inc(scanner=SCANNER_LABEL, outcome="ingest_error")
+        if archive:
+            archive_report(agent_log_json_path)
         return
 
-    databases_data = report.get("databases", {})
+    databases_data = {db_record.database_name: db_record for db_record in agent_report.databases}
 
     active_jobs = db_session.query(ExpectedBackupJob).filter_by(is_active=True, agent_id_responsible=agent_name).all()
     #print(f"VOICI LES AGENS ********** : ++++++++++ : {active_jobs}")
 
-    agent_id = report.get("agent_id")
-    operation_log_file_name = os.path.basename(agent_log_json_path)
-    agent_status = report.get("overall_status")
+    agent_id = agent_report.agent_id
+    agent_status = agent_report.overall_status
 
+    # Worker scanner : les fichiers des jobs sont vérifiés en parallèle dans le pool de processus
+    verification_requests = []
     for job in active_jobs:
-        print(f"**********DEBUT PROCESS EXPECTED JOB************")
-        process_expected_job(
-            job,
-            databases_data,
-            agent_databases_folder, 
-            agent_id,
-            operation_log_file_name,
-            agent_status,
-            db_session
-        )
-    db_session.commit()
-    
-    archive_report(agent_log_json_path)
+        db_record = databases_data.get(job.database_name)
+        if db_record is not None:
+            backup_file_path = staged_file_path(agent_databases_folder, db_record)
+            if os.path.exists(backup_file_path):
+                verification_requests.append((backup_file_path, db_record.compress_size, db_record.compress_sha256))
+    verifications = submit_verifications(verification_requests)
+
+    with SCAN_PHASE_DURATION.time(scanner=SCANNER_LABEL, phase="evaluate"):
+        for job in active_jobs:
+            print(f"**********DEBUT PROCESS EXPECTED JOB************")
+            process_expected_job(
+                job,
+                databases_data,
+                agent_databases_folder, 
+                agent_id,
+                operation_log_file_name,
+                agent_status,
+                db_session,
+                verifications=verifications,
+            )
+    with DB_COMMIT_DURATION.time(scanner=SCANNER_LABEL):
+        db_session.commit()
+    REPORTS_PROCESSED.inc(scanner=SCANNER_LABEL, outcome="processed")
+
+    if archive:
+        with SCAN_PHASE_DURATION.time(scanner=SCANNER_LABEL, phase="archive"):
+            archive_report(agent_log_json_path)
 
 # ------------------------------------------------------------------------------
 # Itération sur le dossier racine des agents
 # ------------------------------------------------------------------------------
 
 
-def process_all_agents(db_session):
+def process_all_agents(db_session, coordinator=None, agents=None, archive=True):
     print(f"*********DEBUT PROCESS ALL AGENTS*******")
     """
     Parcourt le dossier racine (défini par settings.BACKUP_STORAGE_ROOT) et pour chaque agent :
       - Récupère les dossiers 'log' et 'databases'.
       - Pour chaque fichier JSON dans 'log', lance le traitement.
+
+    En mode sharding (settings.SCANNER_SHARDING_ENABLED ou `coordinator` fourni), seuls les agents
+    attribués à cette instance sont parcourus, et chacun seulement si son bail est encore détenu.
+
+    `agents` (liste de noms de dossiers) restreint le passage à ces agents sans lister la racine
+    (scan ciblé, app/cli.py) ; archive=False laisse les rapports traités dans log/.
     """
+    scan_start = time.perf_counter()
     root_folder = settings.BACKUP_STORAGE_ROOT
     print("🗂 Chemin racine utilisé***** :", root_folder)
-    print("🧪 Contenu racine******* :", os.listdir(root_folder))
 
+    if agents is None:
+        agent_names = os.listdir(root_folder)
+        print("🧪 Contenu racine******* :", agent_names)
+    else:
+        agent_names = list(agents)
+    if coordinator is None and settings.SCANNER_SHARDING_ENABLED:
+        coordinator = get_shard_coordinator()
+    if coordinator is not None:
+        agent_folders = [name for name in agent_names if os.path.isdir(os.path.join(root_folder, name))]
+        try:
+            agent_names = coordinator.claim_agents(db_session, agent_folders)
+        except AgentShardingError as e:
+            # Sans bail, aucun agent n'est traité : une autre instance peut s'en charger
+            print(f"❌ {e}")
+            return
+        print(f"🔀 Instance {coordinator.node_id} : {len(agent_names)}/{len(agent_folders)} agent(s) attribué(s)")
 
-    for agent_name in os.listdir(root_folder):
-        print(f"****{agent_name}*****2X  { os.listdir(root_folder) }  2X***********")
+    for agent_name in agent_names:
+        if coordinator is not None and not coordinator.renew(db_session, agent_name):
+            print(f"⏭️ Bail perdu pour l'agent {agent_name}, ignoré pendant ce passage")
+            continue
         agent_path = os.path.join(root_folder, agent_name)
-        print(f"****{agent_name}*****3X  { os.listdir(agent_path) }  3X***********")
         if not os.path.isdir(agent_path):
             continue
+        print(f"****{agent_name}*****3X  { os.listdir(agent_path) }  3X***********")
         log_folder = os.path.join(agent_path, "log")
         databases_folder = os.path.join(agent_path, "databases")
         if not os.path.isdir(log_folder) or not os.path.isdir(databases_folder):
@@ -238,13 +350,16 @@ def process_all_agents(db_session):
             print(f"  log_folder: {os.path.exists(log_folder)}, databases_folder: {os.path.exists(databases_folder)}")
             print(f"************/*/*/*/**/*/*/*/*/*/*/+++++++*//*/*/+++/*/*/*/*/++++")
             continue
+        AGENTS_PROCESSED.inc(scanner=SCANNER_LABEL)
         for file_name in os.listdir(log_folder):
             print(f"****{agent_name}-{file_name}*****4X  { os.listdir(log_folder) }  4X***********")
             if file_name.lower().endswith(".json"):
                 agent_log_json_path = os.path.join(log_folder, file_name)
                 print(f"***********DEBUT PROCESS_AGENT_REPORT agent: {agent_name}**************")
-                process_agent_report(agent_log_json_path, databases_folder, db_session, agent_name)
-    
+                process_agent_report(agent_log_json_path, databases_folder, db_session, agent_name, archive=archive)
+
+    SCAN_DURATION.observe(time.perf_counter() - scan_start, scanner=SCANNER_LABEL)
+    LAST_SCAN_COMPLETED.set(time.time(), scanner=SCANNER_LABEL)
 
 
 # ------------------------------------------------------------------------------
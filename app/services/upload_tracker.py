@@ -0,0 +1,111 @@
+# app/services/upload_tracker.py
+# Ce service détecte les fichiers encore en cours de dépôt dans <agent>/databases/.
+# Un fichier est considéré comme en cours d'écriture si :
+#   - un fichier témoin "<nom>.part" existe à côté de lui (convention optionnelle des agents) ;
+#   - il a été modifié trop récemment (mtime plus récente que SCANNER_UPLOAD_QUIESCENT_SECONDS) ;
+#   - sa taille ou sa mtime ont changé depuis l'observation précédente.
+# Les fichiers en cours sont différés avec un délai exponentiel pour éviter de relire
+# (et de hacher) un fichier partiel à chaque passage du scanner.
+
+import os
+import time
+import logging
+from typing import Dict, NamedTuple, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FileObservation(NamedTuple):
+    """Dernier état connu d'un fichier en cours de dépôt."""
+    size: int
+    mtime_ns: int
+    first_seen: float       # Horodatage (time.time()) de la première observation
+    deferrals: int          # Nombre de reports successifs
+    next_check_at: float    # Pas de nouvelle vérification avant cet horodatage
+
+
+class UploadTracker:
+    """
+    Mémorise entre deux passages du scanner l'état des fichiers déposés
+    et décide s'ils peuvent être vérifiés.
+    """
+
+    def __init__(self):
+        self._observations: Dict[str, FileObservation] = {}
+
+    def _backoff_seconds(self, deferrals: int) -> float:
+        """Délai exponentiel : base * 2^(n-1), plafonné à SCANNER_UPLOAD_BACKOFF_MAX_SECONDS."""
+        delay = settings.SCANNER_UPLOAD_BACKOFF_BASE_SECONDS * (2 ** max(deferrals - 1, 0))
+        return min(delay, settings.SCANNER_UPLOAD_BACKOFF_MAX_SECONDS)
+
+    def _defer(self, file_path: str, size: int, mtime_ns: int, now: float, reason: str) -> bool:
+        previous = self._observations.get(file_path)
+        first_seen = previous.first_seen if previous else now
+        deferrals = (previous.deferrals if previous else 0) + 1
+
+        # Au-delà de la durée maximale, le fichier est vérifié tel quel (l'échec sera alors signalé).
+        if now - first_seen >= settings.SCANNER_UPLOAD_MAX_DEFER_MINUTES * 60:
+            logger.warning(f"Dépôt de '{file_path}' toujours instable après "
+                           f"{settings.SCANNER_UPLOAD_MAX_DEFER_MINUTES} min : vérification forcée.")
+            self._observations.pop(file_path, None)
+            return False
+
+        delay = self._backoff_seconds(deferrals)
+        self._observations[file_path] = FileObservation(size, mtime_ns, first_seen, deferrals, now + delay)
+        logger.info(f"Dépôt en cours pour '{file_path}' ({reason}) : vérification différée de {delay:.0f}s.")
+        return True
+
+    def is_upload_in_progress(self, file_path: str, now: Optional[float] = None) -> bool:
+        """
+        Indique si le fichier doit être différé car encore en cours de dépôt.
+
+        Args:
+            file_path (str): Chemin du fichier déposé.
+            now (Optional[float]): Horodatage courant (time.time()), injectable pour les tests.
+
+        Returns:
+            bool: True si le fichier est en cours d'écriture ou en attente de sa prochaine vérification.
+        """
+        now = time.time() if now is None else now
+        previous = self._observations.get(file_path)
+
+        # Fichier déjà différé : aucun accès disque avant l'échéance
+        if previous is not None and now < previous.next_check_at:
+            return True
+
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            # Fichier absent : seul un témoin .part indique un dépôt en cours
+            if os.path.exists(file_path + settings.SCANNER_UPLOAD_PART_SUFFIX):
+                return self._defer(file_path, -1, 0, now, "fichier partiel présent")
+            self._observations.pop(file_path, None)
+            return False
+
+        size, mtime_ns = stat_result.st_size, stat_result.st_mtime_ns
+
+        if os.path.exists(file_path + settings.SCANNER_UPLOAD_PART_SUFFIX):
+            return self._defer(file_path, size, mtime_ns, now, "fichier partiel présent")
+
+        if previous is not None and (previous.size, previous.mtime_ns) != (size, mtime_ns):
+            return self._defer(file_path, size, mtime_ns, now, "taille ou date de modification en évolution")
+
+        if now - mtime_ns / 1e9 < settings.SCANNER_UPLOAD_QUIESCENT_SECONDS:
+            return self._defer(file_path, size, mtime_ns, now, "modifié récemment")
+
+        self._observations.pop(file_path, None)
+        return False
+
+    def pending_files(self) -> Dict[str, FileObservation]:
+        """Retourne une copie des fichiers actuellement différés."""
+        return dict(self._observations)
+
+    def reset(self) -> None:
+        """Oublie toutes les observations."""
+        self._observations.clear()
+
+
+# Instance partagée par les passages successifs du scanner (même processus).
+upload_tracker = UploadTracker()
@@ -0,0 +1,108 @@
+# app/services/verification_pool.py
+# Pool de processus du worker scanner (app/scanner_worker.py) pour la vérification des fichiers déposés.
+# Les fichiers d'un rapport sont vérifiés (taille, blocs échantillons, SHA-256) en parallèle dans des
+# processus séparés avant l'évaluation des jobs : le hachage ne dispute plus le GIL au planificateur
+# et plusieurs sauvegardes sont lues en même temps. Sans pool démarré, la vérification reste en ligne.
+# Le budget d'E/S (app/utils/io_throttle.py) est réparti à parts égales entre les processus du pool ;
+# les octets hachés et la durée de hachage mesurés dans un processus du pool sont reportés dans
+# les métriques du processus principal à la réception du résultat (registre des passages, /metrics).
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.metrics import BYTES_HASHED, HASH_DURATION
+from app.services.integrity_checker import VerificationResult, verify_staged_file
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# (chemin du fichier déposé, taille annoncée, SHA-256 annoncé)
+VerificationRequest = Tuple[str, Optional[int], Optional[str]]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def resolve_worker_count(workers: Optional[int] = None) -> int:
+    """Nombre de processus du pool : `workers` ou SCANNER_WORKER_PROCESSES, 0 = un par CPU."""
+    workers = settings.SCANNER_WORKER_PROCESSES if workers is None else workers
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def _init_pool_process(workers: int) -> None:
+    from app.utils.io_throttle import io_throttle
+    io_throttle.scale(1 / workers)
+
+
+def _verify_in_pool(file_path: str, expected_size: Optional[int],
+                    expected_hash: Optional[str]) -> Tuple[VerificationResult, float, float]:
+    """Vérification exécutée dans un processus du pool : résultat, octets hachés et durée du hachage."""
+    bytes_before, seconds_before = BYTES_HASHED.value(), HASH_DURATION.sum()
+    result = verify_staged_file(file_path, expected_size, expected_hash)
+    return result, BYTES_HASHED.value() - bytes_before, HASH_DURATION.sum() - seconds_before
+
+
+def start_verification_pool(workers: Optional[int] = None) -> int:
+    """
+    Démarre le pool (processus lancés en « spawn » : le processus parent a déjà des threads).
+    Retourne le nombre de processus, 0 si la vérification reste en ligne (un seul processus demandé).
+    """
+    global _pool, _pool_workers
+    if _pool is not None:
+        return _pool_workers
+    workers = resolve_worker_count(workers)
+    if workers <= 1:
+        logger.info("Vérification des fichiers déposés dans le processus du planificateur.")
+        return 0
+    _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                initializer=_init_pool_process, initargs=(workers,))
+    _pool_workers = workers
+    logger.info(f"Pool de vérification démarré : {workers} processus.")
+    return workers
+
+
+def shutdown_verification_pool() -> None:
+    """Arrête le pool après les vérifications en cours ; celles en attente sont annulées."""
+    global _pool, _pool_workers
+    if _pool is None:
+        return
+    _pool.shutdown(wait=True, cancel_futures=True)
+    _pool, _pool_workers = None, 0
+    logger.info("Pool de vérification arrêté.")
+
+
+def submit_verifications(requests: Iterable[VerificationRequest]) -> Dict[str, Future]:
+    """
+    Lance la vérification de chaque fichier dans le pool. Retourne {chemin: Future},
+    vide sans pool (ou pool hors service) : l'appelant vérifie alors en ligne.
+    """
+    if _pool is None:
+        return {}
+    futures = {}
+    try:
+        for file_path, expected_size, expected_hash in requests:
+            if file_path not in futures:
+                futures[file_path] = _pool.submit(_verify_in_pool, file_path, expected_size, expected_hash)
+    except BrokenProcessPool as e:
+        logger.error(f"Pool de vérification hors service, vérification en ligne : {e}")
+    return futures
+
+
+def wait_verification(future: Future) -> Optional[VerificationResult]:
+    """
+    Résultat d'une vérification lancée dans le pool. Les erreurs de vérification sont relancées
+    comme en ligne ; None si le processus a disparu (l'appelant vérifie alors en ligne).
+    """
+    try:
+        result, bytes_hashed, hash_seconds = future.result()
+    except BrokenProcessPool as e:
+        logger.error(f"Processus de vérification interrompu, vérification en ligne : {e}")
+        return None
+    if bytes_hashed:
+        BYTES_HASHED.inc(bytes_hashed)
+        HASH_DURATION.observe(hash_seconds)
+    return result
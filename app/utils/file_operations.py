@@ -5,10 +5,17 @@
 import os
 import shutil # Pour des opérations de haut niveau sur les fichiers, comme le déplacement
 import logging
+from functools import partial
+
+from app.utils.io_throttle import io_throttle
+from app.utils.page_cache import IO_MODE_CACHE, advise_sequential, drop_cached_range, resolve_io_mode
 
 # Obtenir une instance de logger pour ce module.
 logger = logging.getLogger(__name__)
 
+# Taille des blocs copiés par _copy_in_chunks (budget d'E/S, retrait du cache de pages)
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
 class FileOperationError(Exception):
     """Exception personnalisée levée en cas d'erreur lors d'une opération sur fichier."""
     pass
@@ -32,7 +39,7 @@ def ensure_directory_exists(path: str) -> None:
         raise FileOperationError(f"Impossible de créer le répertoire '{path}': {e}")
 
 
-def move_file(source_path: str, destination_path: str) -> None:
+def move_file(source_path: str, destination_path: str, io_mode: str = None) -> None:
     """
     Déplace un fichier de la source à la destination.
     Utilise os.replace pour une opération atomique sur le même système de fichiers.
@@ -41,6 +48,7 @@ def move_file(source_path: str, destination_path: str) -> None:
     Args:
         source_path (str): Le chemin du fichier source.
         destination_path (str): Le chemin complet de la destination (incluant le nouveau nom de fichier).
+        io_mode (str): Mode d'E/S de la copie de repli (cf. app/utils/page_cache.py), soumise au budget d'E/S.
 
     Raises:
         FileOperationError: Si le fichier source n'existe pas, ou si le déplacement échoue.
@@ -70,7 +78,11 @@ def move_file(source_path: str, destination_path: str) -> None:
         # ou pour d'autres erreurs spécifiques. Dans ce cas, se rabattre sur shutil.move.
         logger.warning(f"os.replace a échoué pour '{source_path}' vers '{destination_path}' ({e}). Utilisation de shutil.move.")
         try:
-            shutil.move(source_path, destination_path)
+            if resolve_io_mode(io_mode) == IO_MODE_CACHE and not io_throttle.enabled:
+                shutil.move(source_path, destination_path)
+            else:
+                shutil.move(source_path, destination_path,
+                            copy_function=partial(copy_file, io_mode=io_mode, operation="move"))
             logger.info(f"Fichier déplacé avec shutil.move : '{source_path}' -> '{destination_path}'")
         except shutil.Error as se:
             logger.error(f"shutil.move a échoué pour '{source_path}' vers '{destination_path}' : {se}")
@@ -104,7 +116,47 @@ def create_dummy_file(file_path: str, content: bytes = b"dummy content"):
         logger.error(f"Échec de la création du fichier factice '{file_path}': {e}")
         raise FileOperationError(f"Impossible de créer le fichier factice '{file_path}': {e}")
 
-def copy_file(source_path: str, destination_path: str):
+def _copy_in_chunks(source_path: str, destination_path: str, keep_cache: bool, operation: str) -> None:
+    """
+    Copie par blocs (sendfile, ou read/write si indisponible) en prélevant chaque bloc sur le budget
+    d'E/S ; sans keep_cache, chaque bloc lu et chaque bloc écrit (une fois sur disque) quitte le
+    cache de pages. Copie ensuite les métadonnées.
+    """
+    with open(source_path, "rb", buffering=0) as source, open(destination_path, "wb", buffering=0) as destination:
+        source_fd, destination_fd = source.fileno(), destination.fileno()
+        if not keep_cache:
+            advise_sequential(source_fd)
+        offset = 0
+        use_sendfile = hasattr(os, "sendfile")
+        while True:
+            if use_sendfile:
+                try:
+                    copied = os.sendfile(destination_fd, source_fd, offset, COPY_CHUNK_SIZE)
+                except OSError:
+                    use_sendfile = False
+                    continue
+            else:
+                source.seek(offset)
+                data = source.read(COPY_CHUNK_SIZE)
+                copied = len(data)
+                if copied:
+                    destination.write(data)
+            if not copied:
+                break
+            if not keep_cache:
+                drop_cached_range(source_fd, offset, copied)
+                # Les pages écrites ne quittent le cache qu'une fois sur disque : DONTNEED lance leur
+                # écriture ; la passe finale (après fdatasync) retire celles encore présentes.
+                drop_cached_range(destination_fd, offset, copied)
+            offset += copied
+            io_throttle.acquire(copied, operation)
+        if not keep_cache:
+            os.fdatasync(destination_fd)
+            drop_cached_range(destination_fd, 0, 0)
+    shutil.copystat(source_path, destination_path)
+
+
+def copy_file(source_path: str, destination_path: str, io_mode: str = None, operation: str = "copy"):
     """
     Copie un fichier de l'emplacement source vers l'emplacement de destination.
     Écrase le fichier de destination s'il existe déjà.
@@ -112,6 +164,9 @@ def copy_file(source_path: str, destination_path: str):
     Args:
         source_path (str): Le chemin absolu du fichier source.
         destination_path (str): Le chemin absolu où le fichier doit être copié.
+        io_mode (str): Mode d'E/S ("cache", "dontneed", "direct"). Par défaut settings.SCANNER_IO_CACHE_MODE ;
+            hors "cache", ni la source ni la copie ne restent dans le cache de pages.
+        operation (str): Étiquette de l'opération pour le budget d'E/S ("copy", "move").
 
     Raises:
         FileOperationError: Si la copie échoue.
@@ -126,7 +181,13 @@ def copy_file(source_path: str, destination_path: str):
     ensure_directory_exists(destination_dir)
 
     try:
-        shutil.copy2(source_path, destination_path) # copy2 préserve les métadonnées du fichier
+        # copy2 préserve les métadonnées ; sous Linux il copie dans le noyau (sendfile), aussi rapide
+        # que copy_file_range et bien plus qu'une boucle read/write (cf. scripts/benchmarks/bench_hash_copy.py)
+        keep_cache = resolve_io_mode(io_mode) == IO_MODE_CACHE
+        if keep_cache and not io_throttle.enabled:
+            shutil.copy2(source_path, destination_path)
+        else:
+            _copy_in_chunks(source_path, destination_path, keep_cache, operation)
         logger.info(f"Fichier copié avec succès : '{source_path}' -> '{destination_path}'")
     except shutil.Error as e:
         logger.error(f"Erreur de copie de fichier de '{source_path}' vers '{destination_path}': {e}")
@@ -0,0 +1,208 @@
+# app/utils/io_throttle.py
+# Ce module fournit le budget de bande passante disque du scanner : un seau à jetons (octets par
+# seconde, avec une réserve de rafale) partagé par le hachage, la copie de promotion et les
+# déplacements (archivage) du processus, pour que le scanner ne ralentisse pas les dépôts des
+# agents sur le même volume.
+#   - SCANNER_IO_RATE_BYTES_PER_SECOND : débit par défaut (0 = illimité) ;
+#   - SCANNER_IO_BURST_BYTES           : taille du seau (octets consommables d'un coup) ;
+#   - SCANNER_IO_RATE_SCHEDULE         : débits par tranche horaire UTC, ex. "06:00-20:00=20M;20:00-06:00=0".
+# Chaque opération prélève les octets lus ou copiés ; un prélèvement supérieur aux jetons
+# disponibles attend le temps nécessaire au débit courant (la dette est partagée entre threads).
+# L'état du seau est exposé par state() et par les métriques backup_io_throttle_*.
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from app.core.metrics import IO_THROTTLE_BYTES, IO_THROTTLE_RATE, IO_THROTTLE_TOKENS, IO_THROTTLE_WAITING, \
+    IO_THROTTLE_WAIT_SECONDS
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Durée maximale d'une attente avant de relire le débit (changement de tranche horaire)
+MAX_SLEEP_SECONDS = 1.0
+
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+_RATE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:I?B)?(?:/S)?\s*$")
+_SLOT_PATTERN = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*=\s*(.+)$")
+
+# (minute de début, minute de fin, débit en octets/s) ; la fin est exclue, une tranche peut passer minuit
+RateSlot = Tuple[int, int, int]
+
+
+class IoThrottleError(Exception):
+    """Exception personnalisée pour les erreurs de configuration du budget d'E/S."""
+    pass
+
+
+def parse_byte_rate(value) -> int:
+    """
+    Convertit un débit ("0", "512K", "20M", "1.5G", "20MB/s" ou un entier) en octets par seconde.
+
+    Raises:
+        IoThrottleError: Si la valeur n'est pas un débit valide.
+    """
+    if isinstance(value, (int, float)):
+        rate = value
+    else:
+        match = _RATE_PATTERN.match(str(value).upper())
+        if not match:
+            raise IoThrottleError(f"Débit d'E/S invalide : '{value}' (ex. 0, 512K, 20M, 1G).")
+        rate = float(match.group(1)) * _UNITS[match.group(2)]
+    if rate < 0:
+        raise IoThrottleError(f"Débit d'E/S négatif : '{value}'.")
+    return int(rate)
+
+
+def parse_rate_schedule(spec: str) -> List[RateSlot]:
+    """
+    Analyse "HH:MM-HH:MM=débit;..." (heures UTC). Une chaîne vide donne un planning vide.
+
+    Raises:
+        IoThrottleError: Si une tranche est mal formée.
+    """
+    slots = []
+    for part in filter(None, (chunk.strip() for chunk in (spec or "").replace(",", ";").split(";"))):
+        match = _SLOT_PATTERN.match(part)
+        if not match:
+            raise IoThrottleError(f"Tranche de SCANNER_IO_RATE_SCHEDULE invalide : '{part}' (attendu HH:MM-HH:MM=débit).")
+        start_hour, start_minute, end_hour, end_minute = (int(group) for group in match.groups()[:4])
+        if start_hour > 24 or end_hour > 24 or start_minute > 59 or end_minute > 59:
+            raise IoThrottleError(f"Heure invalide dans SCANNER_IO_RATE_SCHEDULE : '{part}'.")
+        slots.append((start_hour * 60 + start_minute, end_hour * 60 + end_minute, parse_byte_rate(match.group(5))))
+    return slots
+
+
+def scheduled_rate(schedule: List[RateSlot], default_rate: int, now: datetime) -> int:
+    """Débit de la première tranche contenant `now` (UTC), sinon `default_rate`."""
+    now = now.astimezone(timezone.utc) if now.tzinfo else now
+    minute = now.hour * 60 + now.minute
+    for start, end, rate in schedule:
+        if (start <= minute < end) if start < end else (minute >= start or minute < end):
+            return rate
+    return default_rate
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TokenBucket:
+    """Seau à jetons (octets) partagé entre threads, de débit éventuellement variable selon l'heure."""
+
+    def __init__(self, rate_bytes_per_second=None, burst_bytes=None, schedule: Optional[str] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 now: Callable[[], datetime] = _utc_now):
+        self.default_rate = parse_byte_rate(
+            settings.SCANNER_IO_RATE_BYTES_PER_SECOND if rate_bytes_per_second is None else rate_bytes_per_second)
+        self.burst = max(1, parse_byte_rate(settings.SCANNER_IO_BURST_BYTES if burst_bytes is None else burst_bytes))
+        self.schedule = parse_rate_schedule(settings.SCANNER_IO_RATE_SCHEDULE if schedule is None else schedule)
+        self._clock = clock
+        self._sleep = sleep
+        self._now = now
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._waiting = 0
+        self._wait_seconds = 0.0
+        self._bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        """True si un débit est limité à un moment de la journée."""
+        return self.default_rate > 0 or any(rate > 0 for _, _, rate in self.schedule)
+
+    def current_rate(self) -> int:
+        """Débit en vigueur (octets/s, 0 = illimité)."""
+        return scheduled_rate(self.schedule, self.default_rate, self._now())
+
+    def scale(self, share: float) -> None:
+        """
+        Ramène le budget à une part `share` du débit configuré (processus d'un pool qui se partagent
+        le débit du scanner). Un débit limité le reste : il ne tombe jamais à 0 (illimité).
+        """
+        def _scaled(rate: int) -> int:
+            return max(1, int(rate * share)) if rate > 0 else 0
+
+        with self._lock:
+            self.default_rate = _scaled(self.default_rate)
+            self.burst = max(1, int(self.burst * share))
+            self.schedule = [(start, end, _scaled(rate)) for start, end, rate in self.schedule]
+            self._tokens = min(self._tokens, float(self.burst))
+
+    def _refill(self, rate: int) -> None:
+        now = self._clock()
+        if rate <= 0:
+            self._tokens = float(self.burst)
+        else:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * rate)
+        self._updated_at = now
+
+    def acquire(self, nbytes: int, operation: str = "hash") -> float:
+        """
+        Prélève `nbytes` octets et attend si le seau est à découvert. Retourne l'attente (secondes).
+        """
+        if nbytes <= 0:
+            return 0.0
+        with self._lock:
+            rate = self.current_rate()
+            self._refill(rate)
+            self._bytes += nbytes
+            IO_THROTTLE_RATE.set(rate)
+            if rate <= 0:
+                IO_THROTTLE_BYTES.inc(nbytes, operation=operation)
+                return 0.0
+            self._tokens -= nbytes
+            # Les prélèvements suivants voient la dette : les threads sont servis dans l'ordre
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+            if wait > 0:
+                self._waiting += 1
+                IO_THROTTLE_WAITING.set(self._waiting)
+            IO_THROTTLE_TOKENS.set(self._tokens)
+        IO_THROTTLE_BYTES.inc(nbytes, operation=operation)
+        if wait <= 0:
+            return 0.0
+
+        logger.debug(f"Budget d'E/S épuisé ({operation}, {rate} o/s) : attente de {wait:.2f} s.")
+        waited = 0.0
+        try:
+            while waited < wait:
+                step = min(MAX_SLEEP_SECONDS, wait - waited)
+                self._sleep(step)
+                waited += step
+                if waited < wait and self.current_rate() <= 0:
+                    # Passage à une tranche illimitée : la dette est effacée
+                    with self._lock:
+                        self._refill(0)
+                    break
+        finally:
+            IO_THROTTLE_WAIT_SECONDS.inc(waited, operation=operation)
+            with self._lock:
+                self._waiting -= 1
+                self._wait_seconds += waited
+                IO_THROTTLE_WAITING.set(self._waiting)
+        return waited
+
+    def state(self) -> dict:
+        """État courant du seau (débit, jetons, opérations en attente, cumul des attentes)."""
+        with self._lock:
+            rate = self.current_rate()
+            self._refill(rate)
+            return {
+                "enabled": self.enabled,
+                "rate_bytes_per_second": rate,
+                "burst_bytes": self.burst,
+                "tokens": self._tokens,
+                "throttled": self._waiting > 0,
+                "waiting_operations": self._waiting,
+                "total_wait_seconds": self._wait_seconds,
+                "total_bytes": self._bytes,
+            }
+
+
+# Budget du processus, partagé par le hachage, la promotion et l'archivage.
+io_throttle = TokenBucket()
@@ -0,0 +1,114 @@
+# app/utils/json_decoder.py
+# Ce module fournit une couche de décodage JSON interchangeable pour les rapports STATUS.json.
+# Le fichier est lu une seule fois en octets puis décodé avec orjson s'il est installé,
+# avec repli sur la bibliothèque standard. L'objet décodé est ensuite partagé entre
+# la validation et le traitement.
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import settings
+
+try:  # Dépendance optionnelle : décodeur JSON rapide
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Marque d'ordre des octets UTF-8 parfois écrite par les agents Windows.
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def _decode_with_stdlib(data: bytes) -> Any:
+    """Décode des octets JSON avec le module json de la bibliothèque standard."""
+    try:
+        return json.loads(data.decode("utf-8"))
+    except UnicodeDecodeError as e:
+        raise json.JSONDecodeError(f"Encodage UTF-8 invalide : {e}", "", 0)
+
+
+def _decode_with_orjson(data: bytes) -> Any:
+    """Décode des octets JSON avec orjson (orjson.JSONDecodeError hérite de json.JSONDecodeError)."""
+    return orjson.loads(data)
+
+
+# Registre des décodeurs disponibles, indexé par nom.
+_DECODERS: Dict[str, Callable[[bytes], Any]] = {"json": _decode_with_stdlib}
+if orjson is not None:
+    _DECODERS["orjson"] = _decode_with_orjson
+
+
+def register_decoder(name: str, decoder: Callable[[bytes], Any]) -> None:
+    """
+    Enregistre un décodeur supplémentaire (ex: simdjson) sous un nom donné.
+
+    Args:
+        name (str): Le nom utilisé dans REPORT_JSON_DECODER ou passé à decode_report.
+        decoder (Callable[[bytes], Any]): Fonction décodant des octets JSON.
+            Elle doit lever json.JSONDecodeError (ou une sous-classe) en cas d'erreur.
+    """
+    _DECODERS[name] = decoder
+
+
+def available_decoders() -> list:
+    """Retourne les noms des décodeurs utilisables dans cet environnement."""
+    return list(_DECODERS)
+
+
+def get_decoder(name: Optional[str] = None) -> Callable[[bytes], Any]:
+    """
+    Retourne la fonction de décodage correspondant au nom demandé.
+    'auto' (valeur par défaut de REPORT_JSON_DECODER) choisit orjson s'il est disponible.
+    Un nom inconnu ou indisponible se replie sur la bibliothèque standard.
+    """
+    name = name or settings.REPORT_JSON_DECODER
+    if name == "auto":
+        name = "orjson" if "orjson" in _DECODERS else "json"
+    decoder = _DECODERS.get(name)
+    if decoder is None:
+        logger.warning(f"Décodeur JSON '{name}' indisponible, repli sur la bibliothèque standard.")
+        decoder = _decode_with_stdlib
+    return decoder
+
+
+def read_report_bytes(file_path: str) -> bytes:
+    """
+    Lit le contenu brut d'un rapport en une seule lecture.
+
+    Raises:
+        OSError: Si le fichier est introuvable ou illisible.
+    """
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def decode_report(data: bytes, decoder: Optional[str] = None) -> Any:
+    """
+    Décode le contenu brut d'un rapport JSON.
+
+    Args:
+        data (bytes): Le contenu du fichier.
+        decoder (Optional[str]): Nom du décodeur à utiliser (défaut : REPORT_JSON_DECODER).
+
+    Returns:
+        Any: L'objet JSON décodé.
+
+    Raises:
+        json.JSONDecodeError: Si le contenu n'est pas un JSON valide.
+    """
+    if data.startswith(UTF8_BOM):
+        data = data[len(UTF8_BOM):]
+    return get_decoder(decoder)(data)
+
+
+def load_report(file_path: str, decoder: Optional[str] = None) -> Any:
+    """
+    Lit et décode un rapport JSON en une seule passe sur le disque.
+
+    Raises:
+        OSError: Si le fichier est illisible.
+        json.JSONDecodeError: Si le contenu n'est pas un JSON valide.
+    """
+    return decode_report(read_report_bytes(file_path), decoder)
@@ -0,0 +1,88 @@
+# app/utils/page_cache.py
+# Ce module fournit le mode d'E/S des lectures et copies volumineuses du scanner (hachage et
+# promotion des sauvegardes), pour qu'elles ne chassent pas du cache de pages du noyau la base
+# SQLite de l'API et les fichiers du système :
+#   - "cache"    : E/S tamponnées classiques (comportement historique) ;
+#   - "dontneed" : posix_fadvise SEQUENTIAL à l'ouverture, puis DONTNEED sur chaque bloc consommé
+#                  (et sur chaque bloc écrit, après écriture sur disque, pour les copies) ;
+#   - "direct"   : lectures O_DIRECT dans un tampon aligné pour le hachage (le cache n'est pas
+#                  utilisé du tout) ; les copies utilisent "dontneed".
+# Un mode indisponible sur la plateforme (ou le système de fichiers) est remplacé par le suivant
+# le plus proche : direct -> dontneed -> cache.
+
+import logging
+import mmap
+import os
+from typing import Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+IO_MODE_CACHE = "cache"
+IO_MODE_DONTNEED = "dontneed"
+IO_MODE_DIRECT = "direct"
+IO_MODES = (IO_MODE_CACHE, IO_MODE_DONTNEED, IO_MODE_DIRECT)
+
+# Alignement exigé par O_DIRECT (adresse du tampon, position et taille des lectures)
+DIRECT_IO_ALIGNMENT = 4096
+
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+HAS_DIRECT_IO = hasattr(os, "O_DIRECT")
+
+
+class PageCacheError(Exception):
+    """Exception personnalisée pour les erreurs de configuration du mode d'E/S."""
+    pass
+
+
+def resolve_io_mode(mode: Optional[str] = None) -> str:
+    """
+    Mode d'E/S effectif : `mode` ou settings.SCANNER_IO_CACHE_MODE, ramené au mode disponible
+    le plus proche sur cette plateforme.
+
+    Raises:
+        PageCacheError: Si le mode est inconnu.
+    """
+    mode = (mode or settings.SCANNER_IO_CACHE_MODE).lower()
+    if mode not in IO_MODES:
+        raise PageCacheError(f"SCANNER_IO_CACHE_MODE inconnu : '{mode}' (attendu : {', '.join(IO_MODES)}).")
+    if mode == IO_MODE_DIRECT and not HAS_DIRECT_IO:
+        mode = IO_MODE_DONTNEED
+    if mode == IO_MODE_DONTNEED and not HAS_FADVISE:
+        mode = IO_MODE_CACHE
+    return mode
+
+
+def advise_sequential(fd: int) -> None:
+    """Annonce une lecture séquentielle (lecture anticipée plus agressive)."""
+    if HAS_FADVISE:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+def drop_cached_range(fd: int, offset: int, length: int) -> None:
+    """
+    Retire du cache les pages de [offset, offset + length) (length = 0 : jusqu'à la fin).
+    Les pages modifiées non encore écrites sont conservées (leur écriture est lancée).
+    """
+    if HAS_FADVISE:
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+
+
+def open_direct(path: str) -> Optional[int]:
+    """
+    Ouvre `path` en lecture O_DIRECT ; retourne None si le système de fichiers le refuse (tmpfs...).
+    """
+    if not HAS_DIRECT_IO:
+        return None
+    try:
+        return os.open(path, os.O_RDONLY | os.O_DIRECT)
+    except OSError as e:
+        logger.debug(f"O_DIRECT indisponible pour '{path}' ({e}) : lecture avec fadvise.")
+        return None
+
+
+def aligned_buffer(size: int) -> mmap.mmap:
+    """Tampon anonyme aligné sur une page, de taille arrondie au multiple de DIRECT_IO_ALIGNMENT."""
+    size = max(DIRECT_IO_ALIGNMENT, -(-size // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT)
+    return mmap.mmap(-1, size)
@@ -0,0 +1,173 @@
+# app/utils/profiling.py
+# Ce module fournit un profileur optionnel pour les passages du scanner.
+# Il chronomètre chaque phase, chaque étape par agent et par job, et cumule le temps passé
+# par catégorie (io, db) pour savoir ce qui limite un passage lent.
+# Il peut aussi exécuter cProfile sur tout le passage et en écrire les statistiques.
+# Désactivé, chaque mesure se réduit à un contexte vide.
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Catégories de temps cumulées pendant un passage.
+CATEGORY_IO = "io"
+CATEGORY_DB = "db"
+
+
+class ScanProfiler:
+    """
+    Profileur d'un passage du scanner.
+
+    Usage :
+        profiler.start()
+        with profiler.phase("collect"):
+            with profiler.step("agent", agent_name):
+                with profiler.category(CATEGORY_IO):
+                    ...
+        profiler.stop()
+        profiler.report()
+    """
+
+    def __init__(self, enabled: bool = False, use_cprofile: bool = False, top_n: int = 10,
+                 output_dir: Optional[str] = None):
+        self.enabled = enabled
+        self.use_cprofile = enabled and use_cprofile
+        self.top_n = top_n
+        self.output_dir = output_dir
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.categories: Dict[str, float] = defaultdict(float)
+        # Durées cumulées par type d'étape ("agent", "job") puis par clé
+        self.steps: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.cprofile_path: Optional[str] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._started_at: Optional[float] = None
+        self._total: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls) -> "ScanProfiler":
+        """Construit un profileur selon les paramètres SCANNER_PROFILING_*."""
+        return cls(
+            enabled=settings.SCANNER_PROFILING_ENABLED,
+            use_cprofile=settings.SCANNER_PROFILING_CPROFILE,
+            top_n=settings.SCANNER_PROFILING_TOP_N,
+            output_dir=settings.SCANNER_PROFILING_OUTPUT_DIR,
+        )
+
+    # --- Cycle de vie ---
+
+    def start(self) -> None:
+        """Démarre le chronométrage du passage (et cProfile si demandé)."""
+        if not self.enabled:
+            return
+        self.phases.clear()
+        self.categories.clear()
+        self.steps.clear()
+        self.cprofile_path = None
+        self._total = None
+        self._started_at = time.perf_counter()
+        if self.use_cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        """Arrête le chronométrage et écrit les statistiques cProfile éventuelles."""
+        if not self.enabled or self._started_at is None:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+            self.cprofile_path = self._dump_cprofile(self._profile)
+            self._profile = None
+        self._total = time.perf_counter() - self._started_at
+        self._started_at = None
+
+    def _dump_cprofile(self, profile: cProfile.Profile) -> Optional[str]:
+        output_dir = self.output_dir or "."
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            file_name = f"scan_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')}.prof"
+            path = os.path.join(output_dir, file_name)
+            profile.dump_stats(path)
+            logger.info(f"Statistiques cProfile du passage écrites dans '{path}'.")
+            return path
+        except OSError as e:
+            logger.error(f"Impossible d'écrire les statistiques cProfile dans '{output_dir}' : {e}")
+            return None
+
+    # --- Mesures ---
+
+    @contextmanager
+    def _accumulate(self, target: Dict[str, float], key: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            target[key] += time.perf_counter() - start
+
+    def phase(self, name: str):
+        """Chronomètre une phase du passage."""
+        if not self.enabled:
+            return nullcontext()
+        return self._accumulate(self.phases, name)
+
+    def step(self, kind: str, key: Any):
+        """Chronomètre une étape (ex: kind="agent", key=nom du dossier ; kind="job", key=nom de la base)."""
+        if not self.enabled:
+            return nullcontext()
+        return self._accumulate(self.steps[kind], str(key))
+
+    def category(self, name: str):
+        """Cumule le temps passé dans une catégorie (io, db)."""
+        if not self.enabled:
+            return nullcontext()
+        return self._accumulate(self.categories, name)
+
+    # --- Rapport ---
+
+    def slowest(self, kind: str, top_n: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Retourne les N étapes les plus lentes d'un type donné, de la plus lente à la plus rapide."""
+        durations = self.steps.get(kind, {})
+        return sorted(durations.items(), key=lambda item: item[1], reverse=True)[:top_n or self.top_n]
+
+    def report(self) -> Dict[str, Any]:
+        """Résumé du passage : durée totale, phases, catégories et étapes les plus lentes."""
+        return {
+            "total_seconds": self._total,
+            "phases": dict(self.phases),
+            "categories": dict(self.categories),
+            "slowest": {kind: self.slowest(kind) for kind in self.steps},
+            "cprofile_path": self.cprofile_path,
+        }
+
+    def format_report(self) -> str:
+        """Rapport lisible pour les logs."""
+        lines = [f"Profil du passage : {self._total or 0.0:.3f}s au total"]
+        for name, duration in self.phases.items():
+            lines.append(f"  phase {name:<12} {duration:.3f}s")
+        for name, duration in sorted(self.categories.items()):
+            lines.append(f"  catégorie {name:<12} {duration:.3f}s")
+        for kind in self.steps:
+            lines.append(f"  {kind}s les plus lents :")
+            for key, duration in self.slowest(kind):
+                lines.append(f"    {duration:.3f}s  {key}")
+        if self.cprofile_path:
+            lines.append(f"  cProfile : {self.cprofile_path}")
+        return "\n".join(lines)
+
+    def cprofile_summary(self, limit: int = 20) -> str:
+        """Résumé texte (tri par temps cumulé) des statistiques cProfile écrites par stop()."""
+        if not self.cprofile_path:
+            return ""
+        stream = io.StringIO()
+        pstats.Stats(self.cprofile_path, stream=stream).sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
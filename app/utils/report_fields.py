@@ -0,0 +1,89 @@
+# app/utils/report_fields.py
+# Ce module regroupe les fonctions de conversion des champs bruts des rapports STATUS.json
+# vers des types Python. Les agents produisent des valeurs hétérogènes
+# ("status": "True", "size": "62233088", "error_message": "null", horodatages séparés par un espace)
+# et ces fonctions centralisent leur interprétation.
+
+from datetime import datetime
+from typing import Any, Optional
+
+from app.utils.datetime_utils import parse_iso_datetime, DateTimeUtilityError
+
+# Valeurs textuelles acceptées pour les booléens rapportés par les agents.
+TRUE_STRINGS = frozenset({"true", "1", "yes", "ok"})
+FALSE_STRINGS = frozenset({"false", "0", "no", "ko"})
+# Valeurs textuelles équivalentes à une absence de valeur.
+NULL_STRINGS = frozenset({"", "null", "none"})
+
+
+def coerce_bool(value: Any) -> Optional[bool]:
+    """
+    Convertit un statut rapporté par l'agent en booléen.
+
+    Returns:
+        Optional[bool]: True/False si la valeur est interprétable, None sinon.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in TRUE_STRINGS:
+            return True
+        if lowered in FALSE_STRINGS:
+            return False
+    return None
+
+
+def coerce_int(value: Any) -> Optional[int]:
+    """
+    Convertit une taille rapportée (entier ou chaîne numérique) en entier positif.
+
+    Returns:
+        Optional[int]: La valeur entière, ou None si elle est absente ou invalide.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value >= 0 else None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def coerce_datetime(value: Any) -> Optional[datetime]:
+    """
+    Convertit un horodatage ISO 8601 (séparateur 'T' ou espace) en datetime UTC.
+
+    Returns:
+        Optional[datetime]: Le datetime UTC, ou None si la valeur est absente ou invalide.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        return parse_iso_datetime(value.strip())
+    except DateTimeUtilityError:
+        return None
+
+
+def coerce_optional_str(value: Any) -> Optional[str]:
+    """
+    Normalise une chaîne optionnelle : les valeurs "null"/"None"/vides deviennent None.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        return str(value)
+    if value.strip().lower() in NULL_STRINGS:
+        return None
+    return value
+
+
+def get_reported_checksum(process_section: Any) -> Optional[str]:
+    """
+    Retourne le SHA-256 d'une section de processus (BACKUP/COMPRESS),
+    que l'agent l'ait publié sous la clé 'sha256_checksum' ou 'sha256'.
+    """
+    if not isinstance(process_section, dict):
+        return None
+    checksum = process_section.get("sha256_checksum") or process_section.get("sha256")
+    return coerce_optional_str(checksum)
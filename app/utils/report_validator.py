@@ -0,0 +1,217 @@
+# app/utils/report_validator.py
+# Ce module fournit le validateur unique des rapports STATUS.json.
+# Le schéma est décrit de manière déclarative (REPORT_SCHEMA) puis compilé une seule fois
+# en fonctions de vérification. La validation d'un rapport décodé se fait en une passe
+# et retourne des listes d'anomalies structurées au lieu d'afficher ou de lever à la première erreur.
+
+import re
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from app.utils.report_fields import coerce_bool, coerce_int
+
+# Gravité d'une anomalie : une erreur rend le rapport invalide, un avertissement non.
+ERROR = "error"
+WARNING = "warning"
+
+# Horodatage ISO 8601 avec séparateur 'T' ou espace (format réellement produit par certains agents),
+# fraction de seconde et décalage optionnels. Évite un appel à datetime.fromisoformat par champ.
+TIMESTAMP_PATTERN = re.compile(
+    r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])[T ]([01]\d|2[0-3]):[0-5]\d"
+    r"(:[0-5]\d(\.\d{1,6})?)?(Z|[+-]([01]\d|2[0-3]):?[0-5]\d)?$"
+)
+SHA256_PATTERN = re.compile(r"^[0-9a-fA-F]{64}$")
+
+# --- Schéma déclaratif ---
+# Chaque champ décrit : type, required (bool) et severity (gravité des anomalies sur ce champ).
+# Les clés 'aliases' listent les noms alternatifs acceptés (ex: 'sha256' pour 'sha256_checksum').
+
+PROCESS_TIMES_SCHEMA = {
+    "start_time": {"type": "timestamp", "required": True, "severity": WARNING},
+    "end_time": {"type": "timestamp", "required": True, "severity": WARNING},
+}
+
+CHECKSUMMED_PROCESS_SCHEMA = {
+    "type": "object",
+    "fields": {
+        "status": {"type": "bool", "required": True, "severity": ERROR},
+        **PROCESS_TIMES_SCHEMA,
+        "sha256_checksum": {"type": "sha256", "required": False, "severity": WARNING, "aliases": ["sha256"]},
+        "size": {"type": "size", "required": True, "severity": WARNING},
+    },
+}
+
+TRANSFER_PROCESS_SCHEMA = {
+    "type": "object",
+    "fields": {
+        "status": {"type": "bool", "required": True, "severity": ERROR},
+        **PROCESS_TIMES_SCHEMA,
+        "error_message": {"type": "optional_string", "required": False, "severity": WARNING},
+    },
+}
+
+DATABASE_SCHEMA = {
+    "type": "object",
+    "fields": {
+        "staged_file_name": {"type": "string", "required": True, "severity": ERROR},
+        "BACKUP": {**CHECKSUMMED_PROCESS_SCHEMA, "required": True, "severity": ERROR},
+        "COMPRESS": {**CHECKSUMMED_PROCESS_SCHEMA, "required": True, "severity": ERROR},
+        "TRANSFER": {**TRANSFER_PROCESS_SCHEMA, "required": True, "severity": ERROR},
+    },
+}
+
+REPORT_SCHEMA = {
+    "type": "object",
+    "fields": {
+        "agent_id": {"type": "string", "required": True, "severity": ERROR},
+        "operation_start_time": {"type": "timestamp", "required": True, "severity": ERROR},
+        "operation_end_time": {"type": "timestamp", "required": True, "severity": ERROR},
+        # Absent des rapports de certains agents : vérifié uniquement s'il est présent.
+        "overall_status": {"type": "enum", "values": ["completed", "failed_globally"],
+                           "required": False, "severity": ERROR},
+        "databases": {"type": "mapping", "values": DATABASE_SCHEMA, "required": True, "severity": ERROR},
+    },
+}
+
+
+class ReportValidationIssue(NamedTuple):
+    """Anomalie détectée dans un rapport : chemin du champ, message et gravité."""
+    path: str
+    message: str
+    severity: str
+
+
+class ReportValidationResult(NamedTuple):
+    """Résultat de la validation d'un rapport."""
+    errors: List[ReportValidationIssue]
+    warnings: List[ReportValidationIssue]
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    def summary(self, limit: int = 5) -> str:
+        """Résumé lisible des premières erreurs, pour les logs et les exceptions."""
+        shown = "; ".join(f"{issue.path}: {issue.message}" for issue in self.errors[:limit])
+        remaining = len(self.errors) - limit
+        return shown + (f" (+{remaining} autre(s))" if remaining > 0 else "")
+
+
+# Une fonction de vérification compilée reçoit (valeur, chemin, liste d'anomalies).
+Checker = Callable[[Any, str, List[ReportValidationIssue]], None]
+
+
+# Prédicats des types scalaires : (prédicat, description attendue).
+_SCALAR_TYPES = {
+    "string": (lambda v: isinstance(v, str) and v != "", "chaîne non vide"),
+    "optional_string": (lambda v: v is None or isinstance(v, str), "chaîne ou null"),
+    "bool": (lambda v: coerce_bool(v) is not None, "booléen ou \"True\"/\"False\""),
+    "timestamp": (lambda v: isinstance(v, str) and TIMESTAMP_PATTERN.match(v) is not None, "horodatage ISO 8601"),
+    "sha256": (lambda v: v is None or (isinstance(v, str) and SHA256_PATTERN.match(v) is not None),
+               "empreinte SHA-256 hexadécimale de 64 caractères"),
+    "size": (lambda v: coerce_int(v) is not None, "entier positif (ou chaîne numérique)"),
+}
+
+
+def _compile_scalar(spec: Dict[str, Any]) -> Checker:
+    field_type = spec["type"]
+    severity = spec.get("severity", ERROR)
+
+    if field_type == "enum":
+        allowed = frozenset(spec["values"])
+        expected = " ou ".join(repr(v) for v in spec["values"])
+
+        def check_enum(value, path, issues):
+            if value not in allowed:
+                issues.append(ReportValidationIssue(path, f"valeur {value!r} invalide, attendu {expected}", severity))
+        return check_enum
+
+    predicate, expected = _SCALAR_TYPES[field_type]
+
+    def check_scalar(value, path, issues):
+        if not predicate(value):
+            issues.append(ReportValidationIssue(path, f"valeur {value!r} invalide, attendu {expected}", severity))
+    return check_scalar
+
+
+def _compile_object(spec: Dict[str, Any]) -> Checker:
+    severity = spec.get("severity", ERROR)
+    # Pré-calcul des champs : (nom, alias, requis, gravité, vérificateur)
+    fields = [
+        (name, tuple(field_spec.get("aliases", ())), field_spec.get("required", False),
+         field_spec.get("severity", ERROR), _compile(field_spec))
+        for name, field_spec in spec["fields"].items()
+    ]
+
+    def check_object(value, path, issues):
+        if not isinstance(value, dict):
+            issues.append(ReportValidationIssue(path or "$", "doit être un objet JSON", severity))
+            return
+        prefix = f"{path}." if path else ""
+        for name, aliases, required, field_severity, checker in fields:
+            key = name
+            if key not in value:
+                key = next((alias for alias in aliases if alias in value), None)
+            if key is None:
+                if required:
+                    issues.append(ReportValidationIssue(prefix + name, "champ manquant", field_severity))
+                continue
+            checker(value[key], prefix + key, issues)
+    return check_object
+
+
+def _compile_mapping(spec: Dict[str, Any]) -> Checker:
+    severity = spec.get("severity", ERROR)
+    value_checker = _compile(spec["values"])
+
+    def check_mapping(value, path, issues):
+        if not isinstance(value, dict):
+            issues.append(ReportValidationIssue(path, "doit être un objet JSON", severity))
+            return
+        if not value:
+            issues.append(ReportValidationIssue(path, "aucune base de données rapportée", WARNING))
+        for key, item in value.items():
+            value_checker(item, f"{path}.{key}", issues)
+    return check_mapping
+
+
+def _compile(spec: Dict[str, Any]) -> Checker:
+    """Compile récursivement une spécification de champ en fonction de vérification."""
+    if spec["type"] == "object":
+        return _compile_object(spec)
+    if spec["type"] == "mapping":
+        return _compile_mapping(spec)
+    return _compile_scalar(spec)
+
+
+class CompiledReportValidator:
+    """
+    Validateur de rapports STATUS.json construit à partir d'un schéma déclaratif.
+    Le schéma est compilé à l'instanciation ; validate() peut ensuite être appelé
+    sur un grand nombre de rapports sans recompilation.
+    """
+
+    def __init__(self, schema: Dict[str, Any] = REPORT_SCHEMA):
+        self.schema = schema
+        self._check = _compile(schema)
+
+    def validate(self, report: Any) -> ReportValidationResult:
+        """
+        Valide un rapport décodé en une seule passe.
+
+        Returns:
+            ReportValidationResult: Les erreurs (bloquantes) et avertissements détectés.
+        """
+        issues: List[ReportValidationIssue] = []
+        self._check(report, "", issues)
+        errors = [issue for issue in issues if issue.severity == ERROR]
+        warnings = [issue for issue in issues if issue.severity != ERROR]
+        return ReportValidationResult(errors, warnings)
+
+
+# Validateur par défaut, compilé une seule fois à l'import.
+report_validator = CompiledReportValidator(REPORT_SCHEMA)
+
+
+def validate_report(report: Any) -> ReportValidationResult:
+    """Valide un rapport décodé avec le schéma par défaut."""
+    return report_validator.validate(report)
@@ -61,6 +61,247 @@ class Settings(BaseSettings):
         env="APP_TIMEZONE"
     )
 
+    # Décodeur JSON utilisé pour les rapports STATUS.json : "auto" (orjson si installé), "orjson" ou "json"
+    REPORT_JSON_DECODER: str = Field(
+        "auto",
+        env="REPORT_JSON_DECODER"
+    )
+
+    # Vérification par niveaux des fichiers déposés : active le contrôle par blocs échantillons
+    # (signature du format compressé, fin de fichier non nulle) avant le hachage complet.
+    SCANNER_SAMPLE_CHECK_ENABLED: bool = Field(
+        False,
+        env="SCANNER_SAMPLE_CHECK_ENABLED"
+    )
+    SCANNER_SAMPLE_BLOCK_SIZE: int = Field(
+        65536,
+        env="SCANNER_SAMPLE_BLOCK_SIZE"
+    )
+
+    # Détection des dépôts en cours : un fichier modifié depuis moins de SCANNER_UPLOAD_QUIESCENT_SECONDS,
+    # dont la taille/mtime évolue ou accompagné d'un témoin "<nom>.part" est différé
+    # (délai exponentiel entre BASE et MAX secondes, vérification forcée après MAX_DEFER_MINUTES).
+    SCANNER_UPLOAD_QUIESCENT_SECONDS: int = Field(
+        30,
+        env="SCANNER_UPLOAD_QUIESCENT_SECONDS"
+    )
+    SCANNER_UPLOAD_PART_SUFFIX: str = Field(
+        ".part",
+        env="SCANNER_UPLOAD_PART_SUFFIX"
+    )
+    SCANNER_UPLOAD_BACKOFF_BASE_SECONDS: int = Field(
+        60,
+        env="SCANNER_UPLOAD_BACKOFF_BASE_SECONDS"
+    )
+    SCANNER_UPLOAD_BACKOFF_MAX_SECONDS: int = Field(
+        900,
+        env="SCANNER_UPLOAD_BACKOFF_MAX_SECONDS"
+    )
+    SCANNER_UPLOAD_MAX_DEFER_MINUTES: int = Field(
+        240,
+        env="SCANNER_UPLOAD_MAX_DEFER_MINUTES"
+    )
+
+    # Mode d'E/S du hachage et de la copie des sauvegardes (app/utils/page_cache.py) : "cache" (E/S tamponnées),
+    # "dontneed" (posix_fadvise SEQUENTIAL puis DONTNEED sur les blocs consommés : les sauvegardes ne chassent
+    # pas du cache la base de l'API) ou "direct" (lectures O_DIRECT alignées pour le hachage).
+    SCANNER_IO_CACHE_MODE: str = Field(
+        "cache",
+        env="SCANNER_IO_CACHE_MODE"
+    )
+
+    # Empreinte courte calculée pendant la même lecture que le SHA-256 et stockée sur BackupEntry (content_fingerprint,
+    # indexée) : "auto" (xxh3_128 si le paquet xxhash est installé, sinon sha256_128 dérivé du SHA-256, sans coût),
+    # "sha256_128", "blake2b128", "xxh3_128" ou "none".
+    SCANNER_FINGERPRINT_ALGORITHM: str = Field(
+        "auto",
+        env="SCANNER_FINGERPRINT_ALGORITHM"
+    )
+
+    # Budget de bande passante disque du scanner (app/utils/io_throttle.py), partagé par le hachage, la copie de
+    # promotion et l'archivage : débit en octets/s (0 = illimité, suffixes K/M/G acceptés), réserve de rafale
+    # et débits par tranche horaire UTC ("06:00-20:00=20M;20:00-06:00=0"), prioritaires sur le débit par défaut.
+    SCANNER_IO_RATE_BYTES_PER_SECOND: str = Field(
+        "0",
+        env="SCANNER_IO_RATE_BYTES_PER_SECOND"
+    )
+    SCANNER_IO_BURST_BYTES: str = Field(
+        "64M",
+        env="SCANNER_IO_BURST_BYTES"
+    )
+    SCANNER_IO_RATE_SCHEDULE: str = Field(
+        "",
+        env="SCANNER_IO_RATE_SCHEDULE"
+    )
+
+    # Profilage optionnel des passages de BackupScanner : chronométrage des phases, des agents et des jobs,
+    # cProfile du passage complet (fichiers .prof écrits dans SCANNER_PROFILING_OUTPUT_DIR)
+    # et liste des N agents/jobs les plus lents.
+    SCANNER_PROFILING_ENABLED: bool = Field(
+        False,
+        env="SCANNER_PROFILING_ENABLED"
+    )
+    SCANNER_PROFILING_CPROFILE: bool = Field(
+        False,
+        env="SCANNER_PROFILING_CPROFILE"
+    )
+    SCANNER_PROFILING_TOP_N: int = Field(
+        10,
+        env="SCANNER_PROFILING_TOP_N"
+    )
+    SCANNER_PROFILING_OUTPUT_DIR: str = Field(
+        "data/profiles",
+        env="SCANNER_PROFILING_OUTPUT_DIR"
+    )
+
+    # Partage des agents entre plusieurs instances du scanner : chaque instance s'annonce
+    # (battement de cœur) dans la base, les agents sont répartis par hachage cohérent entre
+    # les instances vivantes et un agent n'est traité que sous un bail valide.
+    # SCANNER_NODE_ID vide : "<hôte>:<pid>".
+    SCANNER_SHARDING_ENABLED: bool = Field(
+        False,
+        env="SCANNER_SHARDING_ENABLED"
+    )
+    SCANNER_NODE_ID: str = Field(
+        "",
+        env="SCANNER_NODE_ID"
+    )
+    SCANNER_LEASE_TTL_SECONDS: int = Field(
+        120,
+        env="SCANNER_LEASE_TTL_SECONDS"
+    )
+    SCANNER_HEARTBEAT_INTERVAL_SECONDS: int = Field(
+        30,
+        env="SCANNER_HEARTBEAT_INTERVAL_SECONDS"
+    )
+    SCANNER_HASH_RING_REPLICAS: int = Field(
+        64,
+        env="SCANNER_HASH_RING_REPLICAS"
+    )
+
+    # Élection du processus qui exécute le planificateur quand l'API tourne avec plusieurs workers :
+    # "file" (verrou fcntl sur SCHEDULER_LEADER_LOCK_FILE, workers d'un même hôte), "db" (ligne de verrou
+    # avec expiration dans scheduler_locks, plusieurs hôtes) ou "none" (chaque processus planifie).
+    # Les autres processus retentent toutes les SCHEDULER_LEADER_RETRY_SECONDS secondes.
+    SCHEDULER_LEADER_ELECTION: str = Field(
+        "file",
+        env="SCHEDULER_LEADER_ELECTION"
+    )
+    SCHEDULER_LEADER_LOCK_FILE: str = Field(
+        "data/scheduler.lock",
+        env="SCHEDULER_LEADER_LOCK_FILE"
+    )
+    SCHEDULER_LEADER_TTL_SECONDS: int = Field(
+        60,
+        env="SCHEDULER_LEADER_TTL_SECONDS"
+    )
+    SCHEDULER_LEADER_RETRY_SECONDS: int = Field(
+        15,
+        env="SCHEDULER_LEADER_RETRY_SECONDS"
+    )
+
+    # Cadence adaptative du scanner : l'intervalle entre deux passages descend à SCANNER_CADENCE_MIN_SECONDS
+    # quand des rapports arrivent, puis double (SCANNER_CADENCE_BACKOFF_FACTOR) à chaque passage sans rapport,
+    # jusqu'à SCANNER_INTERVAL_MINUTES pendant une fenêtre de collecte (heures attendues des jobs actifs et
+    # heures d'arrivée apprises sur les SCANNER_CADENCE_LEARNING_DAYS derniers jours), jusqu'à
+    # SCANNER_CADENCE_MAX_SECONDS en dehors.
+    # Budget : au plus SCANNER_CADENCE_MAX_SCANS_PER_HOUR passages par heure, et une part du temps passée
+    # à scanner limitée à SCANNER_CADENCE_MAX_BUSY_RATIO. Désactivée par défaut : intervalle fixe
+    # SCANNER_INTERVAL_MINUTES.
+    SCANNER_ADAPTIVE_CADENCE_ENABLED: bool = Field(
+        False,
+        env="SCANNER_ADAPTIVE_CADENCE_ENABLED"
+    )
+    SCANNER_CADENCE_MIN_SECONDS: int = Field(
+        20,
+        env="SCANNER_CADENCE_MIN_SECONDS"
+    )
+    SCANNER_CADENCE_MAX_SECONDS: int = Field(
+        900,
+        env="SCANNER_CADENCE_MAX_SECONDS"
+    )
+    SCANNER_CADENCE_BACKOFF_FACTOR: float = Field(
+        2.0,
+        env="SCANNER_CADENCE_BACKOFF_FACTOR"
+    )
+    SCANNER_CADENCE_MAX_SCANS_PER_HOUR: int = Field(
+        120,
+        env="SCANNER_CADENCE_MAX_SCANS_PER_HOUR"
+    )
+    SCANNER_CADENCE_MAX_BUSY_RATIO: float = Field(
+        0.5,
+        env="SCANNER_CADENCE_MAX_BUSY_RATIO"
+    )
+    SCANNER_CADENCE_LEARNING_DAYS: int = Field(
+        7,
+        env="SCANNER_CADENCE_LEARNING_DAYS"
+    )
+
+    # Processus du scanner : RUN_SCANNER_IN_API=False laisse l'API sans planificateur, les scans étant
+    # exécutés par le worker dédié (`python -m app.scanner_worker`, service scanner-worker du compose).
+    # Le worker vérifie les fichiers déposés dans un pool de SCANNER_WORKER_PROCESSES processus
+    # (0 = un par CPU, 1 = vérification dans le processus du planificateur) et expose ses métriques
+    # Prometheus sur SCANNER_WORKER_METRICS_PORT (0 = désactivé). SCANNER_WORKER_NICE abaisse la priorité CPU
+    # du worker et de son pool (os.nice) : sur un hôte à peu de cœurs, l'API reste prioritaire sur les scans.
+    RUN_SCANNER_IN_API: bool = Field(
+        True,
+        env="RUN_SCANNER_IN_API"
+    )
+    SCANNER_WORKER_PROCESSES: int = Field(
+        0,
+        env="SCANNER_WORKER_PROCESSES"
+    )
+    SCANNER_WORKER_METRICS_PORT: int = Field(
+        0,
+        env="SCANNER_WORKER_METRICS_PORT"
+    )
+    SCANNER_WORKER_NICE: int = Field(
+        0,
+        env="SCANNER_WORKER_NICE"
+    )
+
+    # Analyse de l'historique des rapports après chaque passage planifié (app/services/backup_analytics.py,
+    # NumPy requis) : sur les ANALYTICS_LOOKBACK_DAYS derniers jours, chaque rapport d'une base est comparé
+    # aux ANALYTICS_WINDOW rapports précédents. Sont signalés une chute de taille d'au moins
+    # ANALYTICS_SIZE_DROP_RATIO (0.9 : fichier réduit de 90 %) et les tailles ou durées dont le z-score
+    # atteint ANALYTICS_ZSCORE_THRESHOLD.
+    SCANNER_ANALYTICS_ENABLED: bool = Field(
+        False,
+        env="SCANNER_ANALYTICS_ENABLED"
+    )
+    ANALYTICS_LOOKBACK_DAYS: int = Field(
+        90,
+        env="ANALYTICS_LOOKBACK_DAYS"
+    )
+    ANALYTICS_WINDOW: int = Field(
+        30,
+        env="ANALYTICS_WINDOW"
+    )
+    ANALYTICS_SIZE_DROP_RATIO: float = Field(
+        0.9,
+        env="ANALYTICS_SIZE_DROP_RATIO"
+    )
+    ANALYTICS_ZSCORE_THRESHOLD: float = Field(
+        3.0,
+        env="ANALYTICS_ZSCORE_THRESHOLD"
+    )
+
+    # Export colonnaire de l'historique backup_entries (app/services/history_export.py, pyarrow requis) :
+    # fichiers Parquet ou Arrow IPC (HISTORY_EXPORT_FORMAT) partitionnés par entreprise et par mois sous
+    # HISTORY_EXPORT_PATH, lus par lots de HISTORY_EXPORT_BATCH_SIZE lignes (mémoire bornée).
+    HISTORY_EXPORT_PATH: str = Field(
+        "data/exports/backup_history",
+        env="HISTORY_EXPORT_PATH"
+    )
+    HISTORY_EXPORT_FORMAT: str = Field(
+        "parquet",
+        env="HISTORY_EXPORT_FORMAT"
+    )
+    HISTORY_EXPORT_BATCH_SIZE: int = Field(
+        50000,
+        env="HISTORY_EXPORT_BATCH_SIZE"
+    )
+
     # Paramètres pour les notifications par e-mail
     EMAIL_HOST: Optional[str] = os.getenv("EMAIL_HOST")
     try:
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_api_load.py
+"""
+Test de charge des endpoints de consultation de l'API de surveillance.
+
+Une base SQLite temporaire est remplie avec N jobs et M entrées, puis C clients concurrents
+envoient un mélange pondéré de requêtes à l'application FastAPI, en processus
+(httpx.ASGITransport : pas de réseau, seule l'application est mesurée).
+
+Chaque scénario est exécuté :
+  - sans scan : l'API seule ;
+  - avec scan : scanner_MVP.run_new_scanner tourne en boucle dans un thread du même processus
+    (planificateur dans l'API, RUN_SCANNER_IN_API=true) sur une flotte synthétique, de nouveaux
+    rapports étant déposés avant chaque passage ;
+  - worker : la même boucle dans un processus séparé avec son pool de vérification
+    (worker scanner dédié, app/scanner_worker.py : --worker-processes processus, priorité
+    --worker-nice).
+
+Mesures par endpoint et au total : requêtes, erreurs (5xx ou exception), débit (req/s)
+et latences p50/p95/p99 en millisecondes.
+
+Mélange de requêtes (--mix nom=poids) :
+  jobs           GET /api/v1/expected-backup-jobs/?limit=100
+  job            GET /api/v1/expected-backup-jobs/{id}
+  entries        GET /api/v1/backup-entries/?limit=100
+  entries_by_job GET /api/v1/backup-entries/by_job/{id}
+  entry          GET /api/v1/backup-entries/{id}
+  scans          GET /api/v1/scans/
+
+Usage :
+    python scripts/benchmarks/bench_api_load.py
+    python scripts/benchmarks/bench_api_load.py --jobs 2000 --entries 200000 --concurrency 32 --duration 30
+    python scripts/benchmarks/bench_api_load.py --mix entries=5 jobs=1 --scenarios scan --json load.json
+    python scripts/benchmarks/bench_api_load.py --scenarios scan worker --worker-processes 2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from bench_common import print_table, write_json_results
+from bench_scanner_fleet import build_fleet, write_agent_reports
+
+SCENARIOS = ("idle", "scan", "worker")
+DEFAULT_MIX = {"jobs": 2, "job": 2, "entries": 3, "entries_by_job": 3, "entry": 2, "scans": 1}
+API = "/api/v1"
+
+
+def percentile(sorted_values: list, fraction: float):
+    """Percentile par rang le plus proche d'une liste déjà triée."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(values) -> dict:
+    mix = {}
+    for item in values:
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Requête inconnue dans --mix : {name} (choix : {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def request_path(name: str, rng: random.Random, job_ids: list, entry_max_id: int) -> str:
+    if name == "jobs":
+        return f"{API}/expected-backup-jobs/?limit=100&skip={rng.randrange(max(1, len(job_ids) - 100))}"
+    if name == "job":
+        return f"{API}/expected-backup-jobs/{rng.choice(job_ids)}"
+    if name == "entries":
+        return f"{API}/backup-entries/?limit=100"
+    if name == "entries_by_job":
+        return f"{API}/backup-entries/by_job/{rng.choice(job_ids)}?limit=50"
+    if name == "entry":
+        return f"{API}/backup-entries/{rng.randint(1, max(1, entry_max_id))}"
+    return f"{API}/scans/?limit=20"
+
+
+# --- Préparation de la base ---
+
+def seed_database(database, jobs: int, entries: int, fleet_jobs: list, seed: int) -> list:
+    """Insère les jobs de la flotte, N jobs synthétiques et M entrées (insertions groupées)."""
+    from sqlalchemy import insert
+    from app.models.models import BackupEntry, BackupEntryStatus, ExpectedBackupJob
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    job_rows = [
+        dict(year=2025, company_name=job["company"], city=job["city"], neighborhood=job["neighborhood"],
+             database_name=job["database_name"], agent_id_responsible=job["agent"],
+             agent_deposit_path_template="{agent}/databases", agent_log_deposit_path_template="{agent}/log",
+             final_storage_path_template="{company}/{city}/{year}", current_status="UNKNOWN", is_active=True,
+             created_at=now, updated_at=now)
+        for job in fleet_jobs
+    ]
+    for index in range(jobs):
+        job_rows.append(dict(
+            year=2025, company_name=f"LOAD{index // 10:05d}", city="YAOUNDE", neighborhood="CENTRE",
+            database_name=f"LOAD_DB{index:06d}", agent_id_responsible=f"LOAD{index // 10:05d}_YAOUNDE_CENTRE",
+            agent_deposit_path_template="{agent}/databases", agent_log_deposit_path_template="{agent}/log",
+            final_storage_path_template="{company}/{city}/{year}", current_status="SUCCESS", is_active=True,
+            created_at=now, updated_at=now))
+
+    statuses = [status.value for status in BackupEntryStatus]
+    session = database.SessionLocal()
+    try:
+        session.execute(insert(ExpectedBackupJob), job_rows)
+        job_ids = [job_id for (job_id,) in session.query(ExpectedBackupJob.id).all()]
+        batch = []
+        for index in range(entries):
+            created_at = now - timedelta(minutes=index)
+            batch.append(dict(
+                expected_job_id=rng.choice(job_ids), timestamp=created_at, created_at=created_at,
+                status=rng.choice(statuses), message="Entrée générée pour le test de charge",
+                expected_hash="0" * 64, server_calculated_staged_hash="0" * 64,
+                server_calculated_staged_size=1024 * 1024, operation_log_file_name=f"load_{index}.json"))
+            if len(batch) >= 10000:
+                session.execute(insert(BackupEntry), batch)
+                batch = []
+        if batch:
+            session.execute(insert(BackupEntry), batch)
+        session.commit()
+    finally:
+        session.close()
+    return job_ids
+
+
+# --- Scan concurrent ---
+
+class ScanLoop(threading.Thread):
+    """Exécute run_new_scanner en boucle, avec de nouveaux rapports déposés avant chaque passage."""
+
+    def __init__(self, fleet: dict, stop_event=None):
+        super().__init__(name="bench-scan-loop", daemon=True)
+        self.fleet = fleet
+        self.stop_event = stop_event or threading.Event()
+        self.passes = 0
+        self.errors = 0
+
+    def run(self) -> None:
+        from app.services.scanner_MVP import run_new_scanner
+        while not self.stop_event.is_set():
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            for agent in self.fleet["agents"]:
+                write_agent_reports(agent["log_dir"], agent["agent"], agent["databases"], 1, now)
+            try:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    run_new_scanner()
+                self.passes += 1
+            except Exception:
+                self.errors += 1
+            # Les rapports sont nommés à la seconde : éviter de réécrire un rapport déjà archivé
+            self.stop_event.wait(1.0)
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.join()
+
+
+def run_scan_worker(fleet: dict, env: dict, validated_dir: str, processes: int, nice: int, stop_event, passes,
+                    errors) -> None:
+    """Scénario worker : la boucle de scan dans un processus séparé, vérifications dans son pool."""
+    os.environ.update(env)
+    os.nice(nice)
+    logging.disable(logging.WARNING)
+    from config.settings import settings
+    from app.core import database
+    from app.services.verification_pool import shutdown_verification_pool, start_verification_pool
+
+    settings.BACKUP_STORAGE_ROOT = fleet["root"]
+    settings.VALIDATED_BACKUPS_BASE_PATH = validated_dir
+    database.engine.echo = False
+    start_verification_pool(processes)
+    scan_loop = ScanLoop(fleet, stop_event)
+    try:
+        scan_loop.run()
+    finally:
+        shutdown_verification_pool()
+        passes.value, errors.value = scan_loop.passes, scan_loop.errors
+
+
+class ScanProcess:
+    """Lance run_scan_worker dans un processus « spawn » et expose le même contrat que ScanLoop."""
+
+    def __init__(self, fleet: dict, validated_dir: str, processes: int, nice: int):
+        context = multiprocessing.get_context("spawn")
+        self.stop_event = context.Event()
+        self._passes, self._errors = context.Value("i", 0), context.Value("i", 0)
+        env = {name: os.environ[name] for name in ("DATABASE_URL", "BACKUP_STORAGE_ROOT")}
+        self.process = context.Process(target=run_scan_worker, name="bench-scan-worker", args=(
+            fleet, env, validated_dir, processes, nice, self.stop_event, self._passes, self._errors))
+
+    def start(self) -> None:
+        self.process.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.process.join()
+        self.passes, self.errors = self._passes.value, self._errors.value
+
+
+# --- Génération de charge ---
+
+async def run_load(app, mix: dict, concurrency: int, duration: float, job_ids: list, entry_max_id: int,
+                   seed: int) -> tuple:
+    import httpx
+
+    names, weights = list(mix), list(mix.values())
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    # Causes d'erreurs (classe d'exception ou code HTTP) et nombre d'occurrences
+    causes = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_index: int, client) -> None:
+        rng = random.Random(seed + worker_index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            path = request_path(name, rng, job_ids, entry_max_id)
+            start = time.perf_counter()
+            cause = None
+            try:
+                response = await client.get(path)
+                if response.status_code >= 500:
+                    cause = f"HTTP {response.status_code}"
+            except Exception as e:
+                # ASGITransport propage les exceptions de l'application (ex: OperationalError de SQLite)
+                cause = f"{type(e).__name__}: {str(e).splitlines()[0][:120]}"
+            latencies[name].append(time.perf_counter() - start)
+            if cause:
+                errors[name] += 1
+                causes[cause] = causes.get(cause, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(index, client) for index in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, causes, elapsed
+
+
+def summarize(scenario: str, latencies: dict, errors: dict, elapsed: float) -> list:
+    rows = []
+    all_latencies = []
+    for name, values in list(latencies.items()) + [("total", None)]:
+        if values is None:
+            values, error_count = all_latencies, sum(errors.values())
+        else:
+            all_latencies.extend(values)
+            error_count = errors[name]
+        ordered = sorted(values)
+        rows.append({
+            "scenario": scenario,
+            "endpoint": name,
+            "requests": len(ordered),
+            "errors": error_count,
+            "req_per_s": len(ordered) / elapsed if elapsed > 0 else None,
+            "p50_ms": percentile(ordered, 0.50) * 1000 if ordered else None,
+            "p95_ms": percentile(ordered, 0.95) * 1000 if ordered else None,
+            "p99_ms": percentile(ordered, 0.99) * 1000 if ordered else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=500, help="Jobs synthétiques (N)")
+    parser.add_argument("--entries", type=int, default=50000, help="Entrées synthétiques (M)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients concurrents")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de chaque scénario (secondes)")
+    parser.add_argument("--mix", nargs="+", help="Mélange de requêtes nom=poids (défaut : tous)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--scan-agents", type=int, default=10, help="Agents de la flotte scannée en parallèle")
+    parser.add_argument("--scan-databases", type=int, default=3, help="Bases par agent de la flotte scannée")
+    parser.add_argument("--scan-file-size-mb", type=float, default=16, help="Taille des fichiers de la flotte")
+    parser.add_argument("--worker-processes", type=int, default=2,
+                        help="Processus du pool de vérification du scénario worker")
+    parser.add_argument("--worker-nice", type=int, default=10, help="Priorité (nice) du processus worker")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--work-dir", help="Répertoire de travail (défaut : temporaire, supprimé)")
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="bench_api_load_")
+    os.makedirs(work_dir, exist_ok=True)
+    fleet = build_fleet(work_dir, args.scan_agents, args.scan_databases, int(args.scan_file_size_mb * 1024 * 1024),
+                        1, False)
+
+    # La base et la racine de stockage doivent être configurées avant l'import de l'application
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ["BACKUP_STORAGE_ROOT"] = fleet["root"]
+    logging.disable(logging.WARNING)
+
+    from config.settings import settings
+    from app.core import database
+    from app.main import app
+
+    settings.BACKUP_STORAGE_ROOT = fleet["root"]
+    settings.VALIDATED_BACKUPS_BASE_PATH = os.path.join(work_dir, "validated")
+    database.engine.echo = False
+    database.Base.metadata.create_all(bind=database.engine)
+
+    def get_bench_db():
+        db = database.SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[database.get_db] = get_bench_db
+
+    seed_start = time.perf_counter()
+    job_ids = seed_database(database, args.jobs, args.entries, fleet["jobs"], args.seed)
+    print(f"Base : {len(job_ids)} jobs, {args.entries} entrées ({time.perf_counter() - seed_start:.1f}s) — "
+          f"{args.concurrency} clients, {args.duration:.0f}s par scénario, mélange {mix}")
+
+    results, scan_passes, error_causes = [], {}, {}
+    try:
+        for scenario in args.scenarios:
+            scan_loop = None
+            if scenario == "scan":
+                scan_loop = ScanLoop(fleet)
+            elif scenario == "worker":
+                scan_loop = ScanProcess(fleet, settings.VALIDATED_BACKUPS_BASE_PATH, args.worker_processes,
+                                        args.worker_nice)
+            if scan_loop:
+                scan_loop.start()
+            try:
+                latencies, errors, causes, elapsed = asyncio.run(
+                    run_load(app, mix, args.concurrency, args.duration, job_ids, args.entries, args.seed))
+            finally:
+                if scan_loop:
+                    scan_loop.stop()
+                    scan_passes[scenario] = {"passes": scan_loop.passes, "errors": scan_loop.errors}
+            results.extend(summarize(scenario, latencies, errors, elapsed))
+            if causes:
+                error_causes[scenario] = causes
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results, ["scenario", "endpoint", "requests", "errors", "req_per_s", "p50_ms", "p95_ms", "p99_ms"])
+    for scenario, passes in scan_passes.items():
+        print(f"Scan concurrent ({scenario}) : {passes['passes']} passage(s) terminé(s), {passes['errors']} en erreur")
+    for scenario, causes in error_causes.items():
+        for cause, count in sorted(causes.items(), key=lambda item: -item[1]):
+            print(f"⚠️ {scenario} : {count} × {cause}")
+
+    if args.json_path:
+        write_json_results(args.json_path, "api_load", results,
+                           {"jobs": args.jobs, "entries": args.entries, "concurrency": args.concurrency,
+                            "duration": args.duration, "mix": mix, "scenarios": args.scenarios,
+                            "scan_agents": args.scan_agents, "scan_databases": args.scan_databases,
+                            "scan_file_size_mb": args.scan_file_size_mb, "worker_processes": args.worker_processes,
+                            "worker_nice": args.worker_nice,
+                            "scan": scan_passes,
+                            "error_causes": error_causes})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_backup_analytics.py
+"""
+Mesure l'analyse vectorisée de l'historique (app/services/backup_analytics.py) sur un historique
+synthétique de --series bases × --reports rapports (agent_reports / agent_report_databases, SQLite).
+
+Mesures :
+  - load    : requête triée et conversion en colonnes NumPy (load_report_history) ;
+  - compute : statistiques glissantes, percentiles et anomalies de toute la flotte ;
+  - python  : mêmes moyennes et écarts-types glissants (taille et durée) calculés rapport par rapport
+              en Python pur, pour comparaison (--skip-python pour l'omettre).
+
+Usage :
+    python scripts/benchmarks/bench_backup_analytics.py
+    python scripts/benchmarks/bench_backup_analytics.py --series 10000 --reports 100 --window 30 --json out.json
+"""
+
+import argparse
+import logging
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_common import print_table, write_json_results
+
+INSERT_BATCH = 20000
+
+
+def build_history(session, series: int, reports: int) -> None:
+    """Un rapport par jour et par base ; une base sur cent voit sa taille chuter de 95 % au dernier rapport."""
+    from sqlalchemy import insert
+    from app.models.models import AgentReport, AgentReportDatabase
+
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1, 22, 0)
+    report_rows, database_rows = [], []
+    report_id = 0
+    for series_index in range(series):
+        agent = f"BENCH{series_index:05d}_DOUALA_AKWA"
+        base_size = rng.randint(10, 5000) * 1024 * 1024
+        for day in range(reports):
+            report_id += 1
+            begin = start + timedelta(days=day)
+            duration = max(rng.gauss(600, 60), 60)
+            size = base_size * rng.uniform(0.98, 1.02)
+            if series_index % 100 == 0 and day == reports - 1:
+                size *= 0.05
+            report_rows.append({"id": report_id, "agent_id": agent, "operation_log_file_name": f"{day}.json",
+                                "operation_start_time": begin, "operation_end_time": begin + timedelta(seconds=duration),
+                                "overall_status": "completed", "database_count": 1,
+                                "ingested_at": begin})
+            database_rows.append({
+                "report_id": report_id, "database_name": "DB1", "backup_size": int(size * 4), "compress_size": int(size),
+                "backup_start_time": begin, "backup_end_time": begin + timedelta(seconds=duration * 0.6),
+                "compress_start_time": begin + timedelta(seconds=duration * 0.6),
+                "compress_end_time": begin + timedelta(seconds=duration * 0.8),
+                "transfer_start_time": begin + timedelta(seconds=duration * 0.8),
+                "transfer_end_time": begin + timedelta(seconds=duration)})
+            if len(report_rows) >= INSERT_BATCH:
+                session.execute(insert(AgentReport), report_rows)
+                session.execute(insert(AgentReportDatabase), database_rows)
+                report_rows, database_rows = [], []
+    if report_rows:
+        session.execute(insert(AgentReport), report_rows)
+        session.execute(insert(AgentReportDatabase), database_rows)
+    session.commit()
+
+
+def python_rolling(history: dict, window: int) -> int:
+    """Moyenne et écart-type des `window` rapports précédents, rapport par rapport ; retourne les chutes de taille."""
+    agents = history["agent_id"].tolist()
+    sizes = history["compress_size"].tolist()
+    starts = history["backup_start_time"].tolist()
+    ends = history["transfer_end_time"].tolist()
+    durations = [(end - begin).total_seconds() for begin, end in zip(starts, ends)]
+    drops, series_start = 0, 0
+    for index in range(len(sizes)):
+        if index and agents[index] != agents[index - 1]:
+            series_start = index
+        low = max(index - window, series_start)
+        for values in (sizes, durations):
+            previous = values[low:index]
+            if len(previous) < 3:
+                continue
+            mean = sum(previous) / len(previous)
+            std = math.sqrt(sum((value - mean) ** 2 for value in previous) / len(previous))
+            if values is sizes and values[index] <= 0.1 * mean:
+                drops += 1
+            _ = (values[index] - mean) / std if std else None
+    return drops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=2000)
+    parser.add_argument("--reports", type=int, default=100, help="Rapports par base")
+    parser.add_argument("--window", type=int, default=30)
+    parser.add_argument("--skip-python", action="store_true", help="N'exécute pas le calcul de référence en Python pur")
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_backup_analytics_")
+    try:
+        # La base doit être configurée avant l'import de l'application
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+        logging.disable(logging.WARNING)
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from app.core.database import Base
+        from app.services.backup_analytics import compute_fleet_analytics, load_report_history
+
+        engine = create_engine(f"sqlite:///{os.path.join(work_dir, 'history.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        build_start = time.perf_counter()
+        build_history(session, args.series, args.reports)
+        build_seconds = time.perf_counter() - build_start
+
+        start = time.perf_counter()
+        history = load_report_history(session)
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        analytics = compute_fleet_analytics(history, window=args.window)
+        compute_seconds = time.perf_counter() - start
+        results = [
+            {"phase": "load", "seconds": load_seconds, "rows": analytics.rows, "size_drops": None},
+            {"phase": "compute", "seconds": compute_seconds, "rows": analytics.rows,
+             "size_drops": sum("size_drop" in summary["anomalies"] for summary in analytics.series)},
+        ]
+        if not args.skip_python:
+            start = time.perf_counter()
+            drops = python_rolling(history, args.window)
+            results.append({"phase": "python", "seconds": time.perf_counter() - start, "rows": analytics.rows,
+                            "size_drops": drops})
+        session.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"Historique synthétique créé en {build_seconds:.1f}s")
+    print_table(results, ["phase", "seconds", "rows", "size_drops"])
+    if args.json_path:
+        write_json_results(args.json_path, "backup_analytics", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
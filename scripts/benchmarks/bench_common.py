@@ -0,0 +1,69 @@
+# scripts/benchmarks/bench_common.py
+# Fonctions partagées par les scripts de benchmark : mise en place du PYTHONPATH,
+# affichage tabulaire et écriture des résultats au format JSON (comparables entre commits).
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def git_revision() -> str:
+    """Retourne le commit courant (court) du dépôt, ou 'unknown' hors dépôt git."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def run_metadata() -> dict:
+    """Métadonnées jointes à chaque fichier de résultats."""
+    return {
+        "commit": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def print_table(rows: list, columns: list) -> None:
+    """Affiche une liste de dictionnaires sous forme de tableau aligné."""
+    if not rows:
+        print("(aucun résultat)")
+        return
+    cells = [[_format_cell(row.get(col)) for col in columns] for row in rows]
+    widths = [max(len(col), *(len(line[i]) for line in cells)) for i, col in enumerate(columns)]
+    print("  ".join(col.ljust(widths[i]) for i, col in enumerate(columns)))
+    print("  ".join("-" * w for w in widths))
+    for line in cells:
+        print("  ".join(value.ljust(widths[i]) for i, value in enumerate(line)))
+
+
+def write_json_results(path: str, benchmark: str, results, parameters: dict = None) -> None:
+    """Écrit les résultats d'un benchmark avec ses paramètres et ses métadonnées."""
+    payload = {
+        "benchmark": benchmark,
+        "metadata": run_metadata(),
+        "parameters": parameters or {},
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+    print(f"Résultats écrits dans {path}")
+
+
+def _format_cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:,.3f}"
+    if value is None:
+        return "-"
+    return str(value)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_hash_copy.py
+"""
+Microbenchmark des entrées/sorties de hachage et de copie des fichiers de sauvegarde.
+
+Balayages :
+  - hachage SHA-256 : taille de bloc × méthode de lecture (read, readinto, mmap)
+    × nombre de threads (N fichiers hachés en parallèle, hashlib libère le GIL) ;
+  - SHA-256 + empreinte courte (app.utils.crypto.calculate_file_digests) : en une lecture
+    (sha256_128 dérivé, blake2b128, xxh3_128 si xxhash est installé) ou en deux lectures ;
+  - copie : shutil.copy2 (implémentation actuelle de copy_file), shutil.copyfile,
+    boucle read/write, os.copy_file_range, os.sendfile ;
+  - cache de pages chaud (fichier relu) ou froid (pages évincées avec posix_fadvise DONTNEED,
+    au mieux : un système de fichiers réseau peut conserver son propre cache).
+
+Les fichiers de test (données pseudo-aléatoires réellement écrites) sont créés une fois
+dans --work-dir puis réutilisés. Les résultats servent à justifier les valeurs par défaut
+de app/utils/crypto.py et app/utils/file_operations.py.
+
+Usage :
+    python scripts/benchmarks/bench_hash_copy.py
+    python scripts/benchmarks/bench_hash_copy.py --sizes 1M 256M 10G --chunk-sizes 64K 1M 4M --cache cold warm
+    python scripts/benchmarks/bench_hash_copy.py --only hash --threads 1 2 4 --json hash.json
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_common import print_table, write_json_results
+
+from app.utils.crypto import calculate_file_digests, calculate_file_sha256, xxhash
+
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+RANDOM_BLOCK = 1024 * 1024
+
+
+def parse_size(value: str) -> int:
+    """Convertit '64K', '16M', '10G' ou un nombre d'octets en entier."""
+    value = value.strip().upper()
+    if value[-1] in UNITS:
+        return int(float(value[:-1]) * UNITS[value[-1]])
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+
+# --- Préparation des fichiers et du cache ---
+
+def ensure_test_file(work_dir: str, size: int, index: int = 0) -> str:
+    """Crée (une seule fois) un fichier de `size` octets de données pseudo-aléatoires."""
+    path = os.path.join(work_dir, f"bench_{format_size(size)}_{index}.bin")
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        return path
+    block = os.urandom(RANDOM_BLOCK)
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            written = f.write(block[:min(remaining, RANDOM_BLOCK)])
+            remaining -= written
+        f.flush()
+        os.fsync(f.fileno())
+    return path
+
+
+def drop_page_cache(path: str) -> bool:
+    """Évince les pages du fichier du cache (posix_fadvise DONTNEED). Retourne False si non supporté."""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def warm_page_cache(path: str) -> None:
+    with open(path, "rb") as f:
+        while f.read(4 * 1024 * 1024):
+            pass
+
+
+def prepare_cache(paths, cache: str) -> bool:
+    if cache == "cold":
+        return all(drop_page_cache(path) for path in paths)
+    for path in paths:
+        warm_page_cache(path)
+    return True
+
+
+# --- Méthodes de hachage ---
+
+def hash_read(path: str, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb", buffering=0) as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_readinto(path: str, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def hash_mmap(path: str, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    digest.update(view[offset:offset + chunk_size])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def hash_current(path: str, chunk_size: int) -> str:
+    """Implémentation actuelle (app.utils.crypto), avec sa taille de bloc par défaut."""
+    return calculate_file_sha256(path)
+
+
+def hash_two_pass_blake2b(path: str, chunk_size: int) -> str:
+    """SHA-256 puis empreinte BLAKE2b dans une seconde lecture du fichier."""
+    calculate_file_digests(path, ("blake2b128",))
+    return calculate_file_sha256(path)
+
+
+HASH_METHODS = {"read": hash_read, "readinto": hash_readinto, "mmap": hash_mmap, "current": hash_current,
+                "sha256+sha256_128": lambda path, chunk_size: calculate_file_digests(path, ("sha256", "sha256_128")),
+                "sha256+blake2b128": lambda path, chunk_size: calculate_file_digests(path, ("sha256", "blake2b128")),
+                "two_pass_blake2b128": hash_two_pass_blake2b}
+if xxhash is not None:
+    HASH_METHODS["sha256+xxh3_128"] = lambda path, chunk_size: calculate_file_digests(path, ("sha256", "xxh3_128"))
+# Méthodes de app.utils.crypto : taille de bloc par défaut, une seule mesure par taille
+FIXED_CHUNK_METHODS = {"current", "sha256+sha256_128", "sha256+blake2b128", "two_pass_blake2b128", "sha256+xxh3_128"}
+
+
+# --- Stratégies de copie ---
+
+def copy_read_write(source: str, destination: str, chunk_size: int) -> None:
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(source, "rb", buffering=0) as src, open(destination, "wb", buffering=0) as dst:
+        while True:
+            read = src.readinto(buffer)
+            if not read:
+                break
+            dst.write(view[:read])
+
+
+def copy_file_range(source: str, destination: str, chunk_size: int) -> None:
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), min(remaining, 1 << 30))
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def copy_sendfile(source: str, destination: str, chunk_size: int) -> None:
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst.fileno(), src.fileno(), offset, min(size - offset, 1 << 30))
+            if sent == 0:
+                break
+            offset += sent
+
+
+COPY_METHODS = {
+    "shutil.copy2": lambda source, destination, chunk_size: shutil.copy2(source, destination),
+    "shutil.copyfile": lambda source, destination, chunk_size: shutil.copyfile(source, destination),
+    "read_write": copy_read_write,
+}
+if hasattr(os, "copy_file_range"):
+    COPY_METHODS["copy_file_range"] = copy_file_range
+if hasattr(os, "sendfile"):
+    COPY_METHODS["sendfile"] = copy_sendfile
+
+
+# --- Mesures ---
+
+def measure(function, total_bytes: int) -> dict:
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "mb_per_s": total_bytes / elapsed / 1e6 if elapsed > 0 else None}
+
+
+def bench_hash(work_dir: str, size: int, method: str, chunk_size: int, threads: int, cache: str, repeat: int) -> dict:
+    paths = [ensure_test_file(work_dir, size, index) for index in range(threads)]
+    hash_function = HASH_METHODS[method]
+    best = None
+    for _ in range(repeat):
+        cache_ok = prepare_cache(paths, cache)
+        if threads == 1:
+            result = measure(lambda: hash_function(paths[0], chunk_size), size)
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                result = measure(lambda: list(executor.map(lambda p: hash_function(p, chunk_size), paths)),
+                                 size * threads)
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return {"operation": "hash", "size": format_size(size), "method": method,
+            "chunk": format_size(chunk_size) if method not in FIXED_CHUNK_METHODS else "défaut",
+            "threads": threads, "cache": cache if cache_ok else f"{cache} (non garanti)", **best}
+
+
+def bench_copy(work_dir: str, size: int, method: str, chunk_size: int, cache: str, repeat: int) -> dict:
+    source = ensure_test_file(work_dir, size)
+    destination = os.path.join(work_dir, "copy_destination.bin")
+    copy_function = COPY_METHODS[method]
+    best = None
+    for _ in range(repeat):
+        if os.path.exists(destination):
+            os.remove(destination)
+        cache_ok = prepare_cache([source], cache)
+        result = measure(lambda: copy_function(source, destination, chunk_size), size)
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    os.remove(destination)
+    uses_chunk = method == "read_write"
+    return {"operation": "copy", "size": format_size(size), "method": method,
+            "chunk": format_size(chunk_size) if uses_chunk else "-",
+            "threads": 1, "cache": cache if cache_ok else f"{cache} (non garanti)", **best}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1M", "64M", "256M"], help="Tailles de fichiers (1M ... 10G)")
+    parser.add_argument("--chunk-sizes", nargs="+", default=["8K", "64K", "256K", "1M", "4M"])
+    parser.add_argument("--hash-methods", nargs="+", choices=list(HASH_METHODS), default=list(HASH_METHODS))
+    parser.add_argument("--copy-methods", nargs="+", choices=list(COPY_METHODS), default=list(COPY_METHODS))
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--cache", nargs="+", choices=["warm", "cold"], default=["warm", "cold"])
+    parser.add_argument("--only", choices=["hash", "copy"], help="Limite le balayage au hachage ou à la copie")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions par mesure (la meilleure est retenue)")
+    parser.add_argument("--work-dir", help="Répertoire des fichiers de test (défaut : temporaire, supprimé)")
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes]
+    chunk_sizes = [parse_size(chunk) for chunk in args.chunk_sizes]
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="bench_hash_copy_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = []
+    try:
+        for size in sizes:
+            for cache in args.cache:
+                if args.only != "copy":
+                    for method in args.hash_methods:
+                        # L'implémentation actuelle a une taille de bloc fixe : une seule mesure par taille
+                        method_chunks = chunk_sizes[:1] if method in FIXED_CHUNK_METHODS else chunk_sizes
+                        for chunk_size in method_chunks:
+                            for threads in args.threads:
+                                results.append(bench_hash(work_dir, size, method, chunk_size, threads, cache,
+                                                          args.repeat))
+                if args.only != "hash":
+                    for method in args.copy_methods:
+                        method_chunks = chunk_sizes if method == "read_write" else chunk_sizes[:1]
+                        for chunk_size in method_chunks:
+                            results.append(bench_copy(work_dir, size, method, chunk_size, cache, args.repeat))
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results, ["operation", "size", "cache", "method", "chunk", "threads", "seconds", "mb_per_s"])
+
+    if args.json_path:
+        write_json_results(args.json_path, "hash_copy", results,
+                           {"sizes": args.sizes, "chunk_sizes": args.chunk_sizes, "threads": args.threads,
+                            "cache": args.cache, "repeat": args.repeat})
+
+
+if __name__ == "__main__":
+    main()
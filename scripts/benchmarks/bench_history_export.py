@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_history_export.py
+"""
+Compare l'extraction de l'historique backup_entries par l'API JSON paginée (GET <API_V1_STR>/backup-entries/)
+à l'export colonnaire (app/services/history_export.py), sur --entries entrées synthétiques (SQLite).
+
+Scénarios :
+  - api          : pages de --page-size entrées via TestClient, limitées aux --api-entries premières
+                   entrées (débit extrapolé sur l'historique complet) ;
+  - parquet      : export complet en Parquet partitionné par entreprise et par mois ;
+  - arrow        : export complet en Arrow IPC ;
+  - incremental  : export Parquet des seules entrées ajoutées depuis (--new-entries).
+
+Mesures : durée, entrées, débit, octets produits (corps JSON ou fichiers) et pic de mémoire Arrow.
+
+Usage :
+    python scripts/benchmarks/bench_history_export.py
+    python scripts/benchmarks/bench_history_export.py --entries 2000000 --batch-size 100000 --json out.json
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_common import print_table, write_json_results
+
+INSERT_BATCH = 50000
+COMPANIES = 50
+
+
+def build_history(engine, entries: int, first_id: int = 1) -> None:
+    """Entrées réparties sur COMPANIES jobs, une toutes les 5 minutes à partir du 1er janvier 2025."""
+    from sqlalchemy import insert
+    from app.models.models import BackupEntry
+
+    start = datetime(2025, 1, 1)
+    rows = []
+    with engine.begin() as connection:
+        for index in range(first_id, first_id + entries):
+            timestamp = start + timedelta(minutes=5 * index)
+            rows.append({
+                "id": index, "expected_job_id": index % COMPANIES + 1, "timestamp": timestamp,
+                "status": "SUCCESS" if index % 10 else "UNCHANGED", "message": "Nouveau backup validé.",
+                "expected_hash": f"{index:064x}", "operation_log_file_name": f"{timestamp:%Y%m%d_%H%M%S}_AGENT.json",
+                "agent_id": f"AGENT{index % COMPANIES}", "agent_overall_status": "completed",
+                "server_calculated_staged_hash": f"{index:064x}", "server_calculated_staged_size": index * 1024,
+                "previous_successful_hash_global": f"{index:064x}", "hash_comparison_result": True,
+                "verification_tier": "sha256", "content_fingerprint": f"sha256_128:{index:032x}",
+                "created_at": timestamp,
+            })
+            if len(rows) >= INSERT_BATCH:
+                connection.execute(insert(BackupEntry), rows)
+                rows = []
+        if rows:
+            connection.execute(insert(BackupEntry), rows)
+
+
+def folder_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(folder, name)) for folder, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=500000)
+    parser.add_argument("--new-entries", type=int, default=5000)
+    parser.add_argument("--api-entries", type=int, default=50000, help="Entrées lues par l'API (0 : scénario omis)")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_history_export_")
+    try:
+        # La base doit être configurée avant l'import de l'application
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+        os.environ["RUN_SCANNER_IN_API"] = "false"
+        logging.disable(logging.WARNING)
+        import pyarrow as pa
+        from app.core import database
+        from app.models.models import ExpectedBackupJob
+        from app.services.history_export import export_backup_history
+
+        engine = database.get_engine()
+        engine.echo = False
+        database.Base.metadata.create_all(bind=engine)
+        session = database.SessionLocal()
+        session.add_all(ExpectedBackupJob(
+            year=2025, company_name=f"BENCH{index:03d}", city="DOUALA", neighborhood="AKWA", database_name="DB1",
+            agent_id_responsible=f"AGENT{index}", agent_deposit_path_template="x", agent_log_deposit_path_template="y",
+            final_storage_path_template="z", current_status="UNKNOWN", is_active=True) for index in range(COMPANIES))
+        session.commit()
+        build_history(engine, args.entries)
+        results = []
+
+        if args.api_entries:
+            from fastapi.testclient import TestClient
+            from app.main import app
+            from config.settings import settings
+
+            def bench_db():
+                # get_db exécute un PRAGMA en texte brut que SQLAlchemy 2 refuse : session simple
+                db = database.SessionLocal()
+                try:
+                    yield db
+                finally:
+                    db.close()
+
+            app.dependency_overrides[database.get_db] = bench_db
+            with TestClient(app) as client:
+                start, rows, body_bytes = time.perf_counter(), 0, 0
+                while rows < min(args.api_entries, args.entries):
+                    response = client.get(f"{settings.API_V1_STR}/backup-entries/",
+                                          params={"skip": rows, "limit": args.page_size})
+                    response.raise_for_status()
+                    page = response.json()
+                    if not page:
+                        break
+                    rows += len(page)
+                    body_bytes += len(response.content)
+                seconds = time.perf_counter() - start
+            results.append({"scenario": "api", "seconds": seconds, "entries": rows,
+                            "entries_per_second": rows / seconds, "mb_written": body_bytes / 1024 / 1024,
+                            "arrow_peak_mb": None})
+
+        pool = pa.default_memory_pool()
+        for scenario, fmt in (("parquet", "parquet"), ("arrow", "arrow"), ("incremental", "parquet")):
+            output = os.path.join(work_dir, f"export_{fmt}")
+            if scenario == "incremental":
+                build_history(engine, args.new_entries, first_id=args.entries + 1)
+            size_before = folder_size(output) if os.path.isdir(output) else 0
+            start = time.perf_counter()
+            stats = export_backup_history(session, output, fmt, args.batch_size, full=scenario != "incremental")
+            seconds = time.perf_counter() - start
+            results.append({"scenario": scenario, "seconds": seconds, "entries": stats["rows"],
+                            "entries_per_second": stats["rows"] / seconds,
+                            "mb_written": (folder_size(output) - size_before) / 1024 / 1024,
+                            "arrow_peak_mb": pool.max_memory() / 1024 / 1024})
+        session.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results, ["scenario", "seconds", "entries", "entries_per_second", "mb_written", "arrow_peak_mb"])
+    if args.json_path:
+        write_json_results(args.json_path, "history_export", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_io_cache.py
+"""
+Mesure l'effet du mode d'E/S du scanner (SCANNER_IO_CACHE_MODE, app/utils/page_cache.py) sur la
+latence de l'API pendant un gros passage.
+
+Une base SQLite « API » (--db-rows lignes) est lue entièrement pour être chaude dans le cache de
+pages, puis, pour chaque mode, un processus fils hache (et, avec --copy, copie) --data-gb Gio de
+sauvegardes avec calculate_file_sha256 / copy_file. Pendant ce temps, le processus principal
+exécute des lectures ponctuelles aléatoires sur la base (latence p50/p95/p99), et continue
+--after-queries requêtes une fois le passage terminé. Pour que l'éviction soit visible, --data-gb
+doit dépasser la mémoire libre de la machine.
+
+Mesures : latence des requêtes pendant et après le passage, part de la base et des sauvegardes
+encore présente dans le cache de pages (mincore) après le passage, débit du passage.
+
+Usage :
+    python scripts/benchmarks/bench_io_cache.py
+    python scripts/benchmarks/bench_io_cache.py --data-gb 6 --copy --modes cache dontneed --json out.json
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import mmap
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from bench_common import project_root, print_table, write_json_results
+
+from app.utils.crypto import calculate_file_sha256
+from app.utils.file_operations import copy_file
+from app.utils.page_cache import IO_MODES, drop_cached_range
+
+PAGE_SIZE = mmap.PAGESIZE
+_libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+
+def resident_fraction(path: str) -> float:
+    """Part des pages de `path` présentes dans le cache de pages (mincore)."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0.0
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_COPY)
+    try:
+        pages = (size + PAGE_SIZE - 1) // PAGE_SIZE
+        vector = (ctypes.c_ubyte * pages)()
+        address = ctypes.addressof(ctypes.c_char.from_buffer(mapped))
+        if _libc.mincore(ctypes.c_void_p(address), ctypes.c_size_t(size), vector) != 0:
+            raise OSError(ctypes.get_errno(), "mincore")
+        return sum(byte & 1 for byte in vector) / pages
+    finally:
+        del address
+        mapped.close()
+
+
+def drop_from_cache(path: str) -> None:
+    with open(path, "rb") as f:
+        drop_cached_range(f.fileno(), 0, 0)
+
+
+def warm(path: str) -> None:
+    with open(path, "rb") as f:
+        while f.read(8 * 1024 * 1024):
+            pass
+
+
+def build_api_db(path: str, rows: int) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE backup_entries (id INTEGER PRIMARY KEY, payload TEXT)")
+    payload = "x" * 400
+    connection.executemany("INSERT INTO backup_entries VALUES (?, ?)", ((i, payload) for i in range(rows)))
+    connection.commit()
+    connection.close()
+
+
+def build_data(directory: str, data_gb: float, files: int) -> list:
+    """Écrit les sauvegardes (contenu aléatoire) puis les retire du cache."""
+    file_size = int(data_gb * 1024 ** 3 / files)
+    block = os.urandom(8 * 1024 * 1024)
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, f"backup_{index:03d}.sql.gz")
+        with open(path, "wb") as f:
+            remaining = file_size
+            while remaining > 0:
+                remaining -= f.write(block[:min(len(block), remaining)])
+            f.flush()
+            os.fsync(f.fileno())
+        drop_from_cache(path)
+        paths.append(path)
+    return paths
+
+
+def scan(mode: str, paths: list, copy_dir: str) -> None:
+    """Passage du scanner (processus fils) : hachage puis copie éventuelle de chaque sauvegarde."""
+    for path in paths:
+        calculate_file_sha256(path, io_mode=mode)
+        if copy_dir:
+            destination = os.path.join(copy_dir, os.path.basename(path))
+            copy_file(path, destination, io_mode=mode)
+            os.remove(destination)
+
+
+def percentile(values: list, fraction: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_mode(mode: str, db_path: str, rows: int, paths: list, copy_dir: str, after_queries: int, seed: int) -> dict:
+    for path in paths:
+        drop_from_cache(path)
+    warm(db_path)
+    rng = random.Random(seed)
+    connection = sqlite3.connect(db_path)
+    # Cache SQLite minimal : chaque lecture passe par le cache de pages du noyau
+    connection.execute("PRAGMA cache_size = 0")
+
+    def query() -> float:
+        start = time.perf_counter()
+        connection.execute("SELECT payload FROM backup_entries WHERE id = ?", (rng.randrange(rows),)).fetchone()
+        return (time.perf_counter() - start) * 1000
+
+    scanner = multiprocessing.Process(target=scan, args=(mode, paths, copy_dir))
+    start = time.perf_counter()
+    scanner.start()
+    during = []
+    while scanner.is_alive():
+        during.append(query())
+        time.sleep(0.001)
+    scanner.join()
+    scan_seconds = time.perf_counter() - start
+    db_resident = resident_fraction(db_path)
+    data_resident = sum(resident_fraction(path) for path in paths) / len(paths)
+    after = [query() for _ in range(after_queries)]
+    connection.close()
+
+    total_gb = sum(os.path.getsize(path) for path in paths) / 1024 ** 3
+    return {
+        "mode": mode,
+        "scan_s": scan_seconds,
+        "scan_gb_per_s": total_gb / scan_seconds,
+        "during_p50_ms": percentile(during, 0.50),
+        "during_p95_ms": percentile(during, 0.95),
+        "during_p99_ms": percentile(during, 0.99),
+        "db_resident_after": db_resident,
+        "data_resident_after": data_resident,
+        "after_p95_ms": percentile(after, 0.95),
+        "after_p99_ms": percentile(after, 0.99),
+        "after_max_ms": max(after) if after else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-gb", type=float, default=2.0)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--db-rows", type=int, default=500_000)
+    parser.add_argument("--after-queries", type=int, default=20_000)
+    parser.add_argument("--copy", action="store_true", help="Copie aussi chaque sauvegarde (promotion)")
+    parser.add_argument("--modes", nargs="*", choices=IO_MODES, default=list(IO_MODES))
+    parser.add_argument("--work-dir", default=None, help="Répertoire de travail (même disque que les sauvegardes)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_io_cache_", dir=args.work_dir)
+    try:
+        db_path = os.path.join(work_dir, "api.db")
+        build_api_db(db_path, args.db_rows)
+        paths = build_data(work_dir, args.data_gb, args.files)
+        copy_dir = None
+        if args.copy:
+            copy_dir = os.path.join(work_dir, "validated")
+            os.makedirs(copy_dir)
+        results = [run_mode(mode, db_path, args.db_rows, paths, copy_dir, args.after_queries, args.seed)
+                   for mode in args.modes]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results, ["mode", "scan_s", "scan_gb_per_s", "during_p50_ms", "during_p95_ms", "during_p99_ms",
+                          "db_resident_after", "data_resident_after", "after_p95_ms", "after_p99_ms", "after_max_ms"])
+    if args.json_path:
+        write_json_results(args.json_path, "io_cache", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_io_throttle.py
+"""
+Mesure l'effet du budget d'E/S du scanner (app/utils/io_throttle.py) sur un dépôt d'agent
+concurrent écrivant sur le même volume.
+
+Pour chaque débit de --rates (0 = illimité), un processus fils « agent » écrit --upload-mb Mio
+par blocs de 1 Mio (fsync toutes les 8 Mio, comme un transfert qui persiste au fil de l'eau)
+pendant que le processus principal hache --data-mb Mio de sauvegardes froides (retirées du cache)
+avec calculate_file_sha256 et le budget configuré. Le hachage boucle sur les fichiers tant que
+le dépôt n'est pas terminé.
+
+Mesures : débit du dépôt, débit du hachage et sa régularité (écart-type du débit par fichier).
+
+Usage :
+    python scripts/benchmarks/bench_io_throttle.py
+    python scripts/benchmarks/bench_io_throttle.py --rates 0 200M 50M --upload-mb 2048 --json out.json
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from unittest import mock
+
+from bench_common import project_root, print_table, write_json_results
+
+from app.utils.crypto import calculate_file_sha256
+from app.utils.io_throttle import TokenBucket, parse_byte_rate
+from app.utils.page_cache import drop_cached_range
+
+MIB = 1024 * 1024
+
+
+def drop_from_cache(path: str) -> None:
+    with open(path, "rb") as f:
+        drop_cached_range(f.fileno(), 0, 0)
+
+
+def build_data(directory: str, data_mb: int, files: int) -> list:
+    block = os.urandom(MIB)
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, f"backup_{index:03d}.sql.gz")
+        with open(path, "wb") as f:
+            for _ in range(max(1, data_mb // files)):
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        drop_from_cache(path)
+        paths.append(path)
+    return paths
+
+
+def upload(path: str, upload_mb: int, result) -> None:
+    """Dépôt d'agent : écriture séquentielle avec fsync régulier."""
+    block = os.urandom(MIB)
+    start = time.perf_counter()
+    with open(path, "wb") as f:
+        for index in range(upload_mb):
+            f.write(block)
+            if index % 8 == 7:
+                f.flush()
+                os.fsync(f.fileno())
+        f.flush()
+        os.fsync(f.fileno())
+    result.value = time.perf_counter() - start
+
+
+def run_rate(rate: str, paths: list, upload_path: str, upload_mb: int, burst: str) -> dict:
+    for path in paths:
+        drop_from_cache(path)
+    bucket = TokenBucket(rate, burst, "")
+    samples = []
+    upload_seconds = multiprocessing.Value("d", 0.0)
+    agent = multiprocessing.Process(target=upload, args=(upload_path, upload_mb, upload_seconds))
+
+    start = time.perf_counter()
+    agent.start()
+    with mock.patch("app.utils.crypto.io_throttle", bucket):
+        while agent.is_alive():
+            for path in paths:
+                file_start = time.perf_counter()
+                calculate_file_sha256(path, io_mode="dontneed")
+                samples.append(os.path.getsize(path) / MIB / (time.perf_counter() - file_start))
+                if not agent.is_alive():
+                    break
+    agent.join()
+    elapsed = time.perf_counter() - start
+    os.remove(upload_path)
+
+    state = bucket.state()
+    return {
+        "rate": rate,
+        "upload_mb_per_s": upload_mb / upload_seconds.value,
+        "hash_mb_per_s": state["total_bytes"] / MIB / elapsed,
+        "hash_stdev_mb_per_s": statistics.pstdev(samples) if len(samples) > 1 else None,
+        "hash_wait_s": state["total_wait_seconds"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", nargs="*", default=["0", "200M", "100M", "50M"])
+    parser.add_argument("--burst", default="16M")
+    parser.add_argument("--data-mb", type=int, default=1024)
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--upload-mb", type=int, default=4096)
+    parser.add_argument("--work-dir", default=None, help="Répertoire de travail (volume des dépôts)")
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    for rate in args.rates:
+        parse_byte_rate(rate)
+    work_dir = tempfile.mkdtemp(prefix="bench_io_throttle_", dir=args.work_dir)
+    try:
+        paths = build_data(work_dir, args.data_mb, args.files)
+        results = [run_rate(rate, paths, os.path.join(work_dir, "upload.part"), args.upload_mb, args.burst)
+                   for rate in args.rates]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results, ["rate", "upload_mb_per_s", "hash_mb_per_s", "hash_stdev_mb_per_s", "hash_wait_s"])
+    if args.json_path:
+        write_json_results(args.json_path, "io_throttle", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
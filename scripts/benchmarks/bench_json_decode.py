@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_json_decode.py
+"""
+Mesure le coût de décodage des rapports STATUS.json pour chaque décodeur disponible
+(bibliothèque standard, orjson...) sur des rapports multi-bases réalistes.
+
+Usage :
+    python scripts/benchmarks/bench_json_decode.py
+    python scripts/benchmarks/bench_json_decode.py --file chemin/vers/rapport.json --iterations 20000 --json out.json
+"""
+
+import argparse
+import os
+import time
+
+from bench_common import project_root, print_table, write_json_results
+
+from app.utils.json_decoder import available_decoders, decode_report, read_report_bytes
+
+# Rapport multi-bases réel servant de référence par défaut.
+DEFAULT_REPORT_PATH = os.path.join(project_root, "2025-06-20_08-37-35_SIRPACAM_BAFOUSSAM_ORANGE.json")
+
+
+def benchmark_decoder(name: str, data: bytes, iterations: int) -> dict:
+    """Décode `iterations` fois le même contenu et retourne les statistiques de débit."""
+    decode_report(data, name)  # Préchauffage
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_report(data, name)
+    elapsed = time.perf_counter() - start
+    return {
+        "decoder": name,
+        "iterations": iterations,
+        "total_s": elapsed,
+        "us_per_report": elapsed / iterations * 1e6,
+        "reports_per_s": iterations / elapsed,
+        "mb_per_s": len(data) * iterations / elapsed / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="Rapport JSON à décoder (défaut : rapport BAFOUSSAM_ORANGE 08-37-35)")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    report_path = args.file or DEFAULT_REPORT_PATH
+    if not os.path.exists(report_path):
+        parser.error("Aucun rapport de référence trouvé, utilisez --file.")
+
+    data = read_report_bytes(report_path)
+    print(f"Rapport : {report_path} ({len(data)} octets)")
+
+    results = [benchmark_decoder(name, data, args.iterations) for name in available_decoders()]
+    print_table(results, ["decoder", "iterations", "us_per_report", "reports_per_s", "mb_per_s"])
+
+    if args.json_path:
+        write_json_results(args.json_path, "json_decode", results,
+                           {"file": os.path.relpath(report_path, project_root), "size_bytes": len(data),
+                            "iterations": args.iterations})
+
+
+if __name__ == "__main__":
+    main()
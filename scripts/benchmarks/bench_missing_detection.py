@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_missing_detection.py
+"""
+Compare les deux chemins de détection des sauvegardes manquantes (MISSING) de BackupScanner :
+  - per_job   : _handle_missing_or_unknown_job, une requête BackupEntry et un commit par job ;
+  - set_based : _handle_missing_jobs (app/services/missing_evaluator.py), une requête groupée
+                et un seul commit pour toutes les entrées MISSING.
+
+Une base SQLite est créée avec N jobs (heures attendues réparties sur la journée) et
+--history-days jours d'historique par job ; une fraction --missing-ratio des jobs n'a pas
+d'entrée pour le cycle courant. Chaque chemin s'exécute sur sa propre copie de la base.
+Mesures : temps, requêtes SQL exécutées, entrées MISSING créées (identiques entre les chemins).
+
+Usage :
+    python scripts/benchmarks/bench_missing_detection.py
+    python scripts/benchmarks/bench_missing_detection.py --jobs 1000 10000 --history-days 30 --json out.json
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from bench_common import project_root, print_table, write_json_results
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.models import BackupEntry, ExpectedBackupJob
+from app.services.scanner import BackupScanner
+
+PATHS = ("per_job", "set_based")
+WINDOW_MINUTES = 60
+NOW = datetime(2026, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def seed_database(path: str, jobs: int, history_days: int, missing_ratio: float, seed: int) -> None:
+    """Crée la base : N jobs et leur historique quotidien (insertions groupées)."""
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine, tables=[ExpectedBackupJob.__table__, BackupEntry.__table__])
+    naive_now = NOW.replace(tzinfo=None)
+    job_rows = [
+        dict(id=index + 1, year=2026, company_name=f"BENCH{index // 10:05d}", city="DOUALA", neighborhood="AKWA",
+             database_name=f"BENCH_DB{index:06d}", expected_hour_utc=rng.randrange(24),
+             expected_minute_utc=rng.randrange(60), agent_id_responsible=f"BENCH{index // 10:05d}_DOUALA_AKWA",
+             agent_deposit_path_template="{agent}/databases", agent_log_deposit_path_template="{agent}/log",
+             final_storage_path_template="{company}/{city}/{year}", current_status="SUCCESS", is_active=True,
+             created_at=naive_now, updated_at=naive_now)
+        for index in range(jobs)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(ExpectedBackupJob), job_rows)
+        batch = []
+        for job in job_rows:
+            # Jour 0 = cycle courant, absent pour les jobs "manquants"
+            first_day = 1 if rng.random() < missing_ratio else 0
+            expected_today = naive_now.replace(hour=job["expected_hour_utc"], minute=job["expected_minute_utc"])
+            if expected_today > naive_now:
+                expected_today -= timedelta(days=1)
+            for day in range(first_day, history_days):
+                timestamp = expected_today - timedelta(days=day) + timedelta(minutes=rng.randrange(30))
+                batch.append(dict(expected_job_id=job["id"], timestamp=timestamp, created_at=timestamp,
+                                  status="SUCCESS", message="Entrée générée pour le benchmark"))
+            if len(batch) >= 10000:
+                connection.execute(insert(BackupEntry), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(BackupEntry), batch)
+    engine.dispose()
+
+
+def run_path(path_name: str, db_path: str) -> dict:
+    engine = create_engine(f"sqlite:///{db_path}")
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    session = sessionmaker(bind=engine)()
+    jobs = session.query(ExpectedBackupJob).all()
+    scanner = BackupScanner(session)
+    statements.clear()
+
+    with mock.patch("app.services.scanner.get_utc_now", return_value=NOW), \
+            mock.patch.object(scanner.settings, "SCANNER_REPORT_COLLECTION_WINDOW_MINUTES", WINDOW_MINUTES):
+        start = time.perf_counter()
+        if path_name == "per_job":
+            for job in jobs:
+                scanner._handle_missing_or_unknown_job(job)
+        else:
+            scanner._handle_missing_jobs(jobs, NOW)
+        elapsed = time.perf_counter() - start
+
+    created = sorted(job_id for (job_id,) in session.query(BackupEntry.expected_job_id).filter(
+        BackupEntry.timestamp == NOW.replace(tzinfo=None)))
+    session.close()
+    engine.dispose()
+    return {"elapsed_s": elapsed, "sql_statements": len(statements), "missing_created": len(created),
+            "created_ids": created}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--history-days", type=int, default=7)
+    parser.add_argument("--missing-ratio", type=float, default=0.1)
+    parser.add_argument("--paths", nargs="*", choices=PATHS, default=list(PATHS))
+    parser.add_argument("--seed", type=int, default=40)
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    results = []
+    work_dir = tempfile.mkdtemp(prefix="bench_missing_")
+    try:
+        for jobs in args.jobs:
+            seed_path = f"{work_dir}/seed_{jobs}.db"
+            seed_database(seed_path, jobs, args.history_days, args.missing_ratio, args.seed)
+            created_by_path = {}
+            for path_name in args.paths:
+                db_path = f"{work_dir}/{path_name}_{jobs}.db"
+                shutil.copyfile(seed_path, db_path)
+                result = run_path(path_name, db_path)
+                created_by_path[path_name] = result.pop("created_ids")
+                results.append({"path": path_name, "jobs": jobs, **result})
+            identical = len({tuple(ids) for ids in created_by_path.values()}) <= 1
+            for row in results[-len(args.paths):]:
+                row["identical"] = identical
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results, ["path", "jobs", "elapsed_s", "sql_statements", "missing_created", "identical"])
+    if args.json_path:
+        write_json_results(args.json_path, "missing_detection", results,
+                           {"jobs": args.jobs, "history_days": args.history_days,
+                            "missing_ratio": args.missing_ratio, "paths": args.paths, "seed": args.seed})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_report_replay.py
+"""
+Compare la reconstruction d'un historique par rejeu des rapports archivés (app/services/report_replay.py)
+à son retraitement par le scanner, sur une flotte synthétique (bench_scanner_fleet.build_fleet) dont
+chaque agent a --days jours de rapports dans log/_archive (--per-day rapports par jour).
+
+Scénarios, chacun sur sa propre base SQLite :
+  - scanner      : rapports remis dans log/ puis un passage run_scan (chaque rapport est ingéré,
+                   chaque fichier re-haché, une transaction par rapport) ; notifications désactivées ;
+  - replay       : replay_archived_reports en ligne (un processus) ;
+  - replay_pool  : replay_archived_reports avec --workers processus ;
+  - replay_again : second rejeu sur la même base (entrées existantes conservées).
+
+Mesures : durée, rapports, entrées écrites, fichiers et octets hachés.
+
+Usage :
+    python scripts/benchmarks/bench_report_replay.py
+    python scripts/benchmarks/bench_report_replay.py --agents 200 --days 30 --per-day 2 --workers 4 --json out.json
+    python scripts/benchmarks/bench_report_replay.py --skip-scanner
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from bench_common import print_table, write_json_results
+from bench_scanner_fleet import build_fleet, write_agent_reports
+
+
+def write_archives(fleet: dict, days: int, per_day: int) -> int:
+    """Écrit l'historique archivé de chaque agent, le rapport le plus récent daté d'hier."""
+    end = datetime.now(timezone.utc).replace(hour=22, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    count = 0
+    for agent in fleet["agents"]:
+        archive_dir = os.path.join(agent["log_dir"], "_archive")
+        os.makedirs(archive_dir, exist_ok=True)
+        for day in range(days):
+            for index in range(per_day):
+                report_time = end - timedelta(days=day, hours=index * 24 / per_day)
+                write_agent_reports(archive_dir, agent["agent"], agent["databases"], 1, report_time)
+                count += 1
+    return count
+
+
+def new_session(work_dir: str, name: str, fleet: dict):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.models.models import ExpectedBackupJob
+
+    engine = create_engine(f"sqlite:///{os.path.join(work_dir, name + '.db')}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(ExpectedBackupJob(
+        year=2025, company_name=job["company"], city=job["city"], neighborhood=job["neighborhood"],
+        database_name=job["database_name"], agent_id_responsible=job["agent"],
+        agent_deposit_path_template="{agent}/databases", agent_log_deposit_path_template="{agent}/log",
+        final_storage_path_template="{company}/{city}/{year}", current_status="UNKNOWN", is_active=True)
+        for job in fleet["jobs"])
+    session.commit()
+    return session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--databases", type=int, default=3)
+    parser.add_argument("--file-size-mb", type=float, default=4)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--per-day", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processus du scénario replay_pool")
+    parser.add_argument("--skip-scanner", action="store_true", help="Ne mesure pas le retraitement par le scanner")
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_report_replay_")
+    try:
+        fleet = build_fleet(work_dir, args.agents, args.databases, int(args.file_size_mb * 1024 * 1024), 0, False)
+        reports = write_archives(fleet, args.days, args.per_day)
+        # La base doit être configurée avant l'import de l'application
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+        logging.disable(logging.WARNING)
+
+        from config.settings import settings
+        from app.cli import run_scan
+        from app.services.report_replay import replay_archived_reports
+
+        settings.BACKUP_STORAGE_ROOT = fleet["root"]
+        settings.VALIDATED_BACKUPS_BASE_PATH = os.path.join(work_dir, "validated")
+        results = []
+
+        if not args.skip_scanner:
+            for agent in fleet["agents"]:
+                archive_dir = os.path.join(agent["log_dir"], "_archive")
+                for name in os.listdir(archive_dir):
+                    shutil.copy(os.path.join(archive_dir, name), agent["log_dir"])
+            session = new_session(work_dir, "scanner", fleet)
+            start = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                    patch("app.services.scanner_MVP.notify_backup_status_change"):
+                stats = run_scan(session, archive=False, workers=1)
+            results.append({"scenario": "scanner", "seconds": time.perf_counter() - start,
+                            "reports": stats["reports_processed"], "entries": sum(stats["status_counts"].values()),
+                            "files_hashed": stats["files_hashed"], "mb_hashed": stats["bytes_hashed"] / 1024 / 1024})
+            session.close()
+
+        def replay(scenario, session, workers):
+            start = time.perf_counter()
+            stats = replay_archived_reports(session, workers=workers)
+            results.append({"scenario": scenario, "seconds": time.perf_counter() - start,
+                            "reports": stats.get("reports_replayed", 0), "entries": stats.get("entries_written", 0),
+                            "files_hashed": stats.get("files_hashed", 0),
+                            "mb_hashed": stats.get("bytes_hashed", 0) / 1024 / 1024})
+
+        session = new_session(work_dir, "replay", fleet)
+        replay("replay", session, 1)
+        session.close()
+        session = new_session(work_dir, "replay_pool", fleet)
+        replay("replay_pool", session, args.workers)
+        replay("replay_again", session, args.workers)
+        session.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{reports} rapport(s) archivé(s), {len(fleet['jobs'])} job(s)")
+    print_table(results, ["scenario", "seconds", "reports", "entries", "files_hashed", "mb_hashed"])
+    if args.json_path:
+        write_json_results(args.json_path, "report_replay", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
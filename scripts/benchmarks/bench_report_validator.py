@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_report_validator.py
+"""
+Mesure le débit (rapports par seconde) du validateur compilé de rapports STATUS.json,
+sur un rapport réel archivé et sur des rapports synthétiques de N bases de données.
+
+Usage :
+    python scripts/benchmarks/bench_report_validator.py
+    python scripts/benchmarks/bench_report_validator.py --databases 1 10 50 --iterations 5000 --json out.json
+"""
+
+import argparse
+import copy
+import glob
+import os
+import time
+
+from bench_common import project_root, print_table, write_json_results
+
+from app.utils.json_decoder import load_report
+from app.utils.report_validator import validate_report
+
+DEFAULT_REPORT_PATTERN = os.path.join(
+    project_root, "scanner_test_root", "*", "log", "_archive", "*SIRPACAM_BAFOUSSAM_ORANGE.json"
+)
+
+
+def build_synthetic_report(template: dict, database_count: int) -> dict:
+    """Duplique la première base du rapport de référence pour obtenir `database_count` bases."""
+    first_db = next(iter(template["databases"].values()))
+    report = copy.deepcopy(template)
+    report["databases"] = {f"DB_{i:04d}_2025": copy.deepcopy(first_db) for i in range(database_count)}
+    return report
+
+
+def benchmark_report(label: str, report: dict, iterations: int) -> dict:
+    result = validate_report(report)  # Préchauffage et contrôle
+    start = time.perf_counter()
+    for _ in range(iterations):
+        validate_report(report)
+    elapsed = time.perf_counter() - start
+    return {
+        "report": label,
+        "databases": len(report.get("databases", {})),
+        "valid": result.is_valid,
+        "us_per_report": elapsed / iterations * 1e6,
+        "reports_per_s": iterations / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="Rapport JSON de référence (défaut : rapport BAFOUSSAM_ORANGE archivé)")
+    parser.add_argument("--databases", type=int, nargs="*", default=[1, 10, 100])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    report_path = args.file or next(iter(sorted(glob.glob(DEFAULT_REPORT_PATTERN))), None)
+    if not report_path:
+        parser.error("Aucun rapport de référence trouvé, utilisez --file.")
+    template = load_report(report_path)
+
+    results = [benchmark_report(os.path.basename(report_path), template, args.iterations)]
+    for count in args.databases:
+        results.append(benchmark_report(f"synthetic_{count}", build_synthetic_report(template, count), args.iterations))
+
+    print_table(results, ["report", "databases", "valid", "us_per_report", "reports_per_s"])
+    if args.json_path:
+        write_json_results(args.json_path, "report_validator", results,
+                           {"iterations": args.iterations, "databases": args.databases})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_scan_cadence.py
+"""
+Simule une journée de passages du scanner pour comparer l'intervalle fixe (SCANNER_INTERVAL_MINUTES)
+et la cadence adaptative (app/core/scan_cadence.py).
+
+Les jobs ont une heure attendue tirée d'un profil réaliste : une pointe du matin (--rush-share des
+jobs autour de --rush-hour) et le reste réparti le soir et la nuit. Chaque rapport arrive autour
+de l'heure attendue de son job. Un passage coûte --sweep-seconds (parcours des dossiers d'agents)
+plus --report-seconds par rapport traité.
+
+Mesures : passages par jour, temps total passé à scanner (proxy des E/S et du CPU), latence entre
+l'arrivée d'un rapport et le début du passage qui le traite (moyenne, p95, p95 pendant la pointe).
+
+Usage :
+    python scripts/benchmarks/bench_scan_cadence.py
+    python scripts/benchmarks/bench_scan_cadence.py --jobs 2000 --rush-hour 8 --sweep-seconds 4 --json out.json
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+
+from bench_common import project_root, print_table, write_json_results
+
+from app.core.scan_cadence import AdaptiveScanCadence
+
+DAY_SECONDS = 24 * 3600
+START = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
+
+def build_arrivals(jobs: int, rush_hour: int, rush_share: float, seed: int):
+    """Heures attendues (minutes depuis minuit) et arrivées des rapports (secondes depuis minuit)."""
+    rng = random.Random(seed)
+    expected, arrivals = [], []
+    for _ in range(jobs):
+        if rng.random() < rush_share:
+            minute = int(rng.gauss(rush_hour * 60, 20)) % 1440
+        else:
+            minute = int(rng.uniform(18 * 60, 26 * 60)) % 1440
+        expected.append(minute)
+        arrivals.append((minute * 60 + rng.uniform(-600, 1800)) % DAY_SECONDS)
+    return expected, sorted(arrivals)
+
+
+def percentile(values: list, fraction: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def simulate(policy: str, arrivals: list, expected: list, args) -> dict:
+    cadence = None
+    if policy == "adaptive":
+        cadence = AdaptiveScanCadence(
+            min_seconds=args.min_seconds, max_seconds=args.max_seconds, backoff_factor=2.0,
+            max_scans_per_hour=args.max_scans_per_hour, max_busy_ratio=0.5, window_minutes=args.window_minutes)
+        cadence.set_slots(expected)
+
+    clock, next_arrival, passes, busy = 0.0, 0, 0, 0.0
+    latencies, peak_latencies = [], []
+    peak_start, peak_end = (args.rush_hour - 1) * 3600, (args.rush_hour + 1) * 3600
+    # Les rapports de la veille arrivés après minuit sont vus au premier passage
+    while clock < DAY_SECONDS:
+        processed = 0
+        while next_arrival < len(arrivals) and arrivals[next_arrival] <= clock:
+            latency = clock - arrivals[next_arrival]
+            latencies.append(latency)
+            if peak_start <= arrivals[next_arrival] < peak_end:
+                peak_latencies.append(latency)
+            next_arrival += 1
+            processed += 1
+        duration = args.sweep_seconds + args.report_seconds * processed
+        passes += 1
+        busy += duration
+        if cadence is None:
+            interval = args.fixed_minutes * 60
+        else:
+            interval = cadence.next_interval(START + timedelta(seconds=clock + duration), processed, duration)
+        clock += duration + interval
+
+    return {
+        "policy": policy,
+        "passes": passes,
+        "scan_seconds": busy,
+        "latency_mean_s": sum(latencies) / len(latencies) if latencies else None,
+        "latency_p95_s": percentile(latencies, 0.95),
+        "peak_latency_p95_s": percentile(peak_latencies, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--rush-hour", type=int, default=8)
+    parser.add_argument("--rush-share", type=float, default=0.7)
+    parser.add_argument("--sweep-seconds", type=float, default=2.0)
+    parser.add_argument("--report-seconds", type=float, default=0.05)
+    parser.add_argument("--fixed-minutes", type=float, default=1.0)
+    parser.add_argument("--min-seconds", type=float, default=20)
+    parser.add_argument("--max-seconds", type=float, default=900)
+    parser.add_argument("--max-scans-per-hour", type=int, default=120)
+    parser.add_argument("--window-minutes", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=41)
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    expected, arrivals = build_arrivals(args.jobs, args.rush_hour, args.rush_share, args.seed)
+    results = [simulate(policy, arrivals, expected, args) for policy in ("fixed", "adaptive")]
+
+    print_table(results, ["policy", "passes", "scan_seconds", "latency_mean_s", "latency_p95_s", "peak_latency_p95_s"])
+    if args.json_path:
+        write_json_results(args.json_path, "scan_cadence", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
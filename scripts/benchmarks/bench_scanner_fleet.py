@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_scanner_fleet.py
+"""
+Benchmark de bout en bout des scanners sur une flotte synthétique.
+
+La flotte (agents × bases × taille des fichiers × rapports en attente par agent) est créée
+dans un répertoire temporaire avec des fichiers creux (ou préalloués avec --fallocate),
+donc quasi instantanément quelle que soit la taille annoncée. Chaque scanner est exécuté
+dans un processus neuf, sur sa propre copie de la flotte et sa propre base SQLite :
+  - mvp            : scanner_MVP.run_new_scanner (chemin de production)
+  - backup_scanner : BackupScanner.scan_all_jobs
+
+Mesures : temps total, requêtes SQL exécutées, octets lus (/proc/self/io, sinon octets hachés),
+pic de mémoire résidente (ru_maxrss) et entrées créées.
+
+Usage :
+    python scripts/benchmarks/bench_scanner_fleet.py
+    python scripts/benchmarks/bench_scanner_fleet.py --agents 50 --databases 4 --file-size-mb 256 --backlog 2 --json out.json
+    python scripts/benchmarks/bench_scanner_fleet.py --scanners mvp --keep
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from bench_common import project_root, print_table, write_json_results
+
+SCANNERS = ("mvp", "backup_scanner")
+# Les fichiers sont datés dans le passé pour ne pas être pris pour des dépôts en cours.
+OLD_MTIME = time.time() - 24 * 3600
+HASH_CHUNK = 1024 * 1024
+
+
+def fleet_content_digest(size: int) -> str:
+    """SHA-256 d'un fichier de la flotte : signature zstd suivie de zéros jusqu'à `size` octets."""
+    digest = hashlib.sha256(b"\x28\xb5\x2f\xfd")
+    remaining = size - 4
+    zeros = bytes(HASH_CHUNK)
+    while remaining > 0:
+        chunk = min(remaining, HASH_CHUNK)
+        digest.update(zeros[:chunk])
+        remaining -= chunk
+    return digest.hexdigest()
+
+
+def create_staged_file(path: str, size: int, fallocate: bool) -> None:
+    """Crée un fichier de `size` octets sans écrire son contenu (creux ou préalloué)."""
+    with open(path, "wb") as f:
+        f.write(b"\x28\xb5\x2f\xfd")
+        if fallocate and hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            f.truncate(size)
+    os.utime(path, (OLD_MTIME, OLD_MTIME))
+
+
+def build_fleet(base_dir: str, agents: int, databases: int, file_size: int, backlog: int, fallocate: bool) -> dict:
+    """
+    Crée la flotte sous base_dir/root et retourne sa description (racine, jobs, agents).
+    Les rapports d'un agent décrivent toutes ses bases ; le plus récent est daté de maintenant.
+    """
+    root = os.path.join(base_dir, "root")
+    digest = fleet_content_digest(file_size)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    jobs, agents_created = [], []
+    for agent_index in range(agents):
+        company, city, neighborhood = f"BENCH{agent_index:04d}", "DOUALA", "AKWA"
+        agent = f"{company}_{city}_{neighborhood}"
+        log_dir = os.path.join(root, agent, "log")
+        databases_dir = os.path.join(root, agent, "databases")
+        os.makedirs(log_dir)
+        os.makedirs(databases_dir)
+        # BackupScanner lit les fichiers dans <agent>/database/
+        os.symlink("databases", os.path.join(root, agent, "database"))
+
+        report_databases = {}
+        for db_index in range(databases):
+            database_name = f"{company}_{city}_DB{db_index}_2025"
+            staged_file_name = f"{database_name.lower()}.sql.zst"
+            create_staged_file(os.path.join(databases_dir, staged_file_name), file_size, fallocate)
+            jobs.append({"agent": agent, "company": company, "city": city, "neighborhood": neighborhood,
+                         "database_name": database_name})
+            report_databases[database_name] = {
+                "staged_file_name": f"/home/agent/backups/{staged_file_name}",
+                "logs_summary": "ok",
+                "BACKUP": {"status": True, "start_time": "", "end_time": "", "sha256_checksum": "0" * 64,
+                           "size": file_size},
+                "COMPRESS": {"status": True, "start_time": "", "end_time": "", "sha256_checksum": digest,
+                             "size": file_size},
+                "TRANSFER": {"status": True, "start_time": "", "end_time": "", "error_message": None},
+            }
+
+        write_agent_reports(log_dir, agent, report_databases, backlog, now)
+        agents_created.append({"agent": agent, "log_dir": log_dir, "databases": report_databases})
+    return {"root": root, "jobs": jobs, "agents": agents_created}
+
+
+def write_agent_reports(log_dir: str, agent: str, report_databases: dict, backlog: int, now: datetime) -> None:
+    """Écrit `backlog` rapports STATUS.json espacés de 10 minutes, le plus récent daté de `now`."""
+    for report_index in range(backlog):
+        end_time = now - timedelta(minutes=10 * (backlog - 1 - report_index))
+        start_time = end_time - timedelta(minutes=5)
+        for db_data in report_databases.values():
+            for section in ("BACKUP", "COMPRESS", "TRANSFER"):
+                db_data[section]["start_time"] = start_time.isoformat()
+                db_data[section]["end_time"] = end_time.isoformat()
+        report = {
+            "agent_id": agent,
+            "operation_start_time": start_time.isoformat(),
+            "operation_end_time": end_time.isoformat(),
+            "overall_status": "completed",
+            "databases": report_databases,
+        }
+        file_name = f"{end_time.strftime('%Y%m%d_%H%M%S')}_{agent}.json"
+        with open(os.path.join(log_dir, file_name), "w", encoding="utf-8") as f:
+            json.dump(report, f)
+
+
+def _read_bytes_from_proc() -> int:
+    """Octets lus par le processus (rchar de /proc/self/io), ou -1 si indisponible."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def run_scanner_worker(scanner: str, base_dir: str, fleet: dict, queue) -> None:
+    """Exécuté dans un processus neuf : prépare la base, lance le scanner et renvoie les mesures."""
+    os.chdir(base_dir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(base_dir, 'bench.db')}"
+    os.environ["BACKUP_STORAGE_ROOT"] = fleet["root"]
+    sys.path.insert(0, project_root)
+
+    from sqlalchemy import event
+    from config.settings import settings
+    from app.core import database
+    from app.core.metrics import BYTES_HASHED
+    from app.models.models import BackupEntry, ExpectedBackupJob
+    from app.services.scanner import BackupScanner
+    from app.services.scanner_MVP import run_new_scanner
+
+    settings.BACKUP_STORAGE_ROOT = fleet["root"]
+    settings.VALIDATED_BACKUPS_BASE_PATH = os.path.join(base_dir, "validated")
+    database.engine.echo = False
+    database.Base.metadata.create_all(bind=database.engine)
+
+    session = database.SessionLocal()
+    for job in fleet["jobs"]:
+        session.add(ExpectedBackupJob(
+            year=2025, company_name=job["company"], city=job["city"], neighborhood=job["neighborhood"],
+            database_name=job["database_name"], agent_id_responsible=job["agent"],
+            agent_deposit_path_template="{agent}/databases", agent_log_deposit_path_template="{agent}/log",
+            final_storage_path_template="{company}/{city}/{year}", current_status="UNKNOWN", is_active=True,
+        ))
+    session.commit()
+    session.close()
+
+    query_count = [0]
+
+    @event.listens_for(database.engine, "before_cursor_execute")
+    def count_queries(*_args):
+        query_count[0] += 1
+
+    read_before = _read_bytes_from_proc()
+    hashed_before = BYTES_HASHED.value()
+    error = None
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if scanner == "mvp":
+                run_new_scanner()
+            else:
+                session = database.SessionLocal()
+                try:
+                    BackupScanner(session).scan_all_jobs()
+                finally:
+                    session.close()
+    except Exception as e:  # Le scanner est mesuré tel quel : une erreur est rapportée, pas masquée
+        error = f"{type(e).__name__}: {e}"
+    wall_time = time.perf_counter() - start
+    queries = query_count[0]
+    read_after = _read_bytes_from_proc()
+
+    session = database.SessionLocal()
+    entries = session.query(BackupEntry).count()
+    session.close()
+
+    queue.put({
+        "scanner": scanner,
+        "wall_time_s": wall_time,
+        "db_queries": queries,
+        "bytes_read": read_after - read_before if read_before >= 0 else None,
+        "bytes_hashed": int(BYTES_HASHED.value() - hashed_before),
+        # ru_maxrss est en kilo-octets sous Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "entries_created": entries,
+        "error": error,
+    })
+
+
+def run_scanner(scanner: str, args, work_dir: str) -> dict:
+    base_dir = os.path.join(work_dir, scanner)
+    os.makedirs(base_dir)
+    build_start = time.perf_counter()
+    fleet = build_fleet(base_dir, args.agents, args.databases, int(args.file_size_mb * 1024 * 1024),
+                        args.backlog, args.fallocate)
+    build_time = time.perf_counter() - build_start
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=run_scanner_worker, args=(scanner, base_dir, fleet, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    result["fleet_build_s"] = build_time
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=10)
+    parser.add_argument("--databases", type=int, default=3, help="Bases par agent")
+    parser.add_argument("--file-size-mb", type=float, default=16, help="Taille de chaque fichier déposé")
+    parser.add_argument("--backlog", type=int, default=1, help="Rapports STATUS.json en attente par agent")
+    parser.add_argument("--fallocate", action="store_true", help="Fichiers préalloués au lieu de fichiers creux")
+    parser.add_argument("--scanners", nargs="+", choices=SCANNERS, default=list(SCANNERS))
+    parser.add_argument("--work-dir", help="Répertoire de travail (défaut : répertoire temporaire)")
+    parser.add_argument("--keep", action="store_true", help="Conserve la flotte générée")
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="bench_scanner_fleet_")
+    os.makedirs(work_dir, exist_ok=True)
+    print(f"Flotte : {args.agents} agent(s) × {args.databases} base(s) × {args.file_size_mb} Mo, "
+          f"{args.backlog} rapport(s) par agent — {work_dir}")
+    try:
+        results = [run_scanner(scanner, args, work_dir) for scanner in args.scanners]
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results, ["scanner", "wall_time_s", "db_queries", "bytes_read", "bytes_hashed",
+                          "peak_rss_mb", "entries_created", "fleet_build_s"])
+    for result in results:
+        if result["error"]:
+            print(f"⚠️ {result['scanner']} : {result['error']}")
+
+    if args.json_path:
+        write_json_results(args.json_path, "scanner_fleet", results,
+                           {"agents": args.agents, "databases": args.databases, "file_size_mb": args.file_size_mb,
+                            "backlog": args.backlog, "fallocate": args.fallocate})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_startup.py
+"""
+Mesure le coût de démarrage de l'API : import de app.main (ce que paie chaque worker uvicorn
+avant de servir) puis démarrage complet (lifespan, planificateur compris) jusqu'à la première
+réponse, dans des processus Python neufs.
+
+Chaque mesure lance un interpréteur séparé (--runs fois, médiane retenue) :
+  - import     : `import app.main` ;
+  - first_request : import puis TestClient(app) (lifespan exécuté) et GET / ;
+  - importtime : `python -X importtime -c "import app.main"`, imports directs de app.main les
+                 plus coûteux (temps cumulé) ;
+  - effets de bord d'un simple import : tables créées, moteurs créés, planificateur, scanner
+    et YAML chargés.
+
+Usage :
+    python scripts/benchmarks/bench_startup.py
+    python scripts/benchmarks/bench_startup.py --runs 10 --top 15 --json out.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from bench_common import project_root, print_table, write_json_results
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import app.main
+sys.stdout.write(f"\\nBENCH_RESULT {(time.perf_counter() - start) * 1000:.3f}\\n")
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+import app.main
+with TestClient(app.main.app) as client:
+    client.get("/")
+    sys.stdout.write(f"\\nBENCH_RESULT {(time.perf_counter() - start) * 1000:.3f}\\n")
+"""
+
+SIDE_EFFECTS_SNIPPET = """
+import json, os, sqlite3, sys
+import app.main
+from app.core import database
+state = vars(database)
+db_path = os.environ["DATABASE_URL"][len("sqlite:///"):]
+tables = sqlite3.connect(db_path).execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+sys.stdout.write("\\nBENCH_RESULT " + json.dumps({
+    "tables_created": tables > 0,
+    "engine_created": state.get("_engine") is not None if "_engine" in state else "engine" in state,
+    "test_engine_created": state.get("_test_engine") is not None if "_test_engine" in state else "test_engine" in state,
+    "scheduler_loaded": "app.core.scheduler" in sys.modules,
+    "scanner_loaded": "app.services.scanner_MVP" in sys.modules,
+    "yaml_loaded": "yaml" in sys.modules,
+}) + "\\n")
+"""
+
+
+def run_python(code: str, env: dict, extra_args=()) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *extra_args, "-c", code], cwd=project_root, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def bench_result(output: str) -> str:
+    """
+    Valeur imprimée par l'extrait. Les journaux de l'application (threads du planificateur compris)
+    partagent la sortie standard : l'extrait l'écrit en un seul appel, sur sa propre ligne.
+    """
+    return [line for line in output.splitlines() if line.startswith("BENCH_RESULT ")][-1].split(" ", 1)[1]
+
+
+def importtime_top(env: dict, top: int) -> tuple:
+    """Temps cumulé de app.main et de ses imports directs les plus coûteux (sortie de -X importtime)."""
+    stderr = run_python("import app.main", env, ["-X", "importtime"]).stderr
+    total, rows = None, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        if module == "app.main":
+            total = int(cumulative_us) / 1000
+        # Imports directs de app.main : un niveau d'indentation (deux espaces) dans la sortie
+        elif len(name) - len(name.lstrip()) == 3:
+            rows.append({"module": module, "cumulative_ms": int(cumulative_us) / 1000, "self_ms": int(self_us) / 1000})
+    return total, sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{work_dir}/startup.db")
+        side_effects = json.loads(bench_result(run_python(SIDE_EFFECTS_SNIPPET, env).stdout))
+        import_ms = [float(bench_result(run_python(IMPORT_SNIPPET, env).stdout)) for _ in range(args.runs)]
+        first_request_ms = [float(bench_result(run_python(FIRST_REQUEST_SNIPPET, env).stdout))
+                            for _ in range(args.runs)]
+        importtime_total, top_modules = importtime_top(env, args.top)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = [{
+        "import_median_ms": statistics.median(import_ms),
+        "import_min_ms": min(import_ms),
+        "first_request_median_ms": statistics.median(first_request_ms),
+        "importtime_app_main_ms": importtime_total,
+        **side_effects,
+    }]
+    print_table(results, list(results[0]))
+    print()
+    print_table(top_modules, ["module", "cumulative_ms", "self_ms"])
+    if args.json_path:
+        write_json_results(args.json_path, "startup", {"summary": results[0], "top_modules": top_modules}, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# scripts/benchmarks/bench_targeted_scan.py
+"""
+Compare le rattrapage d'une seule agence par un passage ciblé (app/cli.py, `scan --agent`)
+à l'attente d'un passage complet, sur une flotte synthétique (bench_scanner_fleet.build_fleet).
+
+Chaque agent de la flotte a --backlog rapport(s) en attente. On mesure successivement :
+  - targeted : run_scan sur un seul agent (celui qui vient de redéposer) ;
+  - full     : run_scan sur toute la racine (ce que l'agence attend sinon), après un nouveau
+               dépôt du même agent.
+
+Mesures : durée, agents et rapports traités, fichiers et octets hachés.
+
+Usage :
+    python scripts/benchmarks/bench_targeted_scan.py
+    python scripts/benchmarks/bench_targeted_scan.py --agents 500 --databases 4 --file-size-mb 64 --json out.json
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from bench_common import print_table, write_json_results
+from bench_scanner_fleet import build_fleet, write_agent_reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--databases", type=int, default=3)
+    parser.add_argument("--file-size-mb", type=float, default=16)
+    parser.add_argument("--backlog", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="Processus de vérification (1 = en ligne)")
+    parser.add_argument("--json", dest="json_path", help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_targeted_scan_")
+    try:
+        fleet = build_fleet(work_dir, args.agents, args.databases, int(args.file_size_mb * 1024 * 1024),
+                            args.backlog, False)
+        # La base doit être configurée avant l'import de l'application
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+        logging.disable(logging.WARNING)
+
+        from config.settings import settings
+        from app.cli import run_scan
+        from app.core import database
+        from app.models.models import ExpectedBackupJob
+
+        settings.BACKUP_STORAGE_ROOT = fleet["root"]
+        settings.VALIDATED_BACKUPS_BASE_PATH = os.path.join(work_dir, "validated")
+        database.engine.echo = False
+        database.Base.metadata.create_all(bind=database.engine)
+        session = database.SessionLocal()
+        session.add_all(ExpectedBackupJob(
+            year=2025, company_name=job["company"], city=job["city"], neighborhood=job["neighborhood"],
+            database_name=job["database_name"], agent_id_responsible=job["agent"],
+            agent_deposit_path_template="{agent}/databases", agent_log_deposit_path_template="{agent}/log",
+            final_storage_path_template="{company}/{city}/{year}", current_status="UNKNOWN", is_active=True)
+            for job in fleet["jobs"])
+        session.commit()
+
+        agent = fleet["agents"][0]
+        results = []
+        for scenario, agents in (("targeted", [agent["agent"]]), ("full", None)):
+            # Nouveau dépôt de l'agence (nommé à la seconde, postérieur aux rapports déjà archivés)
+            now = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(seconds=len(results) + 1)
+            write_agent_reports(agent["log_dir"], agent["agent"], agent["databases"], 1, now)
+            start = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                stats = run_scan(session, agents, workers=args.workers)
+            results.append({
+                "scenario": scenario,
+                "seconds": time.perf_counter() - start,
+                "agents": stats["agents_processed"],
+                "reports": stats["reports_processed"],
+                "files_hashed": stats["files_hashed"],
+                "mb_hashed": stats["bytes_hashed"] / 1024 / 1024,
+            })
+        session.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results, ["scenario", "seconds", "agents", "reports", "files_hashed", "mb_hashed"])
+    if args.json_path:
+        write_json_results(args.json_path, "targeted_scan", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 # tests/conftest.py
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 from app.core.database import Base, test_engine, TestSessionLocal
 from app.models.models import ExpectedBackupJob, BackupEntry
 from app.main import app  # L'application FastAPI
@@ -43,6 +45,26 @@ def clean_tables():
     db.close()
     yield
 
+# --- Base SQLite temporaire pour les tests de services ---
+@pytest.fixture
+def sqlite_session_factory(tmp_path):
+    """
+    Fabrique de bases SQLite temporaires : sqlite_session_factory(tables, name, **connect_args)
+    crée le fichier `name` dans tmp_path avec les tables demandées (toutes si tables=None)
+    et retourne un sessionmaker lié. Les moteurs sont libérés en fin de test.
+    """
+    engines = []
+
+    def make(tables=None, name="test.db", **connect_args):
+        engine = create_engine(f"sqlite:///{tmp_path / name}", connect_args=connect_args)
+        Base.metadata.create_all(bind=engine, tables=tables)
+        engines.append(engine)
+        return sessionmaker(bind=engine)
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
 # --- Fourniture d'un client FastAPI ---
 @pytest.fixture(scope="module")
 def client():
@@ -0,0 +1,138 @@
+# tests/test_agent_sharding.py
+import multiprocessing
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import AgentLease, ScannerNode
+from app.services.agent_sharding import AgentShardCoordinator, HashRing
+
+AGENTS = [f"AGENT{i:03d}_DOUALA_AKWA" for i in range(60)]
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+TTL = 60
+SHARDING_TABLES = [ScannerNode.__table__, AgentLease.__table__]
+SQLITE_CONNECT_ARGS = {"check_same_thread": False, "timeout": 30}
+
+
+@pytest.fixture
+def session_factory(sqlite_session_factory):
+    return sqlite_session_factory(SHARDING_TABLES, "sharding.db", **SQLITE_CONNECT_ARGS)
+
+
+def _claim(session_factory, coordinator, now):
+    session = session_factory()
+    try:
+        return coordinator.claim_agents(session, AGENTS, now=now)
+    finally:
+        session.close()
+
+
+def test_hash_ring_moves_few_agents_when_a_node_joins():
+    ring = HashRing(["a", "b", "c"])
+    bigger = HashRing(["a", "b", "c", "d"])
+    assert {ring.owner(agent) for agent in AGENTS} == {"a", "b", "c"}
+    moved = [agent for agent in AGENTS if ring.owner(agent) != bigger.owner(agent)]
+    # Seuls les agents repris par "d" changent d'instance
+    assert all(bigger.owner(agent) == "d" for agent in moved)
+    assert len(moved) < len(AGENTS) / 2
+    assert HashRing([]).owner("x") is None
+
+
+def test_live_nodes_partition_the_agents(session_factory):
+    node_a = AgentShardCoordinator("node-a", lease_ttl_seconds=TTL)
+    node_b = AgentShardCoordinator("node-b", lease_ttl_seconds=TTL)
+    session = session_factory()
+    node_a.heartbeat(session, NOW)
+    node_b.heartbeat(session, NOW)
+    session.close()
+
+    owned_a = _claim(session_factory, node_a, NOW)
+    owned_b = _claim(session_factory, node_b, NOW)
+
+    assert owned_a and owned_b
+    assert not set(owned_a) & set(owned_b)
+    assert set(owned_a) | set(owned_b) == set(AGENTS)
+
+
+def test_agents_of_a_dead_node_are_taken_over_after_expiry(session_factory):
+    node_a = AgentShardCoordinator("node-a", lease_ttl_seconds=TTL)
+    node_b = AgentShardCoordinator("node-b", lease_ttl_seconds=TTL)
+    session = session_factory()
+    node_a.heartbeat(session, NOW)
+    node_b.heartbeat(session, NOW)
+    session.close()
+    _claim(session_factory, node_a, NOW)
+    owned_b = _claim(session_factory, node_b, NOW)
+
+    # node-b s'arrête sans rendre ses baux : tant qu'ils sont valides, node-a ne les prend pas
+    soon = NOW + timedelta(seconds=TTL / 2)
+    assert not set(_claim(session_factory, node_a, soon)) & set(owned_b)
+
+    later = NOW + timedelta(seconds=TTL + 1)
+    assert set(_claim(session_factory, node_a, later)) == set(AGENTS)
+    session = session_factory()
+    assert not node_b.renew(session, owned_b[0], now=later)
+    session.close()
+
+
+def test_joining_node_receives_its_share_after_rebalance(session_factory):
+    node_a = AgentShardCoordinator("node-a", lease_ttl_seconds=TTL)
+    node_b = AgentShardCoordinator("node-b", lease_ttl_seconds=TTL)
+    assert set(_claim(session_factory, node_a, NOW)) == set(AGENTS)
+
+    # node-b arrive : ses agents restent à node-a tant que node-a ne les a pas rendus
+    assert _claim(session_factory, node_b, NOW) == []
+    kept_by_a = _claim(session_factory, node_a, NOW + timedelta(seconds=1))
+    owned_b = _claim(session_factory, node_b, NOW + timedelta(seconds=2))
+
+    assert owned_b
+    assert not set(kept_by_a) & set(owned_b)
+    assert set(kept_by_a) | set(owned_b) == set(AGENTS)
+
+
+def test_release_all_frees_leases_immediately(session_factory):
+    node_a = AgentShardCoordinator("node-a", lease_ttl_seconds=TTL)
+    node_b = AgentShardCoordinator("node-b", lease_ttl_seconds=TTL)
+    session = session_factory()
+    node_a.heartbeat(session, NOW)
+    node_b.heartbeat(session, NOW)
+    session.close()
+    _claim(session_factory, node_a, NOW)
+    _claim(session_factory, node_b, NOW)
+
+    session = session_factory()
+    assert node_b.release_all(session) > 0
+    session.close()
+    assert set(_claim(session_factory, node_a, NOW + timedelta(seconds=1))) == set(AGENTS)
+
+
+def _claim_in_process(db_path, node_id, barrier, queue):
+    # Processus fils : les tables ont été créées par le test
+    session_factory = sessionmaker(bind=create_engine(f"sqlite:///{db_path}", connect_args=SQLITE_CONNECT_ARGS))
+    coordinator = AgentShardCoordinator(node_id, lease_ttl_seconds=TTL)
+    session = session_factory()
+    coordinator.heartbeat(session, NOW)
+    session.close()
+    barrier.wait()  # Toutes les instances sont annoncées avant la répartition
+    queue.put((node_id, _claim(session_factory, coordinator, NOW)))
+
+
+def test_several_processes_share_agents_without_overlap(tmp_path, sqlite_session_factory):
+    db_path = tmp_path / "shared.db"
+    sqlite_session_factory(SHARDING_TABLES, db_path.name, **SQLITE_CONNECT_ARGS)
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(3)
+    queue = context.Queue()
+    processes = [context.Process(target=_claim_in_process, args=(db_path, f"node-{i}", barrier, queue))
+                 for i in range(3)]
+    for process in processes:
+        process.start()
+    results = dict(queue.get(timeout=60) for _ in processes)
+    for process in processes:
+        process.join(timeout=60)
+
+    owned = [agent for agents in results.values() for agent in agents]
+    assert len(owned) == len(set(owned)) == len(AGENTS)
+    assert all(results.values())
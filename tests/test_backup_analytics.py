@@ -0,0 +1,100 @@
+# tests/test_backup_analytics.py
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.metrics import BACKUP_ANOMALIES
+from app.models.models import AgentReport, AgentReportDatabase
+from app.services import backup_analytics
+from app.services.backup_analytics import (
+    ANOMALY_DURATION_ZSCORE, ANOMALY_SIZE_DROP, analyze_fleet, group_percentiles, rolling_baseline,
+    run_post_scan_analytics,
+)
+
+np = pytest.importorskip("numpy")
+
+START = datetime(2025, 6, 1, 22, 0)
+
+
+@pytest.fixture
+def session(sqlite_session_factory):
+    session = sqlite_session_factory(name="analytics.db")()
+    yield session
+    session.close()
+
+
+def _add_history(session, agent, database_name, sizes, durations):
+    for day, (size, duration) in enumerate(zip(sizes, durations)):
+        start = START + timedelta(days=day)
+        report = AgentReport(agent_id=agent, operation_log_file_name=f"{start:%Y%m%d_%H%M%S}_{agent}.json",
+                             operation_start_time=start, operation_end_time=start + timedelta(seconds=duration),
+                             overall_status="completed", database_count=1)
+        report.databases.append(AgentReportDatabase(
+            database_name=database_name, backup_size=size * 4, compress_size=size,
+            backup_start_time=start, backup_end_time=start + timedelta(seconds=duration / 2),
+            compress_start_time=start + timedelta(seconds=duration / 2),
+            compress_end_time=start + timedelta(seconds=duration * 3 / 4),
+            transfer_start_time=start + timedelta(seconds=duration * 3 / 4),
+            transfer_end_time=start + timedelta(seconds=duration)))
+        session.add(report)
+    session.commit()
+
+
+def test_rolling_baseline_matches_a_naive_window():
+    rng = np.random.default_rng(7)
+    values = rng.normal(5e9, 1e8, 40)
+    values[[3, 17]] = np.nan
+    group = np.repeat([0, 1, 2], [15, 5, 20])
+    starts = np.array([0, 15, 20])
+
+    mean, std, count = rolling_baseline(values, group, starts, window=6)
+
+    for index in range(len(values)):
+        previous = values[max(index - 6, starts[group[index]]):index]
+        previous = previous[~np.isnan(previous)]
+        assert count[index] == len(previous)
+        if len(previous):
+            assert mean[index] == pytest.approx(previous.mean(), rel=1e-12)
+            assert std[index] == pytest.approx(previous.std(), rel=1e-6, abs=1e-3)
+
+
+def test_group_percentiles_match_numpy():
+    values = np.array([3.0, 1.0, np.nan, 2.0, 10.0, 7.0, np.nan])
+    group = np.array([0, 0, 0, 0, 1, 1, 2])
+
+    p50, p95 = group_percentiles(values, group, 3, (0.5, 0.95))
+
+    assert p50[:2].tolist() == [2.0, 8.5]
+    assert p95[0] == pytest.approx(np.percentile([1.0, 2.0, 3.0], 95))
+    assert np.isnan(p50[2])
+
+
+def test_fleet_analysis_flags_size_drops_and_slow_backups(session):
+    _add_history(session, "ACME_PARIS_CENTRE", "DB1", [1000 + day for day in range(10)] + [80], [600] * 11)
+    _add_history(session, "GLOBEX_DOUALA_AKWA", "DB1", [500] * 8, [300, 310, 290, 305, 295, 300, 310, 3000])
+
+    analytics = analyze_fleet(session, since=START - timedelta(days=1), window=5, zscore_threshold=3.0)
+
+    assert analytics.rows == 19 and len(analytics.series) == 2
+    acme, globex = analytics.series
+    assert acme["anomalies"][0] == ANOMALY_SIZE_DROP and acme["size_ratio"] < 0.1
+    assert acme["compression_ratio"] == 0.25 and acme["reports"] == 11
+    assert globex["anomalies"] == [ANOMALY_DURATION_ZSCORE]
+    assert globex["total_duration_p50"] == 305 and globex["backup_duration_p50"] == 152.5
+    assert {(anomaly["agent_id"], anomaly["kind"]) for anomaly in analytics.anomalies} >= {
+        ("ACME_PARIS_CENTRE", ANOMALY_SIZE_DROP), ("GLOBEX_DOUALA_AKWA", ANOMALY_DURATION_ZSCORE)}
+
+
+def test_post_scan_analytics_updates_the_anomaly_gauge(session):
+    _add_history(session, "ACME_PARIS_CENTRE", "DB1", [1000] * 6 + [50], [600] * 7)
+    factory = sessionmaker(bind=session.get_bind())
+
+    with patch("app.core.database.SessionLocal", factory), \
+            patch.object(backup_analytics.settings, "ANALYTICS_LOOKBACK_DAYS", 100000):
+        analytics = run_post_scan_analytics()
+        assert analytics is not None and BACKUP_ANOMALIES.value(kind=ANOMALY_SIZE_DROP) == 1
+
+        with patch.object(backup_analytics, "np", None):
+            assert run_post_scan_analytics() is None
@@ -0,0 +1,109 @@
+# tests/test_cli.py
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app import cli
+from app.models.models import ExpectedBackupJob
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+AGENTS = {"ACME_PARIS_CENTRE": "ACME", "ACME_LYON_CENTRE": "ACME", "GLOBEX_DOUALA_AKWA": "GLOBEX"}
+
+
+def _write_agent(root: Path, agent: str) -> None:
+    content = b"\x28\xb5\x2f\xfd" + os.urandom(4096)
+    (root / agent / "log").mkdir(parents=True)
+    (root / agent / "databases").mkdir()
+    staged = root / agent / "databases" / "db1_2025.zst"
+    staged.write_bytes(content)
+    os.utime(staged, (1e9, 1e9))
+    step = {"status": "True", "start_time": "2025-06-20 09:16:41", "end_time": "2025-06-20 09:16:54"}
+    report = {
+        "operation_start_time": "2025-06-20 09:16:41", "operation_end_time": "2025-06-20 09:40:05", "agent_id": agent,
+        "databases": {"DB1": {
+            "BACKUP": dict(step, sha256="a" * 64, size="10"),
+            "COMPRESS": dict(step, sha256=hashlib.sha256(content).hexdigest(), size=str(len(content))),
+            "TRANSFER": dict(step, error_message="null"),
+            "staged_file_name": f"/home/x/{staged.name}",
+        }},
+    }
+    (root / agent / "log" / f"20250620_094005_{agent}.json").write_text(json.dumps(report))
+
+
+@pytest.fixture
+def fleet(tmp_path, sqlite_session_factory):
+    root = tmp_path / "root"
+    for agent in AGENTS:
+        _write_agent(root, agent)
+    db_path = tmp_path / "cli.db"
+    session = sqlite_session_factory(name=db_path.name)()
+    for agent, company in AGENTS.items():
+        session.add(ExpectedBackupJob(
+            year=2025, company_name=company, city=agent.split("_")[1], neighborhood="CENTRE", database_name="DB1",
+            agent_id_responsible=agent, agent_deposit_path_template="x", agent_log_deposit_path_template="y",
+            final_storage_path_template="z", current_status="UNKNOWN", is_active=True))
+    session.commit()
+    with patch.object(cli.settings, "BACKUP_STORAGE_ROOT", str(root)), \
+            patch.object(cli.settings, "VALIDATED_BACKUPS_BASE_PATH", str(tmp_path / "validated")):
+        yield root, session, db_path
+    session.close()
+
+
+def test_agents_are_selected_by_id_company_and_pattern(fleet):
+    root, session, _ = fleet
+
+    assert cli.select_agents(session) is None
+    assert cli.select_agents(session, ["GLOBEX_DOUALA_AKWA"], ["ACME"]) == [
+        "GLOBEX_DOUALA_AKWA", "ACME_LYON_CENTRE", "ACME_PARIS_CENTRE"]
+    assert cli.select_agents(session, ["ACME_LYON_CENTRE"], patterns=["ACME_*"]) == [
+        "ACME_LYON_CENTRE", "ACME_PARIS_CENTRE"]
+
+
+def test_targeted_scan_touches_only_the_selected_agent(fleet):
+    root, session, _ = fleet
+    listed = []
+    real_listdir = os.listdir
+
+    def spy_listdir(path="."):
+        listed.append(os.path.abspath(path))
+        return real_listdir(path)
+
+    with patch("app.services.scanner_MVP.os.listdir", side_effect=spy_listdir):
+        stats = cli.run_scan(session, ["ACME_PARIS_CENTRE", "INCONNU"], workers=1)
+
+    assert str(root) not in listed
+    assert all(path.startswith(str(root / "ACME_PARIS_CENTRE")) for path in listed)
+    assert stats["succeeded"] and stats["agents_processed"] == 1 and stats["reports_processed"] == 1
+    assert stats["status_counts"] == {"SUCCESS": 1} and stats["files_hashed"] == 1
+    assert stats["agents_missing"] == ["INCONNU"]
+    assert (root / "ACME_PARIS_CENTRE" / "log" / "_archive").is_dir()
+    assert (root / "GLOBEX_DOUALA_AKWA" / "log" / "20250620_094005_GLOBEX_DOUALA_AKWA.json").exists()
+
+
+def test_scan_without_archive_leaves_the_reports_in_place(fleet):
+    root, session, _ = fleet
+
+    stats = cli.run_scan(session, ["ACME_LYON_CENTRE"], archive=False, workers=1)
+
+    assert stats["reports_processed"] == 1 and stats["archive"] is False
+    assert (root / "ACME_LYON_CENTRE" / "log" / "20250620_094005_ACME_LYON_CENTRE.json").exists()
+    assert not (root / "ACME_LYON_CENTRE" / "log" / "_archive").exists()
+
+
+def test_json_statistics_alone_on_stdout(fleet):
+    root, _, db_path = fleet
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", BACKUP_STORAGE_ROOT=str(root),
+               VALIDATED_BACKUPS_BASE_PATH=str(root.parent / "validated"))
+
+    result = subprocess.run([sys.executable, "-m", "app.cli", "scan", "--company", "GLOBEX", "--workers", "1",
+                             "--json", "-"], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    stats = json.loads(result.stdout)
+    assert stats["agents_requested"] == ["GLOBEX_DOUALA_AKWA"] and stats["reports_processed"] == 1
@@ -0,0 +1,151 @@
+# tests/test_deadline_scheduler.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.models.models import BackupEntry, ExpectedBackupJob
+from app.services import deadline_scheduler as deadline_module
+from app.services.deadline_scheduler import DeadlineScheduler, next_deadline, schedule_fingerprint
+from app.services.scanner import BackupScanner
+
+WINDOW = 60
+NOW = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _scheduler(last_tick):
+    """Échéancier dont le dernier passage a eu lieu à `last_tick`."""
+    scheduler = DeadlineScheduler(window_minutes=WINDOW)
+    scheduler.last_tick = last_tick
+    return scheduler
+
+
+def _job(job_id, hour, minute=0, is_active=True):
+    return SimpleNamespace(id=job_id, expected_hour_utc=hour, expected_minute_utc=minute, is_active=is_active)
+
+
+def test_next_deadline_wraps_past_midnight():
+    # 23:30 + 60 min : échéance le lendemain à 00:30
+    assert next_deadline(23, 30, WINDOW, NOW) == datetime(2026, 1, 2, 0, 30, tzinfo=timezone.utc)
+    # Juste après l'échéance de la nuit : la suivante est le surlendemain
+    after = datetime(2026, 1, 2, 0, 31, tzinfo=timezone.utc)
+    assert next_deadline(23, 30, WINDOW, after) == datetime(2026, 1, 3, 0, 30, tzinfo=timezone.utc)
+    assert next_deadline(10, 0, WINDOW, NOW) == datetime(2026, 1, 2, 11, 0, tzinfo=timezone.utc)
+    assert next_deadline(11, 0, WINDOW, NOW - timedelta(seconds=1)) == NOW
+
+
+def test_first_build_catches_up_on_the_last_day():
+    scheduler = DeadlineScheduler(window_minutes=WINDOW)
+    scheduler.rebuild([_job(1, 10), _job(2, 14)], now=NOW)
+    # Premier passage : les échéances des dernières 24 h sont évaluées
+    assert {job_id for job_id, _ in scheduler.pop_due(NOW)} == {1, 2}
+    assert scheduler.pop_due(NOW) == []
+
+
+def test_pop_due_returns_only_due_jobs_and_reschedules_them():
+    scheduler = _scheduler(NOW - timedelta(hours=1))
+    scheduler.rebuild([_job(1, 10), _job(2, 11), _job(3, 14), _job(4, None)], now=NOW)
+
+    assert len(scheduler) == 3  # Le job sans heure attendue n'est pas planifié
+    due = scheduler.pop_due(NOW)
+    assert [job_id for job_id, _ in due] == [2]
+    assert scheduler.pop_due(NOW) == []
+    # Le job échu est replanifié sur le lendemain, le suivant reste le job 3
+    assert scheduler.next_due() == datetime(2026, 1, 1, 15, 0, tzinfo=timezone.utc)
+    later = NOW + timedelta(days=1)
+    assert {job_id for job_id, _ in scheduler.pop_due(later)} == {1, 2, 3}
+
+
+def test_unscheduled_and_rescheduled_jobs_leave_no_stale_deadline():
+    scheduler = _scheduler(NOW - timedelta(hours=3))
+    scheduler.rebuild([_job(1, 10), _job(2, 10)], now=NOW)
+    scheduler.unschedule(1)
+    scheduler.schedule(_job(2, 20), after=NOW - timedelta(hours=3))
+
+    assert scheduler.pop_due(NOW) == []
+    assert [job_id for job_id, _ in scheduler.pop_due(NOW + timedelta(hours=10))] == [2]
+
+
+def test_many_jobs_with_a_single_due_deadline():
+    scheduler = _scheduler(NOW - timedelta(minutes=5))
+    jobs = [_job(i, 18 + i % 4, i % 60) for i in range(10_000)]
+    jobs.append(_job(10_000, 10, 59))
+    scheduler.rebuild(jobs, now=NOW)
+
+    assert [job_id for job_id, _ in scheduler.pop_due(NOW)] == [10_000]
+
+
+@pytest.fixture
+def session(sqlite_session_factory):
+    session = sqlite_session_factory([ExpectedBackupJob.__table__, BackupEntry.__table__], "deadlines.db")()
+    yield session
+    session.close()
+
+
+def _db_job(name, hour):
+    return ExpectedBackupJob(
+        year=2026, company_name="SIRPACAM", city="DOUALA", neighborhood="AKWA", database_name=name,
+        expected_hour_utc=hour, expected_minute_utc=0, agent_id_responsible="AGENT_DOUALA_AKWA",
+        agent_deposit_path_template="x", agent_log_deposit_path_template="x", final_storage_path_template="x",
+    )
+
+
+def test_refresh_rebuilds_only_when_schedules_change(session, monkeypatch):
+    scheduler = DeadlineScheduler(window_minutes=WINDOW)
+    monkeypatch.setattr(deadline_module, "deadline_scheduler", scheduler)
+    job = _db_job("DB1", 10)
+    session.add(job)
+    session.commit()
+
+    assert scheduler.refresh(session, NOW)
+    assert not scheduler.refresh(session, NOW)
+
+    # Mise à jour de statut par le scanner : pas de reconstruction
+    job.current_status = "MISSING"
+    session.commit()
+    assert not scheduler.refresh(session, NOW)
+
+    # Changement d'heure attendue : reconstruction (événement ou empreinte)
+    job.expected_hour_utc = 11
+    session.commit()
+    assert scheduler.refresh(session, NOW)
+
+    fingerprint = schedule_fingerprint(session)
+    session.add(_db_job("DB2", 9))
+    session.commit()
+    assert schedule_fingerprint(session) != fingerprint
+    assert scheduler.refresh(session, NOW)
+    assert len(scheduler) == 2
+
+
+def test_failed_evaluation_is_retried_on_next_pass(session, monkeypatch):
+    scheduler = _scheduler(NOW - timedelta(hours=2))
+    monkeypatch.setattr("app.services.scanner.deadline_scheduler", scheduler)
+    monkeypatch.setattr("app.services.scanner.get_utc_now", lambda: NOW)
+    monkeypatch.setattr("app.services.scanner.settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES", WINDOW)
+    session.add(_db_job("DB1", 10))
+    session.commit()
+
+    handle_missing_jobs = BackupScanner._handle_missing_jobs
+    calls = []
+
+    def locked_once(self, jobs, now_utc):
+        calls.append([job.id for job in jobs])
+        if len(calls) == 1:
+            raise OperationalError("COMMIT", {}, Exception("database is locked"))
+        return handle_missing_jobs(self, jobs, now_utc)
+
+    monkeypatch.setattr(BackupScanner, "_handle_missing_jobs", locked_once)
+    scanner = BackupScanner(session)
+    with pytest.raises(OperationalError):
+        scanner._phase2_evaluate_jobs()
+    session.rollback()
+    assert scheduler.last_tick == NOW - timedelta(hours=2)
+
+    # Le passage suivant réévalue l'échéance dépilée par le passage en échec
+    scanner._phase2_evaluate_jobs()
+    assert calls[1] == calls[0]
+    job = session.query(ExpectedBackupJob).one()
+    assert job.current_status == "MISSING"
+    assert session.query(BackupEntry).filter(BackupEntry.status == "MISSING").count() == 1
@@ -0,0 +1,128 @@
+# tests/test_history_export.py
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.models.models import BackupEntry, ExpectedBackupJob
+from app.services import history_export
+from app.services.history_export import (
+    STATE_FILE_NAME, HistoryExportError, export_backup_history, read_export_state,
+)
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.dataset as ds  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+COMPANIES = ("ACME", "GLOBEX/SA")
+
+
+@pytest.fixture
+def session(sqlite_session_factory):
+    session = sqlite_session_factory(name="export.db")()
+    for company in COMPANIES:
+        session.add(ExpectedBackupJob(
+            year=2025, company_name=company, city="DOUALA", neighborhood="AKWA", database_name="DB1",
+            agent_id_responsible=f"{company}_AGENT", agent_deposit_path_template="x",
+            agent_log_deposit_path_template="y", final_storage_path_template="z", current_status="UNKNOWN",
+            is_active=True))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _add_entries(session, start, days):
+    for job_id in (1, 2):
+        for day in range(days):
+            timestamp = start + timedelta(days=day)
+            session.add(BackupEntry(expected_job_id=job_id, timestamp=timestamp, created_at=timestamp,
+                                    status="SUCCESS", server_calculated_staged_size=1024 * day,
+                                    hash_comparison_result=True, operation_log_file_name=f"{day}.json"))
+    session.commit()
+
+
+def test_export_is_partitioned_by_company_and_month(session, tmp_path):
+    _add_entries(session, datetime(2025, 5, 30, 22, 0), 4)   # 30-31 mai, 1-2 juin
+    output = tmp_path / "export"
+
+    stats = export_backup_history(session, str(output), batch_size=3)
+
+    assert stats["rows"] == 8 and stats["partitions"] == 4 and stats["files"] == 4
+    assert (output / "company=GLOBEX%2FSA" / "month=2025-06").is_dir()
+    dataset = ds.dataset(str(output), format="parquet", partitioning="hive")
+    table = dataset.to_table()
+    assert table.num_rows == 8
+    assert sorted(set(table.column("month").to_pylist())) == ["2025-05", "2025-06"]
+    assert table.schema.field("timestamp").type == pa.timestamp("us")
+    assert not [name for _, _, names in os.walk(output) for name in names if name.endswith(".tmp")]
+
+
+def test_incremental_export_appends_only_new_entries(session, tmp_path):
+    output = str(tmp_path / "export")
+    _add_entries(session, datetime(2025, 6, 1), 2)
+    first = export_backup_history(session, output)
+
+    assert export_backup_history(session, output)["rows"] == 0
+    _add_entries(session, datetime(2025, 6, 10), 1)
+    second = export_backup_history(session, output)
+
+    assert (first["rows"], second["rows"]) == (4, 2)
+    assert second["previous_entry_id"] == first["last_entry_id"] == 4
+    assert read_export_state(output)["last_entry_id"] == 6
+    assert ds.dataset(output, format="parquet", partitioning="hive").count_rows() == 6
+
+    full = export_backup_history(session, output, full=True)
+    assert full["rows"] == 6 and ds.dataset(output, format="parquet", partitioning="hive").count_rows() == 6
+
+
+def test_batches_bound_row_groups_and_arrow_format(session, tmp_path):
+    _add_entries(session, datetime(2025, 6, 1), 10)
+
+    export_backup_history(session, str(tmp_path / "parquet"), batch_size=4)
+    parquet_file = next((tmp_path / "parquet" / "company=ACME" / "month=2025-06").glob("part-*.parquet"))
+    metadata = pq.ParquetFile(parquet_file).metadata
+    assert [metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)] == [4, 4, 2]
+
+    stats = export_backup_history(session, str(tmp_path / "arrow"), fmt="arrow")
+    assert stats["rows"] == 20
+    arrow_file = next((tmp_path / "arrow" / "company=ACME" / "month=2025-06").glob("part-*.arrow"))
+    assert pa.ipc.open_file(str(arrow_file)).read_all().num_rows == 10
+    with pytest.raises(HistoryExportError):
+        export_backup_history(session, str(tmp_path / "arrow"), fmt="parquet")
+
+
+def test_failed_export_leaves_no_file_and_no_state(session, tmp_path):
+    _add_entries(session, datetime(2025, 6, 1), 3)
+    output = tmp_path / "export"
+
+    with patch.object(history_export.pc, "max", side_effect=RuntimeError("interruption")):
+        with pytest.raises(RuntimeError):
+            export_backup_history(session, str(output), batch_size=2)
+
+    assert not (output / STATE_FILE_NAME).exists()
+    assert not [name for _, _, names in os.walk(output) for name in names]
+    with patch.object(history_export, "pa", None), pytest.raises(HistoryExportError):
+        export_backup_history(session, str(output))
+
+
+def test_failed_full_export_keeps_the_previous_export(session, tmp_path):
+    output = str(tmp_path / "export")
+    _add_entries(session, datetime(2025, 6, 1), 3)
+    previous = export_backup_history(session, output)
+    previous_files = sorted(os.path.join(path, name) for path, _, names in os.walk(output) for name in names)
+
+    with patch.object(history_export.pc, "max", side_effect=RuntimeError("interruption")):
+        with pytest.raises(RuntimeError):
+            export_backup_history(session, output, full=True)
+
+    assert read_export_state(output)["last_entry_id"] == previous["last_entry_id"]
+    assert sorted(os.path.join(path, name) for path, _, names in os.walk(output) for name in names) == previous_files
+    assert ds.dataset(output, format="parquet", partitioning="hive").count_rows() == 6
+
+    # Un export complet réussi remplace les fichiers précédents
+    _add_entries(session, datetime(2025, 7, 1), 1)
+    full = export_backup_history(session, output, full=True)
+    files = [name for _, _, names in os.walk(output) for name in names if name.startswith("part-")]
+    assert full["rows"] == 8 and len(files) == full["files"] == 4
+    assert ds.dataset(output, format="parquet", partitioning="hive").count_rows() == 8
@@ -0,0 +1,79 @@
+# tests/test_integrity_checker.py
+import hashlib
+from unittest.mock import patch
+
+import pytest
+
+from app.services.integrity_checker import (
+    TIER_STAT, TIER_SAMPLE, TIER_SHA256, check_sample, check_stat, verify_staged_file,
+)
+
+
+def _write(path, content: bytes) -> str:
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_check_stat_rejects_size_mismatch(tmp_path):
+    file_path = _write(tmp_path / "db.sql.gz", b"\x1f\x8b" + b"x" * 98)
+
+    result = check_stat(file_path, expected_size=1000)
+
+    assert not result.ok
+    assert result.tier == TIER_STAT
+    assert result.size == 100
+
+
+def test_check_stat_rejects_missing_and_empty_files(tmp_path):
+    assert check_stat(str(tmp_path / "absent.gz"), 10).ok is False
+    empty = _write(tmp_path / "empty.gz", b"")
+    assert check_stat(empty, None).ok is False
+
+
+def test_size_mismatch_is_decided_without_hashing(tmp_path):
+    file_path = _write(tmp_path / "db.sql.gz", b"\x1f\x8b" + b"x" * 98)
+
+    with patch("app.services.integrity_checker.calculate_file_sha256_and_fingerprint") as mock_hash:
+        result = verify_staged_file(file_path, 5000, "0" * 64)
+
+    mock_hash.assert_not_called()
+    assert result.tier == TIER_STAT
+    assert result.sha256 is None
+
+
+def test_check_sample_detects_missing_magic_and_zero_tail(tmp_path):
+    bad_magic = _write(tmp_path / "bad.gz", b"PK" + b"x" * 200)
+    assert check_sample(bad_magic, 202, block_size=16).tier == TIER_SAMPLE
+    assert check_sample(bad_magic, 202, block_size=16).ok is False
+
+    zero_tail = _write(tmp_path / "zero.gz", b"\x1f\x8b" + b"x" * 100 + b"\x00" * 100)
+    assert check_sample(zero_tail, 202, block_size=16).ok is False
+
+    good = _write(tmp_path / "good.zst", b"\x28\xb5\x2f\xfd" + b"y" * 100)
+    assert check_sample(good, 104, block_size=16).ok is True
+
+
+def test_sample_failure_skips_hashing(tmp_path):
+    # Fin nulle plus longue que le bloc échantillon par défaut (zone préallouée jamais écrite)
+    content = b"\x1f\x8b" + b"x" * 50 + b"\x00" * 200_000
+    file_path = _write(tmp_path / "db.sql.gz", content)
+
+    with patch("app.services.integrity_checker.calculate_file_sha256_and_fingerprint") as mock_hash:
+        result = verify_staged_file(file_path, len(content), "0" * 64, sample_check=True)
+
+    mock_hash.assert_not_called()
+    assert result.tier == TIER_SAMPLE
+
+
+@pytest.mark.parametrize("matches", [True, False])
+def test_full_hash_tier(tmp_path, matches):
+    content = b"\x1f\x8b" + b"payload" * 20
+    file_path = _write(tmp_path / "db.sql.gz", content)
+    digest = hashlib.sha256(content).hexdigest()
+    expected = digest if matches else "f" * 64
+
+    result = verify_staged_file(file_path, len(content), expected, sample_check=True)
+
+    assert result.ok is matches
+    assert result.tier == TIER_SHA256
+    assert result.sha256 == digest
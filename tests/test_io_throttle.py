@@ -0,0 +1,102 @@
+# tests/test_io_throttle.py
+import os
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.crypto import calculate_file_sha256
+from app.utils.file_operations import copy_file
+from app.utils.io_throttle import IoThrottleError, TokenBucket, parse_byte_rate, parse_rate_schedule
+
+MIB = 1024 * 1024
+
+
+class FakeClock:
+    def __init__(self, hour: int = 12):
+        self.seconds = 0.0
+        self.moment = datetime(2026, 1, 15, hour, tzinfo=timezone.utc)
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.seconds
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.seconds += seconds
+
+
+def _bucket(clock: FakeClock, rate="10M", burst="20M", schedule="") -> TokenBucket:
+    return TokenBucket(rate, burst, schedule, clock=clock.monotonic, sleep=clock.sleep, now=lambda: clock.moment)
+
+
+def test_rates_and_schedule_are_parsed():
+    assert parse_byte_rate("0") == 0
+    assert parse_byte_rate("512K") == 512 * 1024
+    assert parse_byte_rate("20MB/s") == 20 * MIB
+    assert parse_byte_rate("1.5G") == int(1.5 * 1024 ** 3)
+    assert parse_rate_schedule("06:00-20:00=20M; 20:00-06:00=0") == [(360, 1200, 20 * MIB), (1200, 360, 0)]
+    with pytest.raises(IoThrottleError):
+        parse_byte_rate("vite")
+    with pytest.raises(IoThrottleError):
+        parse_rate_schedule("06h-20h=20M")
+
+
+def test_burst_is_free_then_reads_are_paced_at_the_rate():
+    clock = FakeClock()
+    bucket = _bucket(clock)
+
+    assert bucket.acquire(20 * MIB) == 0
+    # Seau vide : 30 Mio à 10 Mio/s
+    assert bucket.acquire(30 * MIB) == pytest.approx(3.0)
+    assert max(clock.sleeps) <= 1.0
+
+    # Après une pause, le seau se remplit jusqu'à la rafale, pas au-delà
+    clock.seconds += 60
+    assert bucket.acquire(20 * MIB) == 0
+    assert bucket.acquire(MIB) == pytest.approx(0.1)
+
+
+def test_time_of_day_schedule_overrides_the_default_rate():
+    clock = FakeClock(hour=2)
+    bucket = _bucket(clock, rate="10M", schedule="06:00-20:00=5M;20:00-06:00=0")
+
+    # Nuit : illimité
+    assert bucket.acquire(500 * MIB) == 0
+    assert bucket.state()["rate_bytes_per_second"] == 0
+
+    clock.moment = clock.moment.replace(hour=9)
+    bucket.acquire(20 * MIB)
+    assert bucket.acquire(10 * MIB) == pytest.approx(2.0)
+
+
+def test_state_exposes_the_throttle_while_waiting():
+    clock = FakeClock()
+    bucket = _bucket(clock, rate="1M", burst="1M")
+    seen = []
+    clock_sleep = clock.sleep
+    bucket._sleep = lambda seconds: (seen.append(bucket.state()), clock_sleep(seconds))
+
+    bucket.acquire(3 * MIB, "copy")
+
+    assert seen[0]["throttled"] and seen[0]["waiting_operations"] == 1 and seen[0]["tokens"] < 0
+    state = bucket.state()
+    assert not state["throttled"]
+    assert state["total_wait_seconds"] == pytest.approx(2.0)
+    assert state["total_bytes"] == 3 * MIB
+
+
+def test_hashing_and_copies_draw_from_the_shared_budget(tmp_path):
+    clock = FakeClock()
+    bucket = _bucket(clock, rate="4M", burst="4M")
+    source = tmp_path / "db.sql.gz"
+    source.write_bytes(os.urandom(6 * MIB))
+
+    with patch("app.utils.crypto.io_throttle", bucket), patch("app.utils.file_operations.io_throttle", bucket):
+        calculate_file_sha256(str(source), io_mode="cache")
+        copy_file(str(source), str(tmp_path / "validated" / "db.sql.gz"), io_mode="cache")
+
+    assert (tmp_path / "validated" / "db.sql.gz").read_bytes() == source.read_bytes()
+    # 12 Mio prélevés, 4 Mio de rafale : 8 Mio à 4 Mio/s
+    assert bucket.state()["total_bytes"] == 12 * MIB
+    assert sum(clock.sleeps) == pytest.approx(2.0)
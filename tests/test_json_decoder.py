@@ -0,0 +1,55 @@
+# tests/test_json_decoder.py
+import json
+import pytest
+
+from app.utils.json_decoder import available_decoders, decode_report, load_report, register_decoder
+from app.services.validation_service import validate_status_data, StatusFileValidationError
+
+REPORT = {
+    "operation_start_time": "2025-06-12T12:53:52Z",
+    "operation_end_time": "2025-06-12T12:56:06Z",
+    "agent_id": "sirpacam_douala_newbell",
+    "overall_status": "completed",
+    "databases": {
+        "SDMC_DOUALA_AKWA_2023": {
+            "BACKUP": {"status": True},
+            "COMPRESS": {"status": True, "sha256_checksum": "4" * 64, "size": 19972513},
+            "TRANSFER": {"status": True, "error_message": None},
+            "staged_file_name": "sdmc_douala_akwa_2023.sql.gz"
+        }
+    }
+}
+
+
+@pytest.mark.parametrize("decoder", available_decoders())
+def test_decoders_return_identical_objects(decoder):
+    data = json.dumps(REPORT).encode("utf-8")
+    assert decode_report(data, decoder) == REPORT
+
+
+@pytest.mark.parametrize("decoder", available_decoders())
+def test_decoders_raise_json_decode_error(decoder):
+    with pytest.raises(json.JSONDecodeError):
+        decode_report(b'{"agent_id": ', decoder)
+
+
+def test_utf8_bom_is_ignored(tmp_path):
+    report_path = tmp_path / "report.json"
+    report_path.write_bytes(b"\xef\xbb\xbf" + json.dumps(REPORT).encode("utf-8"))
+    assert load_report(str(report_path)) == REPORT
+
+
+def test_unknown_decoder_falls_back_to_stdlib():
+    assert decode_report(b'{"a": 1}', "does-not-exist") == {"a": 1}
+
+
+def test_register_custom_decoder():
+    register_decoder("constant", lambda data: {"decoded": len(data)})
+    assert decode_report(b"{}", "constant") == {"decoded": 2}
+
+
+def test_validate_status_data_reuses_decoded_object():
+    report = decode_report(json.dumps(REPORT).encode("utf-8"))
+    assert validate_status_data(report) is report
+    with pytest.raises(StatusFileValidationError):
+        validate_status_data([report])
@@ -0,0 +1,68 @@
+# tests/test_lazy_startup.py
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_PROBE = """
+import json, sys
+import app.main
+from app.core import database
+print("PROBE " + json.dumps({
+    "engine": database._engine is not None,
+    "test_engine": database._test_engine is not None,
+    "modules": [name for name in ("app.core.scheduler", "app.services.scanner_MVP", "yaml") if name in sys.modules],
+}))
+"""
+
+
+def _probe(code: str, tmp_path) -> dict:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}")
+    output = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads([line for line in output.splitlines() if line.startswith("PROBE ")][-1][len("PROBE "):])
+
+
+def test_importing_the_app_opens_nothing(tmp_path):
+    state = _probe(IMPORT_PROBE, tmp_path)
+
+    assert state == {"engine": False, "test_engine": False, "modules": []}
+    assert not (tmp_path / "startup.db").exists()
+
+
+def test_lifespan_creates_the_tables_and_starts_the_scheduler(tmp_path):
+    state = _probe("""
+import json
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+import app.main
+from app.core import database
+with patch("app.core.scheduler.start_scheduler") as start, patch("app.core.scheduler.shutdown_scheduler") as stop:
+    with TestClient(app.main.app) as client:
+        client.get("/")
+        tables = inspect(database.get_engine()).get_table_names()
+print("PROBE " + json.dumps({"started": start.called, "stopped": stop.called, "tables": tables,
+                             "test_engine": database._test_engine is not None}))
+""", tmp_path)
+
+    assert state["started"] and state["stopped"]
+    assert {"expected_backup_jobs", "backup_entries"} <= set(state["tables"])
+    assert not state["test_engine"]
+
+
+def test_api_without_scanner_starts_no_scheduler(tmp_path, monkeypatch):
+    monkeypatch.setenv("RUN_SCANNER_IN_API", "false")
+    state = _probe("""
+import json, sys
+from fastapi.testclient import TestClient
+import app.main
+with TestClient(app.main.app) as client:
+    client.get("/")
+print("PROBE " + json.dumps({"scheduler": "app.core.scheduler" in sys.modules}))
+""", tmp_path)
+
+    assert state == {"scheduler": False}
@@ -0,0 +1,104 @@
+# tests/test_leader_election.py
+import multiprocessing
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.leader import DatabaseLeaderLock, FileLeaderLock, LeaderElector, build_leader_lock
+from app.models.models import SchedulerLock
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def session_factory(sqlite_session_factory):
+    return sqlite_session_factory([SchedulerLock.__table__], "leader.db", check_same_thread=False)
+
+
+def test_file_lock_has_a_single_holder(tmp_path):
+    path = str(tmp_path / "scheduler.lock")
+    first, second = FileLeaderLock(path), FileLeaderLock(path)
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    first.release()
+    assert second.try_acquire()
+    second.release()
+
+
+def _hold_file_lock(path, acquired):
+    lock = FileLeaderLock(path)
+    acquired.put(lock.try_acquire())
+    # Le processus se termine sans rendre le verrou : le noyau le libère
+
+
+def test_file_lock_is_freed_when_the_leader_process_exits(tmp_path):
+    path = str(tmp_path / "scheduler.lock")
+    context = multiprocessing.get_context("spawn")
+    acquired = context.Queue()
+    process = context.Process(target=_hold_file_lock, args=(path, acquired))
+    process.start()
+    assert acquired.get(timeout=60)
+    process.join(timeout=60)
+
+    assert FileLeaderLock(path).try_acquire()
+
+
+def test_database_lock_fails_over_after_expiry(session_factory):
+    leader = DatabaseLeaderLock(holder="worker-1", ttl_seconds=30, session_factory=session_factory)
+    follower = DatabaseLeaderLock(holder="worker-2", ttl_seconds=30, session_factory=session_factory)
+
+    assert leader.try_acquire(now=NOW)
+    assert not follower.try_acquire(now=NOW + timedelta(seconds=10))
+    assert leader.renew(now=NOW + timedelta(seconds=20))
+    # Le leader ne renouvelle plus : le verrou expire 30 s après le dernier renouvellement
+    assert not follower.try_acquire(now=NOW + timedelta(seconds=45))
+    assert follower.try_acquire(now=NOW + timedelta(seconds=51))
+    assert not leader.renew(now=NOW + timedelta(seconds=52))
+
+
+def test_database_lock_release_allows_immediate_takeover(session_factory):
+    leader = DatabaseLeaderLock(holder="worker-1", ttl_seconds=30, session_factory=session_factory)
+    follower = DatabaseLeaderLock(holder="worker-2", ttl_seconds=30, session_factory=session_factory)
+    assert leader.try_acquire(now=NOW)
+    leader.release()
+    assert follower.try_acquire(now=NOW)
+
+
+class _FakeLock:
+    def __init__(self):
+        self.available = True
+        self.held = False
+
+    def try_acquire(self):
+        if self.available:
+            self.held = True
+        return self.held
+
+    def renew(self):
+        return self.held and self.available
+
+    def release(self):
+        self.held = False
+
+
+def test_elector_calls_back_on_election_and_demotion():
+    lock = _FakeLock()
+    events = []
+    elector = LeaderElector(lock, on_elected=lambda: events.append("elected"),
+                            on_demoted=lambda: events.append("demoted"), interval_seconds=1)
+
+    assert elector.check()
+    assert elector.check()  # Renouvellement : pas de nouvel appel
+    lock.available = False
+    lock.held = False
+    assert not elector.check()
+    elector.stop()
+
+    assert events == ["elected", "demoted"]
+
+
+def test_build_leader_lock_follows_the_setting(tmp_path):
+    assert build_leader_lock("none") is None
+    assert isinstance(build_leader_lock("db"), DatabaseLeaderLock)
+    assert isinstance(build_leader_lock("file"), FileLeaderLock)
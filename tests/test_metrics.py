@@ -0,0 +1,83 @@
+# tests/test_metrics.py
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import metrics as metrics_endpoint
+from app.core.metrics import BYTES_HASHED, HASH_DURATION, MetricsRegistry
+from app.utils.crypto import calculate_file_sha256
+
+
+def test_counter_and_gauge_render_in_prometheus_format():
+    registry = MetricsRegistry()
+    reports = registry.counter("reports_total", "Rapports traités.", ["outcome"])
+    last = registry.gauge("last_scan", "Dernier passage.")
+
+    reports.inc(outcome="processed")
+    reports.inc(2, outcome="processed")
+    reports.inc(outcome="invalid")
+    last.set(12.5)
+
+    text = registry.render()
+    assert "# TYPE reports_total counter" in text
+    assert 'reports_total{outcome="processed"} 3' in text
+    assert 'reports_total{outcome="invalid"} 1' in text
+    assert "last_scan 12.5" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    duration = registry.histogram("phase_seconds", "Durée.", ["phase"], buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 5.0):
+        duration.observe(value, phase="evaluate")
+
+    lines = registry.render().splitlines()
+    assert 'phase_seconds_bucket{phase="evaluate",le="0.1"} 1' in lines
+    assert 'phase_seconds_bucket{phase="evaluate",le="1"} 2' in lines
+    assert 'phase_seconds_bucket{phase="evaluate",le="+Inf"} 3' in lines
+    assert 'phase_seconds_count{phase="evaluate"} 3' in lines
+    assert duration.sum(phase="evaluate") == pytest.approx(5.55)
+
+
+def test_histogram_timer_records_on_exception():
+    registry = MetricsRegistry()
+    duration = registry.histogram("commit_seconds", "Durée.")
+    with pytest.raises(RuntimeError):
+        with duration.time():
+            raise RuntimeError("échec")
+    assert duration.count() == 1
+
+
+def test_wrong_labels_are_rejected():
+    registry = MetricsRegistry()
+    counter = registry.counter("c_total", "Compteur.", ["scanner"])
+    with pytest.raises(ValueError):
+        counter.inc(phase="x")
+    with pytest.raises(ValueError):
+        registry.counter("c_total", "Doublon.")
+
+
+def test_file_hashing_updates_hash_metrics(tmp_path):
+    content = b"backup" * 1000
+    file_path = tmp_path / "db.sql.gz"
+    file_path.write_bytes(content)
+    bytes_before, count_before = BYTES_HASHED.value(), HASH_DURATION.count()
+
+    assert calculate_file_sha256(str(file_path)) == hashlib.sha256(content).hexdigest()
+
+    assert BYTES_HASHED.value() - bytes_before == len(content)
+    assert HASH_DURATION.count() - count_before == 1
+
+
+def test_metrics_endpoint_exposes_registry():
+    app = FastAPI()
+    app.include_router(metrics_endpoint.router, prefix="/metrics")
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE backup_hashed_bytes_total counter" in response.text
+    assert "# TYPE backup_scan_phase_duration_seconds histogram" in response.text
@@ -0,0 +1,122 @@
+# tests/test_missing_evaluator.py
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app.models.models import BackupEntry, BackupEntryStatus, ExpectedBackupJob
+from app.services.missing_evaluator import find_missing_jobs
+from app.services.scanner import BackupScanner
+
+NOW = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+WINDOW = 60
+TABLES = [ExpectedBackupJob.__table__, BackupEntry.__table__]
+
+
+def _naive(hours_before_now):
+    return (NOW - timedelta(hours=hours_before_now)).replace(tzinfo=None)
+
+
+# (nom, heure attendue, minute attendue, [(statut, heures avant NOW)])
+SCENARIOS = [
+    ("no_entry", 10, 0, []),
+    ("success_in_window", 10, 0, [("SUCCESS", 2.5)]),
+    ("success_too_old", 10, 0, [("SUCCESS", 5)]),
+    ("already_missing", 10, 0, [("MISSING", 0.9)]),
+    ("latest_unchanged", 10, 0, [("SUCCESS", 3), ("UNCHANGED", 1.5)]),
+    ("deadline_not_reached", 11, 30, []),
+    ("yesterday_cycle", 13, 0, []),
+    ("yesterday_cycle_handled", 13, 0, [("FAILED", 22)]),
+    ("past_midnight_handled", 0, 30, [("HASH_MISMATCH", 13)]),
+    ("no_expected_time", None, None, []),
+]
+
+
+def _seed(session, scenarios):
+    for name, hour, minute, entries in scenarios:
+        job = ExpectedBackupJob(
+            year=2026, company_name="SIRPACAM", city="DOUALA", neighborhood="AKWA", database_name=name,
+            expected_hour_utc=hour, expected_minute_utc=minute, agent_id_responsible="SIRPACAM_DOUALA_AKWA",
+            agent_deposit_path_template="x", agent_log_deposit_path_template="x", final_storage_path_template="x",
+        )
+        job.backup_entries = [BackupEntry(status=status, timestamp=_naive(hours)) for status, hours in entries]
+        session.add(job)
+    session.commit()
+
+
+def _outcome(session):
+    """Entrées MISSING créées par le passage et statut des jobs, par nom de base."""
+    jobs = session.query(ExpectedBackupJob).order_by(ExpectedBackupJob.database_name).all()
+    created = {
+        entry.expected_job.database_name: entry.message
+        for entry in session.query(BackupEntry).filter(BackupEntry.timestamp == NOW.replace(tzinfo=None))
+    }
+    return created, {job.database_name: job.current_status for job in jobs}
+
+
+def _run_both_paths(sqlite_session_factory, scenarios, monkeypatch):
+    monkeypatch.setattr("app.services.scanner.get_utc_now", lambda: NOW)
+    per_job = sqlite_session_factory(TABLES, "per_job.db")()
+    set_based = sqlite_session_factory(TABLES, "set_based.db")()
+    _seed(per_job, scenarios)
+    _seed(set_based, scenarios)
+
+    scanner = BackupScanner(per_job)
+    for job in per_job.query(ExpectedBackupJob).all():
+        scanner._handle_missing_or_unknown_job(job)
+    BackupScanner(set_based)._handle_missing_jobs(set_based.query(ExpectedBackupJob).all(), NOW)
+    return _outcome(per_job), _outcome(set_based)
+
+
+@pytest.fixture(autouse=True)
+def collection_window(monkeypatch):
+    monkeypatch.setattr("app.services.scanner.settings.SCANNER_REPORT_COLLECTION_WINDOW_MINUTES", WINDOW)
+
+
+def test_set_based_path_matches_per_job_path(sqlite_session_factory, monkeypatch):
+    per_job, set_based = _run_both_paths(sqlite_session_factory, SCENARIOS, monkeypatch)
+
+    assert set_based == per_job
+    assert set(set_based[0]) == {"no_entry", "success_too_old", "latest_unchanged", "yesterday_cycle"}
+    assert "2025-12-31" in set_based[0]["yesterday_cycle"]
+
+
+def test_set_based_path_matches_per_job_path_on_random_fleet(sqlite_session_factory, monkeypatch):
+    rng = random.Random(40)
+    statuses = [status.value for status in BackupEntryStatus]
+    scenarios = [
+        (f"db{i}", rng.randrange(24), rng.randrange(60),
+         [(rng.choice(statuses), rng.uniform(0, 48)) for _ in range(rng.randrange(4))])
+        for i in range(300)
+    ]
+    per_job, set_based = _run_both_paths(sqlite_session_factory, scenarios, monkeypatch)
+
+    assert set_based == per_job
+    assert set_based[0]
+
+
+def test_reported_jobs_are_not_marked_missing(sqlite_session_factory):
+    session = sqlite_session_factory(TABLES, "reported.db")()
+    _seed(session, SCENARIOS)
+    jobs = session.query(ExpectedBackupJob).all()
+
+    missing = find_missing_jobs(session, jobs, NOW, WINDOW,
+                                reported_job_keys={("SIRPACAM_DOUALA_AKWA", "no_entry")})
+
+    assert "no_entry" not in {job.database_name for job, _ in missing}
+
+
+def test_existing_entries_are_read_with_a_single_query(sqlite_session_factory):
+    session = sqlite_session_factory(TABLES, "queries.db")()
+    _seed(session, [(f"db{i}", 10, 0, [("SUCCESS", 1)] if i % 2 else []) for i in range(1500)])
+    jobs = session.query(ExpectedBackupJob).all()
+    selects = []
+    event.listen(session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: selects.append(statement)
+                 if statement.lstrip().upper().startswith("SELECT") else None)
+
+    missing = find_missing_jobs(session, jobs, NOW, WINDOW)
+
+    assert len(missing) == 750
+    assert len(selects) == 1
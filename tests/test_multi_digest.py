@@ -0,0 +1,79 @@
+# tests/test_multi_digest.py
+import hashlib
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from app.core.metrics import BYTES_HASHED
+from app.crud.backup_entry import get_backup_entries_by_fingerprint
+from app.models.models import BackupEntry, ExpectedBackupJob
+from app.services.integrity_checker import verify_staged_file
+from app.utils import crypto
+from app.utils.crypto import (
+    CryptoUtilityError, calculate_file_digests, calculate_file_sha256_and_fingerprint, resolve_fingerprint_algorithm,
+)
+
+
+def _write(path, content: bytes) -> str:
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_all_digests_come_from_a_single_read(tmp_path):
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    file_path = _write(tmp_path / "db.sql.gz", content)
+    before = BYTES_HASHED.value()
+
+    digests = calculate_file_digests(file_path, ("sha256", "blake2b128", "md5", "sha256_128"))
+
+    assert BYTES_HASHED.value() - before == len(content)
+    sha256 = hashlib.sha256(content).hexdigest()
+    assert digests == {
+        "sha256": sha256,
+        "blake2b128": hashlib.blake2b(content, digest_size=16).hexdigest(),
+        "md5": hashlib.md5(content).hexdigest(),
+        "sha256_128": sha256[:32],
+    }
+
+
+def test_fingerprint_algorithm_resolution():
+    assert resolve_fingerprint_algorithm("none") is None
+    assert resolve_fingerprint_algorithm("blake2b128") == "blake2b128"
+    with patch.object(crypto, "xxhash", None):
+        assert resolve_fingerprint_algorithm("auto") == "sha256_128"
+        assert resolve_fingerprint_algorithm("xxh3_128") == "sha256_128"
+    with pytest.raises(CryptoUtilityError):
+        resolve_fingerprint_algorithm("crc32")
+
+
+def test_verification_returns_the_fingerprint_with_the_hash(tmp_path):
+    content = b"\x1f\x8b" + b"payload" * 50
+    file_path = _write(tmp_path / "db.sql.gz", content)
+    digest = hashlib.sha256(content).hexdigest()
+
+    with patch.object(crypto.settings, "SCANNER_FINGERPRINT_ALGORITHM", "blake2b128"):
+        result = verify_staged_file(file_path, len(content), digest)
+
+    assert result.ok and result.sha256 == digest
+    assert result.fingerprint == "blake2b128:" + hashlib.blake2b(content, digest_size=16).hexdigest()
+    assert calculate_file_sha256_and_fingerprint(file_path, "none") == (digest, None)
+
+
+def test_fingerprint_lookup_uses_the_index(sqlite_session_factory):
+    session = sqlite_session_factory([ExpectedBackupJob.__table__, BackupEntry.__table__], "fingerprints.db")()
+    now = datetime(2026, 1, 15, 12, 0)
+    for index in range(20):
+        session.add(BackupEntry(expected_job_id=index % 4 + 1, timestamp=now, created_at=now, status="SUCCESS",
+                                content_fingerprint=f"sha256_128:{index % 5:032x}"))
+    session.commit()
+
+    duplicates = get_backup_entries_by_fingerprint(session, f"sha256_128:{3:032x}")
+
+    assert len(duplicates) == 4
+    plan = session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM backup_entries WHERE content_fingerprint = 'x'")).fetchall()
+    assert "ix_backup_entries_content_fingerprint" in " ".join(str(row) for row in plan)
+    session.close()
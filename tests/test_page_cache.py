@@ -0,0 +1,69 @@
+# tests/test_page_cache.py
+import hashlib
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.utils import page_cache
+from app.utils.crypto import calculate_file_sha256
+from app.utils.file_operations import _copy_in_chunks, copy_file, move_file
+from app.utils.page_cache import IO_MODES, PageCacheError, resolve_io_mode
+
+
+def _write(path, size: int) -> str:
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+@pytest.mark.parametrize("mode", IO_MODES)
+def test_hash_is_identical_in_every_io_mode(tmp_path, mode):
+    # Taille non alignée : le dernier bloc O_DIRECT est partiel
+    file_path = _write(tmp_path / "db.sql.gz", 3 * 1024 * 1024 + 123)
+    expected = hashlib.sha256(open(file_path, "rb").read()).hexdigest()
+
+    assert calculate_file_sha256(file_path, chunk_size=1024 * 1024, io_mode=mode) == expected
+
+
+def test_direct_hash_falls_back_when_o_direct_is_refused(tmp_path):
+    file_path = _write(tmp_path / "db.sql.gz", 10000)
+    expected = hashlib.sha256(open(file_path, "rb").read()).hexdigest()
+
+    with patch("app.utils.crypto.open_direct", return_value=None):
+        assert calculate_file_sha256(file_path, io_mode="direct") == expected
+
+
+def test_uncached_copy_preserves_content_and_mtime(tmp_path):
+    source = _write(tmp_path / "source.gz", 20 * 1024 * 1024 + 7)
+    os.utime(source, (1_700_000_000, 1_700_000_000))
+    destination = str(tmp_path / "validated" / "copy.gz")
+
+    copy_file(source, destination, io_mode="dontneed")
+
+    assert open(destination, "rb").read() == open(source, "rb").read()
+    assert os.path.getmtime(destination) == 1_700_000_000
+
+
+def test_move_fallback_copies_without_caching(tmp_path):
+    source = _write(tmp_path / "staged.gz", 4096)
+    content = open(source, "rb").read()
+    destination = str(tmp_path / "final" / "staged.gz")
+
+    # Systèmes de fichiers différents : ni os.replace ni le os.rename de shutil.move ne s'appliquent
+    cross_device = OSError(18, "Invalid cross-device link")
+    with patch("os.replace", side_effect=cross_device), patch("os.rename", side_effect=cross_device), \
+            patch("app.utils.file_operations._copy_in_chunks", wraps=_copy_in_chunks) as uncached:
+        move_file(source, destination, io_mode="dontneed")
+
+    uncached.assert_called_once()
+    assert not os.path.exists(source)
+    assert open(destination, "rb").read() == content
+
+
+def test_invalid_or_unavailable_modes():
+    with pytest.raises(PageCacheError):
+        resolve_io_mode("bypass")
+    with patch.object(page_cache, "HAS_DIRECT_IO", False):
+        assert resolve_io_mode("direct") == "dontneed"
+    with patch.object(page_cache, "HAS_FADVISE", False), patch.object(page_cache, "HAS_DIRECT_IO", False):
+        assert resolve_io_mode("direct") == "cache"
@@ -0,0 +1,102 @@
+# tests/test_report_ingestion.py
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.models import AgentReport, AgentReportDatabase
+from app.services.report_ingestion import ingest_report, normalize_report, ReportIngestionError
+from app.crud import agent_report as crud_report
+
+
+@pytest.fixture
+def memory_session():
+    """Session sur une base SQLite en mémoire, isolée des autres tests."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def agent_style_report():
+    """Rapport au format réellement produit par les agents (chaînes, séparateur espace, 'sha256')."""
+    return {
+        "operation_start_time": "2025-06-20 09:16:41.004136",
+        "operation_end_time": "2025-06-20 09:40:05.208307",
+        "agent_id": "SIRPACAM_BAFOUSSAM_ORANGE",
+        "databases": {
+            "SDMC_BAFOUSSAM_2025": {
+                "BACKUP": {
+                    "status": "True",
+                    "start_time": "2025-06-20 09:16:41.006542",
+                    "end_time": "2025-06-20 09:16:54.934723",
+                    "sha256": "c" * 64,
+                    "size": "74490368"
+                },
+                "COMPRESS": {
+                    "status": "True",
+                    "start_time": "2025-06-20 09:34:18.078490",
+                    "end_time": "2025-06-20 09:34:40.619834",
+                    "sha256": "6" * 64,
+                    "size": "5719594"
+                },
+                "TRANSFER": {
+                    "status": "False",
+                    "start_time": "2025-06-20 09:39:22.765762",
+                    "end_time": "2025-06-20 09:39:24.360009",
+                    "error_message": "null"
+                },
+                "staged_file_name": "/home/lam/Backup/SDMC_BAFOUSSAM_2025.zst"
+            }
+        }
+    }
+
+
+def test_normalize_report_coerces_agent_quirks(agent_style_report):
+    normalized = normalize_report(agent_style_report)
+
+    assert normalized["agent_id"] == "SIRPACAM_BAFOUSSAM_ORANGE"
+    assert normalized["operation_end_time"] == datetime(2025, 6, 20, 9, 40, 5, 208307, tzinfo=timezone.utc)
+    assert normalized["overall_status"] is None
+
+    row = normalized["databases"][0]
+    assert row["database_name"] == "SDMC_BAFOUSSAM_2025"
+    assert row["staged_file_name"] == "SDMC_BAFOUSSAM_2025.zst"
+    assert row["backup_status"] is True
+    assert row["transfer_status"] is False
+    assert row["compress_sha256"] == "6" * 64
+    assert row["compress_size"] == 5719594
+    assert row["transfer_error_message"] is None
+
+
+def test_normalize_report_rejects_missing_agent_id():
+    with pytest.raises(ReportIngestionError):
+        normalize_report({"databases": {}})
+
+
+def test_ingest_report_is_idempotent(memory_session, agent_style_report):
+    first = ingest_report(memory_session, agent_style_report, "2025-06-20_09-40-05_SIRPACAM_BAFOUSSAM_ORANGE.json")
+    memory_session.commit()
+    second = ingest_report(memory_session, agent_style_report, "2025-06-20_09-40-05_SIRPACAM_BAFOUSSAM_ORANGE.json")
+    memory_session.commit()
+
+    assert first.id == second.id
+    assert memory_session.query(AgentReport).count() == 1
+    assert memory_session.query(AgentReportDatabase).count() == 1
+    assert first.databases[0].all_processes_succeeded is False
+
+
+def test_crud_reads_typed_history(memory_session, agent_style_report):
+    ingest_report(memory_session, agent_style_report, "report_1.json")
+    memory_session.commit()
+
+    reports = crud_report.get_agent_reports(memory_session, agent_id="SIRPACAM_BAFOUSSAM_ORANGE")
+    history = crud_report.get_report_databases_by_name(memory_session, "SDMC_BAFOUSSAM_2025")
+
+    assert len(reports) == 1
+    assert reports[0].database_count == 1
+    assert history[0].backup_size == 74490368
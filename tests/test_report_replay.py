@@ -0,0 +1,160 @@
+# tests/test_report_replay.py
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.models.models import BackupEntry, ExpectedBackupJob
+from app.services.report_replay import (
+    TIER_REPORT, list_archived_reports, replay_archived_reports, report_time_from_name,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+AGENTS = ("ACME_PARIS_CENTRE", "GLOBEX_DOUALA_AKWA")
+# Contenus successifs du fichier déposé : le deuxième rapport redépose le même contenu que le premier
+CONTENTS = (b"\x28\xb5\x2f\xfd" + b"a" * 4096, b"\x28\xb5\x2f\xfd" + b"a" * 4096, b"\x28\xb5\x2f\xfd" + b"b" * 4096)
+
+
+def _write_archive(root: Path, agent: str, databases=("DB1",)) -> None:
+    archive = root / agent / "log" / "_archive"
+    archive.mkdir(parents=True)
+    (root / agent / "databases").mkdir()
+    for day, content in enumerate(CONTENTS, start=1):
+        end_time = f"2025-06-{day:02d} 09:40:05"
+        step = {"status": "True", "start_time": f"2025-06-{day:02d} 09:16:41", "end_time": end_time}
+        report = {
+            "operation_start_time": step["start_time"], "operation_end_time": end_time, "agent_id": agent,
+            "databases": {name: {
+                "BACKUP": dict(step, sha256="a" * 64, size="10"),
+                "COMPRESS": dict(step, sha256=hashlib.sha256(content).hexdigest(), size=str(len(content))),
+                "TRANSFER": dict(step, error_message="null"),
+                "staged_file_name": f"/home/x/{name.lower()}_2025.zst",
+            } for name in databases},
+        }
+        (archive / f"202506{day:02d}_094005_{agent}.json").write_text(json.dumps(report))
+    # Seul le dernier dépôt est encore présent dans la zone de dépôt
+    for name in databases:
+        (root / agent / "databases" / f"{name.lower()}_2025.zst").write_bytes(CONTENTS[-1])
+
+
+@pytest.fixture
+def fleet(tmp_path, sqlite_session_factory):
+    root = tmp_path / "root"
+    for agent in AGENTS:
+        _write_archive(root, agent)
+    (root / AGENTS[0] / "log" / "_archive" / "20250604_000000_corrompu.json").write_text("{")
+    session = sqlite_session_factory(name="replay.db")()
+    for agent in AGENTS:
+        for database_name in ("DB1", "DB2"):
+            session.add(ExpectedBackupJob(
+                year=2025, company_name=agent.split("_")[0], city="X", neighborhood="CENTRE",
+                database_name=database_name, agent_id_responsible=agent, agent_deposit_path_template="x",
+                agent_log_deposit_path_template="y", final_storage_path_template="z", current_status="UNKNOWN",
+                is_active=True))
+    session.commit()
+    yield root, session
+    session.close()
+
+
+def _history(session, agent, database_name="DB1"):
+    return (
+        session.query(BackupEntry)
+        .join(ExpectedBackupJob)
+        .filter(ExpectedBackupJob.agent_id_responsible == agent, ExpectedBackupJob.database_name == database_name)
+        .order_by(BackupEntry.timestamp)
+        .all()
+    )
+
+
+def test_archived_reports_are_listed_in_time_order(fleet):
+    root, _ = fleet
+    archived = list_archived_reports(str(root), since=datetime(2025, 6, 2), until=datetime(2025, 6, 3, 23, 59))
+
+    assert set(archived) == set(AGENTS)
+    assert [report.name for report in archived[AGENTS[1]]] == \
+        [f"20250602_094005_{AGENTS[1]}.json", f"20250603_094005_{AGENTS[1]}.json"]
+    assert report_time_from_name("rapport.json") is None
+
+
+def test_dashed_report_names_order_the_replay_regardless_of_mtime(fleet):
+    root, session = fleet
+    archive = root / AGENTS[0] / "log" / "_archive"
+    for day in range(1, len(CONTENTS) + 1):
+        dashed = archive / f"2025-06-{day:02d}_09-40-05_{AGENTS[0]}.json"
+        (archive / f"202506{day:02d}_094005_{AGENTS[0]}.json").rename(dashed)
+        # Archive restaurée : les dates de modification ne suivent plus l'ordre des rapports
+        os.utime(dashed, (1_000_000 - day, 1_000_000 - day))
+
+    assert report_time_from_name(f"2025-06-20_08-37-35_{AGENTS[0]}.json") == datetime(2025, 6, 20, 8, 37, 35)
+    assert [report.name for report in list_archived_reports(str(root), agents=[AGENTS[0]])[AGENTS[0]]][:3] == \
+        [f"2025-06-{day:02d}_09-40-05_{AGENTS[0]}.json" for day in range(1, 4)]
+
+    replay_archived_reports(session, str(root), agents=[AGENTS[0]], workers=1)
+    history = _history(session, AGENTS[0])
+    assert [entry.status for entry in history] == ["SUCCESS", "UNCHANGED", "SUCCESS"]
+    assert [entry.timestamp for entry in history] == [datetime(2025, 6, day, 9, 40, 5) for day in range(1, 4)]
+
+
+def test_replay_rebuilds_history_and_job_state(fleet):
+    root, session = fleet
+    stats = replay_archived_reports(session, str(root), workers=1)
+
+    assert stats["agents_replayed"] == 2 and stats["reports_invalid"] == 1
+    assert stats["reports_replayed"] == 6 and stats["entries_written"] == 12
+    # Seul le fichier encore déposé (dernier rapport) est haché
+    assert stats["files_hashed"] == 2 and stats["digests_from_report"] == 4
+    history = _history(session, AGENTS[0])
+    assert [entry.status for entry in history] == ["SUCCESS", "UNCHANGED", "SUCCESS"]
+    assert [entry.verification_tier for entry in history] == [TIER_REPORT, TIER_REPORT, "sha256"]
+    assert history[-1].server_calculated_staged_hash == hashlib.sha256(CONTENTS[-1]).hexdigest()
+    assert history[0].timestamp == datetime(2025, 6, 1, 9, 40, 5)
+    assert {entry.status for entry in _history(session, AGENTS[0], "DB2")} == {"MISSING"}
+
+    job = session.query(ExpectedBackupJob).filter_by(agent_id_responsible=AGENTS[0], database_name="DB1").one()
+    assert job.current_status == "SUCCESS"
+    assert job.previous_successful_hash_global == hashlib.sha256(CONTENTS[-1]).hexdigest()
+    assert job.last_checked_timestamp == datetime(2025, 6, 3, 9, 40, 5)
+
+
+def test_replay_keeps_or_replaces_existing_entries_without_rehashing(fleet):
+    root, session = fleet
+    replay_archived_reports(session, str(root), agents=[AGENTS[0]], workers=1)
+
+    kept = replay_archived_reports(session, str(root), agents=[AGENTS[0]], workers=1)
+    assert kept["entries_kept"] == 6 and kept.get("entries_written", 0) == 0
+
+    replaced = replay_archived_reports(session, str(root), agents=[AGENTS[0]], replace=True, workers=1)
+    assert replaced["entries_written"] == 6 and replaced["digests_reused"] == 1
+    assert replaced.get("files_hashed", 0) == 0 and replaced["bytes_hashed"] == 0
+    assert [entry.status for entry in _history(session, AGENTS[0])] == ["SUCCESS", "UNCHANGED", "SUCCESS"]
+
+
+def test_parallel_replay_matches_inline_replay(fleet):
+    root, session = fleet
+    replay_archived_reports(session, str(root), workers=2)
+    parallel = {agent: [(e.status, e.previous_successful_hash_global) for e in _history(session, agent)]
+                for agent in AGENTS}
+
+    replay_archived_reports(session, str(root), replace=True, workers=1)
+    inline = {agent: [(e.status, e.previous_successful_hash_global) for e in _history(session, agent)]
+              for agent in AGENTS}
+    assert parallel == inline
+
+
+def test_cli_replay_selects_agents_and_prints_stats(fleet, tmp_path):
+    root, session = fleet
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'replay.db'}", BACKUP_STORAGE_ROOT=str(root))
+
+    result = subprocess.run([sys.executable, "-m", "app.cli", "replay", "--company", "GLOBEX", "--since", "2025-06-02",
+                             "--workers", "1", "--json", "-"], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    stats = json.loads(result.stdout)
+    assert stats["agents_requested"] == [AGENTS[1]]
+    assert stats["reports_replayed"] == 2 and stats["since"] == "2025-06-02T00:00:00+00:00"
+    assert len(_history(session, AGENTS[1])) == 2 and _history(session, AGENTS[0]) == []
@@ -0,0 +1,111 @@
+# tests/test_report_validator.py
+import copy
+import glob
+import os
+import pytest
+
+from app.utils.json_decoder import load_report
+from app.utils.report_validator import validate_report, CompiledReportValidator, REPORT_SCHEMA
+from app.utils.is_valid_backup_report import is_valid_backup_report
+
+ARCHIVED_REPORTS = sorted(glob.glob(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scanner_test_root", "*", "log", "_archive", "*.json"
+)))
+
+
+@pytest.fixture
+def valid_report():
+    return {
+        "operation_start_time": "2025-06-12T12:53:52Z",
+        "operation_end_time": "2025-06-12T12:56:06Z",
+        "agent_id": "sirpacam_douala_newbell",
+        "overall_status": "completed",
+        "databases": {
+            "SDMC_DOUALA_AKWA_2023": {
+                "BACKUP": {"status": True, "start_time": "2025-06-12T12:53:52Z", "end_time": "2025-06-12T12:54:26Z",
+                           "sha256_checksum": "a" * 64, "size": 188178944},
+                "COMPRESS": {"status": True, "start_time": "2025-06-12T12:55:15Z", "end_time": "2025-06-12T12:56:03Z",
+                             "sha256_checksum": "b" * 64, "size": 19972513},
+                "TRANSFER": {"status": True, "start_time": "2025-06-12T12:56:06Z", "end_time": "2025-06-12T12:56:06Z",
+                             "error_message": None},
+                "staged_file_name": "sdmc_douala_akwa_2023.sql.gz"
+            }
+        }
+    }
+
+
+def test_valid_report_has_no_issue(valid_report):
+    result = validate_report(valid_report)
+    assert result.is_valid
+    assert result.warnings == []
+
+
+@pytest.mark.parametrize("report_path", ARCHIVED_REPORTS)
+def test_real_agent_reports_are_accepted(report_path):
+    # Quirks réels : "status": "True", horodatages avec espace, 'sha256' au lieu de 'sha256_checksum'
+    result = validate_report(load_report(report_path))
+    assert result.is_valid, result.summary()
+
+
+def test_agent_string_quirks_are_accepted(valid_report):
+    db = valid_report["databases"]["SDMC_DOUALA_AKWA_2023"]
+    valid_report["operation_end_time"] = "2025-06-20 09:40:05.208307"
+    db["COMPRESS"]["status"] = "True"
+    db["COMPRESS"]["sha256"] = db["COMPRESS"].pop("sha256_checksum")
+    db["COMPRESS"]["size"] = "19972513"
+    db["TRANSFER"]["error_message"] = "null"
+    del valid_report["overall_status"]
+
+    result = validate_report(valid_report)
+    assert result.is_valid
+    assert result.warnings == []
+
+
+def test_all_errors_are_collected_in_one_pass(valid_report):
+    db = valid_report["databases"]["SDMC_DOUALA_AKWA_2023"]
+    valid_report["operation_end_time"] = "12/06/2025"
+    valid_report["overall_status"] = "done"
+    del db["staged_file_name"]
+    db["BACKUP"]["status"] = "maybe"
+
+    result = validate_report(valid_report)
+    paths = {issue.path for issue in result.errors}
+    assert paths == {
+        "operation_end_time",
+        "overall_status",
+        "databases.SDMC_DOUALA_AKWA_2023.staged_file_name",
+        "databases.SDMC_DOUALA_AKWA_2023.BACKUP.status",
+    }
+
+
+def test_non_blocking_anomalies_are_warnings(valid_report):
+    compress = valid_report["databases"]["SDMC_DOUALA_AKWA_2023"]["COMPRESS"]
+    compress["sha256_checksum"] = "too-short"
+    compress["size"] = -1
+    del compress["start_time"]
+
+    result = validate_report(valid_report)
+    assert result.is_valid
+    assert len(result.warnings) == 3
+
+
+def test_non_dict_report_is_rejected():
+    result = validate_report(["not", "a", "report"])
+    assert not result.is_valid
+    assert result.errors[0].path == "$"
+
+
+def test_is_valid_backup_report_delegates(valid_report):
+    invalid = copy.deepcopy(valid_report)
+    del invalid["agent_id"]
+    assert is_valid_backup_report(valid_report) is True
+    assert is_valid_backup_report(invalid) is False
+
+
+def test_custom_schema_compilation():
+    validator = CompiledReportValidator({"type": "object", "fields": {
+        "agent_id": {"type": "string", "required": True}
+    }})
+    assert validator.validate({"agent_id": "A"}).is_valid
+    assert not validator.validate({}).is_valid
+    assert validator.schema is not REPORT_SCHEMA
@@ -0,0 +1,89 @@
+# tests/test_scan_cadence.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.scan_cadence import AdaptiveScanCadence
+from app.models.models import ExpectedBackupJob, ScanRun
+
+DAY = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
+
+def _cadence(**overrides):
+    options = dict(min_seconds=20, max_seconds=900, window_interval_seconds=60, backoff_factor=2.0,
+                   max_scans_per_hour=1000, max_busy_ratio=0.5, window_minutes=60, learning_days=7)
+    options.update(overrides)
+    return AdaptiveScanCadence(**options)
+
+
+def test_interval_tightens_on_reports_and_backs_off_when_idle():
+    cadence = _cadence()
+    now = DAY.replace(hour=15)
+
+    intervals = [cadence.next_interval(now + timedelta(minutes=i)) for i in range(8)]
+    assert intervals[:5] == [40, 80, 160, 320, 640]
+    assert intervals[-1] == 900
+
+    assert cadence.next_interval(now + timedelta(hours=1), reports_processed=3) == 20
+    assert cadence.next_interval(now + timedelta(hours=1, minutes=1)) == 40
+
+
+def test_open_window_caps_the_backoff_at_the_window_interval():
+    cadence = _cadence()
+    cadence.set_slots([8 * 60])
+
+    assert cadence.in_window(DAY.replace(hour=7, minute=30))
+    assert not cadence.in_window(DAY.replace(hour=9, minute=1))
+    now = DAY.replace(hour=8, minute=30)
+    assert [cadence.next_interval(now + timedelta(minutes=i)) for i in range(3)] == [40, 60, 60]
+
+
+def test_backoff_wakes_up_when_the_next_window_opens():
+    cadence = _cadence(max_seconds=3600)
+    cadence.set_slots([8 * 60])
+    cadence.idle_passes = 10
+
+    # Fenêtre 07:00-09:00 : réveil à 07:00 au plus tard
+    assert cadence.next_interval(DAY.replace(hour=6, minute=50)) == 600
+
+
+def test_windows_wrap_around_midnight():
+    cadence = _cadence()
+    cadence.set_slots([23 * 60 + 30])
+
+    assert cadence.in_window(DAY.replace(hour=0, minute=20))
+    assert not cadence.in_window(DAY.replace(hour=0, minute=31))
+    assert cadence.seconds_until_window(DAY.replace(hour=22, minute=0)) == 30 * 60
+
+
+def test_scan_budget_caps_the_cadence():
+    cadence = _cadence(max_scans_per_hour=3)
+    now = DAY.replace(hour=8)
+    for i in range(2):
+        assert cadence.next_interval(now + timedelta(seconds=20 * i), reports_processed=1) == 20
+    # Plafond atteint : les passages suivants sont espacés régulièrement sur l'heure
+    assert cadence.next_interval(now + timedelta(seconds=40), reports_processed=1) == 1200
+    # Un passage long ne peut occuper plus de la moitié du temps
+    assert _cadence().next_interval(now, reports_processed=1, duration_seconds=120) == 120
+
+
+def test_slots_come_from_expected_times_and_recurring_arrivals(sqlite_session_factory):
+    session_factory = sqlite_session_factory([ExpectedBackupJob.__table__, ScanRun.__table__], "cadence.db")
+    session = session_factory()
+    session.add(ExpectedBackupJob(
+        year=2026, company_name="SIRPACAM", city="DOUALA", neighborhood="AKWA", database_name="DB1",
+        expected_hour_utc=6, expected_minute_utc=30, agent_id_responsible="SIRPACAM_DOUALA_AKWA",
+        agent_deposit_path_template="x", agent_log_deposit_path_template="x", final_storage_path_template="x",
+    ))
+    for days_ago, hour, reports in [(1, 13, 2), (2, 13, 1), (3, 13, 0), (1, 17, 4)]:
+        started_at = (DAY - timedelta(days=days_ago)).replace(hour=hour, minute=5, tzinfo=None)
+        session.add(ScanRun(scanner="mvp", started_at=started_at, finished_at=started_at,
+                            duration_seconds=1.0, reports_processed=reports))
+    session.commit()
+    session.close()
+
+    cadence = _cadence(session_factory=session_factory)
+    cadence.refresh_slots(DAY.replace(hour=12))
+
+    # 06:30 (heure attendue) et 13:07 (rapports deux jours distincts) ; 17:05 n'a été vu qu'une fois
+    assert cadence.slots == [6 * 60 + 30, 13 * 60 + 7]
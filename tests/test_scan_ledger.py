@@ -0,0 +1,123 @@
+# tests/test_scan_ledger.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.metrics import BYTES_HASHED, HASH_DURATION, REPORTS_PROCESSED, SCAN_PHASE_DURATION
+from app.crud.scan_run import get_scan_run, get_scan_runs, get_scan_trends
+from app.models.models import AgentLease, BackupEntry, ExpectedBackupJob, ScanRun
+from app.services.scan_ledger import ScanRunRecorder
+
+
+@pytest.fixture
+def memory_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _job(session):
+    job = ExpectedBackupJob(
+        year=2025, company_name="ACME", city="PARIS", neighborhood="CENTRE", database_name="DB1",
+        agent_id_responsible="ACME_PARIS_CENTRE", agent_deposit_path_template="x",
+        agent_log_deposit_path_template="y", final_storage_path_template="z", is_active=True,
+    )
+    session.add(job)
+    session.commit()
+    return job
+
+
+def test_recorder_writes_deltas_of_the_run(memory_session):
+    job = _job(memory_session)
+    # Activité antérieure au passage : ne doit pas être comptée
+    BYTES_HASHED.inc(999)
+    recorder = ScanRunRecorder(scanner="mvp")
+
+    BYTES_HASHED.inc(1000)
+    HASH_DURATION.observe(0.01)
+    SCAN_PHASE_DURATION.observe(0.5, scanner="mvp", phase="evaluate")
+    SCAN_PHASE_DURATION.observe(0.7, scanner="backup_scanner", phase="evaluate")
+    REPORTS_PROCESSED.inc(2, scanner="mvp", outcome="processed")
+    REPORTS_PROCESSED.inc(scanner="mvp", outcome="deferred")
+    memory_session.add_all([
+        BackupEntry(expected_job_id=job.id, status="SUCCESS", created_at=datetime.utcnow()),
+        BackupEntry(expected_job_id=job.id, status="MISSING", created_at=datetime.utcnow()),
+        BackupEntry(expected_job_id=job.id, status="MISSING", created_at=datetime.utcnow()),
+    ])
+    memory_session.commit()
+    recorder.record_error(RuntimeError("disque plein"))
+
+    scan_run = recorder.finish(memory_session)
+
+    stored = get_scan_run(memory_session, scan_run.id)
+    assert stored.bytes_hashed == 1000
+    assert stored.files_hashed == 1
+    assert stored.phase_durations == {"evaluate": pytest.approx(0.5)}
+    assert stored.report_outcomes == {"processed": 2, "deferred": 1}
+    assert stored.reports_processed == 3
+    assert stored.status_counts == {"SUCCESS": 1, "MISSING": 2}
+    assert stored.entries_created == 3
+    assert stored.succeeded is False
+    assert stored.errors == ["disque plein"]
+
+
+def test_sharded_run_counts_only_entries_of_its_leased_agents(memory_session):
+    job = _job(memory_session)
+    other = ExpectedBackupJob(
+        year=2025, company_name="GLOBEX", city="DOUALA", neighborhood="AKWA", database_name="DB1",
+        agent_id_responsible="GLOBEX_DOUALA_AKWA", agent_deposit_path_template="x",
+        agent_log_deposit_path_template="y", final_storage_path_template="z", is_active=True,
+    )
+    now = datetime.utcnow()
+    memory_session.add_all([
+        other,
+        AgentLease(agent_id="ACME_PARIS_CENTRE", node_id="node-a", acquired_at=now, expires_at=now + timedelta(minutes=5)),
+        AgentLease(agent_id="GLOBEX_DOUALA_AKWA", node_id="node-b", acquired_at=now, expires_at=now + timedelta(minutes=5)),
+    ])
+    memory_session.commit()
+    recorders = [ScanRunRecorder(scanner="mvp", node_id="node-a"),
+                 ScanRunRecorder(scanner="mvp", agents=["GLOBEX_DOUALA_AKWA"]),
+                 ScanRunRecorder(scanner="mvp")]
+
+    memory_session.add_all([
+        BackupEntry(expected_job_id=job.id, status="SUCCESS", created_at=datetime.utcnow()),
+        BackupEntry(expected_job_id=other.id, status="MISSING", created_at=datetime.utcnow()),
+        BackupEntry(expected_job_id=other.id, status="MISSING", created_at=datetime.utcnow()),
+    ])
+    memory_session.commit()
+
+    assert [recorder.build(memory_session).status_counts for recorder in recorders] == [
+        {"SUCCESS": 1}, {"MISSING": 2}, {"SUCCESS": 1, "MISSING": 2},
+    ]
+
+
+def test_runs_listing_and_daily_trends(memory_session):
+    noon = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    for offset_days, offset_minutes, duration, errors in ((0, 10, 2.0, 0), (0, 20, 4.0, 1), (1, 0, 3.0, 0), (90, 0, 9.0, 0)):
+        started = noon - timedelta(days=offset_days) + timedelta(minutes=offset_minutes)
+        memory_session.add(ScanRun(
+            scanner="mvp", started_at=started, finished_at=started + timedelta(seconds=duration),
+            duration_seconds=duration, succeeded=not errors, agents_processed=1, reports_processed=1,
+            entries_created=1, files_hashed=1, bytes_hashed=100, bytes_promoted=0,
+            report_cache_hits=0, report_cache_lookups=1, error_count=errors,
+        ))
+    memory_session.commit()
+
+    runs = get_scan_runs(memory_session, limit=2)
+    assert [run.duration_seconds for run in runs] == [4.0, 2.0]
+
+    trends = get_scan_trends(memory_session, days=30)
+    assert len(trends) == 2
+    today = trends[-1]
+    assert today["runs"] == 2
+    assert today["avg_duration_seconds"] == pytest.approx(3.0)
+    assert today["max_duration_seconds"] == pytest.approx(4.0)
+    assert today["bytes_hashed"] == 200
+    assert today["errors"] == 1
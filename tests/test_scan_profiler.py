@@ -0,0 +1,56 @@
+# tests/test_scan_profiler.py
+import os
+import time
+from unittest.mock import MagicMock
+
+from app.services.scanner import BackupScanner
+from app.utils.profiling import CATEGORY_DB, ScanProfiler
+from config.settings import settings
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = ScanProfiler(enabled=False)
+    profiler.start()
+    with profiler.phase("collect"), profiler.step("agent", "A"), profiler.category(CATEGORY_DB):
+        pass
+    profiler.stop()
+
+    report = profiler.report()
+    assert report["phases"] == {} and report["categories"] == {} and report["slowest"] == {}
+
+
+def test_slowest_steps_are_sorted_and_limited():
+    profiler = ScanProfiler(enabled=True, top_n=2)
+    profiler.start()
+    for key, delay in (("fast", 0.0), ("slow", 0.02), ("medium", 0.01)):
+        with profiler.step("job", key):
+            time.sleep(delay)
+    profiler.stop()
+
+    slowest = profiler.slowest("job")
+    assert [key for key, _ in slowest] == ["slow", "medium"]
+    assert profiler.report()["total_seconds"] >= 0.03
+
+
+def test_cprofile_stats_are_dumped(tmp_path):
+    profiler = ScanProfiler(enabled=True, use_cprofile=True, output_dir=str(tmp_path))
+    profiler.start()
+    sum(range(1000))
+    profiler.stop()
+
+    assert profiler.cprofile_path is not None
+    assert os.path.exists(profiler.cprofile_path)
+    assert "function calls" in profiler.cprofile_summary(limit=5)
+
+
+def test_backup_scanner_records_each_phase(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BACKUP_STORAGE_ROOT", str(tmp_path / "absent"))
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.return_value = []
+    profiler = ScanProfiler(enabled=True)
+
+    BackupScanner(session, profiler=profiler).scan_all_jobs()
+
+    report = profiler.report()
+    assert set(report["phases"]) == {"collect", "evaluate", "archive"}
+    assert CATEGORY_DB in report["categories"]
@@ -0,0 +1,70 @@
+# tests/test_scanner_worker.py
+import hashlib
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app import scanner_worker
+from app.core.metrics import BYTES_HASHED
+from app.services import verification_pool
+from app.services.integrity_checker import TIER_SHA256, TIER_STAT, verify_staged_file
+from app.utils.io_throttle import TokenBucket
+
+
+@pytest.fixture
+def pool():
+    assert verification_pool.start_verification_pool(2) == 2
+    yield verification_pool
+    verification_pool.shutdown_verification_pool()
+
+
+def test_pool_verifies_files_like_the_inline_check(tmp_path, pool):
+    content = b"\x1f\x8b" + b"sauvegarde" * 1000
+    good, truncated = tmp_path / "a.sql.gz", tmp_path / "b.sql.gz"
+    good.write_bytes(content)
+    truncated.write_bytes(content[:100])
+    digest = hashlib.sha256(content).hexdigest()
+    requests = [(str(good), len(content), digest), (str(truncated), len(content), digest), (str(good), len(content), digest)]
+
+    before = BYTES_HASHED.value()
+    futures = pool.submit_verifications(requests)
+
+    assert set(futures) == {str(good), str(truncated)}
+    results = {path: pool.wait_verification(future) for path, future in futures.items()}
+    # Octets hachés dans le pool, reportés dans les métriques du processus principal
+    assert BYTES_HASHED.value() - before == len(content)
+    assert results[str(good)] == verify_staged_file(str(good), len(content), digest)
+    assert results[str(good)].ok and results[str(good)].tier == TIER_SHA256
+    assert not results[str(truncated)].ok and results[str(truncated)].tier == TIER_STAT
+
+
+def test_without_pool_verification_stays_inline(tmp_path):
+    assert verification_pool.start_verification_pool(1) == 0
+    assert verification_pool.submit_verifications([(str(tmp_path / "a.sql.gz"), 1, "0" * 64)]) == {}
+
+
+def test_pool_processes_share_the_io_budget():
+    bucket = TokenBucket("40M", "8M", "06:00-20:00=20M;20:00-06:00=0")
+
+    bucket.scale(1 / 4)
+
+    assert bucket.default_rate == 10 * 1024 * 1024
+    assert bucket.burst == 2 * 1024 * 1024
+    assert [rate for _, _, rate in bucket.schedule] == [5 * 1024 * 1024, 0]
+
+
+def test_worker_runs_the_scheduler_until_stopped(tmp_path):
+    stop_event = threading.Event()
+    stop_event.set()
+    with patch.object(scanner_worker, "get_engine") as get_engine, \
+            patch.object(scanner_worker.Base.metadata, "create_all") as create_all, \
+            patch("app.core.scheduler.start_scheduler") as start, \
+            patch("app.core.scheduler.shutdown_scheduler") as stop, \
+            patch("app.services.verification_pool.start_verification_pool") as start_pool, \
+            patch("app.services.verification_pool.shutdown_verification_pool") as stop_pool:
+        scanner_worker.run_worker(processes=3, metrics_port=0, nice=0, stop_event=stop_event)
+
+    create_all.assert_called_once_with(bind=get_engine.return_value)
+    start_pool.assert_called_once_with(3)
+    assert start.called and stop.called and stop_pool.called
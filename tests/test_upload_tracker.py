@@ -0,0 +1,78 @@
+# tests/test_upload_tracker.py
+import os
+
+import pytest
+
+from app.services.upload_tracker import UploadTracker
+from config.settings import settings
+
+OLD_MTIME = 1_000_000_000.0  # Fichier modifié il y a longtemps
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    monkeypatch.setattr(settings, "SCANNER_UPLOAD_QUIESCENT_SECONDS", 30)
+    monkeypatch.setattr(settings, "SCANNER_UPLOAD_BACKOFF_BASE_SECONDS", 60)
+    monkeypatch.setattr(settings, "SCANNER_UPLOAD_BACKOFF_MAX_SECONDS", 300)
+    monkeypatch.setattr(settings, "SCANNER_UPLOAD_MAX_DEFER_MINUTES", 60)
+    return UploadTracker()
+
+
+def _staged_file(tmp_path, size=100, mtime=OLD_MTIME):
+    path = tmp_path / "db_2025.zst"
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_quiescent_file_is_ready(tracker, tmp_path):
+    file_path = _staged_file(tmp_path)
+    assert tracker.is_upload_in_progress(file_path) is False
+    assert tracker.pending_files() == {}
+
+
+def test_missing_file_is_not_deferred(tracker, tmp_path):
+    assert tracker.is_upload_in_progress(str(tmp_path / "absent.zst")) is False
+
+
+def test_recently_modified_file_is_deferred_then_ready(tracker, tmp_path):
+    now = 2_000_000_000.0
+    file_path = _staged_file(tmp_path, mtime=now - 5)
+
+    assert tracker.is_upload_in_progress(file_path, now=now) is True
+    # Pendant le délai, aucune nouvelle vérification
+    assert tracker.is_upload_in_progress(file_path, now=now + 59) is True
+    # Après le délai, le fichier n'a plus bougé depuis plus de 30 s
+    assert tracker.is_upload_in_progress(file_path, now=now + 60) is False
+
+
+def test_growing_file_backs_off_exponentially(tracker, tmp_path):
+    now = 2_000_000_000.0
+    file_path = _staged_file(tmp_path, size=100, mtime=now - 5)
+    assert tracker.is_upload_in_progress(file_path, now=now) is True
+
+    delays = []
+    for step in range(4):
+        previous = tracker.pending_files()[file_path]
+        check_at = previous.next_check_at
+        _staged_file(tmp_path, size=200 + step, mtime=OLD_MTIME)  # taille modifiée
+        assert tracker.is_upload_in_progress(file_path, now=check_at) is True
+        delays.append(tracker.pending_files()[file_path].next_check_at - check_at)
+
+    assert delays == [120, 240, 300, 300]
+
+
+def test_part_marker_defers_file(tracker, tmp_path):
+    file_path = _staged_file(tmp_path)
+    (tmp_path / "db_2025.zst.part").write_bytes(b"")
+    assert tracker.is_upload_in_progress(file_path) is True
+
+
+def test_unstable_file_is_released_after_max_defer(tracker, tmp_path):
+    now = 2_000_000_000.0
+    file_path = _staged_file(tmp_path, mtime=now)
+    assert tracker.is_upload_in_progress(file_path, now=now) is True
+
+    later = now + 60 * 60
+    _staged_file(tmp_path, mtime=later)
+    assert tracker.is_upload_in_progress(file_path, now=later) is False